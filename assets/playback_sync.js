@@ -0,0 +1,112 @@
+// Reveals speaking replies word by word in step with the bot audio (see src/utils/playback_sync.py).
+// The server sends the audio and the whole text at once. The reply is rendered by the chatbot as usual;
+// its timing arrives as an empty .playback-sync element (data-* attributes) in a hidden HTML component
+// and is applied to the latest bot message of the chatbot it names.
+(() => {
+  const started = new Map(); // sync id -> performance.now() at playback start (survives chatbot re-renders)
+  const finished = new Set();
+  const AUTOPLAY_GRACE_MS = 1500; // fall back to the wall clock when autoplay never starts
+
+  function wrapWords(node) {
+    const words = [];
+    const walker = document.createTreeWalker(node, NodeFilter.SHOW_TEXT);
+    const texts = [];
+    while (walker.nextNode()) texts.push(walker.currentNode);
+    for (const text of texts) {
+      const frag = document.createDocumentFragment();
+      for (const part of text.textContent.split(/(\s+)/)) {
+        if (!part) continue;
+        if (/^\s+$/.test(part)) {
+          frag.appendChild(document.createTextNode(part));
+          continue;
+        }
+        const span = document.createElement("span");
+        span.className = "ps-word";
+        span.textContent = part;
+        frag.appendChild(span);
+        words.push(span);
+      }
+      text.replaceWith(frag);
+    }
+    return words;
+  }
+
+  function latestReply(timing) {
+    const messages = document.querySelectorAll(`#${timing.dataset.chatbot} .bot-row .message`);
+    return messages.length ? messages[messages.length - 1] : null;
+  }
+
+  function sync(timing, node) {
+    timing.dataset.synced = "1";
+    const id = timing.dataset.syncId;
+    if (!id || finished.has(id)) return;
+    const times = (timing.dataset.times || "").split(",").filter(Boolean).map(Number);
+    const duration = parseFloat(timing.dataset.duration) || 0;
+    const played = parseFloat(timing.dataset.played) || 0;
+    const words = wrapWords(node);
+    const shown = () => node.querySelectorAll(".ps-word.ps-shown").length;
+    const appeared = performance.now();
+    let sawPlaying = false;
+
+    function elapsed() {
+      const audio = timing.dataset.audio ? document.querySelector(`#${timing.dataset.audio} audio`) : null;
+      if (started.has(id)) {
+        // Whole-reply audio: follow the player (pauses, seeks); streamed segments: wall clock
+        if (audio && played === 0 && sawPlaying) return audio.ended ? Infinity : audio.currentTime;
+        return (performance.now() - started.get(id)) / 1000;
+      }
+      if (played > 0 || !audio) {
+        started.set(id, performance.now() - played * 1000);
+      } else if (!audio.paused && !audio.ended && audio.currentTime > 0) {
+        sawPlaying = true;
+        started.set(id, performance.now() - audio.currentTime * 1000);
+      } else if (performance.now() - appeared > AUTOPLAY_GRACE_MS) {
+        started.set(id, performance.now());
+      } else {
+        return 0;
+      }
+      return elapsed();
+    }
+
+    function tick() {
+      // Re-rendered message (shows in full) or a newer reply's timing replaced this one: stop revealing
+      if (!node.isConnected || !timing.isConnected) {
+        words.forEach((word) => word.classList.add("ps-shown"));
+        finished.add(id);
+        return;
+      }
+      const t = elapsed();
+      const overdue = started.has(id) && (performance.now() - started.get(id)) / 1000 > duration + 3;
+      words.forEach((word, i) => {
+        if (overdue || t >= (i < times.length ? times[i] : duration)) word.classList.add("ps-shown");
+      });
+      if (shown() < words.length) {
+        requestAnimationFrame(tick);
+      } else {
+        finished.add(id);
+      }
+    }
+    requestAnimationFrame(tick);
+  }
+
+  let scheduled = false;
+  function scan() {
+    scheduled = false;
+    document.querySelectorAll(".playback-sync:not([data-synced])").forEach((timing) => {
+      const id = timing.dataset.syncId;
+      if (id && finished.has(id)) {
+        timing.dataset.synced = "1";
+        return;
+      }
+      const node = latestReply(timing);
+      if (node) sync(timing, node); // else the chatbot has not rendered the reply yet: next mutation
+    });
+  }
+
+  new MutationObserver(() => {
+    if (!scheduled) {
+      scheduled = true;
+      requestAnimationFrame(scan);
+    }
+  }).observe(document.documentElement, { childList: true, subtree: true });
+})();
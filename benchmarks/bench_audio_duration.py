@@ -0,0 +1,65 @@
+"""Benchmark: get_audio_duration via full pydub decode vs the header-only probe.
+
+Usage (from the project root):
+    python -m benchmarks.bench_audio_duration --seconds 20 --repeat 20
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import wave
+
+from pydub import AudioSegment
+
+from src.utils.audio import clear_decoded_audio_cache, get_audio_duration
+
+
+def _make_wav(path: str, seconds: float, frame_rate: int) -> None:
+    with wave.open(path, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(frame_rate)
+        wf.writeframes(b"\x10\x00" * int(frame_rate * seconds))
+
+
+def _legacy_duration(path: str) -> float:
+    """The previous implementation: decode every sample to measure the length."""
+    return len(AudioSegment.from_file(path)) / 1000.0
+
+
+def _mean_ms(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) * 1000.0 / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--frame-rate", type=int, default=24000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix=".wav")
+    os.close(fd)
+    try:
+        _make_wav(path, args.seconds, args.frame_rate)
+        legacy_ms = _mean_ms(lambda: _legacy_duration(path), args.repeat)
+
+        def probe() -> float:
+            clear_decoded_audio_cache()  # each bot reply is a new file, so never count cache hits
+            return get_audio_duration(path)
+
+        probe_ms = _mean_ms(probe, args.repeat)
+        print(f"wav reply={args.seconds:.0f}s @ {args.frame_rate} Hz")
+        print(f"full decode:   {legacy_ms:8.3f} ms/call")
+        print(f"header probe:  {probe_ms:8.3f} ms/call")
+        print(f"speedup:       {legacy_ms / max(probe_ms, 1e-9):8.1f}x")
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Benchmark: request payload on long sessions, previous pruning vs the token-budget context assembler.
+
+Simulates a writing session (essay + feedback per evaluation) and a speaking session, and reports the
+estimated input tokens of the last request plus the assembly cost.
+
+Usage (from the project root):
+    python -m benchmarks.bench_context_budget --turns 30
+"""
+
+import argparse
+import json
+import time
+
+from src.utils.context_budget import assemble_context, context_budget, max_message_tokens, message_tokens
+
+ESSAY = "My favourite place is the beach near my grandmother's house, where we walk every summer. " * 30
+FEEDBACK = "Good structure. Watch verb tenses: 'we walk' should be 'we walked' for past summers. " * 25
+SPOKEN = "I went to the market yesterday and I bought some apples and a big loaf of bread. " * 2
+REPLY = "Nice! Quick correction: 'a big loaf of bread' is perfect. What did you cook with the apples? " * 5
+
+
+def _session(turns: int, user: str, assistant: str) -> list:
+    history = []
+    for i in range(turns):
+        history.append({"role": "user", "content": f"{i} {user}"})
+        history.append({"role": "assistant", "content": f"{i} {assistant}"})
+    history.append({"role": "user", "content": user})
+    return history
+
+
+def _previous_payload(mode: str, system: str, history: list) -> list:
+    """What was sent before: writing sent everything, speaking kept the last SPEAKING_MAX_HISTORY=12 messages."""
+    messages = [{"role": "system", "content": system}] + history
+    if mode == "speaking" and len(messages) > 13:
+        messages = [messages[0]] + messages[-12:]
+    return messages
+
+
+def _report(mode: str, history: list) -> None:
+    system = "system prompt " * 50
+    previous = _previous_payload(mode, system, history)
+    start = time.perf_counter()
+    result = assemble_context(
+        system, history, budget_tokens=context_budget(mode), max_turn_tokens=max_message_tokens(mode)
+    )
+    assemble_ms = (time.perf_counter() - start) * 1000.0
+    previous_tokens = sum(message_tokens(m) for m in previous)
+    print(
+        f"{mode:9s} previous: {previous_tokens:6d} tokens {len(json.dumps(previous)) / 1024:7.1f} KiB | "
+        f"budgeted: {result.tokens:5d} tokens {len(json.dumps(result.messages)) / 1024:6.1f} KiB "
+        f"({result.turns_sent} turns, {result.turns_trimmed} trimmed) in {assemble_ms:.3f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=30)
+    args = parser.parse_args()
+    _report("writing", _session(args.turns, ESSAY, FEEDBACK))
+    _report("speaking", _session(args.turns, SPOKEN, REPLY))
+
+
+if __name__ == "__main__":
+    main()
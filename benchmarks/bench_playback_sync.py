@@ -0,0 +1,90 @@
+"""Benchmark: Hybrid-mode turns served by a fixed worker pool, server-side playback wait vs client-driven sync.
+
+Runs the real SpeakingTutor.handle_bot_response against a fake model that returns a reply of ``--words``
+words with ``--audio-s`` seconds of audio. The previous protocol is modelled as the same handler followed
+by the wait it used to do on the worker (audio duration + 0.2 s, then 50 ms per word of simulated text).
+
+Usage (from the project root):
+    python -m benchmarks.bench_playback_sync --workers 4 --turns 16 --audio-s 0.5 --words 20
+"""
+
+import argparse
+import asyncio
+import base64
+import io
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from src.core.speaking_tutor import SpeakingTutor
+
+
+def _wav(seconds: float, rate: int = 24000) -> bytes:
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(b"\x00\x00" * int(rate * seconds))
+    return buf.getvalue()
+
+
+class _FakeService:
+    def __init__(self, text: str, audio: bytes) -> None:
+        message = SimpleNamespace(
+            content=[
+                {"type": "output_text", "text": text},
+                {"type": "output_audio", "audio": {"data": base64.b64encode(audio).decode()}},
+            ],
+            audio=None,
+        )
+        self._response = SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    async def achat_multimodal(self, messages, max_tokens):
+        return self._response
+
+
+def _run(workers: int, turns: int, audio_s: float, words: int, legacy: bool) -> float:
+    text = " ".join(["word"] * words)
+    service = _FakeService(text, _wav(audio_s))
+    parent = SimpleNamespace(
+        openai_service=service, telemetry=None, get_system_message=lambda mode, level=None: "You are Sophia."
+    )
+    tutor = SpeakingTutor(service, parent)
+
+    async def respond(i: int) -> None:
+        history = [{"role": "user", "content": f"Hello {i}"}]
+        async for _ in tutor.handle_bot_response(history=history, level="B1", speaking_mode="Hybrid"):
+            pass
+
+    def turn(i: int) -> None:
+        asyncio.run(respond(i))
+        if legacy:
+            time.sleep(audio_s + 0.2 + 0.05 * words)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(turn, range(turns)))
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=4, help="worker threads serving bot responses")
+    parser.add_argument("--turns", type=int, default=16)
+    parser.add_argument("--audio-s", type=float, default=0.5)
+    parser.add_argument("--words", type=int, default=20)
+    args = parser.parse_args()
+
+    for label, legacy in (("server wait", True), ("client sync", False)):
+        elapsed = _run(args.workers, args.turns, args.audio_s, args.words, legacy)
+        held = elapsed * args.workers / args.turns
+        print(
+            f"{label:12s}: {args.turns} turns on {args.workers} workers in {elapsed:6.2f} s "
+            f"({args.turns / elapsed:7.1f} turns/s, worker held {held * 1000:7.1f} ms per turn)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Benchmark: pydub loop-based pronunciation metrics vs the NumPy frame-energy engine.
+
+Usage (from the project root):
+    python -m benchmarks.bench_pronunciation_metrics --seconds 30 --repeat 3
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import wave
+
+import numpy as np
+from pydub import AudioSegment
+from pydub.silence import detect_nonsilent
+
+from src.utils.audio import analyze_pronunciation_metrics
+
+
+def _make_wav(path: str, seconds: float, frame_rate: int) -> None:
+    t = np.arange(int(frame_rate * seconds)) / frame_rate
+    gate = (np.floor(t / 0.8) % 2 == 0).astype(float)
+    samples = 9000 * np.sin(2 * np.pi * 180 * t) * gate + np.random.default_rng(1).normal(0, 30, t.size)
+    with wave.open(path, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(frame_rate)
+        wf.writeframes(np.clip(samples, -32768, 32767).astype("<i2").tobytes())
+
+
+def _legacy_core(path: str) -> float:
+    """The previous hot path: pydub detect_nonsilent + per-sample Python clipping loop."""
+    audio = AudioSegment.from_file(path)
+    nonsilent = detect_nonsilent(audio, min_silence_len=200, silence_thresh=audio.dBFS - 16.0)
+    threshold = 0.98 * float(2 ** (8 * audio.sample_width - 1) - 1)
+    clipped = 0
+    for s in audio.get_array_of_samples():
+        if abs(int(s)) >= threshold:
+            clipped += 1
+    _ = (audio.dBFS, audio.max_dBFS)
+    return sum(end - start for start, end in nonsilent) / 1000.0
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=30.0)
+    parser.add_argument("--frame-rate", type=int, default=48000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix=".wav")
+    os.close(fd)
+    try:
+        _make_wav(path, args.seconds, args.frame_rate)
+        legacy_ms = _best_of(lambda: _legacy_core(path), args.repeat)
+        numpy_ms = _best_of(lambda: analyze_pronunciation_metrics(path), args.repeat)
+        print(f"clip={args.seconds:.0f}s @ {args.frame_rate} Hz")
+        print(f"legacy (pydub loop):   {legacy_ms:9.1f} ms")
+        print(f"numpy frame-energy:    {numpy_ms:9.1f} ms")
+        print(f"speedup:               {legacy_ms / max(numpy_ms, 1e-9):9.1f}x")
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
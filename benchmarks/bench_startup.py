@@ -0,0 +1,91 @@
+"""Benchmark: time-to-listen (process start -> first /healthz 200) with blocking vs background key validation.
+
+The OpenAI round trip is simulated with a sleep so the numbers do not depend on the network.
+
+Usage (from the project root):
+    python -m benchmarks.bench_startup --validation-ms 1500 --repeat 3
+"""
+
+import argparse
+import http.client
+import os
+import socket
+import tempfile
+import threading
+import time
+
+import uvicorn
+
+from src.core.tutor import EnglishTutor
+from src.services.openai_service import OpenAIService
+from ui.interfaces import run_gradio_interface
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _healthz_ok(port: int) -> bool:
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+    try:
+        conn.request("GET", "/healthz")
+        return conn.getresponse().status == 200
+    except (OSError, http.client.HTTPException):
+        return False
+    finally:
+        conn.close()
+
+
+def _time_to_listen(blocking: bool) -> float:
+    start = time.perf_counter()
+    tutor = EnglishTutor()
+    if blocking:
+        # The previous startup: validate synchronously before the server can bind
+        OpenAIService.is_key_valid(tutor.openai_api_key)
+    app = run_gradio_interface(tutor)
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    try:
+        while not _healthz_ok(port):
+            time.sleep(0.01)
+        return (time.perf_counter() - start) * 1000.0
+    finally:
+        server.should_exit = True
+        thread.join(10)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--validation-ms", type=float, default=1500.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    def simulated_validation(api_key: str, use_cache: bool = True) -> bool:
+        time.sleep(args.validation_ms / 1000.0)
+        return True
+
+    OpenAIService.is_key_valid = staticmethod(simulated_validation)
+    os.environ.update(
+        {
+            "OPENAI_API_KEY": "sk-bench",
+            "OPENAI_HTTP_WARMUP": "0",
+            "TELEMETRY_DIR": tempfile.mkdtemp(prefix="bench-telemetry-"),
+        }
+    )
+
+    results = {}
+    for blocking in (True, False):
+        runs = [_time_to_listen(blocking) for _ in range(args.repeat)]
+        results[blocking] = sorted(runs)[len(runs) // 2]
+
+    print(f"simulated key validation={args.validation_ms:.0f} ms, median of {args.repeat}")
+    print(f"blocking validation:    {results[True]:8.1f} ms to first /healthz")
+    print(f"background validation:  {results[False]:8.1f} ms to first /healthz")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Benchmark: per-turn session save latency on the SQLite state backend, synchronous vs batched writes.
+
+Each "turn" bumps a learner's progress and saves the session, as the tutors do after a reply.
+
+Usage (from the project root):
+    python -m benchmarks.bench_state_backend --turns 2000 --sessions 200
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from src.core.session_store import SessionStore
+from src.infra.state_backend import SQLiteStateBackend
+
+
+def _turn_latencies_ms(flush_ms: float, turns: int, sessions: int) -> list:
+    with tempfile.TemporaryDirectory(prefix="bench-state-") as tmp:
+        store = SessionStore(backend=SQLiteStateBackend(os.path.join(tmp, "state.db"), flush_ms=flush_ms))
+        latencies = []
+        for i in range(turns):
+            state = store.get(f"session:{i % sessions}")
+            state.progress.add_xp(20)
+            state.set_summary(state.running_summary + f" turn {i}.")
+            start = time.perf_counter()
+            store.save(state)
+            latencies.append((time.perf_counter() - start) * 1000.0)
+        store.backend.close()
+    return sorted(latencies)
+
+
+def _pct(values: list, p: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=2000)
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--flush-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    sync = _turn_latencies_ms(0, args.turns, args.sessions)
+    batched = _turn_latencies_ms(args.flush_ms, args.turns, args.sessions)
+
+    print(f"turns={args.turns} sessions={args.sessions}")
+    print(f"synchronous writes:  p50={_pct(sync, 0.5):7.3f} ms  p99={_pct(sync, 0.99):7.3f} ms")
+    print(f"batched ({args.flush_ms:.0f} ms):     p50={_pct(batched, 0.5):7.3f} ms  p99={_pct(batched, 0.99):7.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Benchmark: caller-side cost per telemetry event, synchronous file append vs buffered background writer.
+
+``--threads`` callers each record ``--events`` histogram samples, as the tutors do on the request path.
+Synchronous mode (TELEMETRY_FLUSH_INTERVAL_MS=0) opens, appends and closes the daily file for every event;
+buffered mode only appends to memory and a writer thread writes batches. The buffered run includes the
+final flush in its total time.
+
+Usage (from the project root):
+    python -m benchmarks.bench_telemetry --events 20000 --threads 4
+"""
+
+import argparse
+import tempfile
+import threading
+import time
+
+from src.infra.telemetry import TelemetryService
+
+
+def _run(flush_ms: float, events: int, threads: int) -> tuple:
+    with tempfile.TemporaryDirectory(prefix="bench-telemetry-") as tmp:
+        telemetry = TelemetryService(base_dir=tmp, flush_ms=flush_ms, max_pending=events * threads + 1)
+        latencies = [[] for _ in range(threads)]
+
+        def caller(n: int) -> None:
+            out = latencies[n]
+            for i in range(events):
+                start = time.perf_counter()
+                telemetry.observe_hist("bench_latency_ms", float(i), {"model": "gpt-4o-mini", "mode": "writing"})
+                out.append((time.perf_counter() - start) * 1e6)
+
+        start = time.perf_counter()
+        workers = [threading.Thread(target=caller, args=(n,)) for n in range(threads)]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        telemetry.close()
+        total = time.perf_counter() - start
+    return sorted(x for per_thread in latencies for x in per_thread), total
+
+
+def _pct(values: list, p: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=20000, help="events per thread")
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--flush-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    print(f"events={args.events} x threads={args.threads}")
+    for label, flush_ms in (("append per event", 0.0), (f"buffered ({args.flush_ms:.0f} ms)", args.flush_ms)):
+        lat, total = _run(flush_ms, args.events, args.threads)
+        print(
+            f"{label:20s}: p50={_pct(lat, 0.5):7.2f} us  p99={_pct(lat, 0.99):8.2f} us  "
+            f"total incl. flush={total:6.2f} s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Benchmark: hourly p50/p95/p99 by name and labels over daily telemetry files, ad-hoc script vs rollup tool.
+
+Writes ``--days`` synthetic metrics-YYYYMMDD.jsonl files of ``--lines`` events each (latency histograms
+by model, counters, stream_summary events, in the TelemetryService line format), then times:
+- an ad-hoc script: json.loads every line in one process, keep every value, sort for quantiles
+- src.infra.telemetry_rollup, cold: mmap + process pool, writes the per-file rollups
+- src.infra.telemetry_rollup, warm: every file has a fresh rollup, only the rollups are read
+
+Usage (from the project root):
+    python -m benchmarks.bench_telemetry_rollup --days 30 --lines 50000
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, UTC
+
+from src.infra.telemetry_rollup import query, rollup, source_files
+
+
+def _write_days(directory: str, days: int, lines: int) -> int:
+    rng = random.Random(7)
+    start = datetime(2025, 1, 1, tzinfo=UTC)
+    total = 0
+    for d in range(days):
+        day = start + timedelta(days=d)
+        with open(os.path.join(directory, f"metrics-{day:%Y%m%d}.jsonl"), "w", encoding="utf-8") as f:
+            for i in range(lines):
+                ts = (day + timedelta(seconds=i * 86400 / lines)).isoformat()
+                r = rng.random()
+                if r < 0.5:
+                    model = rng.choice(("gpt-4o-mini-transcribe", "whisper-1"))
+                    rec = {"ts": ts, "type": "histogram", "name": "transcribe_latency_ms"}
+                    rec.update({"value": rng.lognormvariate(6, 0.5), "labels": {"model": model}})
+                elif r < 0.9:
+                    rec = {"ts": ts, "type": "counter", "name": "audio_attempts_total"}
+                    rec["labels"] = {"model": "gpt-4o-mini-audio-preview", "voice": "alloy"}
+                else:
+                    rec = {"ts": ts, "type": "event", "name": "stream_summary"}
+                    rec["labels"] = {"model": "gpt-4o-mini", "mode": "writing", "ttft_ms": rng.uniform(200, 900)}
+                f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+                total += 1
+    return total
+
+
+def _adhoc(directory: str) -> int:
+    values = {}
+    for path in source_files(directory):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                rec = json.loads(line)
+                if rec["type"] == "histogram":
+                    key = (rec["ts"][:13], rec["name"], json.dumps(rec.get("labels"), sort_keys=True))
+                    values.setdefault(key, []).append(rec["value"])
+    for vals in values.values():
+        vals.sort()
+        _ = [vals[int(q * (len(vals) - 1))] for q in (0.5, 0.95, 0.99)]
+    return len(values)
+
+
+def _tool(directory: str, workers: int) -> int:
+    rows = query(rollup(directory, workers=workers), bucket="hour", names=["*_ms"])
+    for agg in rows.values():
+        _ = [agg.quantile(q) for q in (0.5, 0.95, 0.99)]
+    return len(rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--lines", type=int, default=50000, help="events per daily file")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench-rollup-") as tmp:
+        events = _write_days(tmp, args.days, args.lines)
+        print(f"days={args.days} events={events} workers={args.workers}")
+        for label, fn in (
+            ("ad-hoc json.loads", lambda: _adhoc(tmp)),
+            ("rollup (cold)", lambda: _tool(tmp, args.workers)),
+            ("rollup (cached)", lambda: _tool(tmp, args.workers)),
+        ):
+            start = time.perf_counter()
+            groups = fn()
+            elapsed = time.perf_counter() - start
+            year = elapsed * 365 / args.days
+            print(f"{label:18s}: {elapsed:6.2f} s ({events / elapsed / 1e6:5.2f} M events/s, ~{year:6.1f} s per year)")
+            _ = groups
+
+
+if __name__ == "__main__":
+    main()
@@ -50,6 +50,24 @@ const postSpeakingMetrics = async (payload: {
   return (await res.json()) as SpeakingMetrics;
 };
 
+// Fall back to the wall clock when the reply audio never starts (autoplay blocked, no audio)
+const AUTOPLAY_GRACE_MS = 1500;
+
+// First `count` words of `text`, keeping its original spacing (and Markdown)
+const firstWords = (text: string, count: number): string => {
+  let seen = 0;
+  let out = "";
+  for (const part of text.split(/(\s+)/)) {
+    if (!part) continue;
+    if (!/^\s+$/.test(part)) {
+      if (seen >= count) break;
+      seen++;
+    }
+    out += part;
+  }
+  return out.trimEnd();
+};
+
 interface SpeakingTabProps {
   englishLevel: EnglishLevel;
 }
@@ -103,6 +121,12 @@ const SpeakingTab: React.FC<SpeakingTabProps> = ({ englishLevel }) => {
   const lastUserAudioDataUrlRef = useRef<string | null>(null);
   const transcriptMetricsSentRef = useRef<boolean>(false);
   const lastUserMsgIndexRef = useRef<number | null>(null);
+  // Hybrid replies are revealed word by word in step with their audio (timing from the backend)
+  const [revealSync, setRevealSync] = useState<api.PlaybackSync | null>(null);
+  const [revealedWords, setRevealedWords] = useState<number>(Infinity);
+  const revealIdRef = useRef<string | null>(null);
+  const playbackStartRef = useRef<number | null>(null);
+  const playbackEndedRef = useRef<boolean>(false);
 
   // Escalation UI state
   const [escalatedIndices, setEscalatedIndices] = useState<number[]>([]);
@@ -139,6 +163,35 @@ const SpeakingTab: React.FC<SpeakingTabProps> = ({ englishLevel }) => {
     };
   }, []);
 
+  // Like assets/playback_sync.js: follow this tab's playback once it starts, else the wall clock after a grace period
+  useEffect(() => {
+    if (!revealSync) return;
+    const { duration, played, times } = revealSync;
+    const appeared = performance.now();
+    let frame = 0;
+    const elapsed = (): number => {
+      const now = performance.now();
+      if (playbackEndedRef.current) return Infinity;
+      if (playbackStartRef.current !== null)
+        return (now - playbackStartRef.current) / 1000;
+      // Streamed reply whose audio began before the timing arrived
+      if (played > 0) return played + (now - appeared) / 1000;
+      return Math.max(0, now - appeared - AUTOPLAY_GRACE_MS) / 1000;
+    };
+    const tick = () => {
+      const t = elapsed();
+      if (t > duration) {
+        setRevealedWords(Infinity);
+        return;
+      }
+      const shown = times.filter((start) => start <= t).length;
+      setRevealedWords(shown);
+      frame = requestAnimationFrame(tick);
+    };
+    frame = requestAnimationFrame(tick);
+    return () => cancelAnimationFrame(frame);
+  }, [revealSync]);
+
   // ---------- Escalation helpers ----------
   const handleEscalateRequest = (idx: number) => {
     if (!ENABLE_ESCALATION) return;
@@ -294,11 +347,13 @@ const SpeakingTab: React.FC<SpeakingTabProps> = ({ englishLevel }) => {
         console.log("🔊 Starting audio playback after short delay...");
         setBotSpeaking(true);
         source.start(0);
+        playbackStartRef.current = performance.now();
       }, 150); // 150ms delay is enough for the browser to settle.
 
       source.onended = () => {
         console.log("🔊 Audio playback finished");
         setBotSpeaking(false);
+        playbackEndedRef.current = true;
       };
     } catch (error) {
       console.error("Error playing audio with Web Audio API:", error);
@@ -320,6 +375,10 @@ const SpeakingTab: React.FC<SpeakingTabProps> = ({ englishLevel }) => {
     unlockAudioContext(); // Unlock audio on user gesture
     audioPlayedRef.current = false; // Reset for the new interaction
     lastAudioUrlRef.current = null; // allow new URL to play in this turn
+    playbackStartRef.current = null;
+    playbackEndedRef.current = false;
+    setRevealSync(null);
+    setRevealedWords(Infinity);
     transcriptMetricsSentRef.current = false; // reset for a fresh metrics-with-transcript call
     setSpeakingMetrics(null); // clear previous banner
     // No need to clear userBadgesByIndex; keep history per turn
@@ -427,7 +486,7 @@ const SpeakingTab: React.FC<SpeakingTabProps> = ({ englishLevel }) => {
           practiceMode,
           (data) => {
             // onData callback
-            const { messages: serverMessages, audioUrl } = data;
+            const { messages: serverMessages, audioUrl, sync } = data;
             console.debug(
               `[UX] 🟢 onData: messages=${
                 serverMessages.length
@@ -435,6 +494,12 @@ const SpeakingTab: React.FC<SpeakingTabProps> = ({ englishLevel }) => {
             );
             lastActivityRef.current = Date.now();
             armWatchdog();
+            if (sync && sync.id !== revealIdRef.current) {
+              // New reply timing: hide its words until the audio reaches them
+              revealIdRef.current = sync.id;
+              setRevealedWords(0);
+              setRevealSync(sync);
+            }
             if (audioUrl && !audioPlayedRef.current) {
               console.info("[UX] 🔊 playAudio invoked");
               playAudio(audioUrl);
@@ -791,6 +856,20 @@ const SpeakingTab: React.FC<SpeakingTabProps> = ({ englishLevel }) => {
     );
   };
 
+  // Latest text reply cut to the words its audio has reached
+  const displayMessages = (() => {
+    if (!revealSync || revealedWords === Infinity) return messages;
+    for (let i = messages.length - 1; i >= 0; i--) {
+      const m = messages[i];
+      if (m.role === "assistant" && typeof m.content === "string") {
+        const shown = [...messages];
+        shown[i] = { ...m, content: firstWords(m.content, revealedWords) };
+        return shown;
+      }
+    }
+    return messages;
+  })();
+
   return (
     <div className="flex flex-col h-full max-w-4xl mx-auto">
       <div className="flex justify-center mb-6">
@@ -828,7 +907,7 @@ const SpeakingTab: React.FC<SpeakingTabProps> = ({ englishLevel }) => {
 
       <div className="flex-1 min-h-0 overflow-hidden pr-4">
         <Chatbot
-          messages={messages}
+          messages={displayMessages}
           isLoading={isLoading}
           practiceMode={practiceMode}
           botIsSpeaking={botSpeaking}
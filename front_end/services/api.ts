@@ -3,6 +3,7 @@ import type { EnglishLevel, WritingType, ChatMessage, ProgressData } from "../ty
 import type {
   GradioFile,
   GradioProgressPayload,
+  GradioProgressDataPayload,
   GradioTopicPayload,
   GradioEvaluationPayload,
   GradioAudioPlaybackPayload,
@@ -66,12 +67,39 @@ export const setApiKey = async (apiKey: string): Promise<string> => {
   return data[0] ?? "Error: No status message received.";
 };
 
+// Reveal timing of a Hybrid reply (src/utils/playback_sync.py): start time of each word, in seconds into its audio
+export interface PlaybackSync {
+  id: string;
+  duration: number;
+  played: number; // audio already played when the timing was sent (streamed replies)
+  times: number[];
+}
+
+// The timing arrives as an empty .playback-sync element (data-* attributes) in its own output; other yields skip it
+export const parsePlaybackSync = (html: unknown): PlaybackSync | null => {
+  if (typeof html !== "string" || !html.includes("playback-sync")) return null;
+  const attr = (name: string) =>
+    html.match(new RegExp(`data-${name}="([^"]*)"`))?.[1] ?? "";
+  const id = attr("sync-id");
+  if (!id) return null;
+  return {
+    id,
+    duration: parseFloat(attr("duration")) || 0,
+    played: parseFloat(attr("played")) || 0,
+    times: attr("times").split(",").filter(Boolean).map(Number),
+  };
+};
+
 // AUDIO FLOW
 export const handleTranscriptionAndResponse = (
   audioBlob: Blob,
   level: EnglishLevel,
   practiceMode: "hybrid" | "immersive",
-  onData: (data: { messages: ChatMessage[]; audioUrl: string | null }) => void,
+  onData: (data: {
+    messages: ChatMessage[];
+    audioUrl: string | null;
+    sync?: PlaybackSync | null;
+  }) => void,
   onError: (error: Error) => void,
   onComplete?: () => void
 ) => {
@@ -114,7 +142,12 @@ export const handleTranscriptionAndResponse = (
               if (VERBOSE_GRADIO_LOGS) {
                 console.log(" Gradio streaming raw msg.data:", msg.data);
               }
-              const [rawMessages, audioFile] = msg.data as [any[], any];
+              // Outputs: chatbot, audio, playback timing (gr.State outputs are not sent to the client)
+              const [rawMessages, audioFile, syncHtml] = msg.data as [
+                any[],
+                any,
+                unknown
+              ];
               latestRawMessages = rawMessages;
               latestAudioFile = audioFile;
               if (practiceMode === "immersive") {
@@ -124,10 +157,11 @@ export const handleTranscriptionAndResponse = (
                   audioUrl: null,
                 });
               } else {
-                // Hybrid: stream audio URL as usual
+                // Hybrid: stream audio URL as usual; the text is revealed against it using the timing
                 onData({
                   messages: formatMessages(rawMessages),
                   audioUrl: getFileUrl(audioFile),
+                  sync: parsePlaybackSync(syncHtml),
                 });
               }
             } else if (msg.type === "status" && msg.stage === "error") {
@@ -333,8 +367,11 @@ export const getProgressHtml = async (): Promise<string> => {
 };
 
 // PROGRESS (JSON)
+// Served through Gradio so the backend resolves this browser's own session (the one its turns are saved under)
 export const getProgressData = async (): Promise<ProgressData> => {
-  return jsonFetch<ProgressData>(`${API_BASE_URL}/api/progress`);
+  const client = await getClient();
+  const response = await client.predict("/get_progress", {});
+  return (response.data as GradioProgressDataPayload)[0];
 };
 
 // ---------- Escalation API ----------
@@ -5,6 +5,8 @@
  * safely handle the API responses in our application.
  */
 
+import type { ProgressData } from "../types";
+
 // Represents a file object returned by Gradio. It can contain a server path or a direct URL.
 export interface GradioFile {
   path?: string;
@@ -38,6 +40,10 @@ export type GradioAudioPlaybackPayload = [GradioFile | null];
 // It returns the user's progress dashboard as an HTML string.
 export type GradioProgressPayload = [string | null];
 
+// Payload for the /get_progress endpoint.
+// It returns the progress of the learner behind the calling Gradio session as JSON.
+export type GradioProgressDataPayload = [ProgressData];
+
 // Payload for the /set_api_key_ui endpoint.
 // It returns a status message string.
 export type GradioApiKeyStatusPayload = [string | null];
@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING, Any, Dict, Generator, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Callable, Dict, Generator, List, Optional, Tuple
 
+from src.core.session_store import DEFAULT_SESSION_ID, SessionState
+from src.infra.post_turn_queue import PostTurnQueue
 from src.services.openai_service import OpenAIService
 
 if TYPE_CHECKING:
@@ -11,6 +13,47 @@ class BaseTutor(ABC):
     def __init__(self, openai_service: OpenAIService, tutor_parent: "EnglishTutor"):
         self.openai_service = openai_service
         self.tutor_parent = tutor_parent
+        self._local_session: Optional[SessionState] = None
+
+    def _session(self, request: Any = None) -> SessionState:
+        """Per-learner state for a Gradio request; parents without a session store get one tutor-local session."""
+        get_session = getattr(self.tutor_parent, "session", None)
+        if callable(get_session):
+            return get_session(request)
+        if self._local_session is None:
+            self._local_session = SessionState(session_id=DEFAULT_SESSION_ID)
+        return self._local_session
+
+    def _save_session(self, session: SessionState) -> None:
+        save = getattr(self.tutor_parent, "save_session", None)
+        if callable(save):
+            save(session)
+
+    def _post_turn(
+        self,
+        session: SessionState,
+        fn: Callable[[], None],
+        task: Optional[str] = None,
+        required: bool = True,
+        coalesce: Optional[str] = None,
+    ) -> None:
+        """Run ``fn`` after the reply, on the parent's PostTurnQueue (in session order).
+
+        ``task`` labels the work in telemetry; ``coalesce`` lets a newer submission replace a queued one
+        and must only be used for idempotent work (never for progress awards, which would be lost).
+        Without a queue, or when the queue is full, ``required`` work runs inline; optional work is skipped.
+        """
+        queue = getattr(self.tutor_parent, "post_turn", None)
+        if isinstance(queue, PostTurnQueue) and queue.submit(session.session_id, fn, coalesce=coalesce, task=task):
+            return
+        if required or not isinstance(queue, PostTurnQueue):
+            fn()
+
+    def _record_turn(self, session: SessionState) -> None:
+        """Award a completed turn (20 XP, one task) and persist the session."""
+        session.progress.add_xp(20)
+        session.progress.increment_tasks()
+        self._save_session(session)
 
     @abstractmethod
     def process_input(
@@ -7,9 +7,12 @@ import uuid
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 from urllib.parse import unquote
 
+if TYPE_CHECKING:
+    from src.infra.state_backend import StateBackend
+
 
 @dataclass
 class EscalationRecord:
@@ -56,9 +59,14 @@ class EscalationRecord:
 
 
 class EscalationManager:
-    """Manages creation, listing, and resolution of human escalations using JSONL storage."""
+    """Manages creation, listing, and resolution of human escalations.
+
+    Records go to ``escalations.jsonl`` by default, or to a shared StateBackend (STATE_BACKEND) when one is
+    given, so several workers can create and resolve escalations without rewriting each other's file.
+    """
 
-    def __init__(self, base_dir: Optional[Path | str] = None) -> None:
+    def __init__(self, base_dir: Optional[Path | str] = None, backend: Optional["StateBackend"] = None) -> None:
+        self.backend = backend
         self.base_dir = Path(base_dir) if base_dir else Path("user_data")
         self.base_dir.mkdir(parents=True, exist_ok=True)
         self.store_path = self.base_dir / "escalations.jsonl"
@@ -111,6 +119,8 @@ class EscalationManager:
 
     def list(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
         """List escalation records, optionally filtered by status."""
+        if self.backend is not None:
+            return self.backend.list_escalations(status)
         if not self.store_path.exists():
             return []
         records = []
@@ -129,15 +139,16 @@ class EscalationManager:
 
     def resolve(self, escalation_id: str, note: Optional[str] = None) -> Dict[str, Any]:
         """Mark an escalation as resolved and persist the update via rewrite."""
+        if self.backend is not None:
+            resolved = self.backend.update_escalation(escalation_id, lambda rec: self._mark_resolved(rec, note))
+            if resolved is None:
+                raise ValueError(f"Escalation id not found: {escalation_id}")
+            return resolved
         records = self.list()  # read all
         found = None
         for rec in records:
             if rec.get("id") == escalation_id:
-                rec["status"] = "resolved"
-                rec["resolved_at"] = datetime.now(timezone.utc).isoformat()
-                if note:
-                    rec["resolution_note"] = note
-                found = rec
+                found = self._mark_resolved(rec, note)
                 break
         if not found:
             raise ValueError(f"Escalation id not found: {escalation_id}")
@@ -151,13 +162,26 @@ class EscalationManager:
 
     def get(self, escalation_id: str) -> Optional[Dict[str, Any]]:
         """Return a single escalation by id, or None if not found."""
+        if self.backend is not None:
+            return self.backend.get_escalation(escalation_id)
         for rec in self.list():
             if rec.get("id") == escalation_id:
                 return rec
         return None
 
     # --------------- Internal helpers ---------------
+    @staticmethod
+    def _mark_resolved(rec: Dict[str, Any], note: Optional[str]) -> Dict[str, Any]:
+        rec["status"] = "resolved"
+        rec["resolved_at"] = datetime.now(timezone.utc).isoformat()
+        if note:
+            rec["resolution_note"] = note
+        return rec
+
     def _append_jsonl(self, rec: Dict[str, Any]) -> None:
+        if self.backend is not None:
+            self.backend.put_escalation(rec)
+            return
         with self.store_path.open("a", encoding="utf-8") as f:
             f.write(json.dumps(rec, ensure_ascii=False) + "\n")
 
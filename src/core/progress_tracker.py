@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import List
+from typing import ClassVar, List
 
 """Module for tracking user progress such as XP, badges, completed tasks, etc.
 
@@ -37,20 +37,21 @@ class BadgeDefinition:
 class ProgressTracker:
     """Simple XP, badge and task tracker for the user."""
 
+    # Badge definitions - XP thresholds must be > 0 for XP-based badges.
+    # Shared by every tracker: one is created per learner session.
+    BADGES: ClassVar[List[BadgeDefinition]] = [
+        BadgeDefinition(name="First Steps", description="Earn 50 XP", threshold=50),
+        BadgeDefinition(name="Getting Warmer", description="Earn 200 XP", threshold=200),
+        BadgeDefinition(name="Rising Star", description="Earn 500 XP", threshold=500),
+        BadgeDefinition(name="Master", description="Earn 1000 XP", threshold=1000),
+        # Task-based badge (threshold=0 means it's not XP-based)
+        BadgeDefinition(name="Wordsmith", description="Complete 10 writing tasks", threshold=0),
+    ]
+
     def __init__(self):
         self.xp: int = 0
         self.tasks_completed: int = 0
         self.skills: dict[str, int] = {"grammar": 0, "vocabulary": 0, "pronunciation": 0}
-
-        # Badge definitions - XP thresholds must be > 0 for XP-based badges
-        self.BADGES: List[BadgeDefinition] = [
-            BadgeDefinition(name="First Steps", description="Earn 50 XP", threshold=50),
-            BadgeDefinition(name="Getting Warmer", description="Earn 200 XP", threshold=200),
-            BadgeDefinition(name="Rising Star", description="Earn 500 XP", threshold=500),
-            BadgeDefinition(name="Master", description="Earn 1000 XP", threshold=1000),
-            # Task-based badge (threshold=0 means it's not XP-based)
-            BadgeDefinition(name="Wordsmith", description="Complete 10 writing tasks", threshold=0),
-        ]
         self.badges: List[str] = []
 
     def add_xp(self, amount: int) -> None:
@@ -114,6 +115,41 @@ class ProgressTracker:
         xp_for_next = level * xp_per_level
         return {"level": level, "xp_for_current": xp_for_current, "xp_for_next": xp_for_next}
 
+    def to_state(self) -> dict:
+        """Raw counters for persistence (see ``from_state``); unlike ``to_json`` nothing is derived."""
+        return {
+            "xp": self.xp,
+            "tasks_completed": self.tasks_completed,
+            "skills": dict(self.skills),
+            "badges": list(self.badges),
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> "ProgressTracker":
+        tracker = cls()
+        tracker.xp = int(state.get("xp", 0))
+        tracker.tasks_completed = int(state.get("tasks_completed", 0))
+        tracker.skills.update({k: int(v) for k, v in (state.get("skills") or {}).items()})
+        tracker.badges = [str(b) for b in state.get("badges") or []]
+        # Counters merged from concurrent saves can cross a threshold neither save reached
+        tracker._check_badges()
+        return tracker
+
+    @staticmethod
+    def state_delta(old: dict, new: dict) -> dict:
+        """Counter increments (xp, tasks, skills) between two ``to_state`` snapshots, for merging concurrent saves."""
+        delta: dict = {}
+        for key in ("xp", "tasks_completed"):
+            if new.get(key, 0) != old.get(key, 0):
+                delta[key] = new.get(key, 0) - old.get(key, 0)
+        old_skills = old.get("skills") or {}
+        skills = {
+            k: v - old_skills.get(k, 0) for k, v in (new.get("skills") or {}).items() if v != old_skills.get(k, 0)
+        }
+        if skills:
+            delta["skills"] = skills
+        return delta
+
     def to_json(self) -> dict:
         """Return structured progress data for REST consumption.
 
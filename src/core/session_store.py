@@ -0,0 +1,278 @@
+import logging
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.core.progress_tracker import ProgressTracker
+from src.infra.state_backend import StateBackend
+from src.infra.telemetry import TelemetryService
+
+_logger = logging.getLogger(__name__)
+if not _logger.handlers:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+# Used when a call has no Gradio request (REST API, scripts, tests): behaves like the old single-user state
+DEFAULT_SESSION_ID = "default"
+# Prefix of ids keyed by the (random, unguessable) Gradio browser session hash
+SESSION_ID_PREFIX = "session:"
+
+
+@dataclass
+class SessionState:
+    """Per-learner state: progress, running conversation summary and UI settings.
+
+    The summary and settings are capped (SPEAKING_SUMMARY_MAX_CHARS, SESSION_SETTINGS_MAX_KEYS,
+    SESSION_SETTING_MAX_CHARS) so a single session cannot grow without bound.
+    """
+
+    session_id: str
+    progress: ProgressTracker = field(default_factory=ProgressTracker)
+    running_summary: str = ""
+    settings: Dict[str, str] = field(default_factory=dict)
+    created_at: float = field(default_factory=time.time)
+    last_seen: float = field(default_factory=time.time)
+    # Bumped on every save; a shared backend merges saves made from an outdated revision
+    rev: int = 0
+    # Progress as last loaded/saved, so a save can send its counter increments (transient, not persisted)
+    saved_progress: Dict[str, Any] = field(default_factory=dict, repr=False, compare=False)
+    # Exchanges not yet folded into the running summary (transient, not persisted)
+    pending_exchanges: List[Tuple[str, str]] = field(default_factory=list)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def set_summary(self, summary: str) -> None:
+        max_chars = int(os.getenv("SPEAKING_SUMMARY_MAX_CHARS", "1200"))
+        self.running_summary = (summary or "")[-max_chars:]
+
+    def add_exchange(self, user_text: str, tutor_text: str) -> int:
+        """Record a finished exchange for the next summary refresh; returns how many are waiting."""
+        max_chars = int(os.getenv("SPEAKING_SUMMARY_MAX_CHARS", "1200"))
+        max_waiting = max(1, int(os.getenv("SUMMARY_EVERY_N_TURNS", "3"))) * 2
+        with self._lock:
+            self.pending_exchanges.append((user_text[:max_chars], tutor_text[:max_chars]))
+            del self.pending_exchanges[:-max_waiting]
+            return len(self.pending_exchanges)
+
+    def take_exchanges(self) -> List[Tuple[str, str]]:
+        with self._lock:
+            taken, self.pending_exchanges = self.pending_exchanges, []
+        return taken
+
+    def remember(self, **settings: Optional[str]) -> None:
+        """Store UI settings (level, speaking mode, ...); None values are ignored."""
+        max_keys = int(os.getenv("SESSION_SETTINGS_MAX_KEYS", "16"))
+        max_chars = int(os.getenv("SESSION_SETTING_MAX_CHARS", "256"))
+        for key, value in settings.items():
+            if value is None:
+                continue
+            if key not in self.settings and len(self.settings) >= max_keys:
+                continue
+            self.settings[key] = str(value)[:max_chars]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "progress": self.progress.to_state(),
+            "running_summary": self.running_summary,
+            "settings": dict(self.settings),
+            "created_at": self.created_at,
+        }
+
+    @classmethod
+    def from_dict(cls, session_id: str, data: Dict[str, Any], rev: int = 0) -> "SessionState":
+        progress = ProgressTracker.from_state(data.get("progress") or {})
+        return cls(
+            session_id=session_id,
+            progress=progress,
+            running_summary=str(data.get("running_summary") or ""),
+            settings={str(k): str(v) for k, v in (data.get("settings") or {}).items()},
+            created_at=float(data.get("created_at") or time.time()),
+            rev=rev,
+            saved_progress=progress.to_state(),
+        )
+
+    def approx_bytes(self) -> int:
+        """Rough resident size of the mutable per-session data (summary, settings, progress)."""
+        size = sys.getsizeof(self) + sys.getsizeof(self.session_id) + sys.getsizeof(self.running_summary)
+        size += sys.getsizeof(self.settings)
+        size += sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in self.settings.items())
+        progress = self.progress
+        size += sys.getsizeof(progress) + sys.getsizeof(progress.skills) + sys.getsizeof(progress.badges)
+        size += sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in progress.skills.items())
+        size += sum(sys.getsizeof(b) for b in progress.badges)
+        size += sys.getsizeof(self.pending_exchanges)
+        size += sum(sys.getsizeof(u) + sys.getsizeof(t) for u, t in self.pending_exchanges)
+        return size
+
+
+def session_id_from_request(request: Any) -> str:
+    """Session key for a Gradio request: the logged-in username, else the browser session hash."""
+    if request is None:
+        return DEFAULT_SESSION_ID
+    username = getattr(request, "username", None)
+    if username:
+        return f"user:{username}"
+    session_hash = getattr(request, "session_hash", None)
+    if session_hash:
+        return f"{SESSION_ID_PREFIX}{session_hash}"
+    return DEFAULT_SESSION_ID
+
+
+class SessionStore:
+    """In-process registry of SessionState keyed by session id.
+
+    - LRU bounded by SESSION_MAX (least recently seen sessions are dropped first).
+    - Sessions idle for longer than SESSION_TTL_S are swept at most every SESSION_SWEEP_S, on access.
+    - Each sweep logs a ``session_store`` event with the session count and memory per session.
+    - With a StateBackend (STATE_BACKEND) this is a cache in front of shared storage: sessions are
+      loaded on first use, reloaded when another worker saved a newer revision, and written by ``save``
+      (concurrent saves of the same session are merged: progress increments from both are kept).
+    """
+
+    def __init__(
+        self,
+        max_sessions: Optional[int] = None,
+        ttl_s: Optional[float] = None,
+        telemetry: Optional[TelemetryService] = None,
+        backend: Optional[StateBackend] = None,
+    ) -> None:
+        self.backend = backend
+        self.max_sessions = max(1, int(os.getenv("SESSION_MAX", str(max_sessions or 5000))))
+        self.ttl_s = float(os.getenv("SESSION_TTL_S", str(ttl_s if ttl_s is not None else 6 * 3600)))
+        self.sweep_s = float(os.getenv("SESSION_SWEEP_S", "60"))
+        self.telemetry = telemetry
+        self._sessions: "OrderedDict[str, SessionState]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def _inc(self, name: str, labels: Optional[Dict[str, Any]] = None) -> None:
+        if self.telemetry:
+            try:
+                self.telemetry.inc_counter(name, labels or {})
+            except Exception:
+                pass
+
+    def get(self, session_id: Optional[str] = None) -> SessionState:
+        """Session for ``session_id`` (created on first use), marked as most recently seen."""
+        session_id = session_id or DEFAULT_SESSION_ID
+        now = time.time()
+        evicted = 0
+        loaded = self._load(session_id) if self.backend is not None else None
+        with self._lock:
+            state = self._sessions.get(session_id)
+            if loaded is not None and (state is None or loaded.rev > state.rev):
+                self._sessions[session_id] = state = loaded
+                self._sessions.move_to_end(session_id)
+            if state is None:
+                state = SessionState(session_id=session_id)
+                self._sessions[session_id] = state
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+                    evicted += 1
+            else:
+                self._sessions.move_to_end(session_id)
+            state.last_seen = now
+        for _ in range(evicted):
+            self._inc("session_evicted_total", {"reason": "lru"})
+        if time.monotonic() - self._last_sweep >= self.sweep_s:
+            self.evict_expired()
+        return state
+
+    def _load(self, session_id: str) -> Optional[SessionState]:
+        """Stored session when it is missing locally or newer than the cached copy (another worker wrote it)."""
+        try:
+            with self._lock:
+                cached = self._sessions.get(session_id)
+            if cached is not None:
+                rev = self.backend.session_rev(session_id)
+                if rev is None or rev <= cached.rev:
+                    return None
+            stored = self.backend.load_session(session_id)
+        except Exception as e:
+            _logger.warning("Loading session %s from the state backend failed: %s", session_id, e)
+            self._inc("session_backend_error_total", {"op": "load"})
+            return None
+        if stored is None:
+            return None
+        rev, data = stored
+        return SessionState.from_dict(session_id, data, rev=rev)
+
+    def save(self, state: SessionState) -> None:
+        """Persist ``state`` to the backend (buffered by the backend); no-op for process-local stores.
+
+        The save carries the revision it was based on and the progress increments since the last save, so
+        when another worker saved in between the backend re-applies the increments onto the stored copy
+        instead of overwriting it (the next ``get`` then reloads the merged session).
+        """
+        if self.backend is None:
+            return
+        data = state.to_dict()
+        delta = {"progress": ProgressTracker.state_delta(state.saved_progress, data["progress"])}
+        state.saved_progress = data["progress"]
+        base_rev = state.rev
+        state.rev += 1
+        try:
+            self.backend.save_session(state.session_id, state.rev, data, base_rev=base_rev, delta=delta)
+        except Exception as e:
+            _logger.warning("Saving session %s to the state backend failed: %s", state.session_id, e)
+            self._inc("session_backend_error_total", {"op": "save"})
+
+    def peek(self, session_id: str) -> Optional[SessionState]:
+        """Session for ``session_id`` without creating it or refreshing its LRU position.
+
+        With a shared backend, a session only another worker holds is read from storage (not cached here).
+        """
+        with self._lock:
+            state = self._sessions.get(session_id)
+        if state is None and self.backend is not None:
+            state = self._load(session_id)
+        return state
+
+    def evict_expired(self, now: Optional[float] = None) -> int:
+        """Drop sessions idle for longer than the TTL and report store memory. Returns how many were dropped."""
+        now = time.time() if now is None else now
+        self._last_sweep = time.monotonic()
+        expired = 0
+        if self.ttl_s > 0:
+            with self._lock:
+                # Oldest first: stop at the first session that is still fresh
+                while self._sessions:
+                    oldest = next(iter(self._sessions.values()))
+                    if now - oldest.last_seen < self.ttl_s:
+                        break
+                    self._sessions.popitem(last=False)
+                    expired += 1
+        for _ in range(expired):
+            self._inc("session_evicted_total", {"reason": "ttl"})
+        if expired:
+            _logger.info("Evicted %d idle sessions", expired)
+        self.report()
+        return expired
+
+    def memory_report(self) -> Dict[str, Any]:
+        """Session count and approximate bytes held (total, average and largest session)."""
+        with self._lock:
+            sizes = [s.approx_bytes() for s in self._sessions.values()]
+        total = sum(sizes)
+        return {
+            "sessions": len(sizes),
+            "max_sessions": self.max_sessions,
+            "total_bytes": total,
+            "avg_bytes": int(total / len(sizes)) if sizes else 0,
+            "max_bytes": max(sizes) if sizes else 0,
+        }
+
+    def report(self) -> Dict[str, Any]:
+        stats = self.memory_report()
+        if self.telemetry:
+            try:
+                self.telemetry.log_event("session_store", stats)
+            except Exception:
+                pass
+        return stats
@@ -1,27 +1,55 @@
+import asyncio
 import base64
 import logging
 import time
 import os
 import threading
-import queue
 import gradio as gr
-from typing import Any, Dict, Generator, List, Optional, Tuple
+from dataclasses import dataclass
+from typing import Any, AsyncGenerator, Dict, Generator, List, Optional, Tuple
 
 from src.core.base_tutor import BaseTutor
+from src.core.session_store import SessionState
 from src.utils.audio import (
     extract_audio_from_response,
     extract_text_from_response,
     get_audio_duration,
     save_audio_to_temp_file,
     analyze_pronunciation_metrics,
+    load_decoded_audio,
+    pcm16_to_wav_bytes,
+    ProgressiveWavWriter,
+    remove_temp_audio,
+    DecodedAudio,
 )
+from src.utils.audio_vad import detect_speech, prepare_for_transcription
 from src.infra.streaming_manager import StreamingManager
+from src.infra.stream_coalescer import YieldCoalescer
+from src.services.openai_service import MULTIMODAL_MODEL, STREAM_AUDIO_SAMPLE_RATE
+from src.utils.playback_sync import (
+    SPEAKING_AUDIO_ID,
+    SPEAKING_CHATBOT_ID,
+    SYNC_KEY,
+    sync_enabled,
+    sync_timing,
+    sync_timing_html,
+)
+from src.utils.context_budget import assemble_context, context_budget, max_message_tokens, record_context
 
 _logger = logging.getLogger(__name__)
 if not _logger.handlers:
     logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
 
 
+@dataclass
+class _StreamedReply:
+    """What a streamed multimodal reply produced (an async generator cannot return it)."""
+
+    transcript: str = ""
+    audio_path: Optional[str] = None
+    playback_started: float = 0.0
+
+
 class SpeakingTutor(BaseTutor):
     def process_input(
         self,
@@ -52,8 +80,63 @@ class SpeakingTutor(BaseTutor):
         audio_filepath: Optional[str] = None,
         level: Optional[str] = None,
         speaking_mode: Optional[str] = None,
+        request: Optional[gr.Request] = None,
     ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
         """Transcribes user audio, adds it to history, and returns the updated history."""
+        current_history, prepared = self._begin_transcription(history, audio_filepath)
+        if prepared is None:
+            return current_history, current_history
+        decoded, upload = prepared
+        try:
+            transcription = self.tutor_parent.openai_service.transcribe_audio(audio_filepath, decoded=upload)
+        except Exception as e:
+            error_message = {"role": "assistant", "content": f"Error transcribing audio: {str(e)}"}
+            current_history.append(error_message)
+            return current_history, current_history
+        return self._finish_transcription(
+            current_history, audio_filepath, transcription, decoded, level, speaking_mode, request
+        )
+
+    async def ahandle_transcription(
+        self,
+        history: Optional[List[Dict[str, Any]]],
+        audio_filepath: Optional[str] = None,
+        level: Optional[str] = None,
+        speaking_mode: Optional[str] = None,
+        request: Optional[gr.Request] = None,
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Async variant of handle_transcription for Gradio's event loop: decoding and metrics run in a
+        worker thread (CPU/ffmpeg), while the upload awaits the async client instead of parking a thread.
+        """
+        current_history, prepared = await asyncio.to_thread(self._begin_transcription, history, audio_filepath)
+        if prepared is None:
+            return current_history, current_history
+        decoded, upload = prepared
+        try:
+            transcription = await self.tutor_parent.openai_service.atranscribe_audio(audio_filepath, decoded=upload)
+        except Exception as e:
+            error_message = {"role": "assistant", "content": f"Error transcribing audio: {str(e)}"}
+            current_history.append(error_message)
+            return current_history, current_history
+        return await asyncio.to_thread(
+            self._finish_transcription,
+            current_history,
+            audio_filepath,
+            transcription,
+            decoded,
+            level,
+            speaking_mode,
+            request,
+        )
+
+    def _begin_transcription(
+        self, history: Optional[List[Dict[str, Any]]], audio_filepath: Optional[str]
+    ) -> Tuple[List[Dict[str, Any]], Optional[Tuple[DecodedAudio, Optional[DecodedAudio]]]]:
+        """
+        Checks, decode and VAD gate shared by the sync and async handlers.
+        Returns (history, None) when the turn ends here, else (history, (decoded, decoded arg for upload)).
+        """
         current_history = history.copy() if history else []
 
         if not self.tutor_parent.openai_service:
@@ -62,11 +145,11 @@ class SpeakingTutor(BaseTutor):
                 "content": "⚠️ No valid OpenAI API key set. Please enter your API key in the settings.",
             }
             current_history.append(error_message)
-            return current_history, current_history
+            return current_history, None
 
         if not audio_filepath or not os.path.exists(audio_filepath):
             _logger.warning("Audio file not provided or does not exist.")
-            return current_history, current_history
+            return current_history, None
 
         # Check if the audio file is too small (likely an empty recording)
         min_audio_size_bytes = 1024  # 1 KB
@@ -77,21 +160,54 @@ class SpeakingTutor(BaseTutor):
                 "content": "It seems the audio was empty. Please try recording again.",
             }
             current_history.append(error_message)
-            return current_history, current_history
+            return current_history, None
 
         try:
-            transcription = self.tutor_parent.openai_service.transcribe_audio(audio_filepath)
-            if speaking_mode == "Immersive":
-                user_message = {"role": "user", "content": (audio_filepath, None), "text_for_llm": transcription}
-            else:
-                user_message = {"role": "user", "content": transcription}
+            # Decode once; transcription and pronunciation metrics share the same PCM
+            decoded = load_decoded_audio(audio_filepath)
+            upload = self._prepare_upload(decoded)
+        except Exception as e:
+            error_message = {"role": "assistant", "content": f"Error transcribing audio: {str(e)}"}
+            current_history.append(error_message)
+            return current_history, None
+        if upload is None:
+            _logger.info(f"No speech detected in {audio_filepath}; skipping transcription.")
+            error_message = {
+                "role": "assistant",
+                "content": "It seems the audio was empty. Please try recording again.",
+            }
+            current_history.append(error_message)
+            return current_history, None
+        # Untouched recordings go without ``decoded`` so a compatible WAV/WebM is uploaded as-is
+        return current_history, (decoded, None if upload is decoded else upload)
+
+    def _finish_transcription(
+        self,
+        current_history: List[Dict[str, Any]],
+        audio_filepath: str,
+        transcription: str,
+        decoded: DecodedAudio,
+        level: Optional[str],
+        speaking_mode: Optional[str],
+        request: Optional[gr.Request] = None,
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        session = self._session(request)
+        session.remember(level=level, speaking_mode=speaking_mode)
+        if speaking_mode == "Immersive":
+            user_message = {"role": "user", "content": (audio_filepath, None), "text_for_llm": transcription}
+        else:
+            user_message = {"role": "user", "content": transcription}
 
-            current_history.append(user_message)
+        current_history.append(user_message)
 
-            # Atualizar skill de pronúncia com base nas métricas
-            if self.tutor_parent and hasattr(self.tutor_parent, "progress_tracker"):
+        # Atualizar skill de pronúncia com base nas métricas (após a resposta, fora do caminho da requisição)
+        if self.tutor_parent:
+
+            def _score_pronunciation() -> None:
                 try:
-                    metrics = analyze_pronunciation_metrics(audio_filepath, transcript=transcription, level=level)
+                    metrics = analyze_pronunciation_metrics(
+                        audio_filepath, transcript=transcription, level=level, decoded=decoded
+                    )
 
                     points = 1
                     if metrics.get("speech_ratio", 0) >= 0.45:
@@ -99,26 +215,216 @@ class SpeakingTutor(BaseTutor):
                     if not metrics.get("suggested_escalation", True):
                         points += 1
 
-                    self.tutor_parent.progress_tracker.update_skill("pronunciation", points)
+                    session.progress.update_skill("pronunciation", points)
+                    self._save_session(session)
                 except Exception as e:
                     logging.error(f"Erro ao atualizar skill de pronúncia: {e}")
 
-            return current_history, current_history
+            self._post_turn(session, _score_pronunciation, task="pronunciation")
+
+        return current_history, current_history
+
+    def _note_exchange(self, session: SessionState, user_text: str, tutor_text: str) -> None:
+        """Queue a summary refresh once SUMMARY_EVERY_N_TURNS exchanges are waiting (the next turn never waits)."""
+        waiting = session.add_exchange(user_text, tutor_text)
+        if waiting >= max(1, int(os.getenv("SUMMARY_EVERY_N_TURNS", "3"))):
+            self._post_turn(
+                session, lambda: self._refresh_summary(session), task="summary", required=False, coalesce="summary"
+            )
+
+    def _refresh_summary(self, session: SessionState) -> None:
+        """Fold every waiting exchange into the running summary with one LLM call (truncation fallback)."""
+        exchanges = session.take_exchanges()
+        if not exchanges:
+            return
+        prev = session.running_summary
+        start = time.perf_counter()
+        try:
+            transcript = "\n".join(f"User: {user}\nTutor: {tutor}" for user, tutor in exchanges)
+            prompt = (
+                "Update the running summary of a tutoring session.\n"
+                "Keep key facts, goals, corrections, and user preferences. Be concise (<= 120 words).\n\n"
+                f"Current summary:\n{prev}\n\n"
+                "Latest exchanges:\n"
+                f"{transcript}\n\n"
+                "Return only the updated summary."
+            )
+            messages = [
+                {"role": "system", "content": "You are a concise note taker for an English tutoring session."},
+                {"role": "user", "content": prompt},
+            ]
+            updated = self.tutor_parent.openai_service.chat_completion(
+                messages=messages, temperature=0.2, max_tokens=200
+            )
+            if updated:
+                session.set_summary(updated)
+                _logger.info(
+                    "Running summary updated via LLM from %d exchanges, new_len=%d",
+                    len(exchanges),
+                    len(session.running_summary),
+                )
         except Exception as e:
-            error_message = {"role": "assistant", "content": f"Error transcribing audio: {str(e)}"}
-            current_history.append(error_message)
-            return current_history, current_history
+            _logger.debug(f"LLM summary update failed, falling back to truncation: {e}")
+            updated = ""
+        if not updated:
+            combined = " ".join([prev] + [f"{user} {tutor}" for user, tutor in exchanges]).strip()
+            session.set_summary(combined)
+            _logger.info("Running summary updated via truncation, new_len=%d", len(session.running_summary))
+        telemetry = getattr(self.tutor_parent, "telemetry", None)
+        if telemetry:
+            try:
+                telemetry.observe_hist(
+                    "summary_refresh_ms", (time.perf_counter() - start) * 1000.0, {"exchanges": len(exchanges)}
+                )
+            except Exception:
+                pass
+        self._save_session(session)
+
+    def _prepare_upload(self, decoded: DecodedAudio) -> Optional[DecodedAudio]:
+        """
+        Local VAD gate (TRANSCRIBE_VAD_ENABLED): None when the clip has no speech, otherwise the
+        speech region downmixed/resampled for upload. Metrics keep using the original PCM.
+        """
+        if os.getenv("TRANSCRIBE_VAD_ENABLED", "1").strip().lower() not in ("1", "true", "yes", "on"):
+            return decoded
+        telemetry = getattr(self.tutor_parent, "telemetry", None)
+        vad = detect_speech(decoded)
+        if not vad.has_speech:
+            if telemetry:
+                try:
+                    telemetry.inc_counter("transcribe_skipped_no_speech_total")
+                except Exception:
+                    pass
+            return None
+        upload = prepare_for_transcription(decoded, vad)
+        if telemetry:
+            try:
+                telemetry.observe_hist("transcribe_upload_bytes", float(len(upload.pcm)))
+                telemetry.observe_hist(
+                    "transcribe_upload_bytes_saved", float(max(0, len(decoded.pcm) - len(upload.pcm)))
+                )
+                telemetry.observe_hist(
+                    "transcribe_silence_trimmed_ms", float(max(0, vad.duration_ms - upload.duration_sec * 1000))
+                )
+            except Exception:
+                pass
+        return upload
+
+    @staticmethod
+    def audio_streaming_enabled() -> bool:
+        """Whether bot audio is streamed in segments (SPEAKING_AUDIO_STREAMING)."""
+        return os.getenv("SPEAKING_AUDIO_STREAMING", "0").strip().lower() in ("1", "true", "yes", "on")
+
+    async def _stream_multimodal_audio(
+        self,
+        messages_for_llm: List[Dict[str, Any]],
+        max_tokens: int,
+        current_history: List[Dict[str, Any]],
+        result: _StreamedReply,
+        stop_event: Optional[threading.Event] = None,
+    ) -> AsyncGenerator[Tuple[List[Dict[str, Any]], List[Dict[str, Any]], Optional[str]], None]:
+        """
+        Consume streamed audio deltas, writing the full reply progressively and yielding playable
+        WAV segments (SPEAKING_STREAM_SEGMENT_MS) to the audio output as soon as they fill up.
+        Fills ``result`` with the transcript, the full audio path (or None) and when playback started.
+        """
+        segment_ms = max(100, int(os.getenv("SPEAKING_STREAM_SEGMENT_MS", "600")))
+        sample_rate = STREAM_AUDIO_SAMPLE_RATE
+        segment_bytes = int(sample_rate * 2 * segment_ms / 1000)
+        writer = ProgressiveWavWriter.in_tmp_dir(sample_rate=sample_rate)
+        pending = bytearray()
+        transcript_parts: List[str] = []
+        playback_started = 0.0
+
+        events = None
+        try:
+            events = self.tutor_parent.openai_service.astream_chat_multimodal(
+                messages=messages_for_llm, max_tokens=max_tokens
+            )
+            async for kind, payload in events:
+                if stop_event is not None and stop_event.is_set():
+                    _logger.info("Streamed multimodal reply cancelled by stop_event.")
+                    break
+                if kind == "transcript":
+                    transcript_parts.append(payload)
+                elif kind == "audio":
+                    writer.write(payload)
+                    pending.extend(payload)
+                    if len(pending) >= segment_bytes:
+                        segment_path = save_audio_to_temp_file(pcm16_to_wav_bytes(bytes(pending), sample_rate))
+                        pending.clear()
+                        if not playback_started:
+                            playback_started = time.perf_counter()
+                            _logger.info("Streamed audio: first segment ready for playback.")
+                        yield current_history, current_history, segment_path
+        except Exception as e:
+            # Before any audio was played the caller retries with the blocking path; afterwards keep what we have
+            _logger.error("Streaming multimodal failed: %s", e, exc_info=True)
+            if not playback_started:
+                self._discard_stream_file(writer)
+                return
+        finally:
+            # Stopped early: release the upstream response now rather than when the generator is collected
+            close = getattr(events, "aclose", None)
+            if callable(close):
+                await close()
+
+        if pending:
+            segment_path = save_audio_to_temp_file(pcm16_to_wav_bytes(bytes(pending), sample_rate))
+            if not playback_started:
+                playback_started = time.perf_counter()
+            yield current_history, current_history, segment_path
+        result.transcript = "".join(transcript_parts).strip()
+        if not writer.bytes_written:
+            self._discard_stream_file(writer)
+            return
+        result.audio_path, result.playback_started = writer.close(), playback_started
 
-    def handle_bot_response(
+    @staticmethod
+    def _discard_stream_file(writer: ProgressiveWavWriter) -> None:
+        remove_temp_audio(writer.close())
+
+    async def handle_bot_response_with_sync(
         self,
         history: Optional[List[Dict[str, Any]]],
         level: Optional[str] = None,
         speaking_mode: Optional[str] = None,
+        request: Optional[gr.Request] = None,
+    ) -> AsyncGenerator[Tuple[Any, ...], None]:
+        """``handle_bot_response`` plus a fourth output: the reveal timing of a new Hybrid reply.
+
+        The reply itself stays plain Markdown in the chat (rendered, and copied as text); the timing goes
+        to a hidden HTML component that assets/playback_sync.js applies to the latest bot message.
+        """
+        sent = None
+        responses = self.handle_bot_response(history, level, speaking_mode, request=request)
+        try:
+            async for chat, state, audio in responses:
+                last = chat[-1] if isinstance(chat, list) and chat and isinstance(chat[-1], dict) else {}
+                timing = last.get(SYNC_KEY)
+                if timing and timing["id"] != sent:
+                    sent = timing["id"]
+                    yield chat, state, audio, sync_timing_html(timing, SPEAKING_AUDIO_ID, SPEAKING_CHATBOT_ID)
+                else:
+                    yield chat, state, audio, gr.skip()
+        finally:
+            await responses.aclose()
+
+    async def handle_bot_response(
+        self,
+        history: Optional[List[Dict[str, Any]]],
+        level: Optional[str] = None,
+        speaking_mode: Optional[str] = None,
+        request: Optional[gr.Request] = None,
         stop_event: Optional[threading.Event] = None,
-    ) -> Generator[Tuple[List[Dict[str, Any]], List[Dict[str, Any]], Optional[str]], None, None]:
+    ) -> AsyncGenerator[Tuple[List[Dict[str, Any]], List[Dict[str, Any]], Optional[str]], None]:
         """
-        Gets bot response, yields audio for immediate playback, waits for it to finish,
-        then yields the updated chat history with the bot's text.
+        Gets bot response and yields its audio together with the chat history; in Hybrid mode the reply
+        message carries its reveal timing under ``SYNC_KEY`` (see ``handle_bot_response_with_sync``).
+
+        Runs on the event loop with the async service methods: model calls, the text-only fallback
+        (StreamingManager.astream_text) and TTS are awaited, so no thread is parked per turn and a
+        cancelled handler closes its upstream stream.
         """
         if not self.tutor_parent.openai_service:
             yield gr.Error("No valid OpenAI API key set. Please enter your API key in the settings."), [], None
@@ -129,6 +435,8 @@ class SpeakingTutor(BaseTutor):
 
         # Telemetry (if available on parent)
         telemetry = getattr(self.tutor_parent, "telemetry", None)
+        # Summary and progress belong to this learner, not to the shared tutor instance
+        session = self._session(request)
 
         if not current_history or current_history[-1].get("role") != "user":
             _logger.warning("handle_bot_response called with invalid history state. Aborting.")
@@ -140,67 +448,29 @@ class SpeakingTutor(BaseTutor):
         system_prompt = self.tutor_parent.get_system_message(mode="speaking", level=level)
 
         # Sanitize history to prevent audio generation bugs.
-        messages_for_llm = []
+        turns = []
         for message in current_history:
             llm_message = {"role": message["role"]}
             if "text_for_llm" in message:
                 llm_message["content"] = message["text_for_llm"]
             else:
                 llm_message["content"] = message["content"]
-            messages_for_llm.append(llm_message)
-
-        messages_for_llm = [{"role": "system", "content": system_prompt}] + messages_for_llm
-
-        # Prune history to avoid context overflow (system prompt + last N messages)
-        max_hist = int(os.getenv("SPEAKING_MAX_HISTORY", "12"))
-        if len(messages_for_llm) > max_hist + 1:
-            messages_for_llm = [messages_for_llm[0]] + messages_for_llm[-max_hist:]
-        total_chars = sum(len(str(m.get("content", ""))) for m in messages_for_llm)
-        _logger.info(f"LLM payload pruned to {len(messages_for_llm)} msgs, ~{total_chars} chars.")
-
-        # Inject running summary if available to maintain long-term context
-        running_summary = getattr(self, "_running_summary", "")
-        if running_summary:
-            summary_msg = (
-                "Conversation summary so far (for continuity; do not repeat details, use as context only):\n"
-                + running_summary
-            )
-            messages_for_llm = [{"role": "system", "content": summary_msg}] + messages_for_llm
-            _logger.info("Summary injected: True, summary_len=%d", len(running_summary))
-        else:
-            _logger.info("Summary injected: False, summary_len=0")
+            turns.append(llm_message)
+
+        # Fit summary + system prompt + the most recent turns into the token budget for this mode/model
+        context = assemble_context(
+            system_prompt,
+            turns,
+            budget_tokens=context_budget("speaking", MULTIMODAL_MODEL),
+            summary=session.running_summary,
+            max_turn_tokens=max_message_tokens("speaking", MULTIMODAL_MODEL),
+        )
+        record_context(telemetry, "speaking", context)
+        messages_for_llm = context.messages
 
-        # Helper to update running summary (LLM-based with truncation fallback)
+        # Summary refreshes run after the reply, batched every SUMMARY_EVERY_N_TURNS exchanges
         def _update_running_summary(last_user_text: str, bot_text: str) -> None:
-            max_chars = int(os.getenv("SPEAKING_SUMMARY_MAX_CHARS", "1200"))
-            prev = getattr(self, "_running_summary", "")
-            try:
-                prompt = (
-                    "Update the running summary of a tutoring session.\n"
-                    "Keep key facts, goals, corrections, and user preferences. Be concise (<= 120 words).\n\n"
-                    f"Current summary:\n{prev}\n\n"
-                    "Last exchange:\n"
-                    f"User: {last_user_text}\n"
-                    f"Tutor: {bot_text}\n\n"
-                    "Return only the updated summary."
-                )
-                messages = [
-                    {"role": "system", "content": "You are a concise note taker for an English tutoring session."},
-                    {"role": "user", "content": prompt},
-                ]
-                chunks = self.tutor_parent.openai_service.stream_chat_completion(
-                    messages=messages, temperature=0.2, max_tokens=200
-                )
-                updated = "".join(chunks).strip()
-                if updated:
-                    self._running_summary = updated[:max_chars]
-                    _logger.info("Running summary updated via LLM, new_len=%d", len(self._running_summary))
-                    return
-            except Exception as diag_e:
-                _logger.debug(f"LLM summary update failed, falling back to truncation: {diag_e}")
-            combined = (prev + " " + last_user_text + " " + bot_text).strip()
-            self._running_summary = combined[-max_chars:]
-            _logger.info("Running summary updated via truncation, new_len=%d", len(self._running_summary))
+            self._note_exchange(session, last_user_text, bot_text)
 
         # Helper to extract the latest user text (prefer text_for_llm)
         def _get_last_user_text() -> str:
@@ -229,9 +499,23 @@ class SpeakingTutor(BaseTutor):
             max_tokens = immersive_max if speaking_mode == "Immersive" else hybrid_max
             _logger.info(f"Using max_tokens={max_tokens} for mode={speaking_mode or 'hybrid'}")
 
-            while attempts < max_retries and not audio_base64_data:
+            # Streamed audio: playback starts with the first segment instead of after the whole reply
+            streamed_audio_path: Optional[str] = None
+            playback_started = 0.0
+            if self.audio_streaming_enabled() and hasattr(self.tutor_parent.openai_service, "astream_chat_multimodal"):
+                streamed = _StreamedReply()
+                async for update in self._stream_multimodal_audio(
+                    messages_for_llm, max_tokens, current_history, streamed, stop_event
+                ):
+                    yield update
+                bot_text_response = streamed.transcript
+                streamed_audio_path, playback_started = streamed.audio_path, streamed.playback_started
+            # A streamed transcript without audio goes straight to the TTS fallback below
+            streamed_reply = bool(streamed_audio_path or bot_text_response)
+
+            while attempts < max_retries and not audio_base64_data and not streamed_reply:
                 try:
-                    response = self.tutor_parent.openai_service.chat_multimodal(
+                    response = await self.tutor_parent.openai_service.achat_multimodal(
                         messages=messages_for_llm, max_tokens=max_tokens
                     )
                     bot_text_response = extract_text_from_response(response)
@@ -265,7 +549,7 @@ class SpeakingTutor(BaseTutor):
                         # Backoff exponencial (condicional)
                         delay = base_delay * (2**attempts)
                         if delay > 0:
-                            time.sleep(delay)
+                            await asyncio.sleep(delay)
                 except Exception as e:
                     _logger.error(
                         "Erro na tentativa %d: %s (%s)",
@@ -279,7 +563,7 @@ class SpeakingTutor(BaseTutor):
                         break
                     delay = base_delay * (2**attempts)
                     if delay > 0:
-                        time.sleep(delay)
+                        await asyncio.sleep(delay)
 
                 attempts += 1
 
@@ -288,7 +572,7 @@ class SpeakingTutor(BaseTutor):
                 if telemetry:
                     if not bot_text_response:
                         telemetry.inc_counter("text_missing_total", {"phase": "post_multimodal"})
-                    elif not audio_base64_data:
+                    elif not (audio_base64_data or streamed_audio_path):
                         telemetry.inc_counter("audio_missing_total", {"phase": "post_multimodal"})
                     else:
                         telemetry.inc_counter("multimodal_success_both_total", {"phase": "post_multimodal"})
@@ -303,6 +587,7 @@ class SpeakingTutor(BaseTutor):
                     sm = StreamingManager(
                         service=self.tutor_parent.openai_service,
                         telemetry=getattr(self.tutor_parent, "telemetry", None),
+                        mode="speaking_fallback",
                     )
                     # Telemetry: stream fallback start
                     try:
@@ -310,116 +595,82 @@ class SpeakingTutor(BaseTutor):
                             telemetry.inc_counter("stream_fallback_total", {"reason": "text_missing"})
                     except Exception:
                         pass
-                    # Stream to UI incrementally using callbacks + queue
-                    q: "queue.Queue" = queue.Queue()
+                    # Stream to UI incrementally, chunks awaited on the event loop
                     acc: List[str] = []
-                    done_flag = {"done": False}
                     used_streaming_fallback = True
 
-                    def on_chunk(ch: str) -> None:
-                        q.put(("data", ch))
-
-                    def on_complete(txt: str) -> None:
-                        q.put(("done", txt))
-
-                    def on_error(e: Exception) -> None:
-                        q.put(("error", e))
-
-                    def worker() -> None:
-                        try:
-                            _ = sm.stream_text(
-                                messages=messages_for_llm,
-                                temperature=0.6,
-                                max_tokens=max_tokens,
-                                on_chunk=on_chunk,
-                                on_complete=on_complete,
-                                on_error=on_error,
-                                stop_event=stop_event,
-                            )
-                        except Exception as _:
-                            # Error already reported via on_error
-                            pass
-
-                    t = threading.Thread(target=worker, daemon=True)
-                    t.start()
-
                     # Prepare an empty assistant message to receive streamed chunks
                     current_history.append({"role": "assistant", "content": ""})
-
-                    while True:
-                        try:
-                            kind, payload = q.get(timeout=0.1)
-                        except queue.Empty:
-                            # keep UI responsive while waiting
-                            if stop_event is not None and stop_event.is_set():
-                                done_flag["done"] = True
-                                # Final yield so UI reflects latest partial text before stopping
-                                yield current_history, current_history, None
-                                break
-                            if done_flag["done"]:
-                                break
-                            # Yield current state even without new chunks to let UI refresh
-                            yield current_history, current_history, None
-                            continue
-
-                        if kind == "data":
-                            ch = payload
+                    # Each yield re-sends the chat: batch chunks per STREAM_FLUSH_MS / STREAM_FLUSH_CHARS
+                    coalescer = YieldCoalescer("speaking_fallback", telemetry=telemetry)
+                    stream_status = "cancelled"
+                    try:
+                        # A failed attempt is retried by the manager (resuming from the text already shown)
+                        async for ch in sm.astream_text(
+                            messages=messages_for_llm,
+                            temperature=0.6,
+                            max_tokens=max_tokens,
+                            stop_event=stop_event,
+                        ):
                             acc.append(ch)
-                            current_history[-1]["content"] += ch
-                            # Yield after each chunk
+                            if coalescer.add(ch):
+                                current_history[-1]["content"] = "".join(acc)
+                                coalescer.flushed(current_history)
+                                yield current_history, current_history, None
+                    except Exception as err:
+                        # Every attempt failed
+                        stream_status = "error"
+                        _logger.error("Text-only streaming error: %s", err)
+                        # Show partial text if any, then append error note
+                        current_history[-1]["content"] = "".join(acc)
+                        current_history.append({"role": "assistant", "content": "(streaming error)"})
+                        coalescer.flushed(current_history)
+                        yield current_history, current_history, None
+                        bot_text_response = "".join(acc)
+                        # Telemetry: stream finished with error
+                        try:
+                            if telemetry:
+                                telemetry.inc_counter("stream_fallback_completed_total", {"status": "error"})
+                                telemetry.observe_hist(
+                                    "stream_fallback_chars", float(len(bot_text_response)), {"status": "error"}
+                                )
+                        except Exception:
+                            pass
+                    else:
+                        # Final yield so the UI reflects the latest text (also when stopped early)
+                        if coalescer.pending:
+                            current_history[-1]["content"] = "".join(acc)
+                            coalescer.flushed(current_history)
                             yield current_history, current_history, None
-                        elif kind == "done":
-                            done_flag["done"] = True
-                            bot_text_response = payload or ""  # full text
+                        bot_text_response = "".join(acc)
+                        if stop_event is None or not stop_event.is_set():
+                            stream_status = "ok"
                             # Telemetry: stream finished successfully
                             try:
                                 if telemetry:
-                                    telemetry.inc_counter(
-                                        "stream_fallback_completed_total",
-                                        {"status": "success", "chars": len(bot_text_response)},
+                                    telemetry.inc_counter("stream_fallback_completed_total", {"status": "success"})
+                                    telemetry.observe_hist(
+                                        "stream_fallback_chars", float(len(bot_text_response)), {"status": "success"}
                                     )
                             except Exception:
                                 pass
-                            break
-                        elif kind == "error":
-                            err = payload
-                            _logger.error("Text-only streaming error: %s", err)
-                            # Show partial text if any, then append error note
-                            if acc:
-                                yield current_history, current_history, None
-                            current_history.append({"role": "assistant", "content": "(streaming error)"})
-                            yield current_history, current_history, None
-                            bot_text_response = "".join(acc)
-                            # Telemetry: stream finished with error
+                        elif bot_text_response:
+                            # Cancelled: keep the partial text
                             try:
                                 if telemetry:
-                                    telemetry.inc_counter(
-                                        "stream_fallback_completed_total",
-                                        {"status": "error", "partial_chars": len(bot_text_response)},
+                                    telemetry.inc_counter("stream_fallback_completed_total", {"status": "cancelled"})
+                                    telemetry.observe_hist(
+                                        "stream_fallback_chars", float(len(bot_text_response)), {"status": "cancelled"}
                                     )
                             except Exception:
                                 pass
-                            break
-
-                    # Ensure worker finished
-                    t.join(timeout=0.1)
-                    # If cancelled (no 'done'), preserve partial text
-                    if not bot_text_response and acc:
-                        bot_text_response = "".join(acc)
-                        try:
-                            if telemetry:
-                                telemetry.inc_counter(
-                                    "stream_fallback_completed_total",
-                                    {"status": "cancelled", "partial_chars": len(bot_text_response)},
-                                )
-                        except Exception:
-                            pass
+                    coalescer.finish(stream_status)
                     _logger.info("Text-only fallback produced %d chars.", len(bot_text_response))
                 except Exception as e:
                     _logger.error("Text-only fallback failed: %s", e, exc_info=True)
 
             # --- Fallback to TTS if no audio is returned ---
-            if bot_text_response and not audio_base64_data:
+            if bot_text_response and not audio_base64_data and not streamed_audio_path:
                 _logger.warning("Multimodal response missing audio, falling back to TTS.")
                 try:
                     # Generate audio from the text response (with safety cap)
@@ -434,7 +685,7 @@ class SpeakingTutor(BaseTutor):
                             telemetry.inc_counter("tts_fallback_attempt_total")
                     except Exception:
                         pass
-                    audio_bytes = self.tutor_parent.openai_service.text_to_speech(tts_text)
+                    audio_bytes = await self.tutor_parent.openai_service.atext_to_speech(tts_text)
                     # The service returns raw bytes, so we need to encode it to base64
                     audio_base64_data = base64.b64encode(audio_bytes).decode("utf-8")
                     _logger.info("Successfully generated audio using TTS fallback.")
@@ -454,7 +705,7 @@ class SpeakingTutor(BaseTutor):
                         pass
 
             # If we have text but no audio, send text-only fallback so the chat still updates
-            if bot_text_response and not audio_base64_data:
+            if bot_text_response and not audio_base64_data and not streamed_audio_path:
                 _logger.warning("Audio unavailable; sending text-only fallback message.")
                 # Telemetry: text-only outcome
                 try:
@@ -488,11 +739,15 @@ class SpeakingTutor(BaseTutor):
                 return
 
             # --- Audio-First UX Implementation ---
-            audio_bytes = base64.b64decode(audio_base64_data)
-            # Respect configured output format for file suffix
-            audio_fmt = os.getenv("AUDIO_OUTPUT_FORMAT", "wav").strip().lower() or "wav"
-            suffix = f".{audio_fmt}" if not audio_fmt.startswith(".") else audio_fmt
-            audio_path = save_audio_to_temp_file(audio_bytes, suffix=suffix)
+            if streamed_audio_path:
+                # Segments were already yielded to the player while streaming
+                audio_path = streamed_audio_path
+            else:
+                audio_bytes = base64.b64decode(audio_base64_data)
+                # Respect configured output format for file suffix
+                audio_fmt = os.getenv("AUDIO_OUTPUT_FORMAT", "wav").strip().lower() or "wav"
+                suffix = f".{audio_fmt}" if not audio_fmt.startswith(".") else audio_fmt
+                audio_path = save_audio_to_temp_file(audio_bytes, suffix=suffix)
 
             if speaking_mode == "Immersive":
                 # In immersive mode, just add the audio player to the chat
@@ -507,49 +762,30 @@ class SpeakingTutor(BaseTutor):
                     _update_running_summary(_get_last_user_text(), bot_text_response)
                 except Exception as e:
                     _logger.debug("Summary update skipped (immersive): %s", e)
-                yield current_history, current_history, audio_path
+                yield current_history, current_history, None if streamed_audio_path else audio_path
                 return
 
-            # 1. Yield audio for immediate playback, without updating the chat text.
-            _logger.info("Audio-first UX: Yielding audio for playback.")
-            yield current_history, current_history, audio_path
-
-            # If we already streamed the text fallback, avoid re-streaming/duplicating text
+            # If we already streamed the text fallback, only the audio is new
             if used_streaming_fallback:
-                _logger.info("Streaming fallback was used earlier; skipping re-stream of text.")
+                _logger.info("Streaming fallback was used earlier; sending audio only.")
+                if not streamed_audio_path:
+                    yield current_history, current_history, audio_path
                 return
 
-            # 2. Wait for the audio to finish playing before showing the text.
+            # Audio and the whole text go out together; the browser reveals the text in step with playback
+            # (assets/playback_sync.js), so this worker does not wait for the audio to finish.
             duration = get_audio_duration(audio_path)
-            # Add a small buffer to the wait time
-            wait_time = duration + 0.2
-            _logger.info(f"Audio-first UX: Waiting for {wait_time:.2f}s for audio to play.")
-            time.sleep(wait_time)
-
-            # 3. Now, simulate the streaming of the bot's text.
-            _logger.info("Audio-first UX: Simulating text stream.")
-            bot_full_text = bot_text_response
-
-            # Add an empty message bubble for the assistant to stream into.
-            current_history.append({"role": "assistant", "content": ""})
-
-            words = bot_full_text.split()
-            for i, word in enumerate(words):
-                if stop_event is not None and stop_event.is_set():
-                    _logger.info("Simulated text stream cancelled by stop_event.")
-                    # Yield current state once before stopping so UI shows latest partial
-                    yield current_history, current_history, None
-                    break
-                # Update the content of the last message
-                current_history[-1]["content"] += word + " "
-
-                # Yield the updated state to the UI
-                yield current_history, current_history, None  # audio_path
-
-                # Control the streaming speed for a natural feel
-                time.sleep(0.05)
+            played = 0.0
+            if streamed_audio_path and playback_started:
+                # Part of the reply already played while the rest was still streaming
+                played = min(duration, time.perf_counter() - playback_started)
+            reply = {"role": "assistant", "content": bot_text_response, "text_for_llm": bot_text_response}
+            if sync_enabled():
+                reply[SYNC_KEY] = sync_timing(bot_text_response, duration, played_s=played)
+            current_history.append(reply)
+            _logger.info(f"Audio-first UX: sending audio and text ({duration:.2f}s audio, {played:.2f}s played).")
+            yield current_history, current_history, None if streamed_audio_path else audio_path
 
-            # After finishing streaming, update the running summary
             try:
                 _update_running_summary(_get_last_user_text(), bot_text_response)
             except Exception as e:
@@ -563,10 +799,9 @@ class SpeakingTutor(BaseTutor):
 
             yield current_history, current_history, None
 
-        # Atualizar XP e tasks após resposta bem-sucedida
-        if self.tutor_parent and hasattr(self.tutor_parent, "progress_tracker"):
+        # Atualizar XP e tasks após resposta bem-sucedida (em segundo plano, na ordem da sessão)
+        if self.tutor_parent:
             try:
-                self.tutor_parent.progress_tracker.add_xp(20)
-                self.tutor_parent.progress_tracker.increment_tasks()
+                self._post_turn(session, lambda: self._record_turn(session), task="progress")
             except Exception as e:
                 logging.error(f"Erro ao atualizar progresso: {e}")
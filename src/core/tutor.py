@@ -1,7 +1,9 @@
 import logging
 import os
+import threading
+import time
 import uvicorn
-from typing import Optional
+from typing import Any, Dict, Optional
 
 from dotenv import load_dotenv
 
@@ -10,8 +12,14 @@ from src.core.writing_tutor import WritingTutor
 from src.models.prompts import system_message
 from src.services.openai_service import OpenAIService
 from src.core.progress_tracker import ProgressTracker
+from src.core.session_store import SessionState, SessionStore, session_id_from_request
 from ui.interfaces import run_gradio_interface
 from src.infra.telemetry import TelemetryService
+from src.infra.tts_cache import TTSCache
+from src.infra.openai_clients import get_client_registry
+from src.infra.state_backend import create_state_backend
+from src.infra.post_turn_queue import PostTurnQueue
+from src.infra.temp_audio_manager import get_tmp_audio_index
 
 
 class EnglishTutor:
@@ -19,7 +27,6 @@ class EnglishTutor:
 
     def __init__(self, model: str = "gpt-4o-mini"):
         self.model = model
-        self.progress_tracker = ProgressTracker()
         self._setup()
 
         # Initialize telemetry (best-effort)
@@ -28,8 +35,35 @@ class EnglishTutor:
         except Exception:
             self.telemetry = None
 
+        # Progress, running summary and settings live per learner session (SESSION_MAX / SESSION_TTL_S),
+        # optionally in shared storage (STATE_BACKEND=sqlite) so several workers can serve the same learners
         try:
-            self.openai_service = OpenAIService(api_key=self.openai_api_key, model=self.model, telemetry=self.telemetry)
+            self.state_backend = create_state_backend(self.telemetry)
+        except Exception as e:
+            logging.warning(f"State backend unavailable, keeping state in process memory: {e}")
+            self.state_backend = None
+        self.sessions = SessionStore(telemetry=self.telemetry, backend=self.state_backend)
+        # Summary refreshes and progress updates run here, after the reply has been sent
+        self.post_turn = PostTurnQueue(telemetry=self.telemetry)
+
+        # Scan the temp audio dir once at startup and start its janitor (limits stay off the request path)
+        try:
+            get_tmp_audio_index()
+        except Exception as e:
+            logging.warning(f"Temp audio index unavailable: {e}")
+
+        # Process-wide TTS cache shared by every OpenAIService (survives API key changes)
+        self.tts_cache = None
+        if os.getenv("TTS_CACHE_ENABLED", "1").strip().lower() in ("1", "true", "yes", "on"):
+            try:
+                self.tts_cache = TTSCache(telemetry=self.telemetry)
+            except Exception as e:
+                logging.warning(f"TTS cache disabled: {e}")
+
+        try:
+            self.openai_service = OpenAIService(
+                api_key=self.openai_api_key, model=self.model, telemetry=self.telemetry, tts_cache=self.tts_cache
+            )
         except ValueError as e:
             logging.warning(f"OpenAIService could not be initialized: {e}. API key might need to be set via UI.")
             self.openai_service = None
@@ -39,6 +73,10 @@ class EnglishTutor:
                 "OpenAI API Key not found in environment during Tutor init. User may need to set it in the UI."
             )
 
+        # Validate off the startup path so launch_ui binds immediately; status is polled by the UI/healthz
+        if self.openai_api_key:
+            self._start_key_validation(self.openai_api_key)
+
         self.speaking_tutor = SpeakingTutor(self.openai_service, self)
         self.writing_tutor = WritingTutor(self.openai_service, self)
 
@@ -56,8 +94,12 @@ class EnglishTutor:
             if hasattr(self, "writing_tutor") and self.writing_tutor:
                 self.writing_tutor.openai_service = None
 
-            return "⚠️  API key cannot be empty or contain only whitespace."
+            with self._key_lock:
+                self.api_key_state = "missing"
+                self.api_key_status = "⚠️  API key cannot be empty or contain only whitespace."
+            return self.api_key_status
 
+        # Cached by key hash: re-saving a key that was already checked costs no network call
         if not OpenAIService.is_key_valid(api_key):
             self.openai_api_key = current_api_key_attempt
             self.openai_service = None
@@ -68,11 +110,16 @@ class EnglishTutor:
             if hasattr(self, "writing_tutor") and self.writing_tutor:
                 self.writing_tutor.openai_service = None
 
-            return "❌ Invalid OpenAI API key. Please check the key and try again."
+            with self._key_lock:
+                self.api_key_state = "invalid"
+                self.api_key_status = "❌ Invalid OpenAI API key. Please check the key and try again."
+            return self.api_key_status
 
         try:
             self.openai_api_key = api_key
-            self.openai_service = OpenAIService(api_key=self.openai_api_key, model=self.model, telemetry=self.telemetry)
+            self.openai_service = OpenAIService(
+                api_key=self.openai_api_key, model=self.model, telemetry=self.telemetry, tts_cache=self.tts_cache
+            )
 
             if hasattr(self, "speaking_tutor") and self.speaking_tutor:
                 self.speaking_tutor.openai_service = self.openai_service
@@ -80,7 +127,10 @@ class EnglishTutor:
             if hasattr(self, "writing_tutor") and self.writing_tutor:
                 self.writing_tutor.openai_service = self.openai_service
 
-            return "✅ API key set successfully!"
+            with self._key_lock:
+                self.api_key_state = "valid"
+                self.api_key_status = "✅ API key set successfully!"
+            return self.api_key_status
 
         except Exception as e:
             self.openai_api_key = current_api_key_attempt
@@ -95,23 +145,83 @@ class EnglishTutor:
             return f"🚫 Falha ao inicializar o serviço OpenAI: {e}"
 
     def _setup(self) -> None:
-        """Initialize configuration."""
+        """Initialize configuration. The environment key is validated in the background (see _start_key_validation)."""
         load_dotenv(override=True)
         self.openai_api_key = os.getenv("OPENAI_API_KEY") or ""
+        self._key_lock = threading.Lock()
+        self._key_validation_thread: Optional[threading.Thread] = None
         if self.openai_api_key:
-            if OpenAIService.is_key_valid(self.openai_api_key):
-                self.api_key_status = "✅ API key set successfully!"
-            else:
-                self.api_key_status = "🚫 Invalid API key found in environment."
+            self.api_key_state = "validating"
+            self.api_key_status = "⏳ Validating API key..."
         else:
+            self.api_key_state = "missing"
             self.api_key_status = "⚠️ No API key found. Please enter your OpenAI API key."
 
+    def _start_key_validation(self, api_key: str) -> threading.Thread:
+        """Validate ``api_key`` in a daemon thread, then warm the connection pool (OPENAI_HTTP_WARMUP)."""
+
+        def _run() -> None:
+            start = time.perf_counter()
+            valid = OpenAIService.is_key_valid(api_key)
+            if self.telemetry:
+                try:
+                    self.telemetry.observe_hist(
+                        "key_validation_ms", (time.perf_counter() - start) * 1000.0, {"valid": valid}
+                    )
+                except Exception:
+                    pass
+            with self._key_lock:
+                if api_key != self.openai_api_key:
+                    return  # superseded by set_api_key
+                self.api_key_state = "valid" if valid else "invalid"
+                self.api_key_status = (
+                    "✅ API key set successfully!" if valid else "🚫 Invalid API key found in environment."
+                )
+            if valid and os.getenv("OPENAI_HTTP_WARMUP", "1").strip().lower() in ("1", "true", "yes", "on"):
+                get_client_registry(self.telemetry).warm_up(api_key, background=False)
+
+        t = threading.Thread(target=_run, name="key-validation", daemon=True)
+        t.start()
+        self._key_validation_thread = t
+        return t
+
+    def key_status(self) -> Dict[str, str]:
+        """Current API key state (missing/validating/valid/invalid) and the message shown in the UI."""
+        with self._key_lock:
+            return {"state": self.api_key_state, "message": self.api_key_status}
+
+    def session(self, request: Any = None) -> SessionState:
+        """State of the learner behind a Gradio request (username or session hash); default session without one."""
+        return self.sessions.get(session_id_from_request(request))
+
+    def save_session(self, state: SessionState) -> None:
+        """Persist a session after a turn changed it (no-op without a state backend)."""
+        self.sessions.save(state)
+
+    @property
+    def progress_tracker(self) -> ProgressTracker:
+        """Progress of the default session (callers without a Gradio request, e.g. the REST API)."""
+        return self.sessions.get().progress
+
     def get_system_message(self, mode: str = "speaking", level: Optional[str] = None) -> str:
         """Get the appropriate system message based on tutoring mode."""
         return system_message(mode, level)
 
+    def shutdown(self) -> None:
+        """Flush buffered telemetry and session writes (server shutdown, after in-flight requests drained)."""
+        post_turn = getattr(self, "post_turn", None)
+        if post_turn is not None and not post_turn.shutdown(timeout=float(os.getenv("GRACEFUL_TIMEOUT_S", "30"))):
+            logging.warning(f"Post-turn queue not drained on shutdown ({post_turn.pending} tasks dropped)")
+        for resource in (self.telemetry, self.state_backend):
+            if resource is None:
+                continue
+            try:
+                resource.flush()
+            except Exception as e:
+                logging.warning(f"Flush on shutdown failed: {e}")
+
     def launch_ui(self):
-        """Run the Gradio interface."""
+        """Run the Gradio interface in a single process (see src.infra.launcher for multiple workers)."""
         app = run_gradio_interface(self)
         # Bind host/port from environment to satisfy security linters and hosting platforms
         # - Default host: 127.0.0.1 for local dev
@@ -125,6 +235,11 @@ class EnglishTutor:
 logging.basicConfig(level=logging.INFO, format="%(levelname)s:%(name)s:%(message)s", force=True)
 
 
+def create_app():
+    """App factory used by each worker of the multi-worker launcher."""
+    return run_gradio_interface(EnglishTutor())
+
+
 # module-level function
 def main():
     """Entry point for the tutor application."""
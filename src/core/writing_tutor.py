@@ -1,85 +1,80 @@
 import logging
-import threading
-import queue
-from typing import Any, Dict, Generator, List, Optional, Tuple
+import os
+import time
+from typing import Any, AsyncGenerator, Dict, Generator, List, Optional, Tuple
 import gradio as gr
 from src.core.base_tutor import BaseTutor
-from src.utils.audio import save_audio_to_temp_file
+from src.utils.audio import guess_audio_suffix, save_audio_to_temp_file
+from src.utils.context_budget import assemble_context, context_budget, max_message_tokens, record_context
 from src.infra.streaming_manager import StreamingManager
+from src.infra.stream_coalescer import YieldCoalescer
+from src.infra.tts_pipeline import TTSPipeline
 
 
 class WritingTutor(BaseTutor):
-    def _stream_response_to_history(
+    async def _stream_response_to_history(
         self,
         messages: List[Dict[str, Any]],
         history: List[Dict[str, Any]],
-    ) -> Generator[Tuple[List[Dict[str, Any]], List[Dict[str, Any]]], None, None]:
-        """Stream LLM response using StreamingManager and update history incrementally."""
+    ) -> AsyncGenerator[Tuple[List[Dict[str, Any]], List[Dict[str, Any]]], None]:
+        """Stream LLM response using StreamingManager.astream_text and update history incrementally.
+
+        Runs on the event loop: no helper thread or queue per request, and when Gradio cancels the
+        handler (client disconnect) the upstream stream is closed with it.
+        """
 
         assistant_message = {"role": "assistant", "content": ""}
         history.append(assistant_message)
+        telemetry = getattr(self.tutor_parent, "telemetry", None)
+        # Each yield re-sends the chat: batch chunks per STREAM_FLUSH_MS / STREAM_FLUSH_CHARS
+        coalescer = YieldCoalescer("writing", telemetry=telemetry)
 
         # Emit initial state with empty assistant message
+        coalescer.flushed(history)
         yield history, history
 
-        # Queue to receive streaming events from callbacks
-        q: "queue.Queue" = queue.Queue()
-
-        def on_chunk(ch: str) -> None:
-            # Push chunk event for the generator loop to consume and yield
-            q.put(("chunk", ch))
-
-        def on_complete(full_text: str) -> None:
-            q.put(("end", full_text))
-
-        def on_error(err: Exception) -> None:
-            q.put(("error", err))
-
         # Build a StreamingManager instance (reusing service and telemetry from parent)
-        mgr = StreamingManager(service=self.openai_service, telemetry=getattr(self.tutor_parent, "telemetry", None))
+        mgr = StreamingManager(service=self.openai_service, telemetry=telemetry, mode="writing")
 
-        # Run the blocking stream_text in a background thread, feeding events to the queue
-        def _runner():
-            try:
-                mgr.stream_text(messages=messages, on_chunk=on_chunk, on_complete=on_complete, on_error=on_error)
-            except Exception as e:  # defensive, in case callbacks path didn't capture
-                on_error(e)
-
-        t = threading.Thread(target=_runner, daemon=True)
-        t.start()
-
-        reply_buffer = ""
+        parts: List[str] = []
         try:
-            while True:
-                kind, payload = q.get(timeout=60)  # generous timeout for long generations
-                if kind == "chunk":
-                    ch = payload
-                    if ch:
-                        reply_buffer += ch
-                        assistant_message["content"] = reply_buffer
-                        yield history, history
-                elif kind == "end":
-                    # Ensure content reflects final text (already accumulated)
-                    assistant_message["content"] = reply_buffer or (payload or "").strip()
-                    break
-                elif kind == "error":
-                    e = payload
-                    logging.error(f"WritingTutor streaming error: {e}", exc_info=True)
-                    assistant_message["content"] = f"Sorry, an error occurred: {e}"
+            async for ch in mgr.astream_text(messages=messages):
+                parts.append(ch)
+                if coalescer.add(ch):
+                    assistant_message["content"] = "".join(parts)
+                    coalescer.flushed(history)
                     yield history, history
-                    break
-        except queue.Empty:
-            logging.warning("WritingTutor streaming timed out waiting for events.")
-            assistant_message["content"] = reply_buffer or "Sorry, the response took too long. Please try again."
+        except Exception as e:
+            logging.error(f"WritingTutor streaming error: {e}", exc_info=True)
+            assistant_message["content"] = f"Sorry, an error occurred: {e}"
+            coalescer.flushed(history)
+            coalescer.finish("error")
+            yield history, history
+            return
+
+        reply_buffer = "".join(parts)
+        if not reply_buffer.strip():
+            logging.warning("WritingTutor streaming produced no content.")
+            assistant_message["content"] = "Sorry, no response was generated. Please try again."
+            coalescer.flushed(history)
+            coalescer.finish("empty")
+            yield history, history
+            return
+        if coalescer.pending:
+            assistant_message["content"] = reply_buffer
+            coalescer.flushed(history)
             yield history, history
+        coalescer.finish()
+        self._maybe_prefetch_audio(reply_buffer.strip())
 
-    def process_input(
+    async def process_input(
         self,
         input_data: Optional[str] = None,
         history: Optional[List[Dict[str, Any]]] = None,
         level: Optional[str] = None,
         writing_type: Optional[str] = None,
-    ) -> Generator[Tuple[List[Dict[str, Any]], List[Dict[str, Any]]], None, None]:
+        request: Optional[gr.Request] = None,
+    ) -> AsyncGenerator[Tuple[List[Dict[str, Any]], List[Dict[str, Any]]], None]:
         """Evaluates an essay and streams the feedback into the chat history."""
 
         if not self.tutor_parent.openai_service:
@@ -99,25 +94,54 @@ class WritingTutor(BaseTutor):
 
         # --- Progress Tracking ---
 
-        if self.tutor_parent and hasattr(self.tutor_parent, "progress_tracker"):
-            # Award 20 XP per essay evaluation and count one task
-
-            self.tutor_parent.progress_tracker.add_xp(20)
-            self.tutor_parent.progress_tracker.increment_tasks()
+        if self.tutor_parent:
+            # Award 20 XP per essay evaluation and count one task (for this learner's session)
+            session = self._session(request)
+            session.remember(level=level, writing_type=writing_type)
+            self._post_turn(session, lambda: self._record_turn(session), task="progress")
 
         yield current_history, current_history
 
         system_prompt = self.tutor_parent.get_system_message(mode="writing", level=level)
-        messages = [{"role": "system", "content": system_prompt}] + current_history
-
-        yield from self._stream_response_to_history(messages, current_history)
-
-    def generate_random_topic(
+        # Past essays and feedback only fill what is left of the token budget after the new essay, which is
+        # never trimmed (the feedback must cover all of it)
+        model = getattr(self.tutor_parent.openai_service, "model", None)
+        budget = context_budget("writing", model)
+        context = assemble_context(
+            system_prompt,
+            [{"role": m["role"], "content": m["content"]} for m in current_history],
+            budget_tokens=budget,
+            max_turn_tokens=max_message_tokens("writing", model),
+            trim_latest=False,
+        )
+        telemetry = getattr(self.tutor_parent, "telemetry", None)
+        record_context(telemetry, "writing", context)
+        if context.over_budget:
+            logging.warning(
+                "Essay exceeds CONTEXT_BUDGET_TOKENS_WRITING (~%d tokens sent, budget %d); sent whole",
+                context.tokens,
+                budget,
+            )
+            if telemetry:
+                try:
+                    telemetry.inc_counter("context_over_budget_total", {"mode": "writing"})
+                except Exception:
+                    pass
+            gr.Warning(
+                f"Your text is longer than this tutor's context budget (~{context.tokens} of {budget} tokens), "
+                "so earlier essays were left out. Consider splitting very long texts."
+            )
+
+        async for update in self._stream_response_to_history(context.messages, current_history):
+            yield update
+
+    async def generate_random_topic(
         self,
         level: Optional[str] = None,
         history: Optional[List[Dict]] = None,
         writing_type: Optional[str] = None,
-    ) -> Generator[Tuple[List[Dict[str, Any]], List[Dict[str, Any]]], None, None]:
+        request: Optional[gr.Request] = None,
+    ) -> AsyncGenerator[Tuple[List[Dict[str, Any]], List[Dict[str, Any]]], None]:
         """Generates a random essay topic and streams it into the chat history."""
 
         current_history = history.copy() if history else []
@@ -131,6 +155,7 @@ class WritingTutor(BaseTutor):
             yield current_history, current_history
             return
 
+        self._session(request).remember(level=level, writing_type=writing_type)
         user_request_message = f"Can you give me an essay topic for level {level} referring to {writing_type}."
         current_history.append({"role": "user", "content": user_request_message})
 
@@ -172,13 +197,31 @@ class WritingTutor(BaseTutor):
             {"role": "user", "content": prompt_for_llm},
         ]
 
-        yield from self._stream_response_to_history(messages_for_topic, current_history)
+        async for update in self._stream_response_to_history(messages_for_topic, current_history):
+            yield update
+
+    def _tts_pipeline(self) -> TTSPipeline:
+        """Pipeline bound to the current OpenAIService (rebuilt when the API key changes)."""
+        pipeline = getattr(self, "_pipeline", None)
+        if pipeline is None or pipeline.service is not self.openai_service:
+            if pipeline is not None:
+                pipeline.shutdown()
+            pipeline = TTSPipeline(self.openai_service)
+            self._pipeline = pipeline
+        return pipeline
+
+    def _maybe_prefetch_audio(self, text: str) -> None:
+        """Speculatively synthesize finished feedback so the playback click is instant (WRITING_TTS_PREFETCH)."""
+        if os.getenv("WRITING_TTS_PREFETCH", "0").strip().lower() not in ("1", "true", "yes", "on"):
+            return
+        if not self.openai_service or not text:
+            return
+        try:
+            self._tts_pipeline().prefetch(text)
+        except Exception as e:
+            logging.debug(f"TTS prefetch skipped: {e}")
 
-    def play_audio(self, history: List[Dict[str, str]]) -> str | None:
-        """
-        Takes the last assistant message from the history, converts it to speech,
-        and returns the path to the audio file for Gradio to play.
-        """
+    def _text_to_speak(self, history: List[Dict[str, str]]) -> Optional[str]:
         if not history or not isinstance(history, list):
             logging.warning("play_audio called with empty or invalid history.")
 
@@ -202,14 +245,50 @@ class WritingTutor(BaseTutor):
 
             return None
 
+        return text_to_speak
+
+    def play_audio(self, history: List[Dict[str, str]]) -> str | None:
+        """
+        Takes the last assistant message from the history, converts it to speech,
+        and returns the path to the audio file for Gradio to play.
+        Chunks are synthesized concurrently and stitched into a single file.
+        """
+        text_to_speak = self._text_to_speak(history)
+        if not text_to_speak:
+            return None
+
         try:
             logging.info(f"Generating audio for feedback: '{text_to_speak[:70]}...'")
-            audio_bytes = self.openai_service.text_to_speech(text_to_speak)
+            audio_bytes = self._tts_pipeline().submit(text_to_speak).result()
 
-            tmp_path = save_audio_to_temp_file(audio_bytes)
+            tmp_path = save_audio_to_temp_file(audio_bytes, suffix=guess_audio_suffix(audio_bytes))
 
             return tmp_path
 
         except Exception as e:
             logging.error(f"Failed to generate or save audio feedback: {e}", exc_info=True)
             return None
+
+    def play_audio_stream(self, history: List[Dict[str, str]]) -> Generator[Optional[str], None, None]:
+        """
+        Streaming variant of play_audio for a streaming audio output: yields the first chunk as soon
+        as it is synthesized, then the remaining chunks in order while the rest of the pool works.
+        """
+        text_to_speak = self._text_to_speak(history)
+        if not text_to_speak:
+            yield None
+            return
+
+        telemetry = getattr(self.tutor_parent, "telemetry", None)
+        start = time.perf_counter()
+        try:
+            job = self._tts_pipeline().submit(text_to_speak)
+            for i, audio_bytes in enumerate(job.iter_audio()):
+                if i == 0 and telemetry:
+                    telemetry.observe_hist(
+                        "tts_first_chunk_ms", (time.perf_counter() - start) * 1000.0, {"chunks": len(job.chunks)}
+                    )
+                yield save_audio_to_temp_file(audio_bytes, suffix=guess_audio_suffix(audio_bytes))
+        except Exception as e:
+            logging.error(f"Failed to generate or save audio feedback: {e}", exc_info=True)
+            yield None
@@ -0,0 +1,609 @@
+"""Production launcher: N uvicorn worker processes behind a client-affine front.
+
+Gradio's queue (and ``gr.State``) keeps per-session state in the process that served ``queue/join``, so
+workers cannot simply share one listening socket (the SSE stream may land on another worker). Instead
+each worker listens on its own loopback port and the supervisor forwards every client connection to the
+worker chosen for that client. The client is identified from the first request's headers:
+
+1. the AFFINITY_COOKIE cookie, when set (e.g. the platform load balancer's sticky cookie),
+2. the first ``X-Forwarded-For`` address, when the connection comes from a trusted proxy
+   (FORWARDED_ALLOW_IPS, comma-separated, ``*`` for any; default 127.0.0.1),
+3. otherwise the TCP peer address.
+
+Behind a load balancer on another host, set one of the first two: otherwise every client has the
+balancer's address and all traffic lands on one worker (a warning is logged at startup).
+
+A client keeps the worker it was first sent to (hash of its key over the slots) while that worker is up.
+Requests are forwarded with ``Connection: close``, so a connection a load balancer reuses for several
+clients is never pinned to the first client's worker.
+
+- Per-worker readiness: a slot only receives traffic once its worker answers ``/healthz``.
+- A worker that exits is respawned; a slot whose worker fails to start is retried with exponential
+  backoff (up to RESPAWN_BACKOFF_MAX_S between attempts).
+- SIGTERM/SIGINT: stop accepting, let workers drain in-flight requests and streams
+  (GRACEFUL_TIMEOUT_S), flush telemetry/state on their shutdown, then exit.
+- SIGHUP: rolling restart, one slot at a time. New clients go to the replacement once it is ready;
+  clients already bound to the old worker keep using it (their Gradio sessions live there) until none
+  of them has sent a request for AFFINITY_IDLE_S and its connections are closed, or at most
+  RESTART_DRAIN_MAX_S. Only then is the old worker drained and stopped.
+- Metrics (METRICS_ENABLED=1): the supervisor serves ``/metrics`` on an internal listener
+  (METRICS_HOST:METRICS_PORT, loopback by default). It scrapes every ready worker and merges them,
+  adding a ``worker`` label (the slot) to each series. Workers only answer the supervisor's
+  per-launch METRICS_TOKEN, so ``/metrics`` is not reachable through the public port.
+
+Usage (from the project root):
+    python -m src.infra.launcher --workers 4
+"""
+
+import argparse
+import asyncio
+import http.client
+import ipaddress
+import logging
+import os
+import re
+import secrets
+import signal
+import socket
+import subprocess
+import sys
+import time
+import zlib
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from src.infra.telemetry import TelemetryService
+
+_logger = logging.getLogger(__name__)
+if not _logger.handlers:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+
+def default_workers() -> int:
+    """WORKERS from the environment (``auto`` or unset = one per CPU core)."""
+    value = os.getenv("WORKERS", "auto").strip().lower()
+    if value in ("", "auto"):
+        return max(1, os.cpu_count() or 1)
+    return max(1, int(value))
+
+
+# First request line: METHOD SP target SP HTTP/x.y
+_REQUEST_LINE = re.compile(rb"^[A-Z]+ \S+ HTTP/\d(\.\d)?\r?\n$")
+_HEAD_TIMEOUT_S = 30.0
+_MAX_HEAD_BYTES = 64 * 1024
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _is_ready(port: int) -> bool:
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+    try:
+        conn.request("GET", "/healthz")
+        return conn.getresponse().status == 200
+    except (OSError, http.client.HTTPException):
+        return False
+    finally:
+        conn.close()
+
+
+def _loopback_only(addresses: Iterable[str]) -> bool:
+    """Whether every FORWARDED_ALLOW_IPS entry is a loopback address (``*`` and hostnames are not)."""
+    for address in addresses:
+        try:
+            if not ipaddress.ip_address(address).is_loopback:
+                return False
+        except ValueError:
+            return False
+    return True
+
+
+def _scrape(port: int, token: str) -> str:
+    """Prometheus text of one worker ("" when it does not answer)."""
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+    try:
+        conn.request("GET", "/metrics", headers={"Authorization": f"Bearer {token}"})
+        resp = conn.getresponse()
+        body = resp.read().decode("utf-8", errors="replace")
+        return body if resp.status == 200 else ""
+    except (OSError, http.client.HTTPException):
+        return ""
+    finally:
+        conn.close()
+
+
+def _with_label(sample: str, name: str, value: str) -> str:
+    """Add ``name="value"`` as the first label of a Prometheus sample line."""
+    ends = [i for i in (sample.find("{"), sample.find(" ")) if i >= 0]
+    if not ends:
+        return sample
+    end = min(ends)
+    pair = f'{name}="{value}"'
+    if sample[end] == "{":
+        rest = sample[end + 1 :]
+        return f"{sample[:end]}{{{pair}{'' if rest.startswith('}') else ','}{rest}"
+    return f"{sample[:end]}{{{pair}}}{sample[end:]}"
+
+
+def merge_prometheus(texts: Dict[str, str], label: str = "worker") -> str:
+    """Merge Prometheus text pages of several processes into one, each series labelled by its source.
+
+    Samples are grouped under a single ``# TYPE`` line per metric family, as the format requires.
+    """
+    families: Dict[str, Tuple[str, List[str]]] = {}
+    for source, text in texts.items():
+        family = None
+        for line in text.splitlines():
+            if line.startswith("# TYPE "):
+                parts = line.split()
+                if len(parts) == 4:
+                    family = families.setdefault(parts[2], (parts[3], []))
+                continue
+            if not line.strip() or line.startswith("#") or family is None:
+                continue
+            family[1].append(_with_label(line, label, source))
+    lines: List[str] = []
+    for name in sorted(families):
+        kind, samples = families[name]
+        lines.append(f"# TYPE {name} {kind}")
+        lines.extend(samples)
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+class _Worker:
+    """One uvicorn process serving the app on a loopback port."""
+
+    def __init__(self, slot: int, generation: int, env: Optional[Dict[str, str]] = None) -> None:
+        self.slot = slot
+        self.generation = generation
+        self.port = _free_port()
+        # ready: takes new clients; serving: still serves the clients bound to it (retiring after SIGHUP)
+        self.ready = False
+        self.serving = False
+        self.connections = 0
+        env = dict(os.environ, **(env or {}), WORKER_ID=f"{slot}.{generation}")
+        # Own session: terminal/process-group signals (Ctrl-C, SIGHUP) reach only the supervisor,
+        # which decides when each worker drains
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "src.infra.launcher", "--serve-port", str(self.port)],
+            env=env,
+            start_new_session=True,
+        )
+
+    @property
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    async def wait_ready(self, timeout_s: float) -> bool:
+        deadline = time.monotonic() + timeout_s
+        while time.monotonic() < deadline and self.alive:
+            if await asyncio.to_thread(_is_ready, self.port):
+                self.ready = self.serving = True
+                return True
+            await asyncio.sleep(0.2)
+        return False
+
+    def terminate(self) -> None:
+        """SIGTERM: uvicorn stops accepting and waits for in-flight requests before shutting down."""
+        self.ready = self.serving = False
+        if self.alive:
+            self.process.send_signal(signal.SIGTERM)
+
+    async def wait_exit(self, timeout_s: float) -> None:
+        try:
+            await asyncio.wait_for(asyncio.to_thread(self.process.wait), timeout_s)
+        except asyncio.TimeoutError:
+            _logger.warning("Worker %d (pid %d) did not drain in time; killing it", self.slot, self.process.pid)
+            self.process.kill()
+            await asyncio.to_thread(self.process.wait)
+
+
+class Supervisor:
+    def __init__(
+        self,
+        workers: int,
+        host: str,
+        port: int,
+        grace_s: Optional[float] = None,
+        ready_timeout_s: Optional[float] = None,
+        telemetry: Optional[TelemetryService] = None,
+        metrics_port: Optional[int] = None,
+        metrics_host: Optional[str] = None,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.metrics_port = metrics_port
+        self.metrics_host = metrics_host or os.getenv("METRICS_HOST", "127.0.0.1")
+        # Workers only serve /metrics to the supervisor (never through the public port)
+        self.metrics_token = secrets.token_urlsafe(24)
+        self.grace_s = float(os.getenv("GRACEFUL_TIMEOUT_S", str(grace_s if grace_s is not None else 30)))
+        self.ready_timeout_s = float(os.getenv("WORKER_READY_TIMEOUT_S", str(ready_timeout_s or 60)))
+        self.affinity_cookie = os.getenv("AFFINITY_COOKIE", "").strip()
+        self.trusted_proxies = {
+            p.strip() for p in os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1").split(",") if p.strip()
+        }
+        self.affinity_idle_s = float(os.getenv("AFFINITY_IDLE_S", "600"))
+        self.affinity_max = max(1, int(os.getenv("AFFINITY_MAX", "100000")))
+        self.restart_drain_max_s = float(os.getenv("RESTART_DRAIN_MAX_S", "3600"))
+        self.respawn_backoff_max_s = float(os.getenv("RESPAWN_BACKOFF_MAX_S", "60"))
+        self.telemetry = telemetry
+        self.slots: List[Optional[_Worker]] = [None] * max(1, workers)
+        # Empty slots (worker failed to start): next attempt time and current backoff, per slot
+        self._retry_at: List[float] = [0.0] * len(self.slots)
+        self._retry_delay: List[float] = [0.0] * len(self.slots)
+        # Replaced by a rolling restart but still serving the clients bound to them
+        self.retiring: List[_Worker] = []
+        # Client key -> (worker, last request), least recently seen first
+        self._affinity: "OrderedDict[str, Tuple[_Worker, float]]" = OrderedDict()
+        self._generation = 0
+        self._draining = False
+        self._restarting = False
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._metrics_server: Optional[asyncio.AbstractServer] = None
+        self._stopped = asyncio.Event()
+
+    def _event(self, name: str, labels: dict) -> None:
+        if self.telemetry:
+            try:
+                self.telemetry.log_event(name, labels)
+            except Exception:
+                pass
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+    async def _spawn(self, slot: int) -> Optional[_Worker]:
+        """Start a worker for ``slot`` and wait until it is ready (None if it never became ready)."""
+        self._generation += 1
+        start = time.perf_counter()
+        worker = _Worker(slot, self._generation, env={"METRICS_TOKEN": self.metrics_token})
+        if await worker.wait_ready(self.ready_timeout_s):
+            ready_ms = (time.perf_counter() - start) * 1000.0
+            _logger.info(
+                "Worker %d ready (pid %d, port %d) in %.0f ms", slot, worker.process.pid, worker.port, ready_ms
+            )
+            self._event("worker_ready", {"slot": slot, "pid": worker.process.pid, "ready_ms": round(ready_ms, 1)})
+            return worker
+        _logger.error("Worker %d (pid %d) failed to become ready", slot, worker.process.pid)
+        worker.terminate()
+        await worker.wait_exit(5)
+        return None
+
+    async def _retire(self, worker: _Worker) -> None:
+        worker.terminate()
+        await worker.wait_exit(self.grace_s + 5)
+        self._event("worker_exit", {"slot": worker.slot, "pid": worker.process.pid, "code": worker.process.returncode})
+
+    async def rolling_restart(self) -> None:
+        """Replace each worker in turn; the old one keeps its bound clients until they go idle."""
+        if self._restarting or self._draining:
+            return
+        self._restarting = True
+        _logger.info("Rolling restart of %d workers", len(self.slots))
+        try:
+            for slot, old in enumerate(self.slots):
+                if self._draining:
+                    return
+                new = await self._spawn(slot)
+                if new is None:
+                    _logger.error("Aborting rolling restart; keeping the current workers")
+                    return
+                self.slots[slot] = new
+                if old is not None:
+                    old.ready = False
+                    self.retiring.append(old)
+                    asyncio.ensure_future(self._retire_when_idle(old))
+            self._event("worker_rolling_restart", {"workers": len(self.slots)})
+        finally:
+            self._restarting = False
+
+    def _has_active_clients(self, worker: _Worker, now: Optional[float] = None) -> bool:
+        """Whether a connection is open or a bound client sent a request within AFFINITY_IDLE_S."""
+        if worker.connections > 0:
+            return True
+        now = time.monotonic() if now is None else now
+        return any(w is worker and now - seen < self.affinity_idle_s for w, seen in self._affinity.values())
+
+    async def _retire_when_idle(self, worker: _Worker) -> None:
+        deadline = time.monotonic() + self.restart_drain_max_s
+        while not self._draining and time.monotonic() < deadline and self._has_active_clients(worker):
+            await asyncio.sleep(1.0)
+        if self._draining:
+            return  # drain() stops every retiring worker itself
+        await self._retire(worker)
+        if worker in self.retiring:
+            self.retiring.remove(worker)
+
+    async def _watch(self) -> None:
+        """Respawn workers that exit unexpectedly and forget clients idle for longer than AFFINITY_IDLE_S."""
+        while not self._draining:
+            await asyncio.sleep(1.0)
+            self._prune_affinity()
+            for worker in self.retiring:
+                if worker.serving and not worker.alive:
+                    worker.serving = False
+            await self._heal()
+
+    async def _heal(self) -> None:
+        """Respawn exited workers and retry empty slots whose backoff has elapsed."""
+        for slot, worker in enumerate(self.slots):
+            if self._draining or self._restarting:
+                break
+            if worker is not None:
+                if worker.alive:
+                    continue
+                _logger.warning("Worker %d exited with code %s; respawning", slot, worker.process.returncode)
+                self.slots[slot] = None
+            elif time.monotonic() < self._retry_at[slot]:
+                continue
+            worker = await self._spawn(slot)
+            self.slots[slot] = worker
+            if worker is not None:
+                self._retry_delay[slot] = 0.0
+                continue
+            self._retry_delay[slot] = min(self.respawn_backoff_max_s, max(1.0, self._retry_delay[slot] * 2))
+            self._retry_at[slot] = time.monotonic() + self._retry_delay[slot]
+            _logger.warning("Worker %d failed to start; retrying in %.0f s", slot, self._retry_delay[slot])
+
+    # ------------------------------------------------------------------
+    # Client connections
+    # ------------------------------------------------------------------
+    def _pick(self, key: str) -> Optional[_Worker]:
+        """Worker the client is bound to while it still serves, else its slot's (or the next ready) worker."""
+        now = time.monotonic()
+        bound = self._affinity.get(key)
+        worker = bound[0] if bound is not None and bound[0].serving else None
+        if worker is None:
+            n = len(self.slots)
+            first = zlib.crc32(key.encode("utf-8")) % n
+            for i in range(n):
+                candidate = self.slots[(first + i) % n]
+                if candidate is not None and candidate.ready:
+                    worker = candidate
+                    break
+        if worker is not None:
+            self._affinity[key] = (worker, now)
+            self._affinity.move_to_end(key)
+            while len(self._affinity) > self.affinity_max:
+                self._affinity.popitem(last=False)
+        return worker
+
+    def _prune_affinity(self, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        while self._affinity:
+            worker, seen = next(iter(self._affinity.values()))
+            if now - seen < self.affinity_idle_s and worker.serving:
+                break
+            self._affinity.popitem(last=False)
+
+    def _affinity_key(self, head: List[bytes], peer_ip: str) -> str:
+        """Client identity from the request headers: affinity cookie, trusted X-Forwarded-For, else peer IP."""
+        headers: Dict[str, str] = {}
+        for line in head[1:]:
+            name, sep, value = line.decode("latin-1").partition(":")
+            if sep:
+                headers.setdefault(name.strip().lower(), value.strip())
+        if self.affinity_cookie and "cookie" in headers:
+            for part in headers["cookie"].split(";"):
+                name, _, value = part.strip().partition("=")
+                if name == self.affinity_cookie and value:
+                    return f"cookie:{value}"
+        forwarded = headers.get("x-forwarded-for", "").split(",")[0].strip()
+        if forwarded and ("*" in self.trusted_proxies or peer_ip in self.trusted_proxies):
+            return forwarded
+        return peer_ip
+
+    @staticmethod
+    async def _read_head(reader: asyncio.StreamReader) -> Tuple[bytes, Optional[List[bytes]]]:
+        """Bytes read so far and the request head lines (None when the stream does not start with HTTP)."""
+        raw = await asyncio.wait_for(reader.readline(), _HEAD_TIMEOUT_S)
+        if not _REQUEST_LINE.match(raw):
+            return raw, None
+        lines = [raw.rstrip(b"\r\n")]
+        while len(raw) < _MAX_HEAD_BYTES:
+            line = await asyncio.wait_for(reader.readline(), _HEAD_TIMEOUT_S)
+            raw += line
+            if line in (b"\r\n", b"\n", b""):
+                return raw, lines
+            lines.append(line.rstrip(b"\r\n"))
+        return raw, None
+
+    @staticmethod
+    def _one_request_head(lines: List[bytes]) -> bytes:
+        """Request head with ``Connection: close`` (the worker answers one request, then the client reconnects
+        and is routed again); upgrade requests (WebSocket) are left as they are."""
+        if any(line.lower().startswith(b"upgrade:") for line in lines[1:]):
+            return b"\r\n".join(lines) + b"\r\n\r\n"
+        kept = [lines[0]] + [
+            line for line in lines[1:] if not line.lower().startswith((b"connection:", b"keep-alive:"))
+        ]
+        return b"\r\n".join(kept + [b"Connection: close"]) + b"\r\n\r\n"
+
+    @staticmethod
+    async def _pipe(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    break
+                writer.write(data)
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            try:
+                writer.close()
+            except Exception:
+                pass
+
+    async def _handle(self, client_reader: asyncio.StreamReader, client_writer: asyncio.StreamWriter) -> None:
+        peer = client_writer.get_extra_info("peername") or ("", 0)
+        try:
+            raw, head = await self._read_head(client_reader)
+        except (asyncio.TimeoutError, ValueError, ConnectionError):
+            client_writer.close()
+            return
+        if not raw:
+            client_writer.close()
+            return
+        if head is not None:
+            key, raw = self._affinity_key(head, str(peer[0])), self._one_request_head(head)
+        else:
+            key = str(peer[0])
+        for _ in range(len(self.slots) + len(self.retiring)):
+            worker = self._pick(key)
+            if worker is None:
+                break
+            try:
+                upstream_reader, upstream_writer = await asyncio.open_connection("127.0.0.1", worker.port)
+                break
+            except OSError as e:
+                # Crashed or draining worker: take it out of rotation until the watcher replaces it
+                _logger.warning("Worker %d unreachable: %s", worker.slot, e)
+                worker.ready = worker.serving = False
+        else:
+            worker = None
+        if worker is None or not worker.serving:
+            client_writer.close()
+            return
+        worker.connections += 1
+        try:
+            upstream_writer.write(raw)
+            await asyncio.gather(self._pipe(client_reader, upstream_writer), self._pipe(upstream_reader, client_writer))
+        finally:
+            worker.connections -= 1
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+    async def collect_metrics(self) -> str:
+        """Every ready worker's /metrics plus the supervisor's own, merged with a ``worker`` label."""
+        workers = [w for w in self.slots if w is not None and w.ready]
+        retiring = [w for w in self.retiring if w.serving]
+        pages = await asyncio.gather(
+            *[asyncio.to_thread(_scrape, w.port, self.metrics_token) for w in workers + retiring]
+        )
+        # Retiring workers share their slot with its replacement: label them slot.generation
+        names = [str(w.slot) for w in workers] + [f"{w.slot}.{w.generation}" for w in retiring]
+        texts = dict(zip(names, pages))
+        if self.telemetry is not None:
+            texts["supervisor"] = self.telemetry.metrics.render_prometheus()
+        return merge_prometheus(texts)
+
+    async def _serve_metrics(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Minimal HTTP/1.1 responder for the internal metrics listener (GET /metrics only)."""
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), 5)
+            while (await asyncio.wait_for(reader.readline(), 5)) not in (b"\r\n", b"\n", b""):
+                pass
+            parts = request_line.split()
+            if len(parts) >= 2 and parts[0] == b"GET" and parts[1].split(b"?")[0] == b"/metrics":
+                status, body = "200 OK", (await self.collect_metrics()).encode("utf-8")
+            else:
+                status, body = "404 Not Found", b"Not Found\n"
+            head = (
+                f"HTTP/1.1 {status}\r\nContent-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n"
+            )
+            writer.write(head.encode("ascii") + body)
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    async def drain(self) -> None:
+        """Stop accepting, let every worker finish its in-flight requests, then stop."""
+        if self._draining:
+            return
+        self._draining = True
+        _logger.info("Draining %d workers (grace %.0fs)", len(self.slots), self.grace_s)
+        if self._server is not None:
+            self._server.close()
+        if self._metrics_server is not None:
+            self._metrics_server.close()
+        workers = [w for w in self.slots if w is not None] + self.retiring
+        await asyncio.gather(*[self._retire(w) for w in workers])
+        self._stopped.set()
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        for slot in range(len(self.slots)):
+            self.slots[slot] = await self._spawn(slot)
+        if not any(self.slots):
+            raise RuntimeError("No worker became ready")
+
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        _logger.info("Serving on http://%s:%d with %d workers", self.host, self.port, len(self.slots))
+        if not self.affinity_cookie and _loopback_only(self.trusted_proxies):
+            _logger.warning(
+                "Neither AFFINITY_COOKIE nor a non-loopback FORWARDED_ALLOW_IPS is set: clients are pinned to "
+                "workers by their TCP peer address. Behind a load balancer on another host every client shares "
+                "its address and lands on one worker; set FORWARDED_ALLOW_IPS or AFFINITY_COOKIE."
+            )
+        if self.metrics_port is not None:
+            self._metrics_server = await asyncio.start_server(self._serve_metrics, self.metrics_host, self.metrics_port)
+            _logger.info("Metrics of all workers on http://%s:%d/metrics", self.metrics_host, self.metrics_port)
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, lambda: asyncio.ensure_future(self.drain()))
+        loop.add_signal_handler(signal.SIGHUP, lambda: asyncio.ensure_future(self.rolling_restart()))
+
+        watcher = asyncio.ensure_future(self._watch())
+        await self._stopped.wait()
+        watcher.cancel()
+
+
+def _serve(port: int) -> None:
+    """Worker process entry point: build the app and serve it on a loopback port."""
+    import uvicorn
+
+    from src.core.tutor import create_app
+
+    uvicorn.run(
+        create_app(),
+        host="127.0.0.1",
+        port=port,
+        log_level=os.getenv("LOG_LEVEL", "info"),
+        timeout_graceful_shutdown=float(os.getenv("GRACEFUL_TIMEOUT_S", "30")),
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Multi-worker production launcher")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: WORKERS or CPU count)")
+    parser.add_argument("--host", default=os.getenv("HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--serve-port", type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.serve_port is not None:
+        _serve(args.serve_port)
+        return
+
+    workers = args.workers or default_workers()
+    if workers > 1 and os.getenv("STATE_BACKEND", "memory").strip().lower() in ("", "memory", "none"):
+        _logger.warning(
+            "STATE_BACKEND is process-local: progress and summaries are not shared between workers "
+            "and do not survive a restart. Set STATE_BACKEND=sqlite for multi-worker deployments."
+        )
+    try:
+        telemetry = TelemetryService(base_dir=os.getenv("TELEMETRY_DIR"))
+    except Exception:
+        telemetry = None
+    metrics_port = None
+    if os.getenv("METRICS_ENABLED", "0").strip().lower() not in ("0", "false", "no", "off"):
+        metrics_port = int(os.getenv("METRICS_PORT", "9100"))
+    asyncio.run(Supervisor(workers, args.host, args.port, telemetry=telemetry, metrics_port=metrics_port).run())
+
+
+if __name__ == "__main__":
+    main()
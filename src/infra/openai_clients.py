@@ -0,0 +1,231 @@
+import hashlib
+import importlib.util
+import logging
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
+
+from src.infra.telemetry import TelemetryService
+
+_logger = logging.getLogger(__name__)
+if not _logger.handlers:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+
+def _http2_enabled() -> bool:
+    """HTTP/2 (OPENAI_HTTP2, default on) needs the optional ``h2`` package; fall back to HTTP/1.1 without it."""
+    if os.getenv("OPENAI_HTTP2", "1").strip().lower() not in ("1", "true", "yes", "on"):
+        return False
+    return importlib.util.find_spec("h2") is not None
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=int(os.getenv("OPENAI_HTTP_MAX_CONNECTIONS", "100")),
+        max_keepalive_connections=int(os.getenv("OPENAI_HTTP_MAX_KEEPALIVE", "20")),
+        keepalive_expiry=float(os.getenv("OPENAI_HTTP_KEEPALIVE_S", "60")),
+    )
+
+
+def _pool_connections(client: Any) -> list:
+    """Connections of the httpcore pool behind an SDK client (empty when the internals differ)."""
+    http_client = getattr(client, "_client", None)
+    pool = getattr(getattr(http_client, "_transport", None), "_pool", None)
+    try:
+        return list(getattr(pool, "connections", []) or [])
+    except Exception:
+        return []
+
+
+class _ClientEntry:
+    def __init__(self) -> None:
+        self.sync: Optional[OpenAI] = None
+        self.sync_http: Optional[httpx.Client] = None
+        self.async_: Optional[AsyncOpenAI] = None
+
+
+class OpenAIClientRegistry:
+    """Process-wide OpenAI clients keyed by a hash of the API key.
+
+    - Every OpenAIService (and key validation) for the same key shares one keep-alive connection pool,
+      so TLS/connection setup is paid once instead of per service rebuild or validation call.
+    - Bounded LRU of keys (OPENAI_CLIENT_MAX_KEYS). An evicted sync client may still be held by a live
+      OpenAIService, so its connection pool is closed once the last reference to it is gone.
+    - Pool size/keep-alive come from OPENAI_HTTP_*; HTTP/2 is used when ``h2`` is installed.
+    """
+
+    def __init__(self, max_keys: Optional[int] = None, telemetry: Optional[TelemetryService] = None) -> None:
+        self.max_keys = max(1, int(os.getenv("OPENAI_CLIENT_MAX_KEYS", str(max_keys or 8))))
+        self.telemetry = telemetry
+        self.http2 = _http2_enabled()
+        self._entries: "OrderedDict[str, _ClientEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_hash(api_key: str) -> str:
+        return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+    def _inc(self, name: str, labels: Optional[Dict[str, Any]] = None) -> None:
+        if self.telemetry:
+            try:
+                self.telemetry.inc_counter(name, labels or {})
+            except Exception:
+                pass
+
+    def _entry(self, api_key: str) -> _ClientEntry:
+        key = self.key_hash(api_key)
+        evicted = []
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = _ClientEntry()
+                self._entries[key] = entry
+                while len(self._entries) > self.max_keys:
+                    evicted.append(self._entries.popitem(last=False)[1])
+            else:
+                self._entries.move_to_end(key)
+        for old in evicted:
+            self._release(old)
+            self._inc("openai_client_evicted_total")
+        return entry
+
+    @staticmethod
+    def _close_http(http_client: httpx.Client) -> None:
+        try:
+            http_client.close()
+        except Exception as e:
+            _logger.debug("Closing OpenAI client failed: %s", e)
+
+    @classmethod
+    def _release(cls, entry: _ClientEntry) -> None:
+        """Drop the registry's hold on ``entry``; its sync pool closes when no service uses the client anymore."""
+        if entry.sync is not None and entry.sync_http is not None:
+            weakref.finalize(entry.sync, cls._close_http, entry.sync_http)
+        entry.sync = entry.sync_http = None
+        # Async clients are released with their last reference (closing needs the owning event loop)
+
+    @classmethod
+    def _close(cls, entry: _ClientEntry) -> None:
+        if entry.sync_http is not None:
+            cls._close_http(entry.sync_http)
+
+    def get(self, api_key: str) -> OpenAI:
+        """Shared sync client for ``api_key``."""
+        entry = self._entry(api_key)
+        with self._lock:
+            if entry.sync is None:
+                entry.sync_http = DefaultHttpxClient(limits=_limits(), http2=self.http2)
+                entry.sync = OpenAI(api_key=api_key, http_client=entry.sync_http)
+                created = True
+            else:
+                created = False
+        self._inc("openai_client_created_total" if created else "openai_client_reused_total", {"kind": "sync"})
+        return entry.sync
+
+    def get_async(self, api_key: str) -> AsyncOpenAI:
+        """Shared async client for ``api_key`` (used from the server's single event loop)."""
+        entry = self._entry(api_key)
+        with self._lock:
+            if entry.async_ is None:
+                entry.async_ = AsyncOpenAI(
+                    api_key=api_key, http_client=DefaultAsyncHttpxClient(limits=_limits(), http2=self.http2)
+                )
+                created = True
+            else:
+                created = False
+        self._inc("openai_client_created_total" if created else "openai_client_reused_total", {"kind": "async"})
+        return entry.async_
+
+    def discard(self, api_key: str) -> None:
+        """Drop the clients of a key, e.g. after it failed authentication (closed once unreferenced)."""
+        with self._lock:
+            entry = self._entries.pop(self.key_hash(api_key), None)
+        if entry is not None:
+            self._release(entry)
+
+    def warm_up(self, api_key: str, background: bool = True) -> Optional[threading.Thread]:
+        """Open a pooled connection ahead of the first real request with a cheap ``models.list()`` call.
+        Skipped when the key's pool already holds a connection (e.g. key validation just ran)."""
+
+        def _ping() -> None:
+            start = time.perf_counter()
+            try:
+                client = self.get(api_key)
+                if _pool_connections(client):
+                    self.report_stats()
+                    return
+                client.models.list()
+                if self.telemetry:
+                    self.telemetry.observe_hist("openai_warmup_ms", (time.perf_counter() - start) * 1000.0)
+            except Exception as e:
+                self._inc("openai_warmup_error_total", {"error": type(e).__name__})
+                _logger.info("OpenAI connection warm-up failed: %s", e)
+            self.report_stats()
+
+        if not background:
+            _ping()
+            return None
+        t = threading.Thread(target=_ping, name="openai-warmup", daemon=True)
+        t.start()
+        return t
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Clients and pooled connections (total/idle) across all keys."""
+        with self._lock:
+            entries = list(self._entries.values())
+        stats = {"keys": len(entries), "clients": 0, "connections": 0, "idle_connections": 0, "http2": self.http2}
+        for entry in entries:
+            for client in (entry.sync, entry.async_):
+                if client is None:
+                    continue
+                stats["clients"] += 1
+                for conn in _pool_connections(client):
+                    stats["connections"] += 1
+                    try:
+                        if conn.is_idle():
+                            stats["idle_connections"] += 1
+                    except Exception:
+                        pass
+        return stats
+
+    def report_stats(self) -> Dict[str, Any]:
+        stats = self.pool_stats()
+        if self.telemetry:
+            try:
+                self.telemetry.log_event("openai_http_pool", stats)
+            except Exception:
+                pass
+        return stats
+
+
+_registry: Optional[OpenAIClientRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_client_registry(telemetry: Optional[TelemetryService] = None) -> OpenAIClientRegistry:
+    """Process-wide registry; ``telemetry`` is attached the first time one is provided."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = OpenAIClientRegistry(telemetry=telemetry)
+        elif telemetry is not None and _registry.telemetry is None:
+            _registry.telemetry = telemetry
+        return _registry
+
+
+def reset_client_registry() -> None:
+    """Close every pooled client and start over (tests, or after changing OPENAI_HTTP_* settings)."""
+    global _registry
+    with _registry_lock:
+        registry, _registry = _registry, None
+    if registry is not None:
+        for key in list(registry._entries):
+            entry = registry._entries.pop(key, None)
+            if entry is not None:
+                registry._close(entry)
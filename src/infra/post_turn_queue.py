@@ -0,0 +1,131 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Deque, Dict, Optional, Set, Tuple
+
+from src.infra.telemetry import TelemetryService
+
+_logger = logging.getLogger(__name__)
+if not _logger.handlers:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+
+class PostTurnQueue:
+    """Bounded background queue for work that follows a tutor reply (summary refresh, progress, telemetry).
+
+    - Tasks of one key (session) run one at a time, in submission order; different keys run in parallel
+      on POST_TURN_WORKERS threads.
+    - A task submitted with ``coalesce`` replaces a not-yet-started task of the same key and coalesce key,
+      so bursts collapse into one run (only for idempotent work such as a summary refresh; ``task`` is
+      just the telemetry label and never merges tasks).
+    - At most POST_TURN_MAX_PENDING tasks wait; beyond that new tasks are dropped (and counted) rather
+      than letting the backlog grow.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        telemetry: Optional[TelemetryService] = None,
+    ) -> None:
+        self.workers = max(1, int(os.getenv("POST_TURN_WORKERS", str(workers or 2))))
+        self.max_pending = max(1, int(os.getenv("POST_TURN_MAX_PENDING", str(max_pending or 1000))))
+        self.telemetry = telemetry
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="post-turn")
+        # key -> [(task label, coalesce key, fn)]
+        self._queues: Dict[str, Deque[Tuple[str, Optional[str], Callable[[], None]]]] = {}
+        self._running: Set[str] = set()
+        self._pending = 0
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def _inc(self, name: str, labels: Optional[Dict[str, str]] = None) -> None:
+        if self.telemetry:
+            try:
+                self.telemetry.inc_counter(name, labels or {})
+            except Exception:
+                pass
+
+    @property
+    def pending(self) -> int:
+        with self._cond:
+            return self._pending
+
+    def submit(
+        self, key: str, fn: Callable[[], None], coalesce: Optional[str] = None, task: Optional[str] = None
+    ) -> bool:
+        """Queue ``fn`` behind earlier tasks of ``key``. Returns False when the task was dropped."""
+        name = task or coalesce or "task"
+        with self._cond:
+            if self._closed:
+                return False
+            queue = self._queues.setdefault(key, deque())
+            if coalesce is not None:
+                for i, (_, queued_coalesce, _) in enumerate(queue):
+                    if queued_coalesce == coalesce:
+                        queue[i] = (name, coalesce, fn)
+                        self._inc("post_turn_coalesced_total", {"task": name})
+                        return True
+            if self._pending >= self.max_pending:
+                if not queue:
+                    del self._queues[key]
+                self._inc("post_turn_dropped_total", {"task": name})
+                _logger.warning("Post-turn queue full (%d pending); dropping a task for %s", self._pending, key)
+                return False
+            queue.append((name, coalesce, fn))
+            self._pending += 1
+            start_worker = key not in self._running
+            if start_worker:
+                self._running.add(key)
+        if start_worker:
+            self._executor.submit(self._drain, key)
+        return True
+
+    def _drain(self, key: str) -> None:
+        while True:
+            with self._cond:
+                queue = self._queues.get(key)
+                if not queue:
+                    self._queues.pop(key, None)
+                    self._running.discard(key)
+                    self._cond.notify_all()
+                    return
+                name, _, fn = queue.popleft()
+            start = time.perf_counter()
+            try:
+                fn()
+            except Exception as e:
+                self._inc("post_turn_error_total", {"task": name, "error": type(e).__name__})
+                _logger.warning("Post-turn task %s for %s failed: %s", name, key, e)
+            finally:
+                with self._cond:
+                    self._pending -= 1
+            if self.telemetry:
+                try:
+                    self.telemetry.observe_hist(
+                        "post_turn_task_ms", (time.perf_counter() - start) * 1000.0, {"task": name}
+                    )
+                except Exception:
+                    pass
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Block until every queued task has run (shutdown drain, tests). False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._pending or self._running:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def shutdown(self, timeout: Optional[float] = None) -> bool:
+        """Stop accepting tasks and wait (up to ``timeout``) for the backlog to finish."""
+        with self._cond:
+            self._closed = True
+        idle = self.wait_idle(timeout)
+        self._executor.shutdown(wait=idle)
+        return idle
@@ -0,0 +1,388 @@
+import atexit
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.infra.telemetry import TelemetryService
+
+_logger = logging.getLogger(__name__)
+if not _logger.handlers:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+
+class StateBackend(ABC):
+    """Shared storage for learner sessions and escalations, so several workers can serve the same users.
+
+    Sessions carry a revision number and readers reload when the stored revision is newer than their
+    cached copy. A save names the revision it was based on (compare-and-set): when the stored session
+    moved on in between, the save's counter increments are re-applied onto the stored copy instead of
+    overwriting it, so two workers awarding XP to the same session concurrently both count.
+    """
+
+    @abstractmethod
+    def load_session(self, session_id: str) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """(revision, data) of a stored session, or None."""
+
+    @abstractmethod
+    def session_rev(self, session_id: str) -> Optional[int]:
+        """Stored revision of a session (cheap freshness check), or None."""
+
+    @abstractmethod
+    def save_session(
+        self,
+        session_id: str,
+        rev: int,
+        data: Dict[str, Any],
+        base_rev: Optional[int] = None,
+        delta: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Persist a session snapshot; implementations may buffer the write.
+
+        ``base_rev`` is the revision ``data`` was derived from and ``delta`` the numeric increments made
+        since (same nesting as ``data``). Without ``base_rev`` the snapshot replaces any older revision.
+        """
+
+    @abstractmethod
+    def put_escalation(self, record: Dict[str, Any]) -> None:
+        """Insert or replace an escalation record (durable when this returns)."""
+
+    @abstractmethod
+    def update_escalation(
+        self, escalation_id: str, update: Callable[[Dict[str, Any]], Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """Atomically read-modify-write an escalation; None when it does not exist."""
+
+    @abstractmethod
+    def list_escalations(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Escalation records in creation order, optionally filtered by status."""
+
+    def get_escalation(self, escalation_id: str) -> Optional[Dict[str, Any]]:
+        for rec in self.list_escalations():
+            if rec.get("id") == escalation_id:
+                return rec
+        return None
+
+    def flush(self) -> None:
+        """Write out buffered session snapshots."""
+
+    def close(self) -> None:
+        self.flush()
+
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS sessions ("
+    " session_id TEXT PRIMARY KEY, rev INTEGER NOT NULL, data TEXT NOT NULL, updated_at REAL NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS escalations ("
+    " id TEXT PRIMARY KEY, status TEXT NOT NULL, created_at TEXT NOT NULL, data TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS escalations_status ON escalations (status, created_at)",
+)
+
+_UPSERT_SESSION = (
+    "INSERT INTO sessions (session_id, rev, data, updated_at) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT(session_id) DO UPDATE SET rev = excluded.rev, data = excluded.data, updated_at = excluded.updated_at"
+)
+
+# A pending save: (rev, data, base_rev, delta)
+_PendingSave = Tuple[int, Dict[str, Any], Optional[int], Dict[str, Any]]
+
+
+def _add_delta(stored: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    """Sum two nested dicts of numeric increments."""
+    merged = dict(stored)
+    for key, value in delta.items():
+        if isinstance(value, dict):
+            merged[key] = _add_delta(merged.get(key) or {}, value)
+        else:
+            merged[key] = merged.get(key, 0) + value
+    return merged
+
+
+def _merge_session(stored: Dict[str, Any], data: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    """Re-apply a save made from an outdated revision onto the stored session.
+
+    Inside the sections ``delta`` covers (progress), numbers are the stored value plus this save's
+    increment and lists (badges) keep the stored items plus the new ones; every other field takes the
+    saved value.
+    """
+    merged = dict(data)
+    for key, value in data.items():
+        base = stored.get(key)
+        if key in delta and isinstance(value, dict) and isinstance(base, dict):
+            merged[key] = _merge_counters(base, value, delta[key])
+    return merged
+
+
+def _merge_counters(stored: Dict[str, Any], data: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    merged = dict(data)
+    for key, value in data.items():
+        base = stored.get(key)
+        if isinstance(value, dict) and isinstance(base, dict):
+            merged[key] = _merge_counters(base, value, delta.get(key) or {})
+        elif isinstance(value, (int, float)) and isinstance(base, (int, float)):
+            merged[key] = base + delta.get(key, 0)
+        elif isinstance(value, list) and isinstance(base, list):
+            merged[key] = base + [item for item in value if item not in base]
+    return merged
+
+
+class SQLiteStateBackend(StateBackend):
+    """SQLite (WAL) state backend shared by the worker processes of a single host.
+
+    WAL coordinates readers and writers through a shared-memory index, which only works between
+    processes on one machine: do not put the database on a network/shared volume. Serving from
+    several hosts needs a StateBackend on a networked store instead.
+
+    - WAL lets readers in other workers proceed while one writer commits.
+    - Session saves are buffered and coalesced per session; a writer thread commits them in one
+      transaction every STATE_FLUSH_MS (or once STATE_BATCH_MAX sessions are pending), so a turn only
+      pays for a dict insert. STATE_FLUSH_MS=0 writes synchronously.
+    - Each session write is a compare-and-set on its base revision; on conflict the progress
+      increments are merged onto the stored row (counted in ``state_save_merged_total``).
+    - Escalation writes are committed immediately in their own transaction.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        flush_ms: Optional[float] = None,
+        batch_max: Optional[int] = None,
+        telemetry: Optional[TelemetryService] = None,
+    ) -> None:
+        self.path = Path(path or os.getenv("STATE_DB_PATH", os.path.join("user_data", "state.db")))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.flush_ms = float(os.getenv("STATE_FLUSH_MS", str(flush_ms if flush_ms is not None else 50)))
+        self.batch_max = max(1, int(os.getenv("STATE_BATCH_MAX", str(batch_max or 256))))
+        self.telemetry = telemetry
+        self._local = threading.local()
+        self._pending: Dict[str, _PendingSave] = {}
+        self._cond = threading.Condition()
+        self._closed = False
+        self._write_lock = threading.Lock()
+
+        with self._conn() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            for stmt in _SCHEMA:
+                conn.execute(stmt)
+
+        self._writer: Optional[threading.Thread] = None
+        if self.flush_ms > 0:
+            self._writer = threading.Thread(target=self._run_writer, name="state-writer", daemon=True)
+            self._writer.start()
+        atexit.register(self.close)
+
+    # ------------------------------------------------------------------
+    # Connections
+    # ------------------------------------------------------------------
+    def _conn(self) -> sqlite3.Connection:
+        """One connection per thread (sqlite3 connections are not shared across threads)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=float(os.getenv("STATE_BUSY_TIMEOUT_S", "5")))
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _inc(self, name: str, labels: Optional[Dict[str, Any]] = None) -> None:
+        if self.telemetry:
+            try:
+                self.telemetry.inc_counter(name, labels or {})
+            except Exception:
+                pass
+
+    # ------------------------------------------------------------------
+    # Sessions
+    # ------------------------------------------------------------------
+    def load_session(self, session_id: str) -> Optional[Tuple[int, Dict[str, Any]]]:
+        with self._cond:
+            pending = self._pending.get(session_id)
+        if pending is not None:
+            return pending[0], pending[1]  # read-your-writes before the batch is committed
+        row = self._conn().execute("SELECT rev, data FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        if row is None:
+            return None
+        return int(row[0]), json.loads(row[1])
+
+    def session_rev(self, session_id: str) -> Optional[int]:
+        with self._cond:
+            pending = self._pending.get(session_id)
+        if pending is not None:
+            return pending[0]
+        row = self._conn().execute("SELECT rev FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        return int(row[0]) if row else None
+
+    def save_session(
+        self,
+        session_id: str,
+        rev: int,
+        data: Dict[str, Any],
+        base_rev: Optional[int] = None,
+        delta: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        item: _PendingSave = (rev, data, base_rev, delta or {})
+        if self._writer is None:
+            self._write_sessions({session_id: item})
+            return
+        with self._cond:
+            self._pending[session_id] = self._coalesce(self._pending.get(session_id), item)
+            if len(self._pending) >= self.batch_max:
+                self._cond.notify()
+
+    @staticmethod
+    def _coalesce(current: Optional[_PendingSave], item: _PendingSave) -> _PendingSave:
+        """Fold two saves of one session: newest snapshot, oldest base revision, summed increments."""
+        if current is None:
+            return item
+        newer, older = (item, current) if item[0] >= current[0] else (current, item)
+        if current[2] is None or item[2] is None:
+            base_rev = None if newer[2] is None else older[2]
+        else:
+            base_rev = min(current[2], item[2])
+        return newer[0], newer[1], base_rev, _add_delta(current[3], item[3])
+
+    def _write_sessions(self, batch: Dict[str, _PendingSave]) -> None:
+        """Commit a batch in one transaction, compare-and-set per session.
+
+        A save whose base revision is older than the stored one lost a race with another worker: its
+        increments are re-applied onto the stored session and it gets a revision above both, so every
+        worker (including this one) reloads the merged copy.
+        """
+        start = time.perf_counter()
+        now = time.time()
+        merged = 0
+        with self._write_lock:
+            conn = self._conn()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for sid, (rev, data, base_rev, delta) in batch.items():
+                    row = conn.execute("SELECT rev, data FROM sessions WHERE session_id = ?", (sid,)).fetchone()
+                    if row is not None and base_rev is None and rev < row[0]:
+                        continue  # unversioned snapshot older than the stored one
+                    if row is not None and base_rev is not None and row[0] > base_rev:
+                        data = _merge_session(json.loads(row[1]), data, delta)
+                        rev = max(rev, row[0]) + 1
+                        merged += 1
+                    conn.execute(_UPSERT_SESSION, (sid, rev, json.dumps(data, ensure_ascii=False), now))
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        if merged:
+            self._inc("state_save_merged_total")
+        if self.telemetry:
+            try:
+                self.telemetry.observe_hist("state_flush_ms", (time.perf_counter() - start) * 1000.0)
+                self.telemetry.observe_hist("state_flush_batch_size", float(len(batch)))
+            except Exception:
+                pass
+
+    def _take_pending(self) -> Dict[str, _PendingSave]:
+        with self._cond:
+            batch, self._pending = self._pending, {}
+        return batch
+
+    def _run_writer(self) -> None:
+        while True:
+            with self._cond:
+                if not self._closed and len(self._pending) < self.batch_max:
+                    self._cond.wait(self.flush_ms / 1000.0)
+                closed = self._closed
+            self._flush_pending()
+            if closed:
+                return
+
+    def _flush_pending(self) -> None:
+        batch = self._take_pending()
+        if not batch:
+            return
+        try:
+            self._write_sessions(batch)
+        except Exception as e:
+            self._inc("state_flush_error_total", {"error": type(e).__name__})
+            _logger.warning("State flush failed (%d sessions kept for retry): %s", len(batch), e)
+            with self._cond:
+                for sid, item in batch.items():
+                    self._pending[sid] = self._coalesce(self._pending.get(sid), item)
+
+    def flush(self) -> None:
+        self._flush_pending()
+
+    def close(self) -> None:
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        if self._writer is not None:
+            self._writer.join(5)
+        self._flush_pending()
+
+    # ------------------------------------------------------------------
+    # Escalations
+    # ------------------------------------------------------------------
+    def put_escalation(self, record: Dict[str, Any]) -> None:
+        with self._write_lock:
+            conn = self._conn()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO escalations (id, status, created_at, data) VALUES (?, ?, ?, ?)",
+                    (
+                        record["id"],
+                        record.get("status") or "queued",
+                        record.get("created_at") or "",
+                        json.dumps(record),
+                    ),
+                )
+
+    def update_escalation(
+        self, escalation_id: str, update: Callable[[Dict[str, Any]], Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        with self._write_lock:
+            conn = self._conn()
+            # BEGIN IMMEDIATE takes the write lock up front so other workers cannot interleave the read-modify-write
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT data FROM escalations WHERE id = ?", (escalation_id,)).fetchone()
+                if row is None:
+                    conn.rollback()
+                    return None
+                record = update(json.loads(row[0]))
+                conn.execute(
+                    "UPDATE escalations SET status = ?, data = ? WHERE id = ?",
+                    (record.get("status") or "queued", json.dumps(record), escalation_id),
+                )
+                conn.commit()
+                return record
+            except Exception:
+                conn.rollback()
+                raise
+
+    def list_escalations(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        conn = self._conn()
+        if status is None:
+            rows = conn.execute("SELECT data FROM escalations ORDER BY created_at, rowid").fetchall()
+        else:
+            rows = conn.execute(
+                "SELECT data FROM escalations WHERE status = ? ORDER BY created_at, rowid", (status,)
+            ).fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def get_escalation(self, escalation_id: str) -> Optional[Dict[str, Any]]:
+        row = self._conn().execute("SELECT data FROM escalations WHERE id = ?", (escalation_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+
+def create_state_backend(telemetry: Optional[TelemetryService] = None) -> Optional[StateBackend]:
+    """Backend selected by STATE_BACKEND: ``sqlite`` for shared state, unset/``memory`` for process-local state."""
+    kind = os.getenv("STATE_BACKEND", "memory").strip().lower()
+    if kind in ("", "memory", "none"):
+        return None
+    if kind == "sqlite":
+        return SQLiteStateBackend(telemetry=telemetry)
+    _logger.warning("Unknown STATE_BACKEND=%r; keeping state in process memory.", kind)
+    return None
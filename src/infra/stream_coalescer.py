@@ -0,0 +1,92 @@
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from src.infra.telemetry import TelemetryService
+
+_logger = logging.getLogger(__name__)
+if not _logger.handlers:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+
+def history_bytes(history: List[Dict[str, Any]]) -> int:
+    """Approximate size of a chat history update as shipped to the browser (text content plus framing)."""
+    size = 2
+    for message in history:
+        content = message.get("content")
+        size += 32 + len(content.encode("utf-8") if isinstance(content, str) else str(content).encode("utf-8"))
+    return size
+
+
+class YieldCoalescer:
+    """Decides when a streaming handler pushes an update to Gradio.
+
+    Every yield re-sends the conversation, so per-token yields cost O(turns x tokens) bytes. Chunks are
+    accumulated and flushed at most every STREAM_FLUSH_MS, or sooner once STREAM_FLUSH_CHARS characters
+    are waiting (STREAM_FLUSH_MS=0 flushes every chunk). Updates and bytes sent per stream are recorded
+    in telemetry when the stream finishes.
+    """
+
+    def __init__(
+        self,
+        stream: str,
+        interval_ms: Optional[float] = None,
+        max_chars: Optional[int] = None,
+        telemetry: Optional[TelemetryService] = None,
+        clock: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        self.stream = stream
+        self.interval_s = (
+            float(os.getenv("STREAM_FLUSH_MS", str(interval_ms if interval_ms is not None else 50))) / 1000
+        )
+        self.max_chars = max(1, int(os.getenv("STREAM_FLUSH_CHARS", str(max_chars or 256))))
+        self.telemetry = telemetry
+        self._clock = clock
+        self._last_flush = clock()
+        self.pending_chars = 0
+        self.chunks = 0
+        self.events = 0
+        self.bytes = 0
+
+    @property
+    def pending(self) -> bool:
+        """True when content arrived since the last flush."""
+        return self.pending_chars > 0
+
+    def add(self, text: str) -> bool:
+        """Record a streamed chunk; True when the caller should yield now."""
+        self.chunks += 1
+        self.pending_chars += len(text)
+        return self.due()
+
+    def due(self) -> bool:
+        if not self.pending:
+            return False
+        return self.pending_chars >= self.max_chars or self._clock() - self._last_flush >= self.interval_s
+
+    def flushed(self, history: List[Dict[str, Any]]) -> None:
+        """Account for an update the caller is about to yield."""
+        self.pending_chars = 0
+        self._last_flush = self._clock()
+        self.events += 1
+        self.bytes += history_bytes(history)
+
+    def finish(self, status: str = "ok") -> None:
+        """Record updates/bytes for this stream (call once, when it ends)."""
+        _logger.debug(
+            "Stream %s (%s): %d chunks -> %d UI updates, ~%d bytes",
+            self.stream,
+            status,
+            self.chunks,
+            self.events,
+            self.bytes,
+        )
+        if self.telemetry:
+            try:
+                labels = {"stream": self.stream, "status": status}
+                self.telemetry.observe_hist("stream_ui_events", float(self.events), labels)
+                self.telemetry.observe_hist("stream_ui_bytes", float(self.bytes), labels)
+                self.telemetry.observe_hist("stream_ui_chunks", float(self.chunks), labels)
+            except Exception:
+                pass
@@ -1,11 +1,14 @@
+import asyncio
 import os
 import time
 import logging
 import threading
 import queue
-from typing import Any, Dict, List, Optional, Callable
+from typing import Any, AsyncGenerator, Dict, List, Optional, Callable
 
 from src.infra.telemetry import TelemetryService
+from src.infra.upstream_streams import get_stream_tracker
+from src.utils.context_budget import estimate_tokens
 from src.services.openai_service import OpenAIService
 
 _logger = logging.getLogger(__name__)
@@ -13,12 +16,142 @@ if not _logger.handlers:
     logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
 
 
+# Returned by StreamingManager._next_chunk when stop_event fired before the next chunk arrived
+_STOPPED = object()
+
+RESUME_INSTRUCTION = (
+    "Your previous reply was cut off. Continue it exactly where it stopped, without repeating any of it "
+    "and without any preamble."
+)
+
+
+def resume_messages(messages: List[Dict[str, Any]], prefix: str) -> List[Dict[str, Any]]:
+    """Request that continues a reply from the text already streamed (prefix continuation)."""
+    return [*messages, {"role": "assistant", "content": prefix}, {"role": "user", "content": RESUME_INSTRUCTION}]
+
+
+class OverlapTrimmer:
+    """Drops the start of a continuation that repeats the end of ``prefix``.
+
+    The first chunks are held back only while they could still be the repeated tail (at most ``window``
+    characters); overlaps shorter than ``min_overlap`` are kept, since short repeats are usually genuine.
+    """
+
+    def __init__(self, prefix: str, window: int = 200, min_overlap: int = 8) -> None:
+        self._tail = prefix[-window:]
+        self._min_overlap = min_overlap
+        self._buf = ""
+        self._decided = not self._tail
+        self.trimmed = 0
+
+    def feed(self, chunk: str) -> str:
+        """Text of ``chunk`` that is safe to emit now."""
+        if self._decided:
+            return chunk
+        self._buf += chunk
+        # Still ambiguous while the buffer matches somewhere inside the tail (the repeat may go on)
+        if len(self._buf) < len(self._tail) and self._buf in self._tail[:-1]:
+            return ""
+        return self.flush()
+
+    def flush(self) -> str:
+        """Decide on whatever is held back (end of stream) and return the text to emit."""
+        if self._decided:
+            return ""
+        self._decided = True
+        buf, self._buf = self._buf, ""
+        for k in range(min(len(buf), len(self._tail)), self._min_overlap - 1, -1):
+            if self._tail.endswith(buf[:k]):
+                self.trimmed = k
+                return buf[k:]
+        return buf
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))]
+
+
+class StreamStats:
+    """Latency profile of one streamed attempt: time to first chunk, gaps between chunks, throughput.
+
+    ``finish`` records histograms tagged by model, mode and attempt, plus one ``stream_summary`` event.
+    """
+
+    def __init__(self, model: str, mode: str, attempt: int, clock: Callable[[], float] = time.perf_counter) -> None:
+        self.labels = {"model": model, "mode": mode, "attempt": attempt}
+        self._clock = clock
+        self.started = clock()
+        self.first_at: Optional[float] = None
+        self.last_at: Optional[float] = None
+        self.gaps_ms: List[float] = []
+        self.chunks = 0
+        self.chars = 0
+
+    def chunk(self, text: str) -> None:
+        if not text:
+            return
+        now = self._clock()
+        if self.first_at is None:
+            self.first_at = now
+        else:
+            self.gaps_ms.append((now - self.last_at) * 1000.0)
+        self.last_at = now
+        self.chunks += 1
+        self.chars += len(text)
+
+    def summary(self, outcome: str) -> Dict[str, Any]:
+        end = self._clock()
+        gaps = sorted(self.gaps_ms)
+        generation_s = (self.last_at - self.first_at) if self.first_at is not None else 0.0
+        return {
+            **self.labels,
+            "outcome": outcome,
+            "ttft_ms": round((self.first_at - self.started) * 1000.0, 1) if self.first_at is not None else None,
+            "duration_ms": round((end - self.started) * 1000.0, 1),
+            "chunks": self.chunks,
+            "chars": self.chars,
+            "chars_per_s": round(self.chars / generation_s, 1) if generation_s > 0 else None,
+            "gap_p50_ms": round(_percentile(gaps, 0.5), 1),
+            "gap_p95_ms": round(_percentile(gaps, 0.95), 1),
+            "gap_max_ms": round(gaps[-1], 1) if gaps else 0.0,
+        }
+
+    def finish(self, telemetry: Optional[TelemetryService], outcome: str) -> Dict[str, Any]:
+        summary = self.summary(outcome)
+        if telemetry:
+            try:
+                labels = self.labels
+                if summary["ttft_ms"] is not None:
+                    telemetry.observe_hist("stream_ttft_ms", summary["ttft_ms"], labels)
+                if self.gaps_ms:
+                    # Per-stream gap distribution (median, tail, worst stall)
+                    telemetry.observe_hist("stream_chunk_gap_p50_ms", summary["gap_p50_ms"], labels)
+                    telemetry.observe_hist("stream_chunk_gap_p95_ms", summary["gap_p95_ms"], labels)
+                    telemetry.observe_hist("stream_chunk_gap_max_ms", summary["gap_max_ms"], labels)
+                if summary["chars_per_s"] is not None:
+                    telemetry.observe_hist("stream_chars_per_s", summary["chars_per_s"], labels)
+                telemetry.observe_hist("stream_chunks", float(self.chunks), labels)
+                telemetry.log_event("stream_summary", summary)
+            except Exception:
+                pass
+        return summary
+
+
 class StreamingManager:
     """Thin wrapper around OpenAIService.stream_chat_completion with retry/backoff and telemetry.
 
     Notes:
     - Heartbeats are emitted based on elapsed time while consuming chunks.
-    - Active timeout (preempting a blocked iterator) is not enforced; we bound total time implicitly by retries.
+    - STREAM_TIMEOUT_MS bounds the wait for each chunk; on timeout or stop_event the upstream response is
+      closed (interrupting a consumer thread blocked in it) and the thread joined before any retry.
+    - Every attempt is accounted in the process-wide UpstreamStreams tracker (open/leaked gauges).
+    - Each attempt records time to first token, inter-chunk gaps, chars/s and chunk count (StreamStats),
+      tagged by model, ``mode`` and attempt, and ends with a ``stream_summary`` event.
+    - STREAM_RETRY_MODE=resume (default): a retry after a mid-stream failure asks the model to continue
+      from the text already delivered, trims any repeated overlap and only emits new text.
+    - ``astream_text`` is the asyncio-native path (no consumer thread/queue per request).
     """
 
     def __init__(
@@ -29,13 +162,19 @@ class StreamingManager:
         backoff_ms: Optional[int] = None,
         heartbeat_ms: Optional[int] = None,
         timeout_ms: Optional[int] = None,
+        retry_mode: Optional[str] = None,
+        mode: str = "chat",
     ) -> None:
         self.service = service
+        # Which feature is streaming (writing, speaking_fallback, ...): a label on latency metrics
+        self.mode = mode
         self.telemetry = telemetry
         self.retry_limit = int(os.getenv("STREAM_RETRY_LIMIT", str(retry_limit or 2)))
         self.backoff_ms = int(os.getenv("STREAM_RETRY_BACKOFF_MS", str(backoff_ms or 500)))
         self.heartbeat_ms = int(os.getenv("STREAM_HEARTBEAT_MS", str(heartbeat_ms or 1000)))
         self.timeout_ms = int(os.getenv("STREAM_TIMEOUT_MS", str(timeout_ms or 0)))
+        # resume: a retry after partial output continues from it; restart: a retry regenerates everything
+        self.retry_mode = os.getenv("STREAM_RETRY_MODE", retry_mode or "resume").strip().lower()
 
     def _consume_in_thread(self, iterator, out_queue: "queue.Queue", stop_event: threading.Event) -> None:
         try:
@@ -47,6 +186,70 @@ class StreamingManager:
         except Exception as e:
             out_queue.put(("error", e))
 
+    def _open(self, messages: List[Dict[str, Any]], temperature: float, max_tokens: int):
+        """(chunks, closer) for one attempt; the closer releases the HTTP response even while a thread reads it."""
+        opener = getattr(self.service, "open_chat_stream", None)
+        if callable(opener):
+            stream = opener(messages=messages, temperature=temperature, max_tokens=max_tokens)
+            return stream, stream.close
+        chunks = self.service.stream_chat_completion(messages=messages, temperature=temperature, max_tokens=max_tokens)
+        return chunks, getattr(chunks, "close", None)
+
+    def _start_attempt(self, attempt: int, messages: List[Dict[str, Any]], prefix: str, prefix_ms: float):
+        """(messages, trimmer) for an attempt after ``prefix`` was already delivered; records what the retry saves."""
+        if not prefix:
+            return messages, None
+        if self.retry_mode != "resume":
+            if self.telemetry:
+                self.telemetry.observe_hist(
+                    "stream_retry_replayed_tokens", float(estimate_tokens(prefix)), {"attempt": attempt}
+                )
+            return messages, None
+        _logger.info("Resuming stream after %d delivered chars (attempt %d).", len(prefix), attempt)
+        if self.telemetry:
+            labels = {"attempt": attempt}
+            self.telemetry.inc_counter("stream_resume_total", labels)
+            self.telemetry.observe_hist("stream_resume_prefix_tokens", float(estimate_tokens(prefix)), labels)
+            self.telemetry.observe_hist("stream_resume_saved_ms", prefix_ms, labels)
+        return resume_messages(messages, prefix), OverlapTrimmer(prefix)
+
+    def _end_resumed(self, attempt: int, trimmer: Optional[OverlapTrimmer]) -> None:
+        if trimmer is not None and self.telemetry:
+            self.telemetry.observe_hist("stream_resume_overlap_chars", float(trimmer.trimmed), {"attempt": attempt})
+
+    def _stats(self, attempt: int) -> StreamStats:
+        return StreamStats(str(getattr(self.service, "model", "unknown")), self.mode, attempt)
+
+    @staticmethod
+    async def _next_chunk(chunks, inactivity: Optional[float], stop_event: Optional[threading.Event]) -> Any:
+        """Next chunk of an async stream, or ``_STOPPED`` once ``stop_event`` is set while waiting for it.
+
+        Raises StopAsyncIteration at the end and asyncio.TimeoutError after ``inactivity`` seconds.
+        """
+        if stop_event is None:
+            return await asyncio.wait_for(chunks.__anext__(), inactivity)
+        pending = asyncio.ensure_future(chunks.__anext__())
+        started = time.perf_counter()
+        try:
+            while True:
+                done, _ = await asyncio.wait({pending}, timeout=0.1)
+                if done:
+                    return pending.result()
+                if stop_event.is_set():
+                    return _STOPPED
+                if inactivity is not None and time.perf_counter() - started >= inactivity:
+                    raise asyncio.TimeoutError()
+        finally:
+            if not pending.done():
+                pending.cancel()
+                await asyncio.gather(pending, return_exceptions=True)
+
+    def _heartbeat(self, attempt: int, pieces: List[str]) -> None:
+        if self.telemetry:
+            self.telemetry.log_event(
+                "stream_manager_heartbeat", {"attempt": attempt, "received_chars": sum(len(p) for p in pieces)}
+            )
+
     def stream_text(
         self,
         messages: List[Dict[str, Any]],
@@ -57,6 +260,12 @@ class StreamingManager:
         on_error: Optional[Callable[[Exception], None]] = None,
         stop_event: Optional[threading.Event] = None,
     ) -> str:
+        """Stream a completion with retries. Each attempt's stream is closed (and its consumer thread
+        joined) before the next attempt starts or the call returns, whatever the outcome.
+
+        ``on_chunk`` receives each piece of text once, also across resumed attempts; the return value and
+        ``on_complete`` carry the whole reply.
+        """
         if self.telemetry:
             self.telemetry.inc_counter(
                 "stream_manager_started_total", {"model": getattr(self.service, "model", "unknown")}
@@ -65,89 +274,114 @@ class StreamingManager:
         attempts = 0
         last_err: Optional[Exception] = None
         backoff = max(0.0, self.backoff_ms / 1000.0)
+        tracker = get_stream_tracker()
+        # Text already delivered to on_chunk by failed attempts, and how long it took to generate
+        prefix = ""
+        prefix_ms = 0.0
 
         while attempts < max(1, self.retry_limit):
             attempts += 1
             if self.telemetry:
                 self.telemetry.inc_counter("stream_manager_attempt_total", {"attempt": attempts})
+            attempt_messages, trimmer = self._start_attempt(attempts, messages, prefix, prefix_ms)
+            if trimmer is None:
+                prefix, prefix_ms = "", 0.0
+            lease = tracker.open("chat", self.telemetry)
+            outcome = "error"
+            pieces: List[str] = []
+            stats = self._stats(attempts)
+            attempt_start = last_chunk_at = time.perf_counter()
+
+            def emit(text: str) -> None:
+                if not text:
+                    return
+                pieces.append(text)
+                if on_chunk:
+                    try:
+                        on_chunk(text)
+                    except Exception as cb_e:  # pragma: no cover (defensive)
+                        _logger.debug("on_chunk callback raised: %s", cb_e)
+
             try:
-                chunks = self.service.stream_chat_completion(
-                    messages=messages, temperature=temperature, max_tokens=max_tokens
-                )
-                pieces: List[str] = []
-                last_hb = time.perf_counter()
-                cancelled = False
-
-                if self.timeout_ms > 0:
-                    inactivity = max(0.001, self.timeout_ms / 1000.0)
-                    q: "queue.Queue" = queue.Queue()
-                    local_stop = stop_event or threading.Event()
-                    t = threading.Thread(target=self._consume_in_thread, args=(chunks, q, local_stop), daemon=True)
-                    t.start()
-
-                    while True:
-                        # Cooperative cancellation
-                        if stop_event is not None and stop_event.is_set():
-                            cancelled = True
-                            local_stop.set()
-                            break
-                        try:
-                            kind, payload = q.get(timeout=inactivity)
-                        except queue.Empty:
-                            # inactivity timeout
-                            if self.telemetry:
-                                self.telemetry.log_event(
-                                    "stream_manager_timeout",
-                                    {"attempt": attempts, "received_chars": sum(len(p) for p in pieces)},
-                                )
-                            local_stop.set()
-                            raise TimeoutError("Streaming inactivity timeout")
-
-                        if kind == "data":
-                            ch = payload
-                            if ch:
-                                pieces.append(ch)
-                                if on_chunk:
-                                    try:
-                                        on_chunk(ch)
-                                    except Exception as cb_e:  # pragma: no cover (defensive)
-                                        _logger.debug("on_chunk callback raised: %s", cb_e)
-                            now = time.perf_counter()
-                            if (now - last_hb) * 1000.0 >= self.heartbeat_ms:
+                try:
+                    chunks, closer = self._open(attempt_messages, temperature, max_tokens)
+                    lease.attach(closer)
+                    last_hb = time.perf_counter()
+                    cancelled = False
+
+                    # Read on a consumer thread whenever the wait must be interruptible (inactivity timeout or
+                    # stop_event): a blocked read is only released by closing the lease
+                    if self.timeout_ms > 0 or stop_event is not None:
+                        inactivity = max(0.001, self.timeout_ms / 1000.0) if self.timeout_ms > 0 else None
+                        # Wake up often enough to notice stop_event while the upstream is silent
+                        poll = min(inactivity, 0.1) if inactivity is not None else 0.1
+                        q: "queue.Queue" = queue.Queue()
+                        local_stop = threading.Event()
+                        t = threading.Thread(target=self._consume_in_thread, args=(chunks, q, local_stop), daemon=True)
+                        lease.attach(closer, t)
+                        t.start()
+                        last_data = time.perf_counter()
+
+                        while True:
+                            # Cooperative cancellation
+                            if stop_event is not None and stop_event.is_set():
+                                cancelled = True
+                                local_stop.set()
+                                break
+                            try:
+                                kind, payload = q.get(timeout=poll)
+                            except queue.Empty:
+                                if inactivity is None or time.perf_counter() - last_data < inactivity:
+                                    continue
+                                # inactivity timeout
                                 if self.telemetry:
                                     self.telemetry.log_event(
-                                        "stream_manager_heartbeat",
+                                        "stream_manager_timeout",
                                         {"attempt": attempts, "received_chars": sum(len(p) for p in pieces)},
                                     )
+                                local_stop.set()
+                                outcome = "timeout"
+                                raise TimeoutError("Streaming inactivity timeout")
+
+                            last_data = time.perf_counter()
+                            if kind == "data":
+                                ch = payload
+                                if ch:
+                                    last_chunk_at = last_data
+                                    stats.chunk(ch)
+                                    emit(trimmer.feed(ch) if trimmer else ch)
+                                if (last_data - last_hb) * 1000.0 >= self.heartbeat_ms:
+                                    self._heartbeat(attempts, pieces)
+                                    last_hb = last_data
+                            elif kind == "end":
+                                break
+                            elif kind == "error":
+                                raise payload
+                    else:
+                        for ch in chunks:
+                            # Cooperative cancellation
+                            if stop_event is not None and stop_event.is_set():
+                                cancelled = True
+                                break
+                            now = time.perf_counter()
+                            if ch:
+                                last_chunk_at = now
+                                stats.chunk(ch)
+                                emit(trimmer.feed(ch) if trimmer else ch)
+                            # heartbeat based on elapsed time
+                            if (now - last_hb) * 1000.0 >= self.heartbeat_ms:
+                                self._heartbeat(attempts, pieces)
                                 last_hb = now
-                        elif kind == "end":
-                            break
-                        elif kind == "error":
-                            raise payload
-                else:
-                    for ch in chunks:
-                        # Cooperative cancellation
-                        if stop_event is not None and stop_event.is_set():
-                            cancelled = True
-                            break
-                        if ch:
-                            pieces.append(ch)
-                            if on_chunk:
-                                try:
-                                    on_chunk(ch)
-                                except Exception as cb_e:  # pragma: no cover (defensive)
-                                    _logger.debug("on_chunk callback raised: %s", cb_e)
-                        # heartbeat based on elapsed time
-                        now = time.perf_counter()
-                        if (now - last_hb) * 1000.0 >= self.heartbeat_ms:
-                            if self.telemetry:
-                                self.telemetry.log_event(
-                                    "stream_manager_heartbeat",
-                                    {"attempt": attempts, "received_chars": sum(len(p) for p in pieces)},
-                                )
-                            last_hb = now
-
-                out = "".join(pieces).strip()
+                    if trimmer is not None and not cancelled:
+                        emit(trimmer.flush())
+                    outcome = "cancelled" if cancelled else "completed"
+                finally:
+                    # Release the HTTP response and the consumer thread before returning or retrying
+                    lease.close(outcome)
+                    stats.finish(self.telemetry, outcome)
+
+                self._end_resumed(attempts, trimmer)
+                out = (prefix + "".join(pieces)).strip()
                 if cancelled:
                     if self.telemetry:
                         self.telemetry.inc_counter("stream_manager_cancelled_total", {"attempt": attempts})
@@ -169,6 +403,10 @@ class StreamingManager:
             except Exception as e:
                 last_err = e
                 _logger.warning("Streaming attempt %d failed: %s", attempts, e)
+                if pieces:
+                    # Already shown to the user: the next attempt resumes from (or replays) it
+                    prefix += "".join(pieces)
+                    prefix_ms += (last_chunk_at - attempt_start) * 1000.0
                 if self.telemetry:
                     self.telemetry.inc_counter(
                         "stream_manager_error_total", {"attempt": attempts, "error": type(e).__name__}
@@ -187,3 +425,122 @@ class StreamingManager:
             raise last_err
         # Return empty if we never got content nor exceptions (edge case)
         return ""
+
+    async def astream_text(
+        self,
+        messages: List[Dict[str, Any]],
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        stop_event: Optional[threading.Event] = None,
+    ) -> AsyncGenerator[str, None]:
+        """Async counterpart of stream_text that yields chunks as they arrive.
+
+        - Retries with ``asyncio.sleep`` backoff. After text reached the consumer, a retry resumes from it
+          (STREAM_RETRY_MODE=resume) and yields only new text; with ``restart`` the failure is raised
+          instead, since replaying would duplicate it.
+        - STREAM_TIMEOUT_MS bounds the wait for each chunk via ``asyncio.wait_for``.
+        - Cancelling the consuming task, closing the generator or setting ``stop_event`` closes the
+          upstream stream (and its HTTP response).
+        """
+        if self.telemetry:
+            self.telemetry.inc_counter(
+                "stream_manager_started_total", {"model": getattr(self.service, "model", "unknown")}
+            )
+
+        attempts = 0
+        last_err: Optional[Exception] = None
+        backoff = max(0.0, self.backoff_ms / 1000.0)
+        inactivity = max(0.001, self.timeout_ms / 1000.0) if self.timeout_ms > 0 else None
+        prefix = ""
+        prefix_ms = 0.0
+
+        while attempts < max(1, self.retry_limit):
+            attempts += 1
+            if self.telemetry:
+                self.telemetry.inc_counter("stream_manager_attempt_total", {"attempt": attempts})
+            attempt_messages, trimmer = self._start_attempt(attempts, messages, prefix, prefix_ms)
+            chunks = self.service.astream_chat_completion(
+                messages=attempt_messages, temperature=temperature, max_tokens=max_tokens
+            )
+            lease = get_stream_tracker().open("chat_async", self.telemetry)
+            outcome = "error"
+            received = 0
+            delivered: List[str] = []
+            stats = self._stats(attempts)
+            attempt_start = last_chunk_at = last_hb = time.perf_counter()
+            try:
+                while True:
+                    # Cooperative cancellation
+                    if stop_event is not None and stop_event.is_set():
+                        outcome = "cancelled"
+                        if self.telemetry:
+                            self.telemetry.inc_counter("stream_manager_cancelled_total", {"attempt": attempts})
+                        return
+                    try:
+                        ch = await self._next_chunk(chunks, inactivity, stop_event)
+                    except StopAsyncIteration:
+                        break
+                    except asyncio.TimeoutError:
+                        outcome = "timeout"
+                        if self.telemetry:
+                            self.telemetry.log_event(
+                                "stream_manager_timeout", {"attempt": attempts, "received_chars": received}
+                            )
+                        raise TimeoutError("Streaming inactivity timeout")
+                    if ch is _STOPPED:
+                        continue  # handled by the cancellation check above
+                    if ch:
+                        received += len(ch)
+                        last_chunk_at = time.perf_counter()
+                        stats.chunk(ch)
+                        text = trimmer.feed(ch) if trimmer else ch
+                        if text:
+                            delivered.append(text)
+                            yield text
+                    now = time.perf_counter()
+                    if (now - last_hb) * 1000.0 >= self.heartbeat_ms:
+                        if self.telemetry:
+                            self.telemetry.log_event(
+                                "stream_manager_heartbeat", {"attempt": attempts, "received_chars": received}
+                            )
+                        last_hb = now
+                if trimmer is not None:
+                    text = trimmer.flush()
+                    if text:
+                        delivered.append(text)
+                        yield text
+                outcome = "completed"
+                self._end_resumed(attempts, trimmer)
+                if received or prefix:
+                    if self.telemetry:
+                        self.telemetry.inc_counter("stream_manager_completed_total", {"attempts": attempts})
+                    return
+                _logger.info("Streaming produced empty output (attempt %d). Will retry if attempts remain.", attempts)
+            except (asyncio.CancelledError, GeneratorExit):
+                outcome = "cancelled"
+                if self.telemetry:
+                    self.telemetry.inc_counter("stream_manager_cancelled_total", {"attempt": attempts})
+                raise
+            except Exception as e:
+                _logger.warning("Streaming attempt %d failed: %s", attempts, e)
+                if self.telemetry:
+                    self.telemetry.inc_counter(
+                        "stream_manager_error_total", {"attempt": attempts, "error": type(e).__name__}
+                    )
+                if delivered:
+                    if self.retry_mode != "resume":
+                        raise
+                    prefix += "".join(delivered)
+                    prefix_ms += (last_chunk_at - attempt_start) * 1000.0
+                last_err = e
+            finally:
+                closing = time.perf_counter()
+                await chunks.aclose()
+                lease.close(outcome, started=closing)
+                stats.finish(self.telemetry, outcome)
+            if attempts < self.retry_limit and backoff > 0:
+                await asyncio.sleep(backoff * (2 ** (attempts - 1)))
+
+        # All attempts exhausted
+        if last_err is not None:
+            raise last_err
@@ -1,12 +1,22 @@
+import atexit
+import bisect
 import json
+import math
 import os
+import re
+import threading
 import time
+from collections import deque
 from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime, UTC
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
 
+try:  # POSIX advisory locks keep batches from several worker processes whole
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
 
 DEFAULT_DIR = os.getenv("TELEMETRY_DIR", os.path.join("data", "metrics"))
 
@@ -14,7 +24,7 @@ DEFAULT_DIR = os.getenv("TELEMETRY_DIR", os.path.join("data", "metrics"))
 @dataclass
 class TelemetryEvent:
     ts: str
-    type: str  # counter | histogram | event
+    type: str  # counter | histogram | gauge | event
     name: str
     value: Optional[float] = None
     labels: Optional[Dict[str, Any]] = None
@@ -32,16 +42,183 @@ class TelemetryEvent:
         return d
 
 
+# Fixed histogram buckets: ``*_ms`` metrics are latencies, everything else (sizes, counts, rates) is
+# bucketed on a 1-2-5 scale
+LATENCY_BUCKETS_MS: Tuple[float, ...] = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+VALUE_BUCKETS: Tuple[float, ...] = tuple(m * 10**e for e in range(0, 7) for m in (1, 2, 5))
+
+OVERFLOW_LABEL = "__other__"
+_NAME_RE = re.compile(r"[^a-zA-Z0-9_:]")
+
+
+def _metric_name(name: str) -> str:
+    name = _NAME_RE.sub("_", name)
+    return "_" + name if name[:1].isdigit() else name
+
+
+def _label_value(value: Any) -> str:
+    return str(value)[:64].replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class _Histogram:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Sequence[float]) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """In-process aggregation of counters, gauges and fixed-bucket histograms.
+
+    Each metric keeps at most TELEMETRY_MAX_SERIES label combinations; further combinations are folded into
+    one series whose label values are all ``__other__`` (counted in ``telemetry_series_overflow_total``),
+    so an unbounded label cannot grow memory or the /metrics page. Label values are cut to 64 characters.
+    """
+
+    def __init__(self, max_series: Optional[int] = None) -> None:
+        self.max_series = max(1, int(os.getenv("TELEMETRY_MAX_SERIES", str(max_series or 100))))
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._gauges: Dict[str, Dict[LabelKey, float]] = {}
+        self._hists: Dict[str, Dict[LabelKey, _Histogram]] = {}
+        self._overflows: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def buckets_for(name: str) -> Tuple[float, ...]:
+        return LATENCY_BUCKETS_MS if name.endswith("_ms") else VALUE_BUCKETS
+
+    def _series(self, family: Dict[str, Dict[LabelKey, Any]], name: str, labels: Optional[Dict[str, Any]]):
+        series = family.setdefault(name, {})
+        key: LabelKey = tuple(sorted((_metric_name(str(k)), _label_value(v)) for k, v in (labels or {}).items()))
+        if key not in series and len(series) >= self.max_series:
+            self._overflows[name] = self._overflows.get(name, 0) + 1
+            key = tuple((k, OVERFLOW_LABEL) for k, _ in key)
+        return series, key
+
+    def inc(self, name: str, labels: Optional[Dict[str, Any]] = None, amount: float = 1.0) -> None:
+        with self._lock:
+            series, key = self._series(self._counters, name, labels)
+            series[key] = series.get(key, 0.0) + amount
+
+    def set(self, name: str, value: float, labels: Optional[Dict[str, Any]] = None) -> None:
+        with self._lock:
+            series, key = self._series(self._gauges, name, labels)
+            series[key] = float(value)
+
+    def observe(self, name: str, value: float, labels: Optional[Dict[str, Any]] = None) -> None:
+        with self._lock:
+            series, key = self._series(self._hists, name, labels)
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = _Histogram(self.buckets_for(name))
+            hist.observe(float(value))
+
+    def counter_value(self, name: str, labels: Optional[Dict[str, Any]] = None) -> float:
+        """Sum of a counter over every series matching ``labels`` (a subset of the series labels)."""
+        want = {(_metric_name(str(k)), _label_value(v)) for k, v in (labels or {}).items()}
+        with self._lock:
+            return sum(v for key, v in self._counters.get(name, {}).items() if want <= set(key))
+
+    def quantile(self, name: str, q: float, labels: Optional[Dict[str, Any]] = None) -> Optional[float]:
+        """Estimate of the q-quantile of a histogram (linear within the bucket), merged over matching series."""
+        want = {(_metric_name(str(k)), _label_value(v)) for k, v in (labels or {}).items()}
+        with self._lock:
+            matching = [h for key, h in self._hists.get(name, {}).items() if want <= set(key)]
+            if not matching:
+                return None
+            bounds = matching[0].bounds
+            counts = [sum(h.counts[i] for h in matching) for i in range(len(bounds) + 1)]
+        total = sum(counts)
+        if total == 0:
+            return None
+        rank = q * total
+        seen = 0
+        for i, c in enumerate(counts):
+            if c and seen + c >= rank:
+                if i == len(bounds):
+                    return float(bounds[-1])  # beyond the last bound: report the bound
+                lower = bounds[i - 1] if i > 0 else 0.0
+                return lower + (bounds[i] - lower) * (rank - seen) / c
+            seen += c
+        return float(bounds[-1])
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+
+        def fmt(key: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+            pairs = key + extra
+            return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}" if pairs else ""
+
+        lines: List[str] = []
+        with self._lock:
+            overflows = dict(self._overflows)
+            for kind, family in (("counter", self._counters), ("gauge", self._gauges)):
+                for name in sorted(family):
+                    metric = _metric_name(name)
+                    lines.append(f"# TYPE {metric} {kind}")
+                    for key, value in family[name].items():
+                        lines.append(f"{metric}{fmt(key)} {_format_value(value)}")
+            for name in sorted(self._hists):
+                metric = _metric_name(name)
+                lines.append(f"# TYPE {metric} histogram")
+                for key, hist in self._hists[name].items():
+                    cumulative = 0
+                    for bound, count in zip(list(hist.bounds) + [math.inf], hist.counts):
+                        cumulative += count
+                        lines.append(f"{metric}_bucket{fmt(key, (('le', _format_value(bound)),))} {cumulative}")
+                    lines.append(f"{metric}_sum{fmt(key)} {_format_value(hist.sum)}")
+                    lines.append(f"{metric}_count{fmt(key)} {hist.count}")
+        if overflows:
+            lines.append("# TYPE telemetry_series_overflow_total counter")
+            for name, value in sorted(overflows.items()):
+                lines.append(f'telemetry_series_overflow_total{{metric="{_label_value(name)}"}} {_format_value(value)}')
+        return "\n".join(lines) + "\n"
+
+
 class TelemetryService:
-    """Lightweight JSONL telemetry sink for counters and histograms.
+    """Lightweight telemetry for counters, histograms and gauges.
 
     Design goals:
     - Zero external deps
-    - Append-only JSONL for easy ingestion
+    - Aggregated in process (``metrics``, served as Prometheus text on /metrics)
+    - Append-only JSONL of the raw events for ad-hoc analysis (TELEMETRY_JSONL=0 turns it off)
     - Safe to call from hot paths (best-effort, failures are non-fatal)
+
+    Raw events are appended to an in-memory buffer and a writer thread drains it every
+    TELEMETRY_FLUSH_INTERVAL_MS (or once half of TELEMETRY_MAX_PENDING is waiting), writing each batch with
+    a single locked append so lines from several worker processes never interleave. When the buffer is
+    full new events are dropped and counted (``telemetry_dropped_total`` is written with the next batch).
+    ``flush()`` drains synchronously; buffered events are also flushed at exit.
+    TELEMETRY_FLUSH_INTERVAL_MS=0 writes every event synchronously.
     """
 
-    def __init__(self, base_dir: Optional[str] = None) -> None:
+    def __init__(
+        self,
+        base_dir: Optional[str] = None,
+        flush_ms: Optional[float] = None,
+        max_pending: Optional[int] = None,
+        jsonl: Optional[bool] = None,
+    ) -> None:
+        self.metrics = MetricsRegistry()
+        default_jsonl = "1" if jsonl is None or jsonl else "0"
+        self.jsonl = os.getenv("TELEMETRY_JSONL", default_jsonl).strip().lower() not in ("0", "false", "no", "off")
         self.base_dir = Path(base_dir or DEFAULT_DIR)
         try:
             self.base_dir.mkdir(parents=True, exist_ok=True)
@@ -49,33 +226,133 @@ class TelemetryService:
             # As fallback, use system temp-like dir under project
             self.base_dir = Path("data") / "metrics"
             self.base_dir.mkdir(parents=True, exist_ok=True)
+        self.flush_ms = float(os.getenv("TELEMETRY_FLUSH_INTERVAL_MS", str(flush_ms if flush_ms is not None else 5000)))
+        self.max_pending = max(1, int(os.getenv("TELEMETRY_MAX_PENDING", str(max_pending or 10000))))
+        self._pending: Deque[TelemetryEvent] = deque()
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._closed = False
+        self.dropped = 0
+        self._dropped_unreported = 0
+        self.written = 0
+
+        self._writer: Optional[threading.Thread] = None
+        if self.jsonl and self.flush_ms > 0:
+            self._writer = threading.Thread(target=self._run_writer, name="telemetry-writer", daemon=True)
+            self._writer.start()
+            atexit.register(self.close)
+
+    def _file_for(self, ts: str) -> Path:
+        # ts is ISO-8601 UTC; events buffered across midnight still land in their own day's file
+        return self.base_dir / f"metrics-{ts[:10].replace('-', '')}.jsonl"
+
+    def _emit(self, evt: TelemetryEvent) -> None:
+        if not self.jsonl:
+            return
+        if self._writer is None:
+            self._write_batch([evt])
+            return
+        with self._cond:
+            if len(self._pending) >= self.max_pending:
+                self.dropped += 1
+                self._dropped_unreported += 1
+                return
+            self._pending.append(evt)
+            if len(self._pending) >= self.max_pending // 2:
+                self._cond.notify()
 
-    def _file_for_today(self) -> Path:
-        today = datetime.now(UTC).strftime("%Y%m%d")
-        return self.base_dir / f"metrics-{today}.jsonl"
+    def _write_batch(self, events: List[TelemetryEvent]) -> None:
+        by_file: Dict[Path, List[str]] = {}
+        for evt in events:
+            try:
+                line = json.dumps(evt.to_dict(), ensure_ascii=False)
+            except Exception:
+                continue
+            by_file.setdefault(self._file_for(evt.ts), []).append(line)
+        for fpath, lines in by_file.items():
+            data = ("\n".join(lines) + "\n").encode("utf-8")
+            try:
+                fd = os.open(fpath, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                try:
+                    if fcntl is not None:
+                        fcntl.flock(fd, fcntl.LOCK_EX)
+                    view = memoryview(data)
+                    while view:
+                        view = view[os.write(fd, view) :]
+                finally:
+                    os.close(fd)  # also releases the lock
+                self.written += len(lines)
+            except Exception:
+                # Non-fatal: swallow telemetry write errors
+                pass
 
-    def _write_jsonl(self, payload: Dict[str, Any]) -> None:
+    def _drain(self) -> None:
+        # One drain at a time so batches reach the file in the order they were buffered
+        with self._write_lock:
+            with self._cond:
+                batch = list(self._pending)
+                self._pending.clear()
+                dropped, self._dropped_unreported = self._dropped_unreported, 0
+            if dropped:
+                self.metrics.inc("telemetry_dropped_total", amount=dropped)
+                batch.append(
+                    TelemetryEvent(
+                        ts=datetime.now(UTC).isoformat(), type="counter", name="telemetry_dropped_total", value=dropped
+                    )
+                )
+            if batch:
+                self._write_batch(batch)
+
+    def _run_writer(self) -> None:
+        while True:
+            with self._cond:
+                if not self._closed and len(self._pending) < self.max_pending // 2:
+                    self._cond.wait(self.flush_ms / 1000.0)
+                closed = self._closed
+            self._drain()
+            if closed:
+                return
+
+    @property
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    def inc_counter(self, name: str, labels: Optional[Dict[str, Any]] = None) -> None:
         try:
-            fpath = self._file_for_today()
-            with fpath.open("a", encoding="utf-8") as f:
-                f.write(json.dumps(payload, ensure_ascii=False) + "\n")
+            self.metrics.inc(name, labels)
         except Exception:
-            # Non-fatal: swallow telemetry write errors
             pass
-
-    def inc_counter(self, name: str, labels: Optional[Dict[str, Any]] = None) -> None:
-        evt = TelemetryEvent(ts=datetime.now(UTC).isoformat(), type="counter", name=name, labels=labels or {})
-        self._write_jsonl(evt.to_dict())
+        self._emit(TelemetryEvent(ts=datetime.now(UTC).isoformat(), type="counter", name=name, labels=labels or {}))
 
     def observe_hist(self, name: str, value: float, labels: Optional[Dict[str, Any]] = None) -> None:
+        try:
+            self.metrics.observe(name, value, labels)
+        except Exception:
+            pass
         evt = TelemetryEvent(
             ts=datetime.now(UTC).isoformat(), type="histogram", name=name, value=float(value), labels=labels or {}
         )
-        self._write_jsonl(evt.to_dict())
+        self._emit(evt)
+
+    def set_gauge(self, name: str, value: float, labels: Optional[Dict[str, Any]] = None) -> None:
+        """Current level of something (open streams, live threads); the latest sample wins."""
+        try:
+            self.metrics.set(name, value, labels)
+        except Exception:
+            pass
+        evt = TelemetryEvent(
+            ts=datetime.now(UTC).isoformat(), type="gauge", name=name, value=float(value), labels=labels or {}
+        )
+        self._emit(evt)
 
     def log_event(self, name: str, labels: Optional[Dict[str, Any]] = None) -> None:
-        evt = TelemetryEvent(ts=datetime.now(UTC).isoformat(), type="event", name=name, labels=labels or {})
-        self._write_jsonl(evt.to_dict())
+        # Event payloads are free-form (ids, measurements): only their occurrence is aggregated
+        try:
+            self.metrics.inc("telemetry_events_total", {"event": name})
+        except Exception:
+            pass
+        self._emit(TelemetryEvent(ts=datetime.now(UTC).isoformat(), type="event", name=name, labels=labels or {}))
 
     @contextmanager
     def timeit(self, name: str, labels: Optional[Dict[str, Any]] = None):
@@ -87,5 +364,15 @@ class TelemetryService:
             self.observe_hist(name, dur_ms, labels)
 
     def flush(self) -> None:
-        # Append-on-call model; nothing buffered.
-        return
+        """Write out buffered events now."""
+        self._drain()
+
+    def close(self) -> None:
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        if self._writer is not None:
+            self._writer.join(5)
+        self._drain()
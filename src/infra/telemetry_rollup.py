@@ -0,0 +1,489 @@
+"""Rollups of the daily telemetry JSONL files (``data/metrics/metrics-YYYYMMDD.jsonl``).
+
+Each source file is memory-mapped and aggregated on a process pool into hourly groups keyed by
+(hour, type, name, labels): occurrence count, sum, min, max and last value, plus a mergeable log-bucket
+sketch for histogram quantiles (relative error <= 1%). The hourly rollup of every file is written to
+``<dir>/rollups/rollup-YYYYMMDD.jsonl`` and reused while the source file is unchanged, so repeated
+queries only read the compact rollups. Queries merge the hourly groups into hour/day/month/all buckets,
+optionally projected onto a subset of labels.
+
+Usage (from the project root):
+    python -m src.infra.telemetry_rollup --name transcribe_latency_ms --by model --bucket hour
+    python -m src.infra.telemetry_rollup --bucket day --ratio text_only_fallback_total/audio_attempts_total
+"""
+
+import argparse
+import json
+import logging
+import math
+import mmap
+import os
+import re
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+_logger = logging.getLogger(__name__)
+if not _logger.handlers:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+ROLLUP_VERSION = 1
+# Sketch relative accuracy: a reported quantile is within 1% of a value that was actually observed
+SKETCH_ALPHA = 0.01
+_GAMMA = (1 + SKETCH_ALPHA) / (1 - SKETCH_ALPHA)
+_LOG_GAMMA = math.log(_GAMMA)
+_INV_LOG_GAMMA = 1.0 / _LOG_GAMMA
+# Raw values buffered per group before they are folded into its aggregate (bounds memory on large files)
+_FOLD_EVERY = 65536
+
+# Lines as written by TelemetryService (json.dumps default separators, fixed key order), matched across the
+# whole mapped file in one scan; lines in between matches (other writers, truncated tails) go to json.loads
+_LINE_RE = re.compile(
+    rb'^\{"ts": "([^"\n]{13})[^"\n]*", "type": "([a-z]+)", "name": "([^"\\\n]+)"'
+    rb'(?:, "value": ([^,}\n]+))?(?:, "labels": (\{[^\n]*\}))?\}[ \t\r]*$',
+    re.MULTILINE,
+)
+
+# Numeric fields of an event payload (measurements, not grouping dimensions)
+_NUMERIC_FIELD_RE = re.compile(rb'(?:, )?"[^"\\]*": -?[0-9][0-9.eE+-]*(?=[,}])')
+
+GroupKey = Tuple[str, str, str, str]  # (hour "YYYY-MM-DDTHH", type, name, canonical labels JSON)
+
+
+class Agg:
+    """Aggregate of one group: counters sum their increments, histograms keep a quantile sketch."""
+
+    __slots__ = ("n", "total", "min", "max", "last", "sketch", "zeros")
+
+    def __init__(self) -> None:
+        self.n = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.last: Optional[float] = None
+        self.sketch: Dict[int, int] = {}
+        self.zeros = 0
+
+    def add(self, kind: str, value: Optional[float]) -> None:
+        self.n += 1
+        if kind == "counter":
+            self.total += 1.0 if value is None else value
+            return
+        if value is None:
+            return
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.last = value
+        if kind == "histogram":
+            if value > 0:
+                idx = math.ceil(math.log(value) / _LOG_GAMMA)
+                self.sketch[idx] = self.sketch.get(idx, 0) + 1
+            else:
+                self.zeros += 1
+
+    def add_many(self, kind: str, raw_values: List[Optional[bytes]]) -> None:
+        """Fold a batch of raw values of one group (same result as ``add`` per value, looped in C)."""
+        if kind == "counter":
+            self.n += len(raw_values)
+            self.total += sum(1.0 if v is None else float(v) for v in raw_values)
+            return
+        values = [float(v) for v in raw_values if v is not None]
+        self.n += len(raw_values)
+        if not values:
+            return
+        self.total += math.fsum(values)
+        self.min = min(self.min, min(values))
+        self.max = max(self.max, max(values))
+        self.last = values[-1]
+        if kind == "histogram":
+            positive = values if self.min > 0 else [v for v in values if v > 0]
+            self.zeros += len(values) - len(positive)
+            for idx, count in Counter(map(math.ceil, map(_INV_LOG_GAMMA.__mul__, map(math.log, positive)))).items():
+                self.sketch[idx] = self.sketch.get(idx, 0) + count
+
+    def merge(self, other: "Agg") -> None:
+        """Fold in a later aggregate (``last`` follows merge order)."""
+        self.n += other.n
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        if other.last is not None:
+            self.last = other.last
+        for idx, count in other.sketch.items():
+            self.sketch[idx] = self.sketch.get(idx, 0) + count
+        self.zeros += other.zeros
+
+    def quantile(self, q: float) -> Optional[float]:
+        count = self.zeros + sum(self.sketch.values())
+        if count == 0:
+            return None
+        rank = q * (count - 1)
+        if rank < self.zeros:
+            return 0.0
+        seen = self.zeros
+        for idx in sorted(self.sketch):
+            seen += self.sketch[idx]
+            if seen > rank:
+                estimate = 2 * _GAMMA**idx / (_GAMMA + 1)
+                return min(max(estimate, self.min), self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        d: Dict[str, Any] = {"n": self.n, "sum": self.total}
+        if self.n and self.min != math.inf:
+            d.update({"min": self.min, "max": self.max, "last": self.last})
+        if self.sketch:
+            d["sketch"] = {str(k): v for k, v in self.sketch.items()}
+        if self.zeros:
+            d["zeros"] = self.zeros
+        return d
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "Agg":
+        agg = cls()
+        agg.n = int(d.get("n", 0))
+        agg.total = float(d.get("sum", 0.0))
+        agg.min = float(d.get("min", math.inf))
+        agg.max = float(d.get("max", -math.inf))
+        agg.last = d.get("last")
+        agg.sketch = {int(k): int(v) for k, v in (d.get("sketch") or {}).items()}
+        agg.zeros = int(d.get("zeros", 0))
+        return agg
+
+
+def _canonical_labels(labels: Any, kind: str = "") -> str:
+    if not isinstance(labels, dict) or not labels:
+        return "{}"
+    if kind == "event":
+        # Event payloads carry measurements (ttft_ms, chars, ...): group events by their non-numeric fields
+        labels = {k: v for k, v in labels.items() if isinstance(v, (str, bool)) or v is None}
+    return json.dumps({str(k): str(v) for k, v in labels.items()}, sort_keys=True, ensure_ascii=False)
+
+
+def _add_json_line(groups: Dict[GroupKey, Agg], line: bytes) -> None:
+    try:
+        record = json.loads(line)
+        kind = str(record.get("type", "event"))
+        key = (str(record["ts"])[:13], kind, str(record["name"]), _canonical_labels(record.get("labels"), kind))
+        value = float(record["value"]) if record.get("value") is not None else None
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return  # blank, truncated or foreign line
+    agg = groups.get(key)
+    if agg is None:
+        agg = groups[key] = Agg()
+    agg.add(kind, value)
+
+
+def rollup_file(path: str) -> Dict[GroupKey, Agg]:
+    """Hourly aggregates of one metrics JSONL file (read through mmap, one pass)."""
+    # The scan only collects raw value bytes per raw key; values are folded in batches and names/labels
+    # decoded once per distinct group
+    pending: Dict[Tuple[bytes, bytes, bytes, bytes], List[Optional[bytes]]] = {}
+    raw_aggs: Dict[Tuple[bytes, bytes, bytes, bytes], Agg] = {}
+    event_labels: Dict[bytes, bytes] = {}
+    groups: Dict[GroupKey, Agg] = {}
+
+    def fold(key: Tuple[bytes, bytes, bytes, bytes], values: List[Optional[bytes]]) -> None:
+        agg = raw_aggs.get(key)
+        if agg is None:
+            agg = raw_aggs[key] = Agg()
+        try:
+            agg.add_many(key[1].decode("ascii"), values)
+        except ValueError:
+            for v in values:  # a malformed value: keep the rest of the batch
+                try:
+                    agg.add(key[1].decode("ascii"), None if v is None else float(v))
+                except ValueError:
+                    agg.n += 1
+
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return groups
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos = 0
+            for m in _LINE_RE.finditer(mm):
+                if m.start() > pos + 1:
+                    for line in mm[pos : m.start()].splitlines():
+                        _add_json_line(groups, line)
+                pos = m.end()
+                hour, kind, name, raw_value, raw_labels = m.groups()
+                if kind == b"event" and raw_labels is not None:
+                    # Event payloads are mostly unique: drop their measurements before grouping
+                    stripped = _NUMERIC_FIELD_RE.sub(b"", raw_labels).replace(b"{, ", b"{")
+                    reduced = event_labels.get(stripped)
+                    if reduced is None:
+                        try:
+                            reduced = _canonical_labels(json.loads(stripped), "event").encode("utf-8")
+                        except ValueError:
+                            try:
+                                reduced = _canonical_labels(json.loads(raw_labels), "event").encode("utf-8")
+                            except ValueError:
+                                reduced = b"{}"
+                        if len(event_labels) >= 10000:
+                            event_labels.clear()
+                        event_labels[stripped] = reduced
+                    raw_labels = reduced
+                key = (hour, kind, name, raw_labels)
+                values = pending.get(key)
+                if values is None:
+                    values = pending[key] = []
+                values.append(raw_value)
+                if len(values) >= _FOLD_EVERY:
+                    fold(key, values)
+                    pending[key] = []
+            if pos < len(mm):
+                for line in mm[pos:].splitlines():
+                    _add_json_line(groups, line)
+    for key, values in pending.items():
+        if values:
+            fold(key, values)
+
+    canonical: Dict[bytes, str] = {}
+    for (hour, kind, name, raw_labels), agg in raw_aggs.items():
+        labels = canonical.get(raw_labels or b"")
+        if labels is None:
+            try:
+                labels = _canonical_labels(json.loads(raw_labels)) if raw_labels else "{}"
+            except ValueError:
+                labels = "{}"
+            canonical[raw_labels or b""] = labels
+        key = (hour.decode("ascii"), kind.decode("ascii"), name.decode("utf-8"), labels)
+        current = groups.get(key)
+        if current is None:
+            groups[key] = agg
+        else:
+            current.merge(agg)
+    return groups
+
+
+def _cache_path(source: Path) -> Path:
+    return source.parent / "rollups" / source.name.replace("metrics-", "rollup-", 1)
+
+
+def _source_stamp(source: Path) -> Dict[str, Any]:
+    st = source.stat()
+    return {"version": ROLLUP_VERSION, "source": source.name, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def load_cached(source: Path) -> Optional[Dict[GroupKey, Agg]]:
+    """Cached hourly rollup of ``source``, or None when missing or stale."""
+    cache = _cache_path(source)
+    try:
+        with cache.open("r", encoding="utf-8") as f:
+            if json.loads(f.readline()) != _source_stamp(source):
+                return None
+            groups: Dict[GroupKey, Agg] = {}
+            for line in f:
+                rec = json.loads(line)
+                groups[(rec["hour"], rec["type"], rec["name"], rec["labels"])] = Agg.from_dict(rec)
+            return groups
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def write_cache(source: Path, groups: Dict[GroupKey, Agg], stamp: Dict[str, Any]) -> None:
+    cache = _cache_path(source)
+    try:
+        cache.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cache.with_suffix(f".tmp{os.getpid()}")
+        with tmp.open("w", encoding="utf-8") as f:
+            f.write(json.dumps(stamp) + "\n")
+            for (hour, kind, name, labels), agg in sorted(groups.items()):
+                rec = {"hour": hour, "type": kind, "name": name, "labels": labels, **agg.to_dict()}
+                f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        os.replace(tmp, cache)
+    except OSError as e:
+        _logger.warning("Could not write rollup cache %s: %s", cache, e)
+
+
+def _process(path: str) -> Tuple[str, Dict[GroupKey, Agg]]:
+    source = Path(path)
+    stamp = _source_stamp(source)  # taken before reading: a file that grows meanwhile is re-read next time
+    groups = rollup_file(path)
+    write_cache(source, groups, stamp)
+    return path, groups
+
+
+def source_files(directory: str, since: Optional[str] = None, until: Optional[str] = None) -> List[Path]:
+    """metrics-YYYYMMDD.jsonl files in ``directory`` within [since, until] (YYYYMMDD, inclusive)."""
+    files = []
+    for path in sorted(Path(directory).glob("metrics-*.jsonl")):
+        day = path.stem[len("metrics-") :]
+        if (since and day < since) or (until and day > until):
+            continue
+        files.append(path)
+    return files
+
+
+def rollup(
+    directory: str,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    workers: Optional[int] = None,
+    use_cache: bool = True,
+) -> Dict[GroupKey, Agg]:
+    """Hourly groups of every matching file; stale or missing rollups are rebuilt in parallel."""
+    files = source_files(directory, since, until)
+    per_file: Dict[str, Dict[GroupKey, Agg]] = {}
+    todo: List[str] = []
+    for path in files:
+        cached = load_cached(path) if use_cache else None
+        if cached is None:
+            todo.append(str(path))
+        else:
+            per_file[str(path)] = cached
+
+    workers = max(1, workers or os.cpu_count() or 1)
+    if len(todo) > 1 and workers > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(todo))) as pool:
+            per_file.update(pool.map(_process, todo, chunksize=max(1, len(todo) // (workers * 4))))
+    else:
+        per_file.update(_process(path) for path in todo)
+    _logger.debug("Rolled up %d files (%d rebuilt)", len(files), len(todo))
+
+    merged: Dict[GroupKey, Agg] = {}
+    for path in sorted(per_file):
+        for key, agg in per_file[path].items():
+            current = merged.get(key)
+            if current is None:
+                merged[key] = agg
+            else:
+                current.merge(agg)
+    return merged
+
+
+def _bucket_of(hour: str, bucket: str) -> str:
+    if bucket == "hour":
+        return hour
+    if bucket == "day":
+        return hour[:10]
+    if bucket == "month":
+        return hour[:7]
+    return "all"
+
+
+def query(
+    groups: Dict[GroupKey, Agg],
+    bucket: str = "hour",
+    names: Optional[Iterable[str]] = None,
+    by: Optional[Iterable[str]] = None,
+    where: Optional[Dict[str, str]] = None,
+) -> Dict[Tuple[str, str, str, str], Agg]:
+    """Merge hourly groups into (bucket, type, name, labels) rows.
+
+    ``names`` are fnmatch patterns; ``by`` keeps only those label keys (None keeps all labels, an empty
+    list merges every label set); ``where`` keeps groups whose labels have the given values.
+    """
+    patterns = list(names or [])
+    keep = None if by is None else sorted(set(by))
+    rows: Dict[Tuple[str, str, str, str], Agg] = {}
+    label_cache: Dict[str, Optional[str]] = {}
+    for hour, kind, name, labels in sorted(groups):
+        if patterns and not any(fnmatch(name, p) for p in patterns):
+            continue
+        projected = label_cache.get(labels, "")
+        if projected == "":
+            parsed = json.loads(labels)
+            if where and any(parsed.get(k) != v for k, v in where.items()):
+                projected = None
+            elif keep is None:
+                projected = labels
+            else:
+                projected = _canonical_labels({k: parsed[k] for k in keep if k in parsed})
+            label_cache[labels] = projected
+        if projected is None:
+            continue
+        row_key = (_bucket_of(hour, bucket), kind, name, projected)
+        agg = rows.get(row_key)
+        if agg is None:
+            agg = rows[row_key] = Agg()
+        agg.merge(groups[(hour, kind, name, labels)])
+    return rows
+
+
+def ratios(
+    rows: Dict[Tuple[str, str, str, str], Agg], numerator: str, denominator: str
+) -> List[Tuple[str, float, float, Optional[float]]]:
+    """Per bucket (numerator total, denominator total, ratio) of two counters, summed over labels."""
+    num: Dict[str, float] = {}
+    den: Dict[str, float] = {}
+    for (bucket, kind, name, _labels), agg in rows.items():
+        value = agg.total if kind == "counter" else float(agg.n)
+        if name == numerator:
+            num[bucket] = num.get(bucket, 0.0) + value
+        if name == denominator:
+            den[bucket] = den.get(bucket, 0.0) + value
+    out = []
+    for bucket in sorted(set(num) | set(den)):
+        n, d = num.get(bucket, 0.0), den.get(bucket, 0.0)
+        out.append((bucket, n, d, n / d if d else None))
+    return out
+
+
+def _fmt(value: Optional[float]) -> str:
+    if value is None or math.isinf(value):
+        return "-"
+    return f"{value:.1f}" if abs(value) < 1e6 else f"{value:.3g}"
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Roll up telemetry JSONL files (counters, gauges, quantiles)")
+    parser.add_argument("--dir", default=os.getenv("TELEMETRY_DIR", os.path.join("data", "metrics")))
+    parser.add_argument("--since", help="first day, YYYYMMDD")
+    parser.add_argument("--until", help="last day, YYYYMMDD")
+    parser.add_argument("--bucket", choices=("hour", "day", "month", "all"), default="day")
+    parser.add_argument("--name", action="append", help="metric name or glob (repeatable)")
+    parser.add_argument("--by", help="comma-separated label keys to group by (default: all labels, '' for none)")
+    parser.add_argument("--where", action="append", default=[], help="label=value filter (repeatable)")
+    parser.add_argument("--ratio", help="NUMERATOR/DENOMINATOR counter names, per bucket")
+    parser.add_argument("--workers", type=int, default=None, help="processes for files without a fresh rollup")
+    parser.add_argument("--no-cache", action="store_true", help="ignore and rebuild cached rollups")
+    parser.add_argument("--json", action="store_true", help="print JSON lines instead of a table")
+    args = parser.parse_args(argv)
+
+    where = dict(item.split("=", 1) for item in args.where if "=" in item)
+    by = None if args.by is None else [k.strip() for k in args.by.split(",") if k.strip()]
+    groups = rollup(args.dir, args.since, args.until, workers=args.workers, use_cache=not args.no_cache)
+
+    if args.ratio:
+        numerator, _, denominator = args.ratio.partition("/")
+        rows = query(groups, args.bucket, names=[numerator, denominator], by=[], where=where)
+        for bucket, n, d, r in ratios(rows, numerator, denominator):
+            if args.json:
+                print(json.dumps({"bucket": bucket, "numerator": n, "denominator": d, "ratio": r}))
+            else:
+                print(f"{bucket:16s} {_fmt(n):>10s} / {_fmt(d):>10s} = {'-' if r is None else f'{r:.4f}'}")
+        return
+
+    rows = query(groups, args.bucket, names=args.name, by=by, where=where)
+    if not args.json:
+        print(
+            f"{'bucket':16s} {'type':9s} {'name':40s} {'labels':40s} {'n':>8s} "
+            f"{'sum':>10s} {'p50':>9s} {'p95':>9s} {'p99':>9s} {'max':>9s}"
+        )
+    for (bucket, kind, name, labels), agg in sorted(rows.items()):
+        p50, p95, p99 = (agg.quantile(q) for q in (0.5, 0.95, 0.99))
+        if args.json:
+            rec = {"bucket": bucket, "type": kind, "name": name, "labels": json.loads(labels), "n": agg.n}
+            rec["sum"] = agg.total
+            if kind == "histogram":
+                rec.update({"p50": p50, "p95": p95, "p99": p99, "min": agg.min, "max": agg.max})
+            elif kind == "gauge":
+                rec.update({"last": agg.last, "min": agg.min, "max": agg.max})
+            print(json.dumps(rec, ensure_ascii=False))
+        else:
+            label_text = "" if labels == "{}" else labels
+            print(
+                f"{bucket:16s} {kind:9s} {name:40s} {label_text:40s} {agg.n:8d} {_fmt(agg.total):>10s} "
+                f"{_fmt(p50):>9s} {_fmt(p95):>9s} {_fmt(p99):>9s} {_fmt(agg.max if kind != 'counter' else None):>9s}"
+            )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,16 @@
+import heapq
 import os
+import threading
 import time
 import logging
 from pathlib import Path
-from typing import Iterable, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
 _logger = logging.getLogger(__name__)
 if not _logger.handlers:
     logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
 
-AUDIO_SUFFIXES = {".wav", ".mp3", ".m4a", ".ogg", ".flac", ".aac", ".webm"}
+AUDIO_SUFFIXES = {".wav", ".mp3", ".m4a", ".ogg", ".opus", ".flac", ".aac", ".webm", ".pcm"}
 
 
 def _list_audio_files(tmp_dir: Path) -> List[Path]:
@@ -115,14 +117,12 @@ def enforce_limits(
     return deleted, bytes_deleted
 
 
-def maintain_tmp_audio_dir(
-    base_dir: Optional[str] = None,
+def _limits_from_env(
     max_age_hours: Optional[float] = None,
     max_total_mb: Optional[float] = None,
     max_files: Optional[int] = None,
-) -> Tuple[int, int]:
-    """Convenience wrapper that reads env defaults when args are None and applies cleanup and limits."""
-    base_dir = base_dir or os.getenv("AUDIO_TMP_DIR", os.path.join("data", "audio", "tmp"))
+) -> Tuple[Optional[float], Optional[float], Optional[int]]:
+    """Fill unset limits from AUDIO_TMP_MAX_AGE_HOURS / AUDIO_TMP_MAX_TOTAL_MB / AUDIO_TMP_MAX_FILES."""
     max_age_env = os.getenv("AUDIO_TMP_MAX_AGE_HOURS")
     max_total_env = os.getenv("AUDIO_TMP_MAX_TOTAL_MB")
     max_files_env = os.getenv("AUDIO_TMP_MAX_FILES")
@@ -142,6 +142,18 @@ def maintain_tmp_audio_dir(
             max_files = int(max_files_env)
         except Exception:
             max_files = None
+    return max_age_hours, max_total_mb, max_files
+
+
+def maintain_tmp_audio_dir(
+    base_dir: Optional[str] = None,
+    max_age_hours: Optional[float] = None,
+    max_total_mb: Optional[float] = None,
+    max_files: Optional[int] = None,
+) -> Tuple[int, int]:
+    """Convenience wrapper that reads env defaults when args are None and applies cleanup and limits."""
+    base_dir = base_dir or os.getenv("AUDIO_TMP_DIR", os.path.join("data", "audio", "tmp"))
+    max_age_hours, max_total_mb, max_files = _limits_from_env(max_age_hours, max_total_mb, max_files)
 
     total_deleted = 0
     total_bytes = 0
@@ -157,3 +169,173 @@ def maintain_tmp_audio_dir(
         total_bytes += b
 
     return total_deleted, total_bytes
+
+
+class TempAudioIndex:
+    """In-memory index of a temp audio directory: min-heap by mtime plus a running byte total.
+
+    The directory is scanned once (on creation); afterwards saves/deletes update the index, and the
+    AUDIO_TMP_MAX_* limits are enforced by a periodic background janitor instead of on the request path.
+    Heap entries are invalidated lazily, so record_save/record_delete are O(log n) / O(1).
+
+    Under the multi-worker launcher (WORKER_ID set) every worker writes to the same directory but only
+    records its own saves, so the janitor rescans the directory before each pass and the limits hold for
+    the directory as a whole.
+    """
+
+    def __init__(self, base_dir: str) -> None:
+        self.base_dir = Path(base_dir)
+        self._entries: Dict[str, Tuple[float, int]] = {}  # path -> (mtime, size)
+        self._heap: List[Tuple[float, str]] = []
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._janitor: Optional[threading.Thread] = None
+        self.rescan()
+
+    def rescan(self) -> None:
+        entries: Dict[str, Tuple[float, int]] = {}
+        for p in _list_audio_files(self.base_dir):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            entries[str(p)] = (st.st_mtime, st.st_size)
+        with self._lock:
+            self._entries = entries
+            self._heap = [(mtime, path) for path, (mtime, _) in entries.items()]
+            heapq.heapify(self._heap)
+            self._total_bytes = sum(size for _, size in entries.values())
+
+    def record_save(self, path: str, size: int, mtime: Optional[float] = None) -> None:
+        if Path(path).suffix.lower() not in AUDIO_SUFFIXES:
+            return
+        mtime = time.time() if mtime is None else mtime
+        with self._lock:
+            prev = self._entries.get(path)
+            if prev is not None:
+                self._total_bytes -= prev[1]
+            self._entries[path] = (mtime, size)
+            self._total_bytes += size
+            heapq.heappush(self._heap, (mtime, path))
+
+    def record_delete(self, path: str) -> None:
+        with self._lock:
+            prev = self._entries.pop(path, None)
+            if prev is not None:
+                self._total_bytes -= prev[1]
+
+    def remove(self, path: str) -> None:
+        """Delete a temp file and drop it from the index."""
+        try:
+            Path(path).unlink(missing_ok=True)
+        finally:
+            self.record_delete(path)
+
+    @property
+    def file_count(self) -> int:
+        return len(self._entries)
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def _pop_oldest(self) -> Optional[Tuple[str, int]]:
+        # Caller holds the lock. Skips heap entries made stale by deletes or re-saves.
+        while self._heap:
+            mtime, path = heapq.heappop(self._heap)
+            entry = self._entries.get(path)
+            if entry is None or entry[0] != mtime:
+                continue
+            del self._entries[path]
+            self._total_bytes -= entry[1]
+            return path, entry[1]
+        return None
+
+    def enforce(
+        self,
+        max_age_hours: Optional[float] = None,
+        max_total_mb: Optional[float] = None,
+        max_files: Optional[int] = None,
+    ) -> Tuple[int, int]:
+        """Evict oldest files until age/count/size limits hold. Returns (files_deleted, bytes_deleted)."""
+        cutoff = time.time() - max_age_hours * 3600.0 if max_age_hours and max_age_hours > 0 else None
+        limit_bytes = int(max_total_mb * 1024 * 1024) if max_total_mb and max_total_mb > 0 else None
+        victims: List[Tuple[str, int]] = []
+        with self._lock:
+            while self._heap:
+                mtime, path = self._heap[0]
+                if self._entries.get(path, (None,))[0] != mtime:
+                    heapq.heappop(self._heap)
+                    continue
+                too_old = cutoff is not None and mtime < cutoff
+                too_many = bool(max_files and max_files > 0 and len(self._entries) > max_files)
+                too_big = limit_bytes is not None and self._total_bytes > limit_bytes
+                if not (too_old or too_many or too_big):
+                    break
+                victim = self._pop_oldest()
+                if victim is None:
+                    break
+                victims.append(victim)
+        deleted, bytes_deleted = 0, 0
+        for path, size in victims:
+            try:
+                Path(path).unlink(missing_ok=True)
+                deleted += 1
+                bytes_deleted += size
+            except Exception as e:
+                _logger.debug("Failed to delete %s: %s", path, e)
+        if deleted:
+            _logger.info("TempAudioManager: janitor deleted %d files (%.1f KB)", deleted, bytes_deleted / 1024.0)
+        return deleted, bytes_deleted
+
+    def _sweep(self) -> Tuple[int, int]:
+        """One janitor pass; rescans first when other worker processes share the directory."""
+        if os.getenv("WORKER_ID"):
+            self.rescan()
+        return self.enforce(*_limits_from_env())
+
+    def start_janitor(self, interval_s: Optional[float] = None) -> None:
+        """Run enforce() with the AUDIO_TMP_MAX_* limits every AUDIO_TMP_JANITOR_INTERVAL_S seconds."""
+        if self._janitor is not None and self._janitor.is_alive():
+            return
+        if interval_s is None:
+            interval_s = float(os.getenv("AUDIO_TMP_JANITOR_INTERVAL_S", "60"))
+        interval_s = max(0.01, interval_s)
+        self._stop.clear()
+
+        def _run() -> None:
+            while not self._stop.wait(interval_s):
+                try:
+                    self._sweep()
+                except Exception as e:  # pragma: no cover (defensive)
+                    _logger.debug("TempAudioManager janitor pass failed: %s", e)
+
+        self._janitor = threading.Thread(target=_run, name="tmp-audio-janitor", daemon=True)
+        self._janitor.start()
+
+    def stop_janitor(self) -> None:
+        self._stop.set()
+        if self._janitor is not None:
+            self._janitor.join(timeout=1.0)
+        self._janitor = None
+
+
+_indexes: Dict[str, TempAudioIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_tmp_audio_index(base_dir: Optional[str] = None, start_janitor: bool = True) -> TempAudioIndex:
+    """Process-wide index for ``base_dir`` (default AUDIO_TMP_DIR); the first call scans the directory."""
+    base_dir = base_dir or os.getenv("AUDIO_TMP_DIR", os.path.join("data", "audio", "tmp"))
+    key = os.path.abspath(base_dir)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = TempAudioIndex(base_dir)
+            _indexes[key] = index
+            if start_janitor:
+                # Apply limits once for whatever accumulated while the process was down
+                index.enforce(*_limits_from_env())
+                index.start_janitor()
+    return index
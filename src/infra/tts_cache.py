@@ -0,0 +1,198 @@
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from src.infra.telemetry import TelemetryService
+from src.infra.temp_audio_manager import _list_audio_files, _total_size, enforce_limits
+
+_logger = logging.getLogger(__name__)
+if not _logger.handlers:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+
+class TTSCache:
+    """Disk-backed TTS cache keyed by sha256(text, model, voice, format).
+
+    - Hits touch the file mtime, so TempAudioManager's oldest-mtime-first ``enforce_limits``
+      becomes an LRU policy; size/count limits use the same knobs style as AUDIO_TMP_MAX_*.
+    - Concurrent misses for the same key collapse into one upstream call.
+    - Hit/miss/coalesced/eviction counters go to TelemetryService.
+    """
+
+    def __init__(
+        self,
+        base_dir: Optional[str] = None,
+        max_total_mb: Optional[float] = None,
+        max_files: Optional[int] = None,
+        telemetry: Optional[TelemetryService] = None,
+    ) -> None:
+        self.base_dir = Path(base_dir or os.getenv("TTS_CACHE_DIR", os.path.join("data", "audio", "tts_cache")))
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        self.max_total_mb = float(os.getenv("TTS_CACHE_MAX_TOTAL_MB", str(max_total_mb if max_total_mb else 128)))
+        self.max_files = int(os.getenv("TTS_CACHE_MAX_FILES", str(max_files if max_files else 1000)))
+        self.telemetry = telemetry
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, "Future[bytes]"] = {}
+        # Running totals so the directory is only rescanned when a limit is actually exceeded
+        files = _list_audio_files(self.base_dir)
+        self._files = len(files)
+        self._bytes = _total_size(files)
+
+    @staticmethod
+    def key(text: str, model: str, voice: str, fmt: str) -> str:
+        h = hashlib.sha256()
+        for part in (model, voice, fmt, text):
+            h.update(part.encode("utf-8"))
+            h.update(b"\x00")
+        return h.hexdigest()
+
+    def _path(self, key: str, fmt: str) -> Path:
+        return self.base_dir / f"{key}.{fmt}"
+
+    def _inc(self, name: str, labels: Optional[Dict[str, str]] = None) -> None:
+        if self.telemetry:
+            try:
+                self.telemetry.inc_counter(name, labels or {})
+            except Exception:
+                pass
+
+    def _read(self, path: Path) -> Optional[bytes]:
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        try:
+            now = time.time()
+            os.utime(path, (now, now))
+        except OSError:
+            pass
+        return data
+
+    def _store(self, path: Path, data: bytes) -> None:
+        # Per-writer temp name: leaders in other processes may store the same key concurrently
+        tmp = path.with_name(f"{path.name}.part{os.getpid()}.{threading.get_ident()}")
+        try:
+            tmp.write_bytes(data)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        # A concurrent leader may have stored the same entry meanwhile: replacing it adds no file
+        try:
+            replaced: Optional[int] = path.stat().st_size
+        except FileNotFoundError:
+            replaced = None
+        os.replace(tmp, path)
+        with self._lock:
+            if replaced is None:
+                self._files += 1
+            # Clamped: an entry another process stored was never counted here
+            self._bytes = max(0, self._bytes + len(data) - (replaced or 0))
+            over = (self.max_files > 0 and self._files > self.max_files) or (
+                self.max_total_mb > 0 and self._bytes > self.max_total_mb * 1024 * 1024
+            )
+        if over:
+            deleted, _ = enforce_limits(str(self.base_dir), max_total_mb=self.max_total_mb, max_files=self.max_files)
+            for _ in range(deleted):
+                self._inc("tts_cache_eviction_total")
+            files = _list_audio_files(self.base_dir)
+            with self._lock:
+                self._files = len(files)
+                self._bytes = _total_size(files)
+
+    def _claim(self, key: str) -> Tuple["Future[bytes]", bool]:
+        """In-flight future for ``key`` and whether the caller is the leader that must synthesize."""
+        with self._lock:
+            fut = self._inflight.get(key)
+            if fut is not None:
+                return fut, False
+            fut = Future()
+            self._inflight[key] = fut
+            return fut, True
+
+    def _reread(self, path: Path, fut: "Future[bytes]") -> Optional[bytes]:
+        """New leader's second look: a previous leader may have stored the entry after our first read."""
+        data = self._read(path)
+        if data is not None:
+            fut.set_result(data)
+        return data
+
+    def _release(self, key: str) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def _finish(self, path: Path, data: bytes, fut: "Future[bytes]") -> None:
+        try:
+            self._store(path, data)
+        except Exception as e:
+            _logger.debug("TTS cache store failed for %s: %s", path, e)
+        fut.set_result(data)
+
+    def get_or_create(self, text: str, model: str, voice: str, fmt: str, synthesize: Callable[[], bytes]) -> bytes:
+        """Return cached audio for the key, or run ``synthesize`` once even under concurrent identical calls."""
+        key = self.key(text, model, voice, fmt)
+        labels = {"model": model, "voice": voice}
+        path = self._path(key, fmt)
+
+        data = self._read(path)
+        if data is not None:
+            self._inc("tts_cache_hit_total", labels)
+            return data
+
+        fut, leader = self._claim(key)
+        if not leader:
+            self._inc("tts_cache_coalesced_total", labels)
+            return fut.result()
+
+        try:
+            data = self._reread(path, fut)
+            if data is not None:
+                self._inc("tts_cache_hit_total", labels)
+                return data
+            self._inc("tts_cache_miss_total", labels)
+            data = synthesize()
+            self._finish(path, data, fut)
+            return data
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        finally:
+            self._release(key)
+
+    async def aget_or_create(
+        self, text: str, model: str, voice: str, fmt: str, synthesize: Callable[[], Awaitable[bytes]]
+    ) -> bytes:
+        """Async variant of get_or_create; coalesces with sync callers through the same in-flight futures."""
+        key = self.key(text, model, voice, fmt)
+        labels = {"model": model, "voice": voice}
+        path = self._path(key, fmt)
+
+        data = self._read(path)
+        if data is not None:
+            self._inc("tts_cache_hit_total", labels)
+            return data
+
+        fut, leader = self._claim(key)
+        if not leader:
+            self._inc("tts_cache_coalesced_total", labels)
+            return await asyncio.wrap_future(fut)
+
+        try:
+            data = self._reread(path, fut)
+            if data is not None:
+                self._inc("tts_cache_hit_total", labels)
+                return data
+            self._inc("tts_cache_miss_total", labels)
+            data = await synthesize()
+            self._finish(path, data, fut)
+            return data
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        finally:
+            self._release(key)
@@ -0,0 +1,140 @@
+import hashlib
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Iterator, List, Optional
+
+from src.utils.audio import concat_audio_bytes
+
+_logger = logging.getLogger(__name__)
+if not _logger.handlers:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+_SENTENCE_END = re.compile(r"(?<=[.!?…])\s+")
+
+
+def _hard_split(text: str, max_chars: int) -> List[str]:
+    """Split an over-long sentence at word boundaries."""
+    parts: List[str] = []
+    current = ""
+    for word in text.split():
+        if current and len(current) + 1 + len(word) > max_chars:
+            parts.append(current)
+            current = word
+        else:
+            current = f"{current} {word}" if current else word
+    if current:
+        parts.append(current)
+    return parts
+
+
+def split_for_tts(text: str, max_chars: int = 400, first_chunk_chars: int = 160) -> List[str]:
+    """Split feedback into paragraph/sentence chunks for parallel synthesis.
+
+    Sentences are packed greedily up to ``max_chars`` without crossing paragraphs. The first chunk is
+    capped at ``first_chunk_chars`` so it synthesizes (and starts playing) quickly.
+    """
+    chunks: List[str] = []
+    for paragraph in re.split(r"\n\s*\n", text or ""):
+        paragraph = " ".join(paragraph.split())
+        if not paragraph:
+            continue
+        current = ""
+        for sentence in _SENTENCE_END.split(paragraph):
+            limit = first_chunk_chars if not chunks else max_chars
+            if len(sentence) > limit:
+                if current:
+                    chunks.append(current)
+                    current = ""
+                pieces = _hard_split(sentence, limit)
+                chunks.extend(pieces[:-1])
+                current = pieces[-1] if pieces else ""
+                continue
+            if current and len(current) + 1 + len(sentence) > limit:
+                chunks.append(current)
+                current = sentence
+            else:
+                current = f"{current} {sentence}" if current else sentence
+        if current:
+            chunks.append(current)
+    return chunks
+
+
+class TTSJob:
+    """Synthesis of one text as ordered chunk futures; chunks can be consumed as soon as each is ready."""
+
+    def __init__(self, chunks: List[str], futures: List["Future[bytes]"]) -> None:
+        self.chunks = chunks
+        self.futures = futures
+
+    def iter_audio(self, timeout: Optional[float] = None) -> Iterator[bytes]:
+        """Yield chunk audio in playback order, blocking only on the next chunk needed."""
+        for fut in self.futures:
+            yield fut.result(timeout=timeout)
+
+    def result(self, timeout: Optional[float] = None) -> bytes:
+        """Whole text as a single stitched audio payload."""
+        return concat_audio_bytes(list(self.iter_audio(timeout=timeout)))
+
+    def done(self) -> bool:
+        return all(f.done() for f in self.futures)
+
+    def failed(self) -> bool:
+        return any(f.done() and f.exception() is not None for f in self.futures)
+
+
+class TTSPipeline:
+    """Bounded thread pool that synthesizes TTS chunks concurrently.
+
+    Jobs are remembered per text (small LRU) so a speculative prefetch started when feedback finishes
+    streaming is picked up by the later playback click instead of synthesizing twice.
+    """
+
+    def __init__(
+        self,
+        service: Any,
+        max_workers: Optional[int] = None,
+        max_chars: Optional[int] = None,
+        first_chunk_chars: Optional[int] = None,
+        max_jobs: int = 4,
+    ) -> None:
+        self.service = service
+        self.max_workers = max(1, int(os.getenv("TTS_PARALLELISM", str(max_workers or 3))))
+        self.max_chars = max(50, int(os.getenv("TTS_CHUNK_CHARS", str(max_chars or 400))))
+        self.first_chunk_chars = max(20, int(os.getenv("TTS_FIRST_CHUNK_CHARS", str(first_chunk_chars or 160))))
+        self.max_jobs = max(1, max_jobs)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="tts")
+        self._jobs: "OrderedDict[str, TTSJob]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def submit(self, text: str) -> TTSJob:
+        """Start (or reuse) synthesis of ``text``; returns immediately."""
+        key = self._key(text)
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and not job.failed():
+                self._jobs.move_to_end(key)
+                return job
+            chunks = split_for_tts(text, max_chars=self.max_chars, first_chunk_chars=self.first_chunk_chars)
+            futures = [self._executor.submit(self.service.text_to_speech, chunk) for chunk in chunks]
+            job = TTSJob(chunks, futures)
+            self._jobs[key] = job
+            while len(self._jobs) > self.max_jobs:
+                self._jobs.popitem(last=False)
+        _logger.info("TTS pipeline: %d chunks submitted (workers=%d).", len(chunks), self.max_workers)
+        return job
+
+    def prefetch(self, text: str) -> None:
+        """Speculatively synthesize ``text`` so a later playback request is served from the finished job."""
+        if text and text.strip():
+            self.submit(text)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,131 @@
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from src.infra.telemetry import TelemetryService
+
+_logger = logging.getLogger(__name__)
+if not _logger.handlers:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+
+class StreamLease:
+    """One open upstream (LLM) stream: how to close its HTTP response and which thread consumes it."""
+
+    def __init__(self, tracker: "UpstreamStreams", kind: str, telemetry: Optional[TelemetryService]) -> None:
+        self.tracker = tracker
+        self.kind = kind
+        self.telemetry = telemetry
+        self.opened_at = time.perf_counter()
+        self.closer: Optional[Callable[[], None]] = None
+        self.thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def attach(self, closer: Optional[Callable[[], None]], thread: Optional[threading.Thread] = None) -> None:
+        self.closer = closer
+        self.thread = thread
+
+    def close(self, reason: str = "completed", started: Optional[float] = None) -> bool:
+        """Close the HTTP response (safe from any thread) and wait for the consumer thread to exit.
+
+        ``reason`` other than ``completed`` counts as a forced close. Returns False when the consumer
+        thread is still alive after STREAM_RELEASE_TIMEOUT_MS (counted as leaked).
+        """
+        with self._lock:
+            if self._closed:
+                return True
+            self._closed = True
+        start = started if started is not None else time.perf_counter()
+        if self.closer is not None:
+            try:
+                self.closer()
+            except Exception as e:
+                _logger.debug("Closing %s stream raised: %s", self.kind, e)
+        thread = self.thread
+        if thread is not None and thread is not threading.current_thread() and thread.is_alive():
+            thread.join(self.tracker.release_timeout_s)
+        leaked = thread is not None and thread.is_alive()
+        release_ms = (time.perf_counter() - start) * 1000.0
+        self.tracker._finish(self, leaked)
+
+        if leaked:
+            _logger.warning("%s stream consumer thread still blocked %.0f ms after close", self.kind, release_ms)
+        if self.telemetry:
+            try:
+                labels = {"kind": self.kind, "reason": reason}
+                self.telemetry.observe_hist("upstream_stream_release_ms", release_ms, labels)
+                if reason != "completed":
+                    self.telemetry.inc_counter("upstream_stream_force_closed_total", labels)
+                if leaked:
+                    self.telemetry.inc_counter("upstream_stream_leaked_total", labels)
+            except Exception:
+                pass
+            self.tracker.report(self.telemetry)
+        return not leaked
+
+
+class UpstreamStreams:
+    """Process-wide accounting of upstream streams and their consumer threads.
+
+    Gauges (``report``): ``upstream_streams_open``, ``upstream_consumer_threads`` (alive threads of open
+    streams plus leaked ones) and ``upstream_streams_leaked`` (consumer threads that outlived their close).
+    """
+
+    def __init__(self, release_timeout_ms: Optional[float] = None) -> None:
+        default = release_timeout_ms if release_timeout_ms is not None else 2000
+        self.release_timeout_s = max(0.0, float(os.getenv("STREAM_RELEASE_TIMEOUT_MS", str(default))) / 1000.0)
+        self._open: Set[StreamLease] = set()
+        self._leaked: List[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    def open(self, kind: str, telemetry: Optional[TelemetryService] = None) -> StreamLease:
+        lease = StreamLease(self, kind, telemetry)
+        with self._lock:
+            self._open.add(lease)
+        if telemetry:
+            self.report(telemetry)
+        return lease
+
+    def _finish(self, lease: StreamLease, leaked: bool) -> None:
+        with self._lock:
+            self._open.discard(lease)
+            if leaked and lease.thread is not None:
+                self._leaked.append(lease.thread)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            # Leaked threads that finally unblocked are released
+            self._leaked = [t for t in self._leaked if t.is_alive()]
+            threads = sum(1 for lease in self._open if lease.thread is not None and lease.thread.is_alive())
+            return {
+                "open": len(self._open),
+                "consumer_threads": threads + len(self._leaked),
+                "leaked": len(self._leaked),
+            }
+
+    def report(self, telemetry: Optional[TelemetryService]) -> Dict[str, Any]:
+        stats = self.snapshot()
+        set_gauge = getattr(telemetry, "set_gauge", None)
+        if callable(set_gauge):
+            try:
+                set_gauge("upstream_streams_open", float(stats["open"]))
+                set_gauge("upstream_consumer_threads", float(stats["consumer_threads"]))
+                set_gauge("upstream_streams_leaked", float(stats["leaked"]))
+            except Exception:
+                pass
+        return stats
+
+
+_tracker: Optional[UpstreamStreams] = None
+_tracker_lock = threading.Lock()
+
+
+def get_stream_tracker() -> UpstreamStreams:
+    global _tracker
+    with _tracker_lock:
+        if _tracker is None:
+            _tracker = UpstreamStreams()
+        return _tracker
@@ -1,12 +1,21 @@
+import base64
+import contextlib
+import inspect
 import logging
 import os
 import shutil
-from typing import Any, Dict, Generator, List, Optional
+import socket
+import threading
+import time
+from typing import Any, AsyncGenerator, Dict, Generator, Iterator, List, Optional, Tuple
 from src.models.prompts import TRANSCRIBE_PROMPT
+from src.infra.openai_clients import get_client_registry
 from src.infra.telemetry import TelemetryService
+from src.infra.tts_cache import TTSCache
+from src.utils.audio import DecodedAudio, load_decoded_audio
+from src.utils.audio_probe import sniff_upload_format
 
-from openai import OpenAI, AuthenticationError
-from pydub import AudioSegment
+from openai import AuthenticationError
 from openai.types.chat import ChatCompletion
 
 # --- Constants for Model Names (configurable via env) ---
@@ -20,45 +29,96 @@ Audio generation defaults (configurable):
 """
 AUDIO_VOICE = os.getenv("AUDIO_VOICE", "alloy")
 AUDIO_OUTPUT_FORMAT = os.getenv("AUDIO_OUTPUT_FORMAT", "wav")
+# Streamed audio output is only available as raw 16-bit PCM, mono, at this rate
+STREAM_AUDIO_FORMAT = "pcm16"
+STREAM_AUDIO_SAMPLE_RATE = 24000
 
 logging.info(
     f"Using models: MULTIMODAL_MODEL={MULTIMODAL_MODEL}, TRANSCRIPTION_MODEL={TRANSCRIPTION_MODEL}, FALLBACK_TRANSCRIPTION_MODEL={FALLBACK_TRANSCRIPTION_MODEL}"
 )
 
 
+_key_checks: Dict[str, Tuple[bool, float]] = {}
+_key_checks_lock = threading.Lock()
+
+
+def _cached_key_check(key_hash: str) -> Optional[bool]:
+    ttl = float(os.getenv("OPENAI_KEY_VALIDATION_TTL_S", "3600"))
+    with _key_checks_lock:
+        entry = _key_checks.get(key_hash)
+    if entry is None or ttl <= 0 or time.monotonic() - entry[1] >= ttl:
+        return None
+    return entry[0]
+
+
+def _remember_key_check(key_hash: str, valid: bool) -> None:
+    with _key_checks_lock:
+        _key_checks[key_hash] = (valid, time.monotonic())
+
+
+def clear_key_validation_cache() -> None:
+    with _key_checks_lock:
+        _key_checks.clear()
+
+
 class OpenAIService:
     @staticmethod
-    def is_key_valid(api_key: str) -> bool:
-        """Checks if the provided OpenAI API key is valid by attempting a lightweight API call."""
+    def is_key_valid(api_key: str, use_cache: bool = True) -> bool:
+        """Checks if the provided OpenAI API key is valid by attempting a lightweight API call.
+        Definitive answers (accepted / rejected) are cached by key hash for OPENAI_KEY_VALIDATION_TTL_S,
+        so saving the same key again costs no network call; transient errors are not cached."""
         if not api_key or not api_key.strip():
             return False
 
         if not api_key.startswith("sk-"):
             return False
+
+        registry = get_client_registry()
+        key_hash = registry.key_hash(api_key)
+        if use_cache:
+            cached = _cached_key_check(key_hash)
+            if cached is not None:
+                return cached
         try:
-            client = OpenAI(api_key=api_key)
+            # Pooled client: the connection opened here is reused by the service built for this key
+            client = registry.get(api_key)
             client.models.list()  # A simple call to check authentication
 
+            _remember_key_check(key_hash, True)
             return True
 
         except AuthenticationError:
             logging.warning("Invalid API key provided (AuthenticationError)")
+            registry.discard(api_key)
+            _remember_key_check(key_hash, False)
             return False
 
         except Exception as e:
             if "401" in str(e) or "authentication" in str(e).lower():
                 logging.warning(f"Authentication failed: {e}")
+                registry.discard(api_key)
+                _remember_key_check(key_hash, False)
                 return False
             else:
                 logging.warning(f"API validation error: {e}")
                 return False
 
-    def __init__(self, api_key: str, model: str = "gpt-4o-mini", telemetry: Optional[TelemetryService] = None):
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "gpt-4o-mini",
+        telemetry: Optional[TelemetryService] = None,
+        tts_cache: Optional[TTSCache] = None,
+    ):
         if not api_key:
             raise ValueError("API key is required for OpenAIService.")
-        self.client = OpenAI(api_key=api_key)
+        # Shared per-key clients: rebuilding the service (e.g. on a key save) keeps the warm pool
+        registry = get_client_registry(telemetry)
+        self.client = registry.get(api_key)
+        self.async_client = registry.get_async(api_key)
         self.model = model
         self.telemetry = telemetry
+        self.tts_cache = tts_cache
 
     def chat_multimodal(
         self,
@@ -122,54 +182,150 @@ class OpenAIService:
                 )
             raise
 
-    def stream_chat_completion(
+    def stream_chat_multimodal(
         self,
         messages: List[Dict[str, Any]],
+        voice: str = AUDIO_VOICE,
         temperature: float = 0.7,
         max_tokens: int = 1000,
-    ) -> Generator[str, None, None]:
-        """Stream chat completion tokens one by one."""
-        logging.info(f"Requesting streaming chat completion with model {self.model}.")
+    ) -> Generator[Tuple[str, Any], None, None]:
+        """
+        Streaming variant of chat_multimodal.
+        Yields ("audio", pcm16_bytes) and ("transcript", text) events as deltas arrive, so playback can
+        start before the whole reply is generated. Audio is 24 kHz mono PCM (STREAM_AUDIO_SAMPLE_RATE).
+        """
+        if not messages:
+            logging.error("'messages' must be a non-empty list.")
+            raise ValueError("Messages list cannot be empty for stream_chat_multimodal")
+
+        labels = {"model": MULTIMODAL_MODEL, "voice": voice, "format": STREAM_AUDIO_FORMAT}
+        logging.info(f"Streaming {len(messages)} messages to multimodal model {MULTIMODAL_MODEL} (voice={voice}).")
         if self.telemetry:
-            self.telemetry.inc_counter("stream_started_total", {"model": self.model})
+            self.telemetry.inc_counter("audio_attempts_total", labels)
+
+        start = time.perf_counter()
+        first_audio = True
+        response = None
+        exhausted = False
+        try:
+            response = self.client.chat.completions.create(
+                model=MULTIMODAL_MODEL,
+                modalities=["text", "audio"],
+                audio={"voice": voice, "format": STREAM_AUDIO_FORMAT},
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True,
+            )
+            for chunk in response:
+                for kind, payload in _multimodal_delta_events(chunk):
+                    if kind == "audio" and first_audio:
+                        first_audio = False
+                        if self.telemetry:
+                            self.telemetry.observe_hist(
+                                "multimodal_ttfa_ms", (time.perf_counter() - start) * 1000.0, labels
+                            )
+                    yield kind, payload
+            exhausted = True
+            if self.telemetry:
+                self.telemetry.observe_hist("multimodal_latency_ms", (time.perf_counter() - start) * 1000.0, labels)
+                self.telemetry.inc_counter("audio_success_total", labels)
+        except Exception as e:
+            if self.telemetry:
+                self.telemetry.inc_counter("audio_error_total", {**labels, "error": type(e).__name__})
+            logging.error(f"Error during streaming multimodal chat: {e}", exc_info=True)
+            raise
+        finally:
+            # Abandoned early (stop_event, consumer closed the generator): release the HTTP response now
+            _close_stream(response, exhausted)
+
+    def chat_completion(
+        self,
+        messages: List[Dict[str, Any]],
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+    ) -> str:
+        """Single (non-streaming) chat completion, for background work that needs the whole text at once."""
         try:
             if self.telemetry:
-                with self.telemetry.timeit("stream_session_ms", {"model": self.model}):
+                with self.telemetry.timeit("chat_completion_ms", {"model": self.model}):
                     response = self.client.chat.completions.create(
-                        model=self.model,
-                        messages=messages,
-                        temperature=temperature,
-                        max_tokens=max_tokens,
-                        stream=True,
+                        model=self.model, messages=messages, temperature=temperature, max_tokens=max_tokens
                     )
-                    for chunk in response:
-                        if chunk.choices and chunk.choices[0].delta and chunk.choices[0].delta.content:
-                            yield chunk.choices[0].delta.content
             else:
                 response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    temperature=temperature,
-                    max_tokens=max_tokens,
-                    stream=True,
+                    model=self.model, messages=messages, temperature=temperature, max_tokens=max_tokens
                 )
-                for chunk in response:
-                    if chunk.choices and chunk.choices[0].delta and chunk.choices[0].delta.content:
-                        yield chunk.choices[0].delta.content
+        except Exception as e:
             if self.telemetry:
-                self.telemetry.inc_counter("stream_completed_total", {"model": self.model})
+                self.telemetry.inc_counter(
+                    "chat_completion_error_total", {"model": self.model, "error": type(e).__name__}
+                )
+            raise
+        choices = getattr(response, "choices", None) or []
+        if not choices:
+            return ""
+        return (getattr(choices[0].message, "content", None) or "").strip()
+
+    def open_chat_stream(
+        self,
+        messages: List[Dict[str, Any]],
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+    ) -> "ChatStream":
+        """Start a streaming chat completion; the returned ChatStream can be closed from any thread."""
+        logging.info(f"Requesting streaming chat completion with model {self.model}.")
+        if self.telemetry:
+            self.telemetry.inc_counter("stream_started_total", {"model": self.model})
+        start = time.perf_counter()
+        try:
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True,
+            )
         except Exception as e:
             if self.telemetry:
                 self.telemetry.inc_counter("stream_error_total", {"model": self.model, "error": type(e).__name__})
-            logging.error(f"Error during multimodal chat: {e}", exc_info=True)
+            logging.error(f"Error starting chat stream: {e}", exc_info=True)
             raise
+        return ChatStream(response, model=self.model, telemetry=self.telemetry, started=start)
+
+    def stream_chat_completion(
+        self,
+        messages: List[Dict[str, Any]],
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+    ) -> Generator[str, None, None]:
+        """Stream chat completion tokens one by one."""
+        stream = self.open_chat_stream(messages=messages, temperature=temperature, max_tokens=max_tokens)
+        try:
+            yield from stream
+        finally:
+            stream.close()
 
-    def text_to_speech(self, text: str, model: str = "tts-1", voice: str = "alloy") -> bytes:
-        """Converts text to speech using OpenAI's TTS model and returns the audio data as bytes."""
+    def text_to_speech(
+        self, text: str, model: str = "tts-1", voice: str = "alloy", response_format: str = "mp3"
+    ) -> bytes:
+        """Converts text to speech using OpenAI's TTS model and returns the audio data as bytes.
+        Served from the TTS cache when one is configured (identical concurrent requests share one call)."""
         if not self.client:
             logging.error("OpenAI client is not initialized. Cannot perform text-to-speech.")
             raise ConnectionError("OpenAI client not initialized. Please set a valid API key.")
 
+        if self.tts_cache is not None:
+            return self.tts_cache.get_or_create(
+                text,
+                model,
+                voice,
+                response_format,
+                lambda: self._synthesize_speech(text, model, voice, response_format),
+            )
+        return self._synthesize_speech(text, model, voice, response_format)
+
+    def _synthesize_speech(self, text: str, model: str, voice: str, response_format: str) -> bytes:
         if self.telemetry:
             self.telemetry.inc_counter("tts_attempts_total", {"model": model, "voice": voice})
         try:
@@ -179,12 +335,14 @@ class OpenAIService:
                         model=model,
                         voice=voice,
                         input=text,
+                        response_format=response_format,
                     )
             else:
                 response = self.client.audio.speech.create(
                     model=model,
                     voice=voice,
                     input=text,
+                    response_format=response_format,
                 )
             if self.telemetry:
                 self.telemetry.inc_counter("tts_success_total", {"model": model, "voice": voice})
@@ -198,53 +356,96 @@ class OpenAIService:
             logging.error(f"Error during text-to-speech generation: {e}", exc_info=True)
             raise
 
-    def transcribe_audio(self, audio_file_path: str) -> str:
+    def _transcription_upload(
+        self, audio_file_path: str, decoded: Optional[DecodedAudio]
+    ) -> Tuple[str, Optional[bytes], str, Optional[str]]:
         """
-        Transcribe audio using the specified transcription model.
-        It uses pydub to convert the input audio to a valid WAV format first,
-        ensuring compatibility with OpenAI's API and handling potentially corrupted files.
+        Decide how the audio goes over the wire: (upload_name, in-memory payload or None, path to read
+        when there is no payload, temp WAV to delete afterwards or None).
+        Inputs that are already PCM WAV or WebM are uploaded as-is. Anything else (or a caller-provided
+        ``decoded`` buffer, e.g. VAD-trimmed PCM) is wrapped as WAV in memory; only conversions above
+        TRANSCRIBE_INMEMORY_MAX_MB are written to a temporary file on disk.
+        """
+        upload_format = sniff_upload_format(audio_file_path) if decoded is None else None
+        payload: Optional[bytes] = None
+        upload_path = audio_file_path
+        converted_wav_path: Optional[str] = None
+        if upload_format:
+            source = "passthrough"
+            size_bytes = os.path.getsize(audio_file_path)
+        else:
+            # Decode (shared cache) and re-wrap as WAV; this also fixes potentially corrupted inputs
+            if decoded is None:
+                decoded = load_decoded_audio(audio_file_path)
+            upload_format = "wav"
+            max_inmemory = float(os.getenv("TRANSCRIBE_INMEMORY_MAX_MB", "25")) * 1024 * 1024
+            if len(decoded.pcm) <= max_inmemory:
+                source = "memory"
+                payload = decoded.to_wav_bytes()
+                size_bytes = len(payload)
+            else:
+                source = "disk"
+                converted_wav_path = audio_file_path + ".wav"
+                decoded.to_segment().export(converted_wav_path, format="wav")
+                upload_path = converted_wav_path
+                size_bytes = os.path.getsize(converted_wav_path)
+        logging.info(f"Transcription upload: {source} {upload_format}, {size_bytes} bytes")
+        if self.telemetry:
+            self.telemetry.inc_counter("transcribe_upload_total", {"source": source, "format": upload_format})
+
+        # Basic integrity check on the upload
+        if size_bytes < 1024:  # < 1KB usually indicates empty/invalid file
+            if converted_wav_path and os.path.exists(converted_wav_path):
+                os.remove(converted_wav_path)
+            logging.error(f"Upload size check failed: {size_bytes} bytes")
+            raise ValueError("Audio upload appears too small; possible empty/invalid recording.")
+        return f"audio.{upload_format}", payload, upload_path, converted_wav_path
+
+    @staticmethod
+    def _transcription_text(resp: Any) -> str:
+        # The SDK returns an object with .text
+        if hasattr(resp, "text") and isinstance(resp.text, str):
+            return resp.text
+        # Some SDKs might return the raw string
+        if isinstance(resp, str):
+            return resp
+        # Last resort, try to get any plausible text field
+        if hasattr(resp, "output_text"):
+            return getattr(resp, "output_text")
+        raise ValueError("Unexpected transcription response type; no text found.")
+
+    @staticmethod
+    def _remove_converted_wav(converted_wav_path: Optional[str]) -> None:
+        # Clean up the converted WAV file (disk fallback only)
+        if converted_wav_path and os.path.exists(converted_wav_path):
+            os.remove(converted_wav_path)
+            logging.info(f"Removed temporary WAV file: {converted_wav_path}")
+
+    def transcribe_audio(self, audio_file_path: str, decoded: Optional[DecodedAudio] = None) -> str:
+        """
+        Transcribe audio using the specified transcription model, falling back to
+        FALLBACK_TRANSCRIPTION_MODEL. Pass ``decoded`` to reuse PCM the caller already decoded
+        (or trimmed) instead of decoding the file again.
         """
         logging.info(f"Received audio for transcription: {audio_file_path}")
-        converted_wav_path = audio_file_path + ".wav"
+        converted_wav_path: Optional[str] = None
 
         try:
-            # Convert the input audio file to WAV format using pydub
-            # This handles various input formats and fixes potential corruption.
-            audio = AudioSegment.from_file(audio_file_path)
-            audio.export(converted_wav_path, format="wav")
-            logging.info(f"Successfully converted audio to WAV: {converted_wav_path}")
+            upload_name, payload, upload_path, converted_wav_path = self._transcription_upload(audio_file_path, decoded)
 
-            # Basic integrity check on the converted file
-            try:
-                size_bytes = os.path.getsize(converted_wav_path)
-                logging.info(f"Converted WAV size: {size_bytes} bytes")
-                if size_bytes < 1024:  # < 1KB usually indicates empty/invalid file
-                    raise ValueError("Converted WAV appears too small; possible empty/invalid recording.")
-            except Exception as size_err:
-                logging.error(f"Converted WAV size check failed: {size_err}")
-                raise
-
-            # Transcribe the converted WAV file
+            # Each attempt gets a fresh file argument (a consumed handle cannot be re-sent)
             def _do_transcribe(model_name: str) -> str:
                 logging.info(f"Transcribing with model: {model_name}")
-                with open(converted_wav_path, "rb") as audio_file:
+                with contextlib.ExitStack() as stack:
+                    body = payload if payload is not None else stack.enter_context(open(upload_path, "rb"))
                     resp = self.client.audio.transcriptions.create(
                         model=model_name,
-                        file=audio_file,
+                        file=(upload_name, body),
                         language="en",
                         # Avoid response_format="text" to prevent JSON parse errors in SDK
                         prompt=TRANSCRIBE_PROMPT,
                     )
-                # The SDK returns an object with .text
-                if hasattr(resp, "text") and isinstance(resp.text, str):
-                    return resp.text
-                # Some SDKs might return the raw string
-                if isinstance(resp, str):
-                    return resp
-                # Last resort, try to get any plausible text field
-                if hasattr(resp, "output_text"):
-                    return getattr(resp, "output_text")
-                raise ValueError("Unexpected transcription response type; no text found.")
+                return self._transcription_text(resp)
 
             try:
                 if self.telemetry:
@@ -283,7 +484,329 @@ class OpenAIService:
             raise
 
         finally:
-            # Clean up the converted WAV file
-            if os.path.exists(converted_wav_path):
-                os.remove(converted_wav_path)
-                logging.info(f"Removed temporary WAV file: {converted_wav_path}")
+            self._remove_converted_wav(converted_wav_path)
+
+    # ------------------------------------------------------------------
+    # Async API (AsyncOpenAI). Same contracts and telemetry as the sync methods above, for async
+    # Gradio handlers and FastAPI routes: no worker thread is parked per request, and cancelling the
+    # awaiting task closes the upstream HTTP stream.
+    # ------------------------------------------------------------------
+
+    async def achat_multimodal(
+        self,
+        messages: List[Dict[str, Any]],
+        voice: str = AUDIO_VOICE,
+        output_format: str = AUDIO_OUTPUT_FORMAT,
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+    ) -> ChatCompletion:
+        """Async variant of chat_multimodal."""
+        if not messages:
+            logging.error("'messages' must be a non-empty list.")
+            raise ValueError("Messages list cannot be empty for chat_multimodal")
+
+        labels = {"model": MULTIMODAL_MODEL, "voice": voice, "format": output_format}
+        if self.telemetry:
+            self.telemetry.inc_counter("audio_attempts_total", labels)
+        start = time.perf_counter()
+        try:
+            response = await self.async_client.chat.completions.create(
+                model=MULTIMODAL_MODEL,
+                modalities=["text", "audio"],
+                audio={"voice": voice, "format": output_format},
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+            )
+            if self.telemetry:
+                self.telemetry.observe_hist("multimodal_latency_ms", (time.perf_counter() - start) * 1000.0, labels)
+                self.telemetry.inc_counter("audio_success_total", labels)
+            return response
+        except Exception as e:
+            if self.telemetry:
+                self.telemetry.inc_counter("audio_error_total", {**labels, "error": type(e).__name__})
+            raise
+
+    async def astream_chat_multimodal(
+        self,
+        messages: List[Dict[str, Any]],
+        voice: str = AUDIO_VOICE,
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+    ) -> AsyncGenerator[Tuple[str, Any], None]:
+        """Async variant of stream_chat_multimodal (same ("audio", pcm16) / ("transcript", text) events)."""
+        if not messages:
+            logging.error("'messages' must be a non-empty list.")
+            raise ValueError("Messages list cannot be empty for stream_chat_multimodal")
+
+        labels = {"model": MULTIMODAL_MODEL, "voice": voice, "format": STREAM_AUDIO_FORMAT}
+        if self.telemetry:
+            self.telemetry.inc_counter("audio_attempts_total", labels)
+
+        start = time.perf_counter()
+        first_audio = True
+        response = None
+        try:
+            response = await self.async_client.chat.completions.create(
+                model=MULTIMODAL_MODEL,
+                modalities=["text", "audio"],
+                audio={"voice": voice, "format": STREAM_AUDIO_FORMAT},
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True,
+            )
+            async for chunk in response:
+                for kind, payload in _multimodal_delta_events(chunk):
+                    if kind == "audio" and first_audio:
+                        first_audio = False
+                        if self.telemetry:
+                            self.telemetry.observe_hist(
+                                "multimodal_ttfa_ms", (time.perf_counter() - start) * 1000.0, labels
+                            )
+                    yield kind, payload
+            if self.telemetry:
+                self.telemetry.observe_hist("multimodal_latency_ms", (time.perf_counter() - start) * 1000.0, labels)
+                self.telemetry.inc_counter("audio_success_total", labels)
+        except Exception as e:
+            if self.telemetry:
+                self.telemetry.inc_counter("audio_error_total", {**labels, "error": type(e).__name__})
+            logging.error(f"Error during async streaming multimodal chat: {e}", exc_info=True)
+            raise
+        finally:
+            await _aclose_stream(response)
+
+    async def astream_chat_completion(
+        self,
+        messages: List[Dict[str, Any]],
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+    ) -> AsyncGenerator[str, None]:
+        """Async variant of stream_chat_completion; closing the generator closes the HTTP response."""
+        logging.info(f"Requesting async streaming chat completion with model {self.model}.")
+        if self.telemetry:
+            self.telemetry.inc_counter("stream_started_total", {"model": self.model})
+        start = time.perf_counter()
+        response = None
+        try:
+            response = await self.async_client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True,
+            )
+            async for chunk in response:
+                if chunk.choices and chunk.choices[0].delta and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+            if self.telemetry:
+                self.telemetry.inc_counter("stream_completed_total", {"model": self.model})
+        except Exception as e:
+            if self.telemetry:
+                self.telemetry.inc_counter("stream_error_total", {"model": self.model, "error": type(e).__name__})
+            logging.error(f"Error during async chat stream: {e}", exc_info=True)
+            raise
+        finally:
+            await _aclose_stream(response)
+            if self.telemetry:
+                self.telemetry.observe_hist(
+                    "stream_session_ms", (time.perf_counter() - start) * 1000.0, {"model": self.model}
+                )
+
+    async def atext_to_speech(
+        self, text: str, model: str = "tts-1", voice: str = "alloy", response_format: str = "mp3"
+    ) -> bytes:
+        """Async variant of text_to_speech (shares the TTS cache and its in-flight coalescing)."""
+        if self.tts_cache is not None:
+            return await self.tts_cache.aget_or_create(
+                text,
+                model,
+                voice,
+                response_format,
+                lambda: self._asynthesize_speech(text, model, voice, response_format),
+            )
+        return await self._asynthesize_speech(text, model, voice, response_format)
+
+    async def _asynthesize_speech(self, text: str, model: str, voice: str, response_format: str) -> bytes:
+        labels = {"model": model, "voice": voice}
+        if self.telemetry:
+            self.telemetry.inc_counter("tts_attempts_total", labels)
+        start = time.perf_counter()
+        try:
+            response = await self.async_client.audio.speech.create(
+                model=model,
+                voice=voice,
+                input=text,
+                response_format=response_format,
+            )
+            if self.telemetry:
+                self.telemetry.observe_hist("tts_latency_ms", (time.perf_counter() - start) * 1000.0, labels)
+                self.telemetry.inc_counter("tts_success_total", labels)
+            return response.content
+        except Exception as e:
+            if self.telemetry:
+                self.telemetry.inc_counter("tts_error_total", {**labels, "error": type(e).__name__})
+            logging.error(f"Error during async text-to-speech generation: {e}", exc_info=True)
+            raise
+
+    async def atranscribe_audio(self, audio_file_path: str, decoded: Optional[DecodedAudio] = None) -> str:
+        """Async variant of transcribe_audio (same upload selection and model fallback)."""
+        logging.info(f"Received audio for async transcription: {audio_file_path}")
+        converted_wav_path: Optional[str] = None
+        try:
+            upload_name, payload, upload_path, converted_wav_path = self._transcription_upload(audio_file_path, decoded)
+
+            async def _do_transcribe(model_name: str) -> str:
+                if self.telemetry:
+                    self.telemetry.inc_counter("transcribe_attempts_total", {"model": model_name})
+                start = time.perf_counter()
+                with contextlib.ExitStack() as stack:
+                    body = payload if payload is not None else stack.enter_context(open(upload_path, "rb"))
+                    resp = await self.async_client.audio.transcriptions.create(
+                        model=model_name,
+                        file=(upload_name, body),
+                        language="en",
+                        prompt=TRANSCRIBE_PROMPT,
+                    )
+                if self.telemetry:
+                    self.telemetry.observe_hist(
+                        "transcribe_latency_ms", (time.perf_counter() - start) * 1000.0, {"model": model_name}
+                    )
+                return self._transcription_text(resp)
+
+            try:
+                text = await _do_transcribe(TRANSCRIPTION_MODEL)
+            except Exception as primary_err:
+                logging.error(f"Primary transcription failed ({TRANSCRIPTION_MODEL}): {primary_err}", exc_info=True)
+                if self.telemetry:
+                    self.telemetry.inc_counter(
+                        "transcribe_error_total", {"model": TRANSCRIPTION_MODEL, "error": type(primary_err).__name__}
+                    )
+                logging.info(f"Falling back to {FALLBACK_TRANSCRIPTION_MODEL}...")
+                text = await _do_transcribe(FALLBACK_TRANSCRIPTION_MODEL)
+
+            if self.telemetry:
+                self.telemetry.inc_counter(
+                    "transcribe_success_total",
+                    {"primary_model": TRANSCRIPTION_MODEL, "fallback_model": FALLBACK_TRANSCRIPTION_MODEL},
+                )
+            return text
+        except Exception as e:
+            logging.error(f"Error during audio conversion or async transcription: {e}", exc_info=True)
+            raise
+        finally:
+            self._remove_converted_wav(converted_wav_path)
+
+
+def _multimodal_delta_events(chunk: Any) -> List[Tuple[str, Any]]:
+    """("transcript", text) / ("audio", pcm16 bytes) events carried by one streamed multimodal chunk."""
+    if not chunk.choices or not chunk.choices[0].delta:
+        return []
+    delta = chunk.choices[0].delta
+    events: List[Tuple[str, Any]] = []
+    # The SDK does not model delta.audio; it arrives as an extra field (dict or object)
+    audio = getattr(delta, "audio", None)
+    if audio is None and isinstance(getattr(delta, "model_extra", None), dict):
+        audio = delta.model_extra.get("audio")
+    if audio:
+        data = audio.get("data") if isinstance(audio, dict) else getattr(audio, "data", None)
+        transcript = audio.get("transcript") if isinstance(audio, dict) else getattr(audio, "transcript", None)
+        if transcript:
+            events.append(("transcript", transcript))
+        if data:
+            events.append(("audio", base64.b64decode(data)))
+    if getattr(delta, "content", None):
+        events.append(("transcript", delta.content))
+    return events
+
+
+def _close_stream(response: Any, exhausted: bool = False) -> None:
+    """Release a sync Stream's HTTP response; safe on None, from any thread, and more than once.
+
+    Closing the response does not wake a thread blocked reading its socket, so a stream that was not
+    read to the end has its socket shut down first (the blocked read then fails and its thread exits).
+    """
+    if response is None:
+        return
+    if not exhausted:
+        try:
+            http_response = getattr(response, "response", None)
+            network_stream = (getattr(http_response, "extensions", None) or {}).get("network_stream")
+            sock = network_stream.get_extra_info("socket") if network_stream is not None else None
+            if sock is not None:
+                sock.shutdown(socket.SHUT_RDWR)
+        except Exception as e:
+            logging.debug(f"Socket shutdown of upstream stream failed: {e}")
+    close = getattr(response, "close", None)
+    if close is None:
+        return
+    try:
+        close()
+    except Exception as e:
+        logging.debug(f"Closing upstream stream failed: {e}")
+
+
+class ChatStream:
+    """Text deltas of a streamed chat completion, with a ``close`` that is safe to call from another thread.
+
+    A consumer blocked waiting for the next chunk is released by ``close`` (the read fails and iteration
+    ends quietly), so cancellation and timeouts free the connection and the thread immediately.
+    """
+
+    def __init__(
+        self, response: Any, model: str, telemetry: Optional[TelemetryService] = None, started: Optional[float] = None
+    ) -> None:
+        self._response = response
+        self.model = model
+        self.telemetry = telemetry
+        self._started = started if started is not None else time.perf_counter()
+        self._exhausted = False
+        self._closed = False
+        self._lock = threading.Lock()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def __iter__(self) -> Iterator[str]:
+        try:
+            for chunk in self._response:
+                if self._closed:
+                    return
+                if chunk.choices and chunk.choices[0].delta and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+            self._exhausted = True
+            if self.telemetry and not self._closed:
+                self.telemetry.inc_counter("stream_completed_total", {"model": self.model})
+        except Exception as e:
+            if self._closed:
+                # Our own close() interrupted the read
+                return
+            if self.telemetry:
+                self.telemetry.inc_counter("stream_error_total", {"model": self.model, "error": type(e).__name__})
+            logging.error(f"Error during chat stream: {e}", exc_info=True)
+            raise
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        _close_stream(self._response, self._exhausted)
+        if self.telemetry:
+            self.telemetry.observe_hist(
+                "stream_session_ms", (time.perf_counter() - self._started) * 1000.0, {"model": self.model}
+            )
+
+
+async def _aclose_stream(response: Any) -> None:
+    """Close an AsyncStream (releasing its HTTP connection); safe on None or already-closed streams."""
+    close = getattr(response, "close", None)
+    if close is None:
+        return
+    try:
+        result = close()
+        if inspect.isawaitable(result):
+            await result
+    except Exception as e:
+        logging.debug(f"Closing upstream stream failed: {e}")
@@ -1,14 +1,21 @@
 import base64
+import io
 import logging
+import struct
 import tempfile
+import threading
+import wave
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional, Tuple
 import os
 import re
 import uuid
-from src.infra.temp_audio_manager import maintain_tmp_audio_dir
+from src.infra.temp_audio_manager import get_tmp_audio_index
+from src.utils.audio_probe import probe_duration
 
+import numpy as np
 from pydub import AudioSegment
-from pydub.silence import detect_nonsilent
 
 # Configure o logger para este módulo
 _logger = logging.getLogger(__name__)
@@ -16,6 +23,21 @@ if not _logger.handlers:
     logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
 
 
+def _index_temp_audio(base_dir: str, path: str, size: int) -> None:
+    try:
+        get_tmp_audio_index(base_dir).record_save(path, size)
+    except Exception as index_e:
+        _logger.debug("TempAudioManager indexing skipped: %s", index_e)
+
+
+def remove_temp_audio(path: str) -> None:
+    """Delete a temp audio file and drop it from its directory index."""
+    try:
+        get_tmp_audio_index(os.path.dirname(path)).remove(path)
+    except Exception as e:
+        _logger.debug("Failed to remove temp audio %s: %s", path, e)
+
+
 def save_audio_to_temp_file(audio_bytes: bytes, suffix: str = ".wav") -> str:
     """Saves audio bytes to a temporary file and returns the file path."""
     try:
@@ -30,11 +52,8 @@ def save_audio_to_temp_file(audio_bytes: bytes, suffix: str = ".wav") -> str:
                 with open(tmp_path, "wb") as f:
                     f.write(audio_bytes)
                 _logger.info("Saved temp audio to project dir: %s", tmp_path)
-                # Best-effort maintenance of tmp dir (age/size/count)
-                try:
-                    maintain_tmp_audio_dir(base_dir=base_dir)
-                except Exception as maint_e:
-                    _logger.debug("TempAudioManager maintenance skipped: %s", maint_e)
+                # Index the file; age/size/count limits are enforced by the background janitor
+                _index_temp_audio(base_dir, tmp_path, len(audio_bytes))
                 return tmp_path
         except Exception as dir_e:
             _logger.debug("Project tmp dir save failed (%s). Falling back to system tmp.", dir_e)
@@ -44,17 +63,113 @@ def save_audio_to_temp_file(audio_bytes: bytes, suffix: str = ".wav") -> str:
             tmp_file.write(audio_bytes)
             tmp_path = tmp_file.name
         _logger.info("Saved temp audio to system tmp: %s", tmp_path)
-        # Best-effort maintenance for the directory we used
-        try:
-            maintain_tmp_audio_dir(base_dir=os.path.dirname(tmp_path))
-        except Exception as maint_e:
-            _logger.debug("TempAudioManager maintenance (system tmp) skipped: %s", maint_e)
+        _index_temp_audio(os.path.dirname(tmp_path), tmp_path, len(audio_bytes))
         return tmp_path
     except Exception as e:
         _logger.error(f"Failed to save audio to temporary file: {e}", exc_info=True)
         raise
 
 
+def pcm16_to_wav_bytes(pcm: bytes, sample_rate: int = 24000, channels: int = 1) -> bytes:
+    """Wrap raw little-endian 16-bit PCM in a WAV container."""
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(pcm)
+    return buf.getvalue()
+
+
+def guess_audio_suffix(data: bytes, default: str = ".wav") -> str:
+    """File suffix from the container magic bytes (TTS returns mp3 unless asked otherwise)."""
+    if data[:4] == b"RIFF":
+        return ".wav"
+    if data[:4] == b"OggS":
+        return ".ogg"
+    if data[:4] == b"fLaC":
+        return ".flac"
+    if data[:3] == b"ID3" or (len(data) > 1 and data[0] == 0xFF and (data[1] & 0xE0) == 0xE0):
+        return ".mp3"
+    return default
+
+
+def concat_audio_bytes(parts: List[bytes]) -> bytes:
+    """Stitch same-format audio payloads without re-encoding.
+
+    WAV parts are merged into one RIFF with the summed PCM; MPEG/Ogg streams are frame/page
+    sequences and concatenate byte-wise.
+    """
+    parts = [p for p in parts if p]
+    if len(parts) <= 1:
+        return parts[0] if parts else b""
+    if all(p[:4] == b"RIFF" for p in parts):
+        # pydub reads/writes plain WAV without ffmpeg and aligns rate/channels/width if they differ
+        combined = AudioSegment.from_file(io.BytesIO(parts[0]), format="wav")
+        for p in parts[1:]:
+            combined += AudioSegment.from_file(io.BytesIO(p), format="wav")
+        out = io.BytesIO()
+        combined.export(out, format="wav")
+        return out.getvalue()
+    return b"".join(parts)
+
+
+class ProgressiveWavWriter:
+    """Appends streamed PCM16 to a WAV file whose header is patched with the real sizes on close().
+
+    While open, the header carries placeholder sizes (0xFFFFFFFF) so players and the duration probe
+    treat the file as "read until EOF".
+    """
+
+    def __init__(self, path: str, sample_rate: int = 24000, channels: int = 1) -> None:
+        self.path = path
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.bytes_written = 0
+        self._f = open(path, "wb")
+        self._f.write(self._header(0xFFFFFFFF))
+        self._f.flush()
+
+    @classmethod
+    def in_tmp_dir(cls, sample_rate: int = 24000, channels: int = 1) -> "ProgressiveWavWriter":
+        base_dir = os.getenv("AUDIO_TMP_DIR", os.path.join("data", "audio", "tmp"))
+        os.makedirs(base_dir, exist_ok=True)
+        return cls(os.path.join(base_dir, f"sophia_{uuid.uuid4().hex}.wav"), sample_rate, channels)
+
+    def _header(self, data_size: int) -> bytes:
+        riff_size = 0xFFFFFFFF if data_size == 0xFFFFFFFF else 36 + data_size
+        block_align = 2 * self.channels
+        return (
+            b"RIFF"
+            + struct.pack("<I", riff_size)
+            + b"WAVEfmt "
+            + struct.pack(
+                "<IHHIIHH", 16, 1, self.channels, self.sample_rate, self.sample_rate * block_align, block_align, 16
+            )
+            + b"data"
+            + struct.pack("<I", data_size)
+        )
+
+    @property
+    def duration_sec(self) -> float:
+        return self.bytes_written / float(2 * self.channels * self.sample_rate)
+
+    def write(self, pcm: bytes) -> None:
+        if not pcm:
+            return
+        self._f.write(pcm)
+        self._f.flush()
+        self.bytes_written += len(pcm)
+
+    def close(self) -> str:
+        if not self._f.closed:
+            self._f.seek(0)
+            self._f.write(self._header(self.bytes_written))
+            self._f.close()
+            _index_temp_audio(os.path.dirname(self.path), self.path, 44 + self.bytes_written)
+        return self.path
+
+
 def extract_text_from_response(response: Any) -> str:
     """Extrai texto da resposta OpenAI, garantindo que sempre retorne uma string."""
     if not hasattr(response, "choices") or not response.choices:
@@ -163,14 +278,153 @@ def extract_audio_from_response(response: Any) -> str | None:
     return None
 
 
+# ---------------- Decoded audio (decode once per file) ----------------
+_SAMPLE_DTYPES = {1: np.int8, 2: np.dtype("<i2"), 4: np.dtype("<i4")}
+
+
+def _segment_samples(audio: AudioSegment) -> np.ndarray:
+    """Interleaved signed PCM samples of a pydub segment as a zero-copy NumPy view when possible."""
+    dtype = _SAMPLE_DTYPES.get(audio.sample_width)
+    if dtype is not None:
+        return np.frombuffer(audio.raw_data, dtype=dtype)
+    arr = audio.get_array_of_samples()
+    return np.frombuffer(arr, dtype=np.dtype(arr.typecode))
+
+
+@dataclass(frozen=True)
+class DecodedAudio:
+    """PCM buffer of an audio file decoded once and shared by transcription, metrics and duration."""
+
+    path: str
+    pcm: bytes
+    frame_rate: int
+    channels: int
+    sample_width: int
+
+    @classmethod
+    def from_segment(cls, segment: AudioSegment, path: str = "") -> "DecodedAudio":
+        return cls(
+            path=path,
+            pcm=segment.raw_data,
+            frame_rate=segment.frame_rate,
+            channels=segment.channels,
+            sample_width=segment.sample_width,
+        )
+
+    @property
+    def frame_count(self) -> int:
+        return len(self.pcm) // max(1, self.sample_width * self.channels)
+
+    @property
+    def duration_sec(self) -> float:
+        if not self.frame_rate:
+            return 0.0
+        return self.frame_count / float(self.frame_rate)
+
+    @property
+    def samples(self) -> np.ndarray:
+        """Interleaved signed samples (zero-copy view over ``pcm`` for 8/16/32-bit audio)."""
+        dtype = _SAMPLE_DTYPES.get(self.sample_width)
+        if dtype is not None:
+            return np.frombuffer(self.pcm, dtype=dtype)
+        return _segment_samples(self.to_segment())
+
+    def to_segment(self) -> AudioSegment:
+        return AudioSegment(
+            data=self.pcm, sample_width=self.sample_width, frame_rate=self.frame_rate, channels=self.channels
+        )
+
+    def to_wav_bytes(self) -> bytes:
+        """The PCM wrapped in an in-memory WAV container (no temp file)."""
+        buf = io.BytesIO()
+        with wave.open(buf, "wb") as wf:
+            wf.setnchannels(self.channels)
+            wf.setsampwidth(self.sample_width)
+            wf.setframerate(self.frame_rate)
+            wf.writeframes(self.pcm)
+        return buf.getvalue()
+
+
+class _DecodedAudioCache:
+    """Small LRU of decoded files keyed by (path, mtime, size) so a changed file is decoded again."""
+
+    def __init__(self, max_entries: int, max_bytes: int) -> None:
+        self.max_entries = max(0, max_entries)
+        self.max_bytes = max(0, max_bytes)
+        self._items: "OrderedDict[Tuple[str, int, int], DecodedAudio]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, int, int]) -> Optional[DecodedAudio]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None:
+                self._items.move_to_end(key)
+            return item
+
+    def put(self, key: Tuple[str, int, int], item: DecodedAudio) -> None:
+        size = len(item.pcm)
+        if self.max_entries <= 0 or (self.max_bytes and size > self.max_bytes):
+            return
+        with self._lock:
+            # Drop stale versions of the same path before inserting the new one
+            for old_key in [k for k in self._items if k[0] == key[0]]:
+                self._bytes -= len(self._items.pop(old_key).pcm)
+            self._items[key] = item
+            self._bytes += size
+            while len(self._items) > self.max_entries or (self.max_bytes and self._bytes > self.max_bytes):
+                _, evicted = self._items.popitem(last=False)
+                self._bytes -= len(evicted.pcm)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+_decode_cache = _DecodedAudioCache(
+    max_entries=int(os.getenv("AUDIO_DECODE_CACHE_ENTRIES", "8")),
+    max_bytes=int(float(os.getenv("AUDIO_DECODE_CACHE_MAX_MB", "64")) * 1024 * 1024),
+)
+
+
+def load_decoded_audio(file_path: str, use_cache: bool = True) -> DecodedAudio:
+    """Decode ``file_path`` (pydub/ffmpeg) once and reuse the PCM for later lookups of the same file version."""
+    key = None
+    if use_cache:
+        try:
+            st = os.stat(file_path)
+            key = (os.path.abspath(file_path), st.st_mtime_ns, st.st_size)
+            cached = _decode_cache.get(key)
+            if cached is not None:
+                return cached
+        except OSError:
+            key = None
+    decoded = DecodedAudio.from_segment(AudioSegment.from_file(file_path), path=file_path)
+    if key is not None:
+        _decode_cache.put(key, decoded)
+    return decoded
+
+
+def clear_decoded_audio_cache() -> None:
+    _decode_cache.clear()
+
+
 def get_audio_duration(file_path: str) -> float:
-    """Calculates the duration of an audio file in seconds."""
+    """Calculates the duration of an audio file in seconds.
+
+    WAV/MP3/Ogg durations come from container headers; other formats fall back to a full decode.
+    """
     if not file_path:
         return 0.0
+    probed = probe_duration(file_path)
+    if probed is not None:
+        return probed
     try:
-        audio = AudioSegment.from_file(file_path)
-        duration_seconds = len(audio) / 1000.0
-        return duration_seconds
+        return load_decoded_audio(file_path).duration_sec
     except Exception as e:
         _logger.error(f"Failed to get duration for audio file {file_path}: {e}", exc_info=True)
         return 0.0  # Return 0 if duration can't be determined
@@ -197,58 +451,124 @@ def _safe_dbfs(val: float) -> float:
     return float(val)
 
 
-def analyze_pronunciation_metrics(
-    file_path: str,
+@dataclass
+class FrameEnergyStats:
+    """Loudness, clipping and speech spans from a single frame-energy pass (times in ms)."""
+
+    duration_ms: int
+    rms_dbfs: float
+    peak_dbfs: float
+    clipping_ratio: float
+    nonsilent: List[Tuple[int, int]] = field(default_factory=list)
+
+    @property
+    def speaking_ms(self) -> int:
+        return sum(max(0, end - start) for start, end in self.nonsilent)
+
+
+def _ratio_to_dbfs(ratio: float) -> float:
+    if ratio <= 0:
+        return -90.0
+    return float(20.0 * np.log10(ratio))
+
+
+def _complement_spans(silent: List[Tuple[int, int]], length_ms: int) -> List[Tuple[int, int]]:
+    # Mirrors pydub.silence.detect_nonsilent so spans match the previous implementation
+    if not silent:
+        return [(0, length_ms)]
+    if silent[0][0] == 0 and silent[0][1] == length_ms:
+        return []
+    spans: List[Tuple[int, int]] = []
+    prev_end = 0
+    for start, end in silent:
+        spans.append((prev_end, start))
+        prev_end = end
+    if silent[-1][1] != length_ms:
+        spans.append((prev_end, length_ms))
+    if spans and spans[0] == (0, 0):
+        spans.pop(0)
+    return spans
+
+
+def compute_frame_energy(
+    samples: np.ndarray,
+    frame_rate: int,
+    channels: int = 1,
+    sample_width: int = 2,
+    min_silence_len: int = 200,
+    silence_offset_db: float = 16.0,
+) -> FrameEnergyStats:
+    """Vectorized equivalent of pydub's dBFS/max_dBFS/detect_nonsilent plus clipping count.
+
+    ``samples`` are interleaved signed integers. Silence is any ``min_silence_len`` ms window whose
+    RMS is at or below ``overall dBFS - silence_offset_db`` (same rule as the pydub-based version).
+    """
+    channels = max(1, int(channels))
+    frame_rate = int(frame_rate)
+    n_frames = samples.size // channels if frame_rate > 0 else 0
+    if n_frames == 0:
+        return FrameEnergyStats(duration_ms=0, rms_dbfs=-90.0, peak_dbfs=-90.0, clipping_ratio=0.0, nonsilent=[])
+
+    duration_ms = int(round(1000 * n_frames / frame_rate))
+    max_amp = float(2 ** (8 * sample_width - 1))
+
+    x = samples[: n_frames * channels].astype(np.float64)
+    abs_x = np.abs(x)
+    peak = float(abs_x.max())
+    clipped = int(np.count_nonzero(abs_x >= 0.98 * (max_amp - 1.0)))
+    clipping_ratio = clipped / max(1, x.size)
+
+    # Per-frame energy and its prefix sum drive both the global RMS and every sliding window
+    frame_energy = np.square(x).reshape(n_frames, channels).sum(axis=1)
+    cumulative = np.concatenate(([0.0], np.cumsum(frame_energy)))
+    rms = float(np.floor(np.sqrt(cumulative[-1] / x.size)))
+    rms_dbfs = _ratio_to_dbfs(rms / max_amp)
+    peak_dbfs = _ratio_to_dbfs(peak / max_amp)
+
+    silent_ranges: List[Tuple[int, int]] = []
+    if duration_ms >= min_silence_len:
+        thresh_amp = (10 ** ((rms_dbfs - silence_offset_db) / 20.0)) * max_amp
+        starts = np.arange(0, duration_ms - min_silence_len + 1, dtype=np.int64)
+        lo = (starts * (frame_rate / 1000.0)).astype(np.int64)
+        hi = ((starts + min_silence_len) * (frame_rate / 1000.0)).astype(np.int64)
+        # pydub pads short tail windows with silence, so the sample count uses the nominal length
+        counts = (hi - lo) * channels
+        sums = cumulative[np.minimum(hi, n_frames)] - cumulative[np.minimum(lo, n_frames)]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            window_rms = np.where(counts > 0, np.floor(np.sqrt(sums / np.maximum(counts, 1))), 0.0)
+        silent_starts = np.flatnonzero(window_rms <= thresh_amp)
+        if silent_starts.size:
+            breaks = np.flatnonzero(np.diff(silent_starts) > min_silence_len)
+            range_starts = np.concatenate((silent_starts[:1], silent_starts[breaks + 1]))
+            range_ends = np.concatenate((silent_starts[breaks], silent_starts[-1:])) + min_silence_len
+            silent_ranges = [(int(a), int(b)) for a, b in zip(range_starts, range_ends)]
+
+    return FrameEnergyStats(
+        duration_ms=duration_ms,
+        rms_dbfs=rms_dbfs,
+        peak_dbfs=peak_dbfs,
+        clipping_ratio=clipping_ratio,
+        nonsilent=_complement_spans(silent_ranges, duration_ms),
+    )
+
+
+def pronunciation_metrics_from_stats(
+    stats: FrameEnergyStats,
     transcript: Optional[str] = None,
     level: Optional[str] = None,
 ) -> Dict[str, Any]:
-    """Compute lightweight pronunciation metrics using pydub.
-
-    Returns keys:
-    - duration_sec, speaking_time_sec, speech_ratio, pause_ratio
-    - rms_dbfs, peak_dbfs, clipping_ratio
-    - words, wps, wpm (if transcript provided)
-    - suggested_escalation (bool), reasons (list)
-    - pronunciation_score (0-100), pronunciation_reasons (list[str])
-    - word_scores (optional, None for MVP)
-    """
-    try:
-        audio = AudioSegment.from_file(file_path)
-    except Exception as e:
-        _logger.error("Failed to load audio for metrics: %s", e, exc_info=True)
-        raise
-
-    duration_ms = max(0, len(audio))
+    """Turn frame-energy stats into the metrics dict returned by analyze_pronunciation_metrics."""
+    duration_ms = max(0, stats.duration_ms)
     duration_sec = duration_ms / 1000.0 if duration_ms else 0.0
 
-    # Non-silent detection
-    dbfs = _safe_dbfs(audio.dBFS)
-    silence_thresh = dbfs - 16.0
-    try:
-        nonsilent = detect_nonsilent(audio, min_silence_len=200, silence_thresh=silence_thresh)
-    except Exception:
-        nonsilent = []
-    speaking_ms = sum(max(0, end - start) for start, end in nonsilent)
+    speaking_ms = stats.speaking_ms
     speaking_time_sec = speaking_ms / 1000.0
     speech_ratio = (speaking_ms / duration_ms) if duration_ms else 0.0
     pause_ratio = max(0.0, 1.0 - speech_ratio)
 
-    # Loudness & clipping
-    rms_dbfs = _safe_dbfs(audio.dBFS)
-    peak_dbfs = _safe_dbfs(audio.max_dBFS)
-    samples = audio.get_array_of_samples()
-    total_samples = max(1, len(samples))
-    # Max possible amplitude for sample width
-    max_possible = float(2 ** (8 * audio.sample_width - 1) - 1)
-    threshold = 0.98 * max_possible
-    clipped = 0
-    try:
-        for s in samples:
-            if abs(int(s)) >= threshold:
-                clipped += 1
-    except Exception:
-        clipped = 0
-    clipping_ratio = clipped / total_samples
+    rms_dbfs = stats.rms_dbfs
+    peak_dbfs = stats.peak_dbfs
+    clipping_ratio = stats.clipping_ratio
 
     # Words per second/minute from transcript (optional)
     words = None
@@ -350,3 +670,37 @@ def analyze_pronunciation_metrics(
         "pronunciation_reasons": pron_reasons,
         "word_scores": word_scores,
     }
+
+
+def analyze_pronunciation_metrics(
+    file_path: str,
+    transcript: Optional[str] = None,
+    level: Optional[str] = None,
+    decoded: Optional[DecodedAudio] = None,
+) -> Dict[str, Any]:
+    """Compute lightweight pronunciation metrics from an audio file.
+
+    Returns keys:
+    - duration_sec, speaking_time_sec, speech_ratio, pause_ratio
+    - rms_dbfs, peak_dbfs, clipping_ratio
+    - words, wps, wpm (if transcript provided)
+    - suggested_escalation (bool), reasons (list)
+    - pronunciation_score (0-100), pronunciation_reasons (list[str])
+    - word_scores (optional, None for MVP)
+
+    Pass ``decoded`` when the caller already holds the PCM to skip decoding the file again.
+    """
+    if decoded is None:
+        try:
+            decoded = load_decoded_audio(file_path)
+        except Exception as e:
+            _logger.error("Failed to load audio for metrics: %s", e, exc_info=True)
+            raise
+
+    stats = compute_frame_energy(
+        decoded.samples,
+        frame_rate=decoded.frame_rate,
+        channels=decoded.channels,
+        sample_width=decoded.sample_width,
+    )
+    return pronunciation_metrics_from_stats(stats, transcript=transcript, level=level)
@@ -0,0 +1,166 @@
+"""Header-only duration probes for the containers we produce and receive (WAV, MP3, Ogg).
+
+None of these functions decode samples; they read the RIFF header, walk MPEG frame headers or
+read the last Ogg granule position. They return ``None`` when the container is not recognized
+so the caller can fall back to a full pydub decode.
+"""
+
+import logging
+import os
+import struct
+from typing import Optional
+
+_logger = logging.getLogger(__name__)
+
+_MP3_BITRATES = {
+    # (version_bits, layer_bits) -> kbps table indexed by the 4-bit bitrate index
+    (3, 1): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 0],  # MPEG1 Layer III
+    (3, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384, 0],  # MPEG1 Layer II
+    (3, 3): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448, 0],  # MPEG1 Layer I
+    "v2_l1": [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256, 0],
+    "v2_l23": [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160, 0],
+}
+_MP3_SAMPLE_RATES = {3: [44100, 48000, 32000], 2: [22050, 24000, 16000], 0: [11025, 12000, 8000]}
+
+
+def probe_wav_duration(data: bytes, file_size: int) -> Optional[float]:
+    """Duration from the RIFF ``fmt `` and ``data`` chunks (``data`` may be a header prefix)."""
+    if len(data) < 12 or data[:4] not in (b"RIFF", b"RF64") or data[8:12] != b"WAVE":
+        return None
+    pos = 12
+    byte_rate = 0
+    while pos + 8 <= len(data):
+        chunk_id = data[pos : pos + 4]
+        (chunk_size,) = struct.unpack_from("<I", data, pos + 4)
+        body = pos + 8
+        if chunk_id == b"fmt " and body + 16 <= len(data):
+            _, _, _, byte_rate, _, _ = struct.unpack_from("<HHIIHH", data, body)
+        elif chunk_id == b"data":
+            if not byte_rate:
+                return None
+            # Streamed WAVs (e.g. progressive TTS output) carry a placeholder size; trust the file length
+            available = max(0, file_size - body)
+            if chunk_size == 0 or chunk_size == 0xFFFFFFFF or chunk_size > available:
+                chunk_size = available
+            return chunk_size / float(byte_rate)
+        pos = body + chunk_size + (chunk_size & 1)
+    return None
+
+
+def _mp3_frame(data: bytes, pos: int):
+    """Return (frame_length, samples, sample_rate) for a valid MPEG audio frame header at ``pos``."""
+    if pos + 4 > len(data) or data[pos] != 0xFF or (data[pos + 1] & 0xE0) != 0xE0:
+        return None
+    version = (data[pos + 1] >> 3) & 0x03
+    layer = (data[pos + 1] >> 1) & 0x03
+    bitrate_idx = (data[pos + 2] >> 4) & 0x0F
+    sr_idx = (data[pos + 2] >> 2) & 0x03
+    padding = (data[pos + 2] >> 1) & 0x01
+    if version == 1 or layer == 0 or sr_idx == 3 or bitrate_idx in (0, 15):
+        return None
+    if version == 3:
+        kbps = _MP3_BITRATES[(3, layer)][bitrate_idx]
+    else:
+        kbps = _MP3_BITRATES["v2_l1" if layer == 3 else "v2_l23"][bitrate_idx]
+    sample_rate = _MP3_SAMPLE_RATES[version][sr_idx]
+    if layer == 3:  # Layer I
+        return (12 * kbps * 1000 // sample_rate + padding) * 4, 384, sample_rate
+    if layer == 1 and version != 3:  # Layer III, MPEG2/2.5
+        return 72 * kbps * 1000 // sample_rate + padding, 576, sample_rate
+    return 144 * kbps * 1000 // sample_rate + padding, 1152, sample_rate
+
+
+def probe_mp3_duration(data: bytes) -> Optional[float]:
+    """Sum samples over MPEG frame headers; payloads are skipped, never decoded."""
+    pos = 0
+    if data[:3] == b"ID3" and len(data) >= 10:
+        size = data[6] << 21 | data[7] << 14 | data[8] << 7 | data[9]
+        pos = 10 + size + (10 if data[5] & 0x10 else 0)
+    # Resync to the first frame header (some encoders pad after the ID3 tag)
+    limit = min(len(data), pos + 64 * 1024)
+    while pos < limit and _mp3_frame(data, pos) is None:
+        pos += 1
+    total_samples = 0
+    sample_rate = 0
+    frames = 0
+    while pos < len(data):
+        frame = _mp3_frame(data, pos)
+        if frame is None:
+            break
+        length, samples, sample_rate = frame
+        if length <= 0:
+            break
+        # A leading Xing/Info/VBRI frame is metadata that decoders skip
+        if frames or not any(tag in data[pos : pos + min(length, 64)] for tag in (b"Xing", b"Info", b"VBRI")):
+            total_samples += samples
+        frames += 1
+        pos += length
+    if not frames or not sample_rate:
+        return None
+    return total_samples / float(sample_rate)
+
+
+def probe_ogg_duration(data: bytes, tail: bytes) -> Optional[float]:
+    """Last page granule position divided by the Vorbis/Opus rate from the identification header."""
+    if data[:4] != b"OggS" or len(data) < 28:
+        return None
+    n_segments = data[26]
+    packet = data[27 + n_segments :]
+    pre_skip = 0
+    if packet.startswith(b"\x01vorbis") and len(packet) >= 16:
+        (rate,) = struct.unpack_from("<I", packet, 12)
+    elif packet.startswith(b"OpusHead") and len(packet) >= 12:
+        # Opus granule positions always count 48 kHz samples
+        rate = 48000
+        (pre_skip,) = struct.unpack_from("<H", packet, 10)
+    else:
+        return None
+    last = tail.rfind(b"OggS")
+    if last < 0 or last + 14 > len(tail) or not rate:
+        return None
+    (granule,) = struct.unpack_from("<q", tail, last + 6)
+    if granule < 0:
+        return None
+    return max(0, granule - pre_skip) / float(rate)
+
+
+def sniff_upload_format(file_path: str) -> Optional[str]:
+    """``"wav"`` for RIFF PCM, ``"webm"`` for EBML/WebM, else ``None`` (the file needs converting before upload)."""
+    try:
+        with open(file_path, "rb") as f:
+            head = f.read(4096)
+    except OSError:
+        return None
+    if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+        pos = 12
+        while pos + 8 <= len(head):
+            chunk_id = head[pos : pos + 4]
+            (chunk_size,) = struct.unpack_from("<I", head, pos + 4)
+            if chunk_id == b"fmt " and pos + 10 <= len(head):
+                (fmt_tag,) = struct.unpack_from("<H", head, pos + 8)
+                # Plain or extensible integer PCM; float/ADPCM WAVs are re-encoded
+                return "wav" if fmt_tag in (1, 0xFFFE) else None
+            pos += 8 + chunk_size + (chunk_size & 1)
+        return None
+    if head[:4] == b"\x1a\x45\xdf\xa3" and b"webm" in head[:64]:
+        return "webm"
+    return None
+
+
+def probe_duration(file_path: str) -> Optional[float]:
+    """Best-effort container duration in seconds without decoding; ``None`` if unknown/unparseable."""
+    try:
+        file_size = os.path.getsize(file_path)
+        with open(file_path, "rb") as f:
+            head = f.read(4096)
+            if head[:4] in (b"RIFF", b"RF64"):
+                return probe_wav_duration(head, file_size)
+            if head[:4] == b"OggS":
+                f.seek(max(0, file_size - 65536))
+                return probe_ogg_duration(head, f.read())
+            if head[:3] == b"ID3" or (len(head) > 1 and head[0] == 0xFF and (head[1] & 0xE0) == 0xE0):
+                f.seek(0)
+                return probe_mp3_duration(f.read())
+    except Exception as e:
+        _logger.debug("Duration probe failed for %s: %s", file_path, e)
+    return None
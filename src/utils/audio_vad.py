@@ -0,0 +1,105 @@
+"""Local voice-activity gate and upload preparation for transcription.
+
+Runs on the already-decoded PCM (see ``DecodedAudio``): rejects clips without speech before any
+network call, trims long leading/trailing silence and downmixes/resamples to 16 kHz mono so the
+upload is as small as the transcription model allows.
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from src.utils.audio import DecodedAudio
+
+
+@dataclass
+class VadResult:
+    has_speech: bool
+    speech_ms: int
+    start_ms: int
+    end_ms: int
+    duration_ms: int
+
+
+def detect_speech(
+    decoded: DecodedAudio,
+    frame_ms: int = 20,
+    threshold_dbfs: Optional[float] = None,
+    min_speech_ms: Optional[int] = None,
+) -> VadResult:
+    """Energy VAD: a frame is speech when its RMS is above ``threshold_dbfs`` and clearly above the noise floor."""
+    threshold_dbfs = float(os.getenv("VAD_THRESHOLD_DBFS", "-45")) if threshold_dbfs is None else threshold_dbfs
+    min_speech_ms = int(os.getenv("VAD_MIN_SPEECH_MS", "200")) if min_speech_ms is None else min_speech_ms
+
+    channels = max(1, decoded.channels)
+    samples = decoded.samples
+    n_frames_total = samples.size // channels
+    duration_ms = int(round(1000 * n_frames_total / decoded.frame_rate)) if decoded.frame_rate else 0
+    hop = max(1, int(decoded.frame_rate * frame_ms / 1000))
+    n_windows = n_frames_total // hop
+    if n_windows == 0:
+        return VadResult(False, 0, 0, 0, duration_ms)
+
+    x = samples[: n_windows * hop * channels].astype(np.float64).reshape(n_windows, hop * channels)
+    rms = np.sqrt(np.mean(np.square(x), axis=1))
+    max_amp = float(2 ** (8 * decoded.sample_width - 1))
+    with np.errstate(divide="ignore"):
+        db = np.where(rms > 0, 20.0 * np.log10(rms / max_amp), -90.0)
+    # Adaptive floor: steady background hum above the absolute threshold is not speech, but the
+    # floor is capped so loud continuous input is never rejected (a false "empty" costs a re-record)
+    noise_floor = float(np.percentile(db, 10))
+    speech = db > max(threshold_dbfs, min(noise_floor + 6.0, threshold_dbfs + 20.0))
+    idx = np.flatnonzero(speech)
+    speech_ms = int(idx.size * frame_ms)
+    if speech_ms < min_speech_ms:
+        return VadResult(False, speech_ms, 0, 0, duration_ms)
+    return VadResult(True, speech_ms, int(idx[0] * frame_ms), int((idx[-1] + 1) * frame_ms), duration_ms)
+
+
+def _to_mono_float(decoded: DecodedAudio) -> np.ndarray:
+    channels = max(1, decoded.channels)
+    x = decoded.samples.astype(np.float64)
+    n = x.size // channels
+    return x[: n * channels].reshape(n, channels).mean(axis=1)
+
+
+def _resample(x: np.ndarray, src_rate: int, dst_rate: int) -> np.ndarray:
+    if src_rate == dst_rate or x.size == 0:
+        return x
+    if dst_rate < src_rate:
+        # Box low-pass before decimating to limit aliasing (speech content is well below 8 kHz)
+        width = int(np.ceil(src_rate / dst_rate))
+        if width > 1:
+            x = np.convolve(x, np.ones(width) / width, mode="same")
+    n_out = int(round(x.size * dst_rate / src_rate))
+    t_out = np.arange(n_out) * (src_rate / dst_rate)
+    return np.interp(t_out, np.arange(x.size), x)
+
+
+def prepare_for_transcription(
+    decoded: DecodedAudio,
+    vad: VadResult,
+    target_rate: Optional[int] = None,
+    pad_ms: Optional[int] = None,
+) -> DecodedAudio:
+    """Trim to the speech region (plus padding), downmix to mono and resample to ``target_rate`` as 16-bit PCM."""
+    target_rate = int(os.getenv("TRANSCRIBE_SAMPLE_RATE", "16000")) if target_rate is None else target_rate
+    pad_ms = int(os.getenv("VAD_PAD_MS", "250")) if pad_ms is None else pad_ms
+
+    mono = _to_mono_float(decoded)
+    start = max(0, int((vad.start_ms - pad_ms) * decoded.frame_rate / 1000))
+    end = min(mono.size, int((vad.end_ms + pad_ms) * decoded.frame_rate / 1000))
+    mono = mono[start:end] if end > start else mono
+
+    # Normalize to 16-bit regardless of the source width
+    scale = 32768.0 / float(2 ** (8 * decoded.sample_width - 1))
+    out = np.clip(np.round(_resample(mono, decoded.frame_rate, target_rate) * scale), -32768, 32767)
+    return DecodedAudio(
+        path=decoded.path,
+        pcm=out.astype("<i2").tobytes(),
+        frame_rate=target_rate,
+        channels=1,
+        sample_width=2,
+    )
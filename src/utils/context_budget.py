@@ -0,0 +1,180 @@
+import logging
+import os
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+_logger = logging.getLogger(__name__)
+if not _logger.handlers:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+# Chat format overhead per message (role, separators), as counted by OpenAI for chat completions
+MESSAGE_OVERHEAD_TOKENS = 4
+TRIM_MARKER = " … [trimmed] … "
+
+_DEFAULT_BUDGETS = {"speaking": 1200, "writing": 6000}
+_DEFAULT_MAX_MESSAGE_TOKENS = {"speaking": 400, "writing": 1200}
+
+
+def _text_of(content: Any) -> str:
+    """Text the model sees for a message content (strings, multimodal part lists; file tuples count as empty)."""
+    if content is None:
+        return ""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return " ".join(str(part.get("text") or "") if isinstance(part, dict) else str(part) for part in content)
+    if isinstance(content, tuple):
+        return ""
+    return str(content)
+
+
+def estimate_tokens(content: Any) -> int:
+    """Fast local token estimate: ~4 characters per token for English text (no tokenizer dependency)."""
+    text = _text_of(content)
+    return (len(text) + 3) // 4
+
+
+def message_tokens(message: Dict[str, Any]) -> int:
+    return estimate_tokens(message.get("content")) + MESSAGE_OVERHEAD_TOKENS
+
+
+def _env_key(value: str) -> str:
+    return re.sub(r"[^A-Z0-9]+", "_", value.upper()).strip("_")
+
+
+def _int_setting(prefix: str, mode: str, model: Optional[str], default: int) -> int:
+    """``PREFIX_MODE_MODEL`` > ``PREFIX_MODE`` > ``PREFIX`` > default."""
+    names = [f"{prefix}_{_env_key(mode)}"]
+    if model:
+        names.insert(0, f"{prefix}_{_env_key(mode)}_{_env_key(model)}")
+    names.append(prefix)
+    for name in names:
+        value = os.getenv(name)
+        if value:
+            return int(value)
+    return default
+
+
+def context_budget(mode: str, model: Optional[str] = None) -> int:
+    """Input token budget for a request (CONTEXT_BUDGET_TOKENS[_MODE[_MODEL]])."""
+    return _int_setting("CONTEXT_BUDGET_TOKENS", mode, model, _DEFAULT_BUDGETS.get(mode, 4000))
+
+
+def max_message_tokens(mode: str, model: Optional[str] = None) -> int:
+    """Cap for any single older message (CONTEXT_MAX_MESSAGE_TOKENS[_MODE[_MODEL]])."""
+    return _int_setting("CONTEXT_MAX_MESSAGE_TOKENS", mode, model, _DEFAULT_MAX_MESSAGE_TOKENS.get(mode, 800))
+
+
+def trim_to_tokens(text: str, max_tokens: int) -> str:
+    """Shorten ``text`` to about ``max_tokens``, keeping its beginning and end."""
+    max_chars = max(0, max_tokens) * 4
+    if len(text) <= max_chars:
+        return text
+    keep = max(0, max_chars - len(TRIM_MARKER))
+    head = (keep * 2) // 3
+    return text[:head] + TRIM_MARKER + text[len(text) - (keep - head) :]
+
+
+def _trimmed(message: Dict[str, Any], max_tokens: int) -> Optional[Dict[str, Any]]:
+    """Copy of ``message`` with its text content trimmed, or None when it already fits / is not text."""
+    content = message.get("content")
+    if not isinstance(content, str) or estimate_tokens(content) <= max_tokens:
+        return None
+    return {**message, "content": trim_to_tokens(content, max_tokens)}
+
+
+@dataclass
+class ContextResult:
+    messages: List[Dict[str, Any]]
+    tokens: int
+    turns_sent: int
+    turns_dropped: int
+    turns_trimmed: int
+    # More tokens than the budget (a latest turn that could not be trimmed enough, or ``trim_latest=False``)
+    over_budget: bool = False
+
+
+def assemble_context(
+    system_prompt: str,
+    turns: List[Dict[str, Any]],
+    budget_tokens: int,
+    summary: Optional[str] = None,
+    max_turn_tokens: Optional[int] = None,
+    trim_latest: bool = True,
+) -> ContextResult:
+    """Fit the system prompt, running summary and the most recent turns into ``budget_tokens``.
+
+    Turns are taken newest first; older turns longer than ``max_turn_tokens`` are trimmed, and turns that
+    no longer fit are dropped. The latest turn is always sent, trimmed to the remaining budget if needed;
+    with ``trim_latest=False`` it is sent whole, every older turn being dropped first, and ``over_budget``
+    tells the caller when it did not fit.
+    Order of the result: summary (as a system message), system prompt, turns in chronological order.
+    """
+    head: List[Dict[str, Any]] = []
+    if summary:
+        head.append(
+            {
+                "role": "system",
+                "content": "Conversation summary so far (for continuity; do not repeat details, use as context only):\n"
+                + summary,
+            }
+        )
+    head.append({"role": "system", "content": system_prompt})
+    used = sum(message_tokens(m) for m in head)
+    remaining = budget_tokens - used
+
+    selected: List[Dict[str, Any]] = []
+    trimmed = 0
+    for index, turn in enumerate(reversed(turns)):
+        latest = index == 0
+        candidate = turn
+        if max_turn_tokens is not None and not latest:
+            shorter = _trimmed(turn, max_turn_tokens)
+            if shorter is not None:
+                candidate, trimmed = shorter, trimmed + 1
+        cost = message_tokens(candidate)
+        if cost > remaining:
+            if not latest:
+                break
+            if not trim_latest:
+                selected.append(candidate)
+                remaining -= cost
+                used += cost
+                continue
+            floor = max_turn_tokens if max_turn_tokens is not None else budget_tokens // 4
+            shorter = _trimmed(turn, max(remaining - MESSAGE_OVERHEAD_TOKENS, floor))
+            if shorter is not None:
+                candidate, trimmed = shorter, trimmed + 1
+                cost = message_tokens(candidate)
+        selected.append(candidate)
+        remaining -= cost
+        used += cost
+
+    selected.reverse()
+    return ContextResult(
+        messages=head + selected,
+        tokens=used,
+        turns_sent=len(selected),
+        turns_dropped=len(turns) - len(selected),
+        turns_trimmed=trimmed,
+        over_budget=used > budget_tokens,
+    )
+
+
+def record_context(telemetry: Any, mode: str, result: ContextResult) -> None:
+    """Log and record (best-effort) the estimated tokens sent for one request."""
+    _logger.info(
+        "LLM context (%s): ~%d tokens, %d turns sent, %d dropped, %d trimmed",
+        mode,
+        result.tokens,
+        result.turns_sent,
+        result.turns_dropped,
+        result.turns_trimmed,
+    )
+    if telemetry:
+        try:
+            telemetry.observe_hist("context_tokens", float(result.tokens), {"mode": mode})
+            telemetry.observe_hist("context_turns_dropped", float(result.turns_dropped), {"mode": mode})
+        except Exception:
+            pass
@@ -0,0 +1,67 @@
+import html
+import os
+import uuid
+from typing import Any, Dict, List
+
+# Client-side reveal (assets/playback_sync.js): the server sends the whole reply at once and the browser
+# reveals the words in step with the audio element, so no worker thread waits for playback to finish.
+# The reply stays plain Markdown in the chat (rendered and copied as such); its timing travels separately,
+# as an empty element in a hidden HTML component that points at the chatbot message to reveal.
+SYNC_CLASS = "playback-sync"
+# Key of a history message holding its reveal timing (server side only, the chatbot ignores it)
+SYNC_KEY = "playback_sync"
+# elem_id of the speaking tab's audio player, followed by the client script
+SPEAKING_AUDIO_ID = "audio-output-speaking"
+# elem_id of the speaking tab's chatbot, whose latest bot message is revealed
+SPEAKING_CHATBOT_ID = "chatbot-speaking"
+
+
+def sync_enabled() -> bool:
+    """SPEAKING_TEXT_SYNC=0 shows the whole reply text immediately instead of revealing it with the audio."""
+    return os.getenv("SPEAKING_TEXT_SYNC", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def word_offsets(text: str, duration_s: float) -> List[float]:
+    """Start time (seconds into the audio) of each word, spread over ``duration_s`` by word length.
+
+    Longer words take longer to say, so weighting by characters (plus one for the pause after each word)
+    tracks speech more closely than a fixed pace per word.
+    """
+    words = text.split()
+    if not words:
+        return []
+    weights = [len(w) + 1 for w in words]
+    total = float(sum(weights))
+    offsets = []
+    elapsed = 0
+    for weight in weights:
+        offsets.append(round(max(0.0, duration_s) * elapsed / total, 2))
+        elapsed += weight
+    return offsets
+
+
+def sync_timing(text: str, duration_s: float, played_s: float = 0.0) -> Dict[str, Any]:
+    """Reveal timing of a reply, stored on its history message under ``SYNC_KEY``.
+
+    ``played_s`` is how much of the audio already played when the message is sent (streamed replies).
+    """
+    return {
+        "id": uuid.uuid4().hex,
+        "duration": round(max(0.0, duration_s), 2),
+        "played": round(max(0.0, played_s), 2),
+        "times": word_offsets(text, duration_s),
+    }
+
+
+def sync_timing_html(timing: Dict[str, Any], audio_id: str = "", chatbot_id: str = "") -> str:
+    """Empty element carrying ``timing`` for the client script.
+
+    ``audio_id`` is the elem_id of the Gradio audio component to follow and ``chatbot_id`` that of the
+    chatbot whose latest bot message is revealed. Without the client script the reply shows in full.
+    """
+    times = ",".join(f"{t:g}" for t in timing["times"])
+    return (
+        f'<div class="{SYNC_CLASS}" data-sync-id="{html.escape(timing["id"])}" data-audio="{html.escape(audio_id)}" '
+        f'data-chatbot="{html.escape(chatbot_id)}" '
+        f'data-duration="{timing["duration"]:.2f}" data-played="{timing["played"]:.2f}" data-times="{times}"></div>'
+    )
@@ -5,3 +5,18 @@ from pathlib import Path
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def _isolated_openai_clients():
+    """Tests patch attributes on service.client; don't let pooled clients leak between tests."""
+    from src.infra.openai_clients import reset_client_registry
+    from src.services.openai_service import clear_key_validation_cache
+
+    reset_client_registry()
+    clear_key_validation_cache()
+    yield
+    reset_client_registry()
+    clear_key_validation_cache()
@@ -0,0 +1,222 @@
+import asyncio
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from src.core.speaking_tutor import SpeakingTutor
+from src.core.writing_tutor import WritingTutor
+from src.infra.streaming_manager import StreamingManager
+from src.infra.tts_cache import TTSCache
+
+
+class StubTelemetry:
+    def __init__(self) -> None:
+        self.counters: List[str] = []
+        self.events: List[str] = []
+
+    def inc_counter(self, name: str, labels: Optional[Dict[str, Any]] = None) -> None:
+        self.counters.append(name)
+
+    def observe_hist(self, name: str, value: float, labels: Optional[Dict[str, Any]] = None) -> None:
+        pass
+
+    def log_event(self, name: str, labels: Optional[Dict[str, Any]] = None) -> None:
+        self.events.append(name)
+
+
+class AsyncService:
+    """Scripted astream_chat_completion: each attempt plays the next script entry."""
+
+    model = "gpt-4o-mini"
+
+    def __init__(self, *scripts) -> None:
+        self.scripts = list(scripts)
+        self.calls = 0
+        self.closed = 0
+
+    async def astream_chat_completion(self, messages, temperature, max_tokens):
+        self.sent = messages
+        script = self.scripts[min(self.calls, len(self.scripts) - 1)]
+        self.calls += 1
+        try:
+            for item in script:
+                if isinstance(item, Exception):
+                    raise item
+                if isinstance(item, float):
+                    await asyncio.sleep(item)
+                    continue
+                yield item
+        finally:
+            self.closed += 1
+
+
+async def _collect(agen) -> List[str]:
+    return [ch async for ch in agen]
+
+
+def test_astream_yields_chunks_and_completes():
+    tel = StubTelemetry()
+    sm = StreamingManager(service=AsyncService(["Hello ", "world"]), telemetry=tel, retry_limit=1, backoff_ms=0)
+    assert asyncio.run(_collect(sm.astream_text(messages=[]))) == ["Hello ", "world"]
+    assert "stream_manager_completed_total" in tel.counters
+
+
+def test_astream_retries_before_first_chunk():
+    svc = AsyncService([RuntimeError("boom")], [], ["ok"])
+    sm = StreamingManager(service=svc, retry_limit=3, backoff_ms=1)
+    assert asyncio.run(_collect(sm.astream_text(messages=[]))) == ["ok"]
+    assert svc.calls == 3 and svc.closed == 3
+
+
+def test_astream_does_not_replay_after_partial_output():
+    svc = AsyncService(["partial", RuntimeError("dropped")], ["again"])
+    sm = StreamingManager(service=svc, retry_limit=3, backoff_ms=0, retry_mode="restart")
+    received: List[str] = []
+
+    async def run():
+        async for ch in sm.astream_text(messages=[]):
+            received.append(ch)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(run())
+    assert received == ["partial"] and svc.calls == 1
+
+
+def test_astream_inactivity_timeout():
+    tel = StubTelemetry()
+    svc = AsyncService(["a", 1.0, "b"])
+    sm = StreamingManager(service=svc, telemetry=tel, retry_limit=1, backoff_ms=0, timeout_ms=50)
+    with pytest.raises(TimeoutError):
+        asyncio.run(_collect(sm.astream_text(messages=[])))
+    assert "stream_manager_timeout" in tel.events
+    assert svc.closed == 1
+
+
+def test_task_cancel_closes_upstream():
+    tel = StubTelemetry()
+    svc = AsyncService(["a", 5.0, "b"])
+    sm = StreamingManager(service=svc, telemetry=tel, retry_limit=1, backoff_ms=0)
+
+    async def run():
+        task = asyncio.create_task(_collect(sm.astream_text(messages=[])))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert svc.closed == 1
+    assert "stream_manager_cancelled_total" in tel.counters
+
+
+def test_writing_tutor_streams_on_event_loop():
+    class Parent:
+        openai_service = AsyncService(["Nice ", "essay."])
+        telemetry = None
+
+        def get_system_message(self, mode, level):
+            return "system"
+
+    parent = Parent()
+    tutor = WritingTutor(openai_service=parent.openai_service, tutor_parent=parent)
+
+    async def run():
+        return [[m["content"] for m in history] async for history, _ in tutor.generate_random_topic(level="B1")]
+
+    updates = asyncio.run(run())
+    assert updates[-1][-1] == "Nice essay."
+
+
+def test_speaking_text_fallback_streams_on_event_loop(monkeypatch):
+    class SpeakingService(AsyncService):
+        async def achat_multimodal(self, messages, max_tokens):
+            raise RuntimeError("no multimodal reply")
+
+        async def atext_to_speech(self, text):
+            raise RuntimeError("no TTS")
+
+    class Parent:
+        openai_service = SpeakingService(["Let's ", "talk."])
+        telemetry = StubTelemetry()
+
+        def get_system_message(self, mode, level=None):
+            return "system"
+
+    def no_thread(*args, **kwargs):
+        raise AssertionError("the fallback must not start a thread")
+
+    monkeypatch.setattr("src.core.speaking_tutor.threading.Thread", no_thread)
+    monkeypatch.setenv("STREAM_FLUSH_MS", "0")
+    parent = Parent()
+    tutor = SpeakingTutor(openai_service=parent.openai_service, tutor_parent=parent)
+
+    async def run():
+        history = [{"role": "user", "content": "Hi"}]
+        return [[m["content"] for m in chat] async for chat, _, _ in tutor.handle_bot_response(history=history)]
+
+    updates = asyncio.run(run())
+    assert updates[-1][-1] == "Let's talk."
+    assert "stream_fallback_completed_total" in parent.telemetry.counters
+    assert parent.openai_service.closed == 1
+
+
+def test_writing_essay_longer_than_the_budget_is_sent_whole(monkeypatch, caplog):
+    monkeypatch.setenv("CONTEXT_BUDGET_TOKENS_WRITING", "500")
+    telemetry = StubTelemetry()
+
+    class Parent:
+        openai_service = AsyncService(["Long ", "essay."])
+
+        def get_system_message(self, mode, level):
+            return "system"
+
+    parent = Parent()
+    parent.telemetry = telemetry
+    tutor = WritingTutor(openai_service=parent.openai_service, tutor_parent=parent)
+    essay = " ".join(f"sentence {i} of a long essay." for i in range(400))
+    history = [{"role": "user", "content": "old essay"}, {"role": "assistant", "content": "old feedback"}]
+
+    async def run():
+        return [h async for h, _ in tutor.process_input(essay, history, level="B1", writing_type="Essay")]
+
+    with pytest.warns(UserWarning, match="context budget"):
+        updates = asyncio.run(run())
+    assert updates[-1][-1]["content"] == "Long essay."
+    sent = parent.openai_service.sent
+    assert [m["role"] for m in sent] == ["system", "user"]  # earlier essays dropped, not the new one
+    assert sent[-1]["content"].endswith(essay)
+    assert "context_over_budget_total" in telemetry.counters
+    assert "exceeds CONTEXT_BUDGET_TOKENS_WRITING" in caplog.text
+
+
+def test_tts_cache_async_coalesces(tmp_path):
+    cache = TTSCache(base_dir=str(tmp_path))
+    calls = {"n": 0}
+
+    async def synthesize() -> bytes:
+        calls["n"] += 1
+        await asyncio.sleep(0.05)
+        return b"audio"
+
+    async def run():
+        return await asyncio.gather(
+            *[cache.aget_or_create("hi", "tts-1", "alloy", "mp3", synthesize) for _ in range(5)]
+        )
+
+    assert asyncio.run(run()) == [b"audio"] * 5
+    assert calls["n"] == 1
+    assert asyncio.run(cache.aget_or_create("hi", "tts-1", "alloy", "mp3", synthesize)) == b"audio"
+    assert calls["n"] == 1
+
+
+def test_astream_resumes_after_partial_output():
+    class ResumeService(AsyncService):
+        async def astream_chat_completion(self, messages, temperature, max_tokens):
+            self.last_messages = messages
+            async for item in super().astream_chat_completion(messages, temperature, max_tokens):
+                yield item
+
+    svc = ResumeService(["Good morning, ", RuntimeError("dropped")], ["everyone!"])
+    sm = StreamingManager(service=svc, retry_limit=2, backoff_ms=0)
+    assert "".join(asyncio.run(_collect(sm.astream_text(messages=[])))) == "Good morning, everyone!"
+    assert svc.calls == 2 and svc.last_messages[-2]["content"] == "Good morning, "
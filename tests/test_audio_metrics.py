@@ -0,0 +1,92 @@
+import wave
+from pathlib import Path
+
+import numpy as np
+import pytest
+from pydub import AudioSegment
+from pydub.silence import detect_nonsilent
+
+from src.utils.audio import analyze_pronunciation_metrics, compute_frame_energy
+
+
+def _write_wav(path: Path, samples: np.ndarray, frame_rate: int = 16000, channels: int = 1) -> Path:
+    with wave.open(str(path), "wb") as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(2)
+        wf.setframerate(frame_rate)
+        wf.writeframes(samples.astype("<i2").tobytes())
+    return path
+
+
+def _speech_like(frame_rate: int = 16000, seconds: float = 4.0) -> np.ndarray:
+    """Alternating tone bursts and near-silence, with a few clipped samples."""
+    t = np.arange(int(frame_rate * seconds)) / frame_rate
+    signal = 8000 * np.sin(2 * np.pi * 220 * t)
+    gate = (np.floor(t / 0.7) % 2 == 0).astype(float)
+    rng = np.random.default_rng(0)
+    out = signal * gate + rng.normal(0, 20, t.size)
+    out[100:140] = 32767
+    return np.clip(out, -32768, 32767)
+
+
+def _pydub_reference(path: Path):
+    audio = AudioSegment.from_file(str(path))
+    spans = detect_nonsilent(audio, min_silence_len=200, silence_thresh=audio.dBFS - 16.0)
+    samples = audio.get_array_of_samples()
+    clipped = sum(1 for s in samples if abs(int(s)) >= 0.98 * (2**15 - 1))
+    return audio, spans, clipped / len(samples)
+
+
+@pytest.mark.parametrize("frame_rate,channels", [(16000, 1), (44100, 2)])
+def test_frame_energy_matches_pydub(tmp_path: Path, frame_rate: int, channels: int):
+    mono = _speech_like(frame_rate=frame_rate)
+    samples = np.repeat(mono, channels) if channels > 1 else mono
+    path = _write_wav(tmp_path / "speech.wav", samples, frame_rate=frame_rate, channels=channels)
+    audio, ref_spans, ref_clip = _pydub_reference(path)
+
+    stats = compute_frame_energy(
+        np.frombuffer(audio.raw_data, dtype="<i2"),
+        frame_rate=audio.frame_rate,
+        channels=audio.channels,
+        sample_width=audio.sample_width,
+    )
+
+    assert stats.duration_ms == len(audio)
+    assert stats.nonsilent == [tuple(s) for s in ref_spans]
+    assert stats.rms_dbfs == pytest.approx(audio.dBFS, abs=1e-6)
+    assert stats.peak_dbfs == pytest.approx(audio.max_dBFS, abs=1e-6)
+    assert stats.clipping_ratio == pytest.approx(ref_clip)
+
+
+def test_analyze_pronunciation_metrics_keys_and_silence(tmp_path: Path):
+    path = _write_wav(tmp_path / "speech.wav", _speech_like())
+    metrics = analyze_pronunciation_metrics(str(path), transcript="hello there my friend", level="B1")
+
+    for key in (
+        "duration_sec",
+        "speaking_time_sec",
+        "speech_ratio",
+        "pause_ratio",
+        "rms_dbfs",
+        "peak_dbfs",
+        "clipping_ratio",
+        "words",
+        "wps",
+        "wpm",
+        "level",
+        "suggested_escalation",
+        "reasons",
+        "pronunciation_score",
+        "pronunciation_reasons",
+        "word_scores",
+    ):
+        assert key in metrics
+    assert metrics["words"] == 4
+    assert 0.0 < metrics["speech_ratio"] < 1.0
+    assert 0 <= metrics["pronunciation_score"] <= 100
+
+    silent = _write_wav(tmp_path / "silent.wav", np.zeros(16000))
+    silent_metrics = analyze_pronunciation_metrics(str(silent))
+    assert silent_metrics["rms_dbfs"] == -90.0
+    assert silent_metrics["speaking_time_sec"] == 0.0
+    assert "low_speech_ratio" in silent_metrics["pronunciation_reasons"]
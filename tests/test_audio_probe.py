@@ -0,0 +1,79 @@
+import struct
+import wave
+from pathlib import Path
+
+import pytest
+
+from src.utils.audio import get_audio_duration
+from src.utils.audio_probe import probe_duration, sniff_upload_format
+
+
+def _write_wav(path: Path, seconds: float, frame_rate: int = 24000, channels: int = 1) -> Path:
+    with wave.open(str(path), "wb") as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(2)
+        wf.setframerate(frame_rate)
+        wf.writeframes(b"\x00\x00" * channels * int(frame_rate * seconds))
+    return path
+
+
+def _ogg_page(granule: int, payload: bytes, header_type: int = 0) -> bytes:
+    segments = bytes([len(payload)])
+    return b"OggS" + struct.pack("<BBqIIIB", 0, header_type, granule, 1, 0, 0, 1) + segments + payload
+
+
+def test_probe_wav_matches_header(tmp_path: Path):
+    path = _write_wav(tmp_path / "reply.wav", seconds=2.5, channels=2)
+    assert probe_duration(str(path)) == pytest.approx(2.5)
+    assert get_audio_duration(str(path)) == pytest.approx(2.5)
+
+
+def test_probe_wav_with_streaming_placeholder_size(tmp_path: Path):
+    path = _write_wav(tmp_path / "stream.wav", seconds=1.0, frame_rate=16000)
+    raw = bytearray(path.read_bytes())
+    data_at = raw.index(b"data")
+    raw[data_at + 4 : data_at + 8] = b"\xff\xff\xff\xff"
+    path.write_bytes(bytes(raw))
+    assert probe_duration(str(path)) == pytest.approx(1.0)
+
+
+def test_probe_mp3_walks_frame_headers(tmp_path: Path):
+    # MPEG1 Layer III, 128 kbps, 44.1 kHz, no padding -> 417-byte frames of 1152 samples
+    header = bytes([0xFF, 0xFB, 0x90, 0x00])
+    frame = header + b"\x00" * (417 - 4)
+    id3 = b"ID3" + bytes([3, 0, 0, 0, 0, 0, 10]) + b"\x00" * 10
+    path = tmp_path / "reply.mp3"
+    path.write_bytes(id3 + frame * 100)
+    assert probe_duration(str(path)) == pytest.approx(100 * 1152 / 44100)
+
+
+def test_probe_ogg_vorbis_last_granule(tmp_path: Path):
+    ident = b"\x01vorbis" + struct.pack("<IBI", 0, 1, 22050) + b"\x00" * 16
+    path = tmp_path / "reply.ogg"
+    path.write_bytes(_ogg_page(0, ident, header_type=2) + _ogg_page(44100, b"\x00" * 8, header_type=4))
+    assert probe_duration(str(path)) == pytest.approx(2.0)
+
+
+def test_unknown_container_falls_back(tmp_path: Path):
+    path = tmp_path / "reply.bin"
+    path.write_bytes(b"not audio at all")
+    assert probe_duration(str(path)) is None
+    assert get_audio_duration(str(path)) == 0.0
+
+
+def test_sniff_upload_format(tmp_path: Path):
+    wav = tmp_path / "rec.wav"
+    with wave.open(str(wav), "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(16000)
+        wf.writeframes(b"\x00\x00" * 1600)
+    webm = tmp_path / "rec.webm"
+    webm.write_bytes(b"\x1a\x45\xdf\xa3\x9f\x42\x86\x81\x01\x42\x82\x84webm" + b"\x00" * 64)
+    float_wav = tmp_path / "float.wav"
+    float_wav.write_bytes(wav.read_bytes()[:20] + struct.pack("<H", 3) + wav.read_bytes()[22:])
+
+    assert sniff_upload_format(str(wav)) == "wav"
+    assert sniff_upload_format(str(webm)) == "webm"
+    assert sniff_upload_format(str(float_wav)) is None
+    assert sniff_upload_format(str(tmp_path / "missing.wav")) is None
@@ -0,0 +1,105 @@
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from src.core.speaking_tutor import SpeakingTutor
+from src.utils.audio import DecodedAudio
+from src.utils.audio_vad import detect_speech, prepare_for_transcription
+
+
+class StubTelemetry:
+    def __init__(self):
+        self.counters = []
+        self.hists = []
+
+    def inc_counter(self, name, labels=None):
+        self.counters.append(name)
+
+    def observe_hist(self, name, value, labels=None):
+        self.hists.append((name, value))
+
+
+def _decoded(samples: np.ndarray, frame_rate: int = 48000, channels: int = 1) -> DecodedAudio:
+    return DecodedAudio(
+        path="clip.wav",
+        pcm=samples.astype("<i2").tobytes(),
+        frame_rate=frame_rate,
+        channels=channels,
+        sample_width=2,
+    )
+
+
+def _clip(frame_rate: int = 48000, lead_s: float = 1.0, speech_s: float = 1.0, tail_s: float = 1.0) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    t = np.arange(int(frame_rate * speech_s)) / frame_rate
+    speech = 8000 * np.sin(2 * np.pi * 220 * t) * (0.6 + 0.4 * np.sin(2 * np.pi * 3 * t))
+    # ~-64 dBFS room noise around the voiced part
+    lead = rng.normal(0, 20, int(frame_rate * lead_s))
+    tail = rng.normal(0, 20, int(frame_rate * tail_s))
+    return np.concatenate([lead, speech, tail])
+
+
+def test_detects_speech_region():
+    vad = detect_speech(_decoded(_clip()))
+    assert vad.has_speech
+    assert vad.start_ms == pytest.approx(1000, abs=40)
+    assert vad.end_ms == pytest.approx(2000, abs=40)
+    assert vad.duration_ms == 3000
+
+
+def test_rejects_silence_and_steady_hum():
+    rng = np.random.default_rng(1)
+    assert not detect_speech(_decoded(rng.normal(0, 20, 48000))).has_speech
+    t = np.arange(48000) / 48000
+    hum = 150 * np.sin(2 * np.pi * 50 * t)  # ~-49 dBFS mains hum
+    assert not detect_speech(_decoded(hum), threshold_dbfs=-55).has_speech
+
+
+def test_prepare_trims_downmixes_and_resamples():
+    mono = _clip()
+    stereo = np.repeat(mono, 2)
+    decoded = _decoded(stereo, channels=2)
+    vad = detect_speech(decoded)
+    upload = prepare_for_transcription(decoded, vad, target_rate=16000, pad_ms=250)
+    assert upload.frame_rate == 16000 and upload.channels == 1 and upload.sample_width == 2
+    assert upload.duration_sec == pytest.approx(1.5, abs=0.05)
+    assert len(upload.pcm) < len(decoded.pcm) / 10
+    # Tone survives the box filter and resampling
+    assert np.abs(upload.samples).max() > 4000
+
+
+def _tutor(telemetry):
+    parent = MagicMock()
+    parent.telemetry = telemetry
+    parent.openai_service.transcribe_audio.return_value = "hello"
+    return SpeakingTutor(openai_service=parent.openai_service, tutor_parent=parent), parent
+
+
+def test_handle_transcription_skips_upload_without_speech(tmp_path, monkeypatch):
+    rng = np.random.default_rng(2)
+    path = tmp_path / "silence.wav"
+    _decoded(rng.normal(0, 20, 48000)).to_segment().export(str(path), format="wav")
+    telemetry = StubTelemetry()
+    tutor, parent = _tutor(telemetry)
+
+    history, _ = tutor.handle_transcription(history=[], audio_filepath=str(path))
+
+    parent.openai_service.transcribe_audio.assert_not_called()
+    assert "empty" in history[-1]["content"]
+    assert "transcribe_skipped_no_speech_total" in telemetry.counters
+
+
+def test_handle_transcription_uploads_trimmed_audio(tmp_path):
+    path = tmp_path / "speech.wav"
+    _decoded(_clip()).to_segment().export(str(path), format="wav")
+    telemetry = StubTelemetry()
+    tutor, parent = _tutor(telemetry)
+
+    history, _ = tutor.handle_transcription(history=[], audio_filepath=str(path))
+
+    assert history[-1] == {"role": "user", "content": "hello"}
+    sent = parent.openai_service.transcribe_audio.call_args.kwargs["decoded"]
+    assert sent.frame_rate == 16000 and sent.channels == 1
+    saved = dict(telemetry.hists)["transcribe_upload_bytes_saved"]
+    assert saved > 0
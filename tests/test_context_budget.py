@@ -0,0 +1,75 @@
+from src.utils.context_budget import (
+    TRIM_MARKER,
+    assemble_context,
+    context_budget,
+    estimate_tokens,
+    max_message_tokens,
+    message_tokens,
+)
+
+
+def _turns(n: int, chars: int):
+    return [{"role": "user" if i % 2 == 0 else "assistant", "content": f"{i}:" + "x" * chars} for i in range(n)]
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcd" * 10) == 10
+    assert estimate_tokens([{"type": "text", "text": "abcd"}]) == 1
+    assert estimate_tokens(("/tmp/a.wav", None)) == 0
+
+
+def test_recent_turns_fill_the_budget():
+    turns = _turns(40, 400)
+    result = assemble_context("system", turns, budget_tokens=1000)
+    assert result.tokens <= 1000
+    assert result.messages[0] == {"role": "system", "content": "system"}
+    assert result.messages[-1] is turns[-1]
+    assert result.turns_sent + result.turns_dropped == 40
+    assert result.messages[1:] == turns[-result.turns_sent :]
+
+
+def test_summary_comes_first_and_counts():
+    without = assemble_context("system", _turns(40, 400), budget_tokens=1000)
+    with_summary = assemble_context("system", _turns(40, 400), budget_tokens=1000, summary="s" * 800)
+    assert with_summary.messages[0]["content"].endswith("s" * 800)
+    assert with_summary.messages[1]["content"] == "system"
+    assert with_summary.turns_sent < without.turns_sent
+
+
+def test_oversized_turns_are_trimmed():
+    turns = [
+        {"role": "user", "content": "old essay " + "a" * 8000},
+        {"role": "assistant", "content": "feedback"},
+        {"role": "user", "content": "new essay " + "b" * 2000},
+    ]
+    result = assemble_context("system", turns, budget_tokens=3000, max_turn_tokens=200)
+    old, latest = result.messages[1], result.messages[-1]
+    assert TRIM_MARKER in old["content"] and old["content"].startswith("old essay")
+    assert message_tokens(old) <= 200 + 4
+    assert latest is turns[-1]  # the newest turn is kept whole when it fits
+    assert result.turns_trimmed == 1
+
+    tight = assemble_context("system", turns, budget_tokens=300, max_turn_tokens=200)
+    assert tight.turns_sent == 1 and TRIM_MARKER in tight.messages[-1]["content"]
+
+
+def test_latest_turn_can_be_kept_whole_over_budget():
+    turns = _turns(6, 400) + [{"role": "user", "content": "essay " + "e" * 8000}]
+    result = assemble_context("system", turns, budget_tokens=1000, max_turn_tokens=200, trim_latest=False)
+    assert result.messages[-1] is turns[-1]  # never trimmed
+    assert result.turns_sent == 1 and result.turns_dropped == 6  # older history goes first
+    assert result.over_budget and result.tokens > 1000
+
+    fits = assemble_context("system", turns[-3:-1], budget_tokens=1000, trim_latest=False)
+    assert not fits.over_budget
+
+
+def test_budget_settings_by_mode_and_model(monkeypatch):
+    assert context_budget("speaking") == 1200
+    monkeypatch.setenv("CONTEXT_BUDGET_TOKENS_WRITING", "5000")
+    monkeypatch.setenv("CONTEXT_BUDGET_TOKENS_WRITING_GPT_4O_MINI", "3000")
+    assert context_budget("writing") == 5000
+    assert context_budget("writing", "gpt-4o-mini") == 3000
+    monkeypatch.setenv("CONTEXT_MAX_MESSAGE_TOKENS", "250")
+    assert max_message_tokens("speaking") == 250
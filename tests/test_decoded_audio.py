@@ -0,0 +1,138 @@
+import asyncio
+import os
+import wave
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+import numpy as np
+import pytest
+from pydub import AudioSegment
+
+from src.utils import audio as audio_utils
+from src.utils.audio import (
+    analyze_pronunciation_metrics,
+    clear_decoded_audio_cache,
+    get_audio_duration,
+    load_decoded_audio,
+)
+from src.services.openai_service import OpenAIService
+
+
+def _write_wav(path: Path, seconds: float = 1.5, frame_rate: int = 16000) -> Path:
+    t = np.arange(int(frame_rate * seconds)) / frame_rate
+    with wave.open(str(path), "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(frame_rate)
+        wf.writeframes((6000 * np.sin(2 * np.pi * 200 * t)).astype("<i2").tobytes())
+    return path
+
+
+@pytest.fixture
+def count_decodes(monkeypatch):
+    clear_decoded_audio_cache()
+    calls = {"n": 0}
+    real = AudioSegment.from_file
+
+    def counting(*args, **kwargs):
+        calls["n"] += 1
+        return real(*args, **kwargs)
+
+    monkeypatch.setattr(audio_utils.AudioSegment, "from_file", counting)
+    yield calls
+    clear_decoded_audio_cache()
+
+
+def test_cache_reuses_decode_until_file_changes(tmp_path: Path, count_decodes):
+    path = _write_wav(tmp_path / "a.wav")
+
+    first = load_decoded_audio(str(path))
+    assert load_decoded_audio(str(path)) is first
+    assert get_audio_duration(str(path)) == pytest.approx(1.5)
+    analyze_pronunciation_metrics(str(path))
+    assert count_decodes["n"] == 1
+
+    _write_wav(path, seconds=2.0)
+    bumped = os.stat(path).st_mtime_ns + 1_000_000
+    os.utime(path, ns=(bumped, bumped))
+    assert load_decoded_audio(str(path)).duration_sec == pytest.approx(2.0)
+    assert count_decodes["n"] == 2
+
+
+def test_cache_is_bounded(tmp_path: Path, count_decodes, monkeypatch):
+    monkeypatch.setattr(audio_utils, "_decode_cache", audio_utils._DecodedAudioCache(max_entries=2, max_bytes=0))
+    paths = [str(_write_wav(tmp_path / f"{i}.wav", seconds=0.2)) for i in range(3)]
+    for p in paths:
+        load_decoded_audio(p)
+    assert len(audio_utils._decode_cache) == 2
+
+    # Oldest entry was evicted, the most recent ones are still hits
+    load_decoded_audio(paths[2])
+    assert count_decodes["n"] == 3
+    load_decoded_audio(paths[0])
+    assert count_decodes["n"] == 4
+
+
+def test_transcribe_uses_shared_decoded_audio(tmp_path: Path, count_decodes):
+    path = _write_wav(tmp_path / "rec.wav")
+    decoded = load_decoded_audio(str(path))
+
+    service = OpenAIService(api_key="test")
+    service.client.audio.transcriptions.create = MagicMock(return_value=MagicMock(text="hello"))
+
+    assert service.transcribe_audio(str(path), decoded=decoded) == "hello"
+    analyze_pronunciation_metrics(str(path), decoded=decoded)
+    assert count_decodes["n"] == 1
+    assert not os.path.exists(str(path) + ".wav")
+
+
+def _transcribe_service() -> OpenAIService:
+    service = OpenAIService(api_key="test")
+    service.client.audio.transcriptions.create = MagicMock(return_value=MagicMock(text="hello"))
+    return service
+
+
+def test_transcribe_passes_compatible_wav_through(tmp_path: Path, count_decodes):
+    path = _write_wav(tmp_path / "rec.wav")
+    service = _transcribe_service()
+
+    assert service.transcribe_audio(str(path)) == "hello"
+    name, body = service.client.audio.transcriptions.create.call_args.kwargs["file"]
+    assert name == "audio.wav" and body.name == str(path)
+    assert count_decodes["n"] == 0
+
+
+def test_transcribe_uploads_converted_audio_from_memory(tmp_path: Path, count_decodes):
+    path = _write_wav(tmp_path / "rec.wav")
+    decoded = load_decoded_audio(str(path))
+    service = _transcribe_service()
+
+    service.transcribe_audio(str(path), decoded=decoded)
+    name, body = service.client.audio.transcriptions.create.call_args.kwargs["file"]
+    assert name == "audio.wav" and body == decoded.to_wav_bytes()
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_transcribe_large_conversion_falls_back_to_disk(tmp_path: Path, count_decodes, monkeypatch):
+    monkeypatch.setenv("TRANSCRIBE_INMEMORY_MAX_MB", "0.01")
+    path = _write_wav(tmp_path / "rec.wav")
+    service = _transcribe_service()
+    seen = []
+    service.client.audio.transcriptions.create.side_effect = lambda **kw: (
+        seen.append(kw["file"][1].name) or MagicMock(text="hello")
+    )
+
+    assert service.transcribe_audio(str(path), decoded=load_decoded_audio(str(path))) == "hello"
+    assert seen == [str(path) + ".wav"]
+    assert not os.path.exists(str(path) + ".wav")
+
+
+def test_atranscribe_uploads_from_memory(tmp_path: Path, count_decodes):
+    path = _write_wav(tmp_path / "rec.wav")
+    decoded = load_decoded_audio(str(path))
+    service = OpenAIService(api_key="test")
+    service.async_client.audio.transcriptions.create = AsyncMock(return_value=MagicMock(text="hello"))
+
+    assert asyncio.run(service.atranscribe_audio(str(path), decoded=decoded)) == "hello"
+    name, body = service.async_client.audio.transcriptions.create.call_args.kwargs["file"]
+    assert name == "audio.wav" and body == decoded.to_wav_bytes()
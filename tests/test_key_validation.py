@@ -0,0 +1,57 @@
+import threading
+from unittest.mock import MagicMock
+
+from src.core.tutor import EnglishTutor
+from src.infra.openai_clients import get_client_registry
+from src.services.openai_service import OpenAIService
+
+
+def test_valid_key_is_cached_by_hash():
+    client = get_client_registry().get("sk-good")
+    client.models.list = MagicMock(return_value=[])
+
+    assert OpenAIService.is_key_valid("sk-good")
+    assert OpenAIService.is_key_valid("sk-good")
+    assert client.models.list.call_count == 1
+
+
+def test_transient_errors_are_not_cached(monkeypatch):
+    client = get_client_registry().get("sk-flaky")
+    client.models.list = MagicMock(side_effect=[ConnectionError("reset"), []])
+
+    assert not OpenAIService.is_key_valid("sk-flaky")
+    assert OpenAIService.is_key_valid("sk-flaky")
+
+
+def test_ttl_zero_disables_cache(monkeypatch):
+    monkeypatch.setenv("OPENAI_KEY_VALIDATION_TTL_S", "0")
+    client = get_client_registry().get("sk-good")
+    client.models.list = MagicMock(return_value=[])
+
+    OpenAIService.is_key_valid("sk-good")
+    OpenAIService.is_key_valid("sk-good")
+    assert client.models.list.call_count == 2
+
+
+def test_startup_does_not_wait_for_validation(monkeypatch, tmp_path):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-startup")
+    monkeypatch.setenv("OPENAI_HTTP_WARMUP", "0")
+    monkeypatch.setenv("TTS_CACHE_ENABLED", "0")
+    monkeypatch.setenv("TELEMETRY_DIR", str(tmp_path / "telemetry"))
+    monkeypatch.setenv("AUDIO_TMP_DIR", str(tmp_path / "tmp"))
+    monkeypatch.setattr("src.core.tutor.load_dotenv", lambda **kwargs: None)
+    release = threading.Event()
+
+    def slow_validation(api_key, use_cache=True):
+        release.wait(5)
+        return True
+
+    monkeypatch.setattr(OpenAIService, "is_key_valid", staticmethod(slow_validation))
+
+    tutor = EnglishTutor()
+    assert tutor.key_status()["state"] == "validating"
+    assert tutor.openai_service is not None
+
+    release.set()
+    tutor._key_validation_thread.join(5)
+    assert tutor.key_status() == {"state": "valid", "message": "✅ API key set successfully!"}
@@ -0,0 +1,248 @@
+import asyncio
+import http.server
+import threading
+
+from src.infra.launcher import (
+    Supervisor,
+    _Worker,
+    _free_port,
+    _is_ready,
+    _loopback_only,
+    default_workers,
+    merge_prometheus,
+)
+
+
+def _fake_worker(slot: int, port: int = 0, ready: bool = True) -> _Worker:
+    worker = _Worker.__new__(_Worker)
+    worker.slot, worker.port, worker.ready, worker.serving, worker.connections = slot, port, ready, ready, 0
+    worker.generation = 1
+    return worker
+
+
+def test_default_workers(monkeypatch):
+    monkeypatch.setenv("WORKERS", "3")
+    assert default_workers() == 3
+    monkeypatch.setenv("WORKERS", "auto")
+    assert default_workers() >= 1
+
+
+def test_clients_stick_to_a_ready_slot():
+    sup = Supervisor(workers=3, host="127.0.0.1", port=0)
+    sup.slots = [_fake_worker(i) for i in range(3)]
+    home = sup._pick("203.0.113.7")
+    assert all(sup._pick("203.0.113.7") is home for _ in range(5))
+
+    home.ready = home.serving = False  # stopped or unreachable: fall through to another ready worker
+    fallback = sup._pick("203.0.113.7")
+    assert fallback is not None and fallback is not home
+
+    for worker in sup.slots:
+        worker.ready = worker.serving = False
+    assert sup._pick("203.0.113.7") is None
+
+
+def test_connections_are_forwarded_to_the_worker():
+    async def run():
+        async def upstream(reader, writer):
+            data = await reader.readline()
+            writer.write(b"echo:" + data)
+            await writer.drain()
+            writer.close()
+
+        worker_server = await asyncio.start_server(upstream, "127.0.0.1", 0)
+        worker_port = worker_server.sockets[0].getsockname()[1]
+        sup = Supervisor(workers=1, host="127.0.0.1", port=0)
+        sup.slots = [_fake_worker(0, port=worker_port)]
+        front = await asyncio.start_server(sup._handle, "127.0.0.1", 0)
+        reader, writer = await asyncio.open_connection("127.0.0.1", front.sockets[0].getsockname()[1])
+        writer.write(b"hello\n")
+        await writer.drain()
+        reply = await asyncio.wait_for(reader.read(), 5)
+        writer.close()
+        front.close()
+        worker_server.close()
+        return reply
+
+    assert asyncio.run(run()) == b"echo:hello\n"
+
+
+def test_worker_metrics_are_merged_with_a_worker_label():
+    page = (
+        "# TYPE audio_attempts_total counter\n"
+        'audio_attempts_total{voice="alloy"} 3\n'
+        "# TYPE state_flush_ms histogram\n"
+        'state_flush_ms_bucket{le="5"} 1\n'
+        "state_flush_ms_sum 2.5\n"
+        "state_flush_ms_count 1\n"
+    )
+    merged = merge_prometheus({"0": page, "1": page.replace(" 3\n", " 4\n")})
+    lines = merged.splitlines()
+    assert lines.count("# TYPE audio_attempts_total counter") == 1
+    assert 'audio_attempts_total{worker="0",voice="alloy"} 3' in lines
+    assert 'audio_attempts_total{worker="1",voice="alloy"} 4' in lines
+    assert 'state_flush_ms_bucket{worker="1",le="5"} 1' in lines
+    assert 'state_flush_ms_sum{worker="0"} 2.5' in lines
+    # Each family's samples stay together under its TYPE line
+    histogram = lines.index("# TYPE state_flush_ms histogram")
+    assert all(line.startswith("state_flush_ms_") for line in lines[histogram + 1 :])
+
+
+def test_supervisor_serves_metrics_of_every_worker():
+    async def run():
+        seen_auth = []
+
+        async def worker_metrics(reader, writer):
+            head = (await reader.readuntil(b"\r\n\r\n")).decode()
+            seen_auth.append([h for h in head.split("\r\n") if h.lower().startswith("authorization")])
+            body = b"# TYPE tts_attempts_total counter\ntts_attempts_total 2\n"
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: %d\r\n\r\n" % len(body) + body)
+            await writer.drain()
+            writer.close()
+
+        servers = [await asyncio.start_server(worker_metrics, "127.0.0.1", 0) for _ in range(2)]
+        sup = Supervisor(workers=2, host="127.0.0.1", port=0)
+        sup.slots = [_fake_worker(i, port=srv.sockets[0].getsockname()[1]) for i, srv in enumerate(servers)]
+        front = await asyncio.start_server(sup._serve_metrics, "127.0.0.1", 0)
+        reader, writer = await asyncio.open_connection("127.0.0.1", front.sockets[0].getsockname()[1])
+        writer.write(b"GET /metrics HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        await writer.drain()
+        reply = (await asyncio.wait_for(reader.read(), 5)).decode()
+        writer.close()
+        front.close()
+        for srv in servers:
+            srv.close()
+        return reply, seen_auth, sup.metrics_token
+
+    reply, seen_auth, token = asyncio.run(run())
+    assert reply.startswith("HTTP/1.1 200 OK")
+    assert 'tts_attempts_total{worker="0"} 2' in reply and 'tts_attempts_total{worker="1"} 2' in reply
+    assert seen_auth == [[f"Authorization: Bearer {token}"]] * 2
+
+
+def test_readiness_probe_hits_healthz():
+    class Health(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200 if self.path == "/healthz" else 404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.HTTPServer(("127.0.0.1", 0), Health)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        assert _is_ready(server.server_address[1])
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert not _is_ready(_free_port())
+
+
+def test_affinity_key_from_cookie_or_trusted_forwarded_for(monkeypatch):
+    monkeypatch.setenv("AFFINITY_COOKIE", "lb_sticky")
+    monkeypatch.setenv("FORWARDED_ALLOW_IPS", "10.0.0.2")
+    sup = Supervisor(workers=2, host="127.0.0.1", port=0)
+    head = [b"GET / HTTP/1.1", b"Host: tutor", b"X-Forwarded-For: 198.51.100.4, 10.0.0.9"]
+    assert sup._affinity_key(head, "10.0.0.2") == "198.51.100.4"
+    # Untrusted peers cannot choose their key through the header
+    assert sup._affinity_key(head, "203.0.113.7") == "203.0.113.7"
+    assert sup._affinity_key(head + [b"Cookie: a=1; lb_sticky=abc"], "10.0.0.2") == "cookie:abc"
+
+
+def test_requests_behind_a_proxy_are_routed_per_client_with_connection_close(monkeypatch):
+    monkeypatch.setenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+
+    async def run():
+        heads = {0: [], 1: []}
+
+        def upstream_for(slot):
+            async def upstream(reader, writer):
+                heads[slot].append(await reader.readuntil(b"\r\n\r\n"))
+                writer.write(b"HTTP/1.1 204 No Content\r\nConnection: close\r\n\r\n")
+                await writer.drain()
+                writer.close()
+
+            return upstream
+
+        servers = [await asyncio.start_server(upstream_for(i), "127.0.0.1", 0) for i in range(2)]
+        sup = Supervisor(workers=2, host="127.0.0.1", port=0)
+        sup.slots = [_fake_worker(i, port=srv.sockets[0].getsockname()[1]) for i, srv in enumerate(servers)]
+        front = await asyncio.start_server(sup._handle, "127.0.0.1", 0)
+        port = front.sockets[0].getsockname()[1]
+        clients = [f"198.51.100.{i}" for i in range(16)]
+        for client in clients * 2:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            request = f"GET /x HTTP/1.1\r\nHost: t\r\nConnection: keep-alive\r\nX-Forwarded-For: {client}\r\n\r\n"
+            writer.write(request.encode())
+            await writer.drain()
+            await asyncio.wait_for(reader.read(), 5)
+            writer.close()
+        front.close()
+        for srv in servers:
+            srv.close()
+        return heads, {c: sup._affinity[c][0].slot for c in clients}
+
+    heads, placement = asyncio.run(run())
+    assert heads[0] and heads[1]  # clients behind one proxy address are spread over the workers
+    for slot, seen in heads.items():
+        clients = {h.split(b"X-Forwarded-For: ")[1].split(b"\r\n")[0].decode() for h in seen}
+        assert all(placement[c] == slot for c in clients)  # ...and each one always lands on the same worker
+        assert all(b"Connection: close\r\n" in h and b"keep-alive" not in h for h in seen)
+
+
+def test_rolling_restart_keeps_bound_clients_on_the_old_worker_until_idle(monkeypatch):
+    monkeypatch.setenv("AFFINITY_IDLE_S", "60")
+    sup = Supervisor(workers=1, host="127.0.0.1", port=0)
+    old = _fake_worker(0)
+    sup.slots = [old]
+    assert sup._pick("alice") is old
+
+    # SIGHUP: the replacement takes the slot, the old worker only keeps its clients
+    new = _fake_worker(0)
+    sup.slots, old.ready = [new], False
+    sup.retiring.append(old)
+    assert sup._pick("alice") is old
+    assert sup._pick("bob") is new
+    assert sup._has_active_clients(old)
+
+    later = sup._affinity["alice"][1] + 61
+    assert not sup._has_active_clients(old, now=later)
+    sup._prune_affinity(now=later)
+    assert "alice" not in sup._affinity
+
+    old.serving = False  # retired: a returning client moves to the new worker
+    assert sup._pick("alice") is new
+
+
+def test_empty_slots_are_retried_with_backoff(monkeypatch):
+    monkeypatch.setenv("RESPAWN_BACKOFF_MAX_S", "4")
+    sup = Supervisor(workers=1, host="127.0.0.1", port=0)
+    attempts = []
+
+    async def spawn(slot):
+        attempts.append(slot)
+        return _fake_worker(slot) if len(attempts) == 4 else None
+
+    sup._spawn = spawn
+
+    async def run():
+        delays = []
+        for _ in range(3):
+            await sup._heal()
+            delays.append(sup._retry_delay[0])
+            await sup._heal()  # backoff not elapsed: no new attempt
+            sup._retry_at[0] = 0.0
+        await sup._heal()
+        return delays
+
+    assert asyncio.run(run()) == [1.0, 2.0, 4.0]
+    assert len(attempts) == 4
+    assert sup.slots[0] is not None and sup._retry_delay[0] == 0.0
+
+
+def test_loopback_only_forwarded_allow_ips():
+    assert _loopback_only({"127.0.0.1", "::1"})
+    assert not _loopback_only({"127.0.0.1", "10.0.0.5"})
+    assert not _loopback_only({"*"})
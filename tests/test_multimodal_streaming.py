@@ -0,0 +1,137 @@
+import asyncio
+import base64
+import types
+import wave
+from typing import Any, Dict, List, Optional
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.core.speaking_tutor import SpeakingTutor
+from src.services.openai_service import OpenAIService
+from src.utils.audio import get_audio_duration
+from src.utils.playback_sync import SYNC_KEY
+
+PCM_100MS = b"\x01\x00" * 2400  # 100 ms of 24 kHz mono pcm16
+
+
+class StubTelemetry:
+    def __init__(self) -> None:
+        self.counters: List[Dict[str, Any]] = []
+        self.hists: List[Dict[str, Any]] = []
+
+    def inc_counter(self, name: str, labels: Optional[Dict[str, Any]] = None) -> None:
+        self.counters.append({"name": name, "labels": labels or {}})
+
+    def observe_hist(self, name: str, value: float, labels: Optional[Dict[str, Any]] = None) -> None:
+        self.hists.append({"name": name, "value": value, "labels": labels or {}})
+
+    def log_event(self, name: str, labels: Optional[Dict[str, Any]] = None) -> None:
+        pass
+
+
+def _audio_chunk(data: Optional[bytes] = None, transcript: Optional[str] = None):
+    audio: Dict[str, Any] = {}
+    if data is not None:
+        audio["data"] = base64.b64encode(data).decode("ascii")
+    if transcript is not None:
+        audio["transcript"] = transcript
+    delta = types.SimpleNamespace(audio=audio, content=None)
+    return types.SimpleNamespace(choices=[types.SimpleNamespace(delta=delta)])
+
+
+def test_stream_chat_multimodal_yields_deltas_and_records_ttfa():
+    tel = StubTelemetry()
+    service = OpenAIService(api_key="test", telemetry=tel)
+    chunks = [_audio_chunk(transcript="Hi "), _audio_chunk(data=PCM_100MS), _audio_chunk(transcript="there")]
+    service.client.chat.completions.create = MagicMock(return_value=iter(chunks))
+
+    events = list(service.stream_chat_multimodal(messages=[{"role": "user", "content": "Hello"}]))
+
+    assert events == [("transcript", "Hi "), ("audio", PCM_100MS), ("transcript", "there")]
+    kwargs = service.client.chat.completions.create.call_args.kwargs
+    assert kwargs["stream"] is True and kwargs["audio"]["format"] == "pcm16"
+    assert [h["name"] for h in tel.hists].count("multimodal_ttfa_ms") == 1
+
+
+class MockStreamService:
+    """Local mock stream: transcript + ten 100 ms audio deltas, tracking how far it was consumed."""
+
+    def __init__(self) -> None:
+        self.delivered = 0
+
+    async def astream_chat_multimodal(self, messages, max_tokens):
+        yield "transcript", "Nice to meet you."
+        for _ in range(10):
+            self.delivered += 1
+            yield "audio", PCM_100MS
+
+    async def achat_multimodal(self, *args, **kwargs):  # pragma: no cover - must not be used when streaming works
+        raise AssertionError("blocking path should not run")
+
+
+class FakeParent:
+    def __init__(self, svc) -> None:
+        self.openai_service = svc
+        self.telemetry = None
+
+    def get_system_message(self, mode: str, level: Optional[str] = None) -> str:
+        return "You are Sophia."
+
+
+def _collect(responses):
+    """Run an async handler to completion and return everything it yielded."""
+
+    async def run():
+        return [out async for out in responses]
+
+    return asyncio.run(run())
+
+
+@pytest.fixture
+def streaming_env(monkeypatch, tmp_path):
+    monkeypatch.setenv("SPEAKING_AUDIO_STREAMING", "1")
+    monkeypatch.setenv("SPEAKING_STREAM_SEGMENT_MS", "300")
+    monkeypatch.setenv("AUDIO_TMP_DIR", str(tmp_path))
+    monkeypatch.setattr("src.core.speaking_tutor.time.sleep", lambda *_a, **_k: None)
+
+
+def test_immersive_playback_starts_before_stream_finishes(streaming_env):
+    svc = MockStreamService()
+    tutor = SpeakingTutor(openai_service=svc, tutor_parent=FakeParent(svc))
+    gen = tutor.handle_bot_response(
+        history=[{"role": "user", "content": "Hello"}], level="B1", speaking_mode="Immersive"
+    )
+
+    async def run():
+        first = await gen.__anext__()
+        delivered = svc.delivered
+        return first, delivered, [out async for out in gen]
+
+    (_, _, first_segment), delivered, outputs = asyncio.run(run())
+    assert first_segment is not None
+    assert delivered == 3  # first 300 ms segment played while 700 ms were still being generated
+
+    _, history, final_audio = outputs[-1]
+    assert final_audio is None  # already played via segments
+    full_path = history[-1]["content"][0]
+    assert history[-1]["text_for_llm"] == "Nice to meet you."
+    with wave.open(full_path, "rb") as wf:
+        assert wf.getnframes() == 24000
+    assert get_audio_duration(full_path) == pytest.approx(1.0)
+
+
+def test_hybrid_streams_text_after_streamed_audio(streaming_env):
+    svc = MockStreamService()
+    tutor = SpeakingTutor(openai_service=svc, tutor_parent=FakeParent(svc))
+    outputs = _collect(
+        tutor.handle_bot_response(history=[{"role": "user", "content": "Hello"}], speaking_mode="Hybrid")
+    )
+
+    segments = [audio for _, _, audio in outputs if audio]
+    assert len(segments) >= 3
+    reply = outputs[-1][1][-1]
+    assert reply["text_for_llm"] == "Nice to meet you."
+    # 1 s of audio; the remaining reveal is offset by what already played while streaming
+    assert reply["content"] == "Nice to meet you."
+    assert reply[SYNC_KEY]["duration"] == 1.0 and "played" in reply[SYNC_KEY]
@@ -0,0 +1,72 @@
+import gc
+from typing import Any, Dict, List, Optional
+from unittest.mock import MagicMock
+
+from src.infra.openai_clients import OpenAIClientRegistry, get_client_registry
+from src.services.openai_service import OpenAIService
+
+
+class StubTelemetry:
+    def __init__(self) -> None:
+        self.counters: List[Dict[str, Any]] = []
+        self.events: List[Dict[str, Any]] = []
+        self.hists: List[str] = []
+
+    def inc_counter(self, name: str, labels: Optional[Dict[str, Any]] = None) -> None:
+        self.counters.append({"name": name, "labels": labels or {}})
+
+    def observe_hist(self, name: str, value: float, labels: Optional[Dict[str, Any]] = None) -> None:
+        self.hists.append(name)
+
+    def log_event(self, name: str, labels: Optional[Dict[str, Any]] = None) -> None:
+        self.events.append({"name": name, "labels": labels or {}})
+
+
+def test_services_for_same_key_share_clients():
+    a = OpenAIService(api_key="sk-one")
+    b = OpenAIService(api_key="sk-one")
+    c = OpenAIService(api_key="sk-two")
+    assert a.client is b.client and a.async_client is b.async_client
+    assert a.client is not c.client
+    assert get_client_registry().pool_stats()["keys"] == 2
+
+
+def test_pool_limits_from_env(monkeypatch):
+    monkeypatch.setenv("OPENAI_HTTP_MAX_CONNECTIONS", "7")
+    client = OpenAIClientRegistry().get("sk-env")
+    assert client._client._transport._pool._max_connections == 7
+
+
+def test_lru_eviction_closes_clients_once_unreferenced():
+    tel = StubTelemetry()
+    registry = OpenAIClientRegistry(max_keys=1, telemetry=tel)
+    first = registry.get("sk-a")
+    http_client = first._client
+    registry.get("sk-b")
+    # Evicted while a service may still hold it: keeps working until its last reference goes away
+    assert not first.is_closed()
+    assert registry.get("sk-a") is not first
+    del first
+    gc.collect()
+    assert http_client.is_closed
+    names = [c["name"] for c in tel.counters]
+    assert names.count("openai_client_evicted_total") == 2
+    assert names.count("openai_client_created_total") == 3
+
+
+def test_invalid_key_is_discarded(monkeypatch):
+    registry = get_client_registry()
+    client = registry.get("sk-bad")
+    client.models.list = MagicMock(side_effect=Exception("Error code: 401 - authentication failed"))
+    assert OpenAIService.is_key_valid("sk-bad") is False
+    assert registry.pool_stats()["keys"] == 0
+
+
+def test_warm_up_reports_pool_stats():
+    tel = StubTelemetry()
+    registry = OpenAIClientRegistry(telemetry=tel)
+    registry.get("sk-warm").models.list = MagicMock(return_value=[])
+    registry.warm_up("sk-warm", background=False)
+    assert "openai_warmup_ms" in tel.hists
+    stats = [e for e in tel.events if e["name"] == "openai_http_pool"]
+    assert stats and stats[0]["labels"]["clients"] == 1
@@ -0,0 +1,22 @@
+import re
+
+from src.utils.playback_sync import sync_timing, sync_timing_html, word_offsets
+
+
+def test_word_offsets_span_the_audio_by_word_length():
+    offsets = word_offsets("I really appreciate it", 4.4)
+    assert offsets[0] == 0.0
+    assert offsets == sorted(offsets) and offsets[-1] < 4.4
+    # "appreciate" takes longer than "I"
+    assert offsets[3] - offsets[2] > offsets[1] - offsets[0]
+    assert word_offsets("", 3.0) == []
+
+
+def test_timing_html_carries_timing_without_the_text():
+    timing = sync_timing("Use **bold** tags?\nNo & never.", 2.0, played_s=0.5)
+    assert timing["duration"] == 2.0 and timing["played"] == 0.5 and len(timing["times"]) == 6
+    markup = sync_timing_html(timing, audio_id="player", chatbot_id="chat")
+    assert "bold" not in markup and markup.endswith("></div>")
+    assert 'data-audio="player"' in markup and 'data-chatbot="chat"' in markup and 'data-played="0.50"' in markup
+    times = re.search(r'data-times="([^"]*)"', markup).group(1).split(",")
+    assert [float(t) for t in times] == timing["times"]
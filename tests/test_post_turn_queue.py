@@ -0,0 +1,100 @@
+import threading
+from types import SimpleNamespace
+
+from src.core.session_store import SessionStore
+from src.core.speaking_tutor import SpeakingTutor
+from src.infra.post_turn_queue import PostTurnQueue
+
+
+def test_tasks_of_one_session_run_in_order():
+    queue = PostTurnQueue(workers=4)
+    seen = []
+    for i in range(20):
+        queue.submit("session:a", lambda i=i: seen.append(i))
+    assert queue.wait_idle(5)
+    assert seen == list(range(20))
+    queue.shutdown()
+
+
+def test_coalesced_task_replaces_waiting_one():
+    queue = PostTurnQueue(workers=1)
+    gate = threading.Event()
+    ran = []
+    queue.submit("session:a", gate.wait)
+    queue.submit("session:a", lambda: ran.append("first"), coalesce="summary")
+    queue.submit("session:a", lambda: ran.append("second"), coalesce="summary")
+    gate.set()
+    assert queue.wait_idle(5)
+    assert ran == ["second"]
+    queue.shutdown()
+
+
+def test_progress_awards_queued_behind_busy_work_are_all_applied():
+    parent = SimpleNamespace(
+        openai_service=None, telemetry=None, post_turn=PostTurnQueue(workers=1), sessions=SessionStore()
+    )
+    tutor = SpeakingTutor(None, parent)
+    session = parent.sessions.get("session:a")
+    start_xp = session.progress.xp
+    gate = threading.Event()
+    tutor._post_turn(session, gate.wait, task="pronunciation")
+    for _ in range(2):
+        tutor._post_turn(session, lambda: tutor._record_turn(session), task="progress")
+    gate.set()
+    assert parent.post_turn.wait_idle(5)
+    assert session.progress.xp - start_xp == 40
+    parent.post_turn.shutdown()
+
+
+def test_full_queue_drops_new_tasks():
+    queue = PostTurnQueue(workers=1, max_pending=2)
+    gate = threading.Event()
+    assert queue.submit("session:a", gate.wait)
+    assert queue.submit("session:a", lambda: None)
+    assert not queue.submit("session:b", lambda: None)
+    gate.set()
+    assert queue.wait_idle(5) and queue.pending == 0
+    queue.shutdown()
+
+
+def test_failing_task_does_not_stop_the_session():
+    queue = PostTurnQueue(workers=1)
+    ran = []
+    queue.submit("session:a", lambda: 1 / 0)
+    queue.submit("session:a", lambda: ran.append("after"))
+    assert queue.wait_idle(5)
+    assert ran == ["after"]
+    queue.shutdown()
+
+
+class _SummaryService:
+    def __init__(self):
+        self.calls = []
+
+    def chat_completion(self, messages, temperature, max_tokens):
+        self.calls.append(messages[-1]["content"])
+        return f"summary #{len(self.calls)}"
+
+
+def test_summary_refresh_is_batched_every_n_turns(monkeypatch):
+    monkeypatch.setenv("SUMMARY_EVERY_N_TURNS", "3")
+    service = _SummaryService()
+    parent = SimpleNamespace(
+        openai_service=service, telemetry=None, post_turn=PostTurnQueue(workers=1), sessions=SessionStore()
+    )
+    tutor = SpeakingTutor(service, parent)
+    session = parent.sessions.get("session:a")
+
+    for i in range(3):
+        tutor._note_exchange(session, f"user {i}", f"tutor {i}")
+    assert parent.post_turn.wait_idle(5)
+    for i in range(3, 5):
+        tutor._note_exchange(session, f"user {i}", f"tutor {i}")
+    assert parent.post_turn.wait_idle(5)
+
+    # One LLM call folded the first three exchanges; the other two wait for the next refresh
+    assert len(service.calls) == 1
+    assert all(f"User: user {i}" in service.calls[0] for i in range(3))
+    assert session.running_summary == "summary #1"
+    assert len(session.pending_exchanges) == 2
+    parent.post_turn.shutdown()
@@ -0,0 +1,154 @@
+import asyncio
+import base64
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from src.core.session_store import DEFAULT_SESSION_ID, SessionStore, session_id_from_request
+from src.core.speaking_tutor import SpeakingTutor
+
+
+class StubTelemetry:
+    def __init__(self) -> None:
+        self.counters: List[Dict[str, Any]] = []
+        self.events: List[Dict[str, Any]] = []
+
+    def inc_counter(self, name: str, labels: Optional[Dict[str, Any]] = None) -> None:
+        self.counters.append({"name": name, "labels": labels or {}})
+
+    def observe_hist(self, name: str, value: float, labels: Optional[Dict[str, Any]] = None) -> None:
+        pass
+
+    def log_event(self, name: str, labels: Optional[Dict[str, Any]] = None) -> None:
+        self.events.append({"name": name, "labels": labels or {}})
+
+
+def test_session_id_from_request():
+    assert session_id_from_request(None) == DEFAULT_SESSION_ID
+    assert session_id_from_request(SimpleNamespace(username="ana", session_hash="h1")) == "user:ana"
+    assert session_id_from_request(SimpleNamespace(username=None, session_hash="h1")) == "session:h1"
+
+
+def test_lru_eviction_drops_least_recently_seen():
+    tel = StubTelemetry()
+    store = SessionStore(max_sessions=2, telemetry=tel)
+    store.get("a").progress.add_xp(10)
+    store.get("b")
+    store.get("a")
+    store.get("c")
+    assert store.peek("b") is None
+    assert store.peek("a").progress.xp == 10
+    assert [c["labels"] for c in tel.counters] == [{"reason": "lru"}]
+
+
+def test_idle_sessions_expire_and_memory_is_reported():
+    tel = StubTelemetry()
+    store = SessionStore(ttl_s=60, telemetry=tel)
+    old = store.get("old")
+    store.get("fresh")
+    assert store.evict_expired(now=old.last_seen + 30) == 0
+    store.get("fresh").last_seen = old.last_seen + 100
+    assert store.evict_expired(now=old.last_seen + 90) == 1
+    assert store.peek("old") is None and len(store) == 1
+    report = tel.events[-1]
+    assert report["name"] == "session_store"
+    assert report["labels"]["sessions"] == 1 and report["labels"]["avg_bytes"] > 0
+
+
+def test_peek_never_creates_sessions(tmp_path):
+    from src.infra.state_backend import SQLiteStateBackend
+
+    store = SessionStore(max_sessions=2)
+    for i in range(10):
+        assert store.peek(f"guess:{i}") is None
+    assert len(store) == 0
+
+    backend = SQLiteStateBackend(str(tmp_path / "state.db"), flush_ms=0)
+    other_worker = SessionStore(backend=backend)
+    learner = other_worker.get("session:real")
+    learner.progress.add_xp(20)
+    other_worker.save(learner)
+    local = SessionStore(backend=backend)
+    assert local.peek("session:real").progress.xp == 20
+    assert local.peek("session:unknown") is None and len(local) == 0
+    backend.close()
+
+
+def test_session_footprint_is_bounded(monkeypatch):
+    monkeypatch.setenv("SPEAKING_SUMMARY_MAX_CHARS", "100")
+    monkeypatch.setenv("SESSION_SETTINGS_MAX_KEYS", "2")
+    store = SessionStore()
+    state = store.get("s")
+    state.set_summary("x" * 10_000)
+    state.remember(level="B1", speaking_mode="Hybrid", extra="y" * 10_000)
+    assert len(state.running_summary) == 100
+    assert state.settings == {"level": "B1", "speaking_mode": "Hybrid"}
+    assert state.approx_bytes() < 4096
+
+
+class _Resp:
+    def __init__(self, text: str):
+        message = SimpleNamespace(
+            content=[
+                {"type": "output_text", "text": text},
+                {"type": "output_audio", "audio": {"data": base64.b64encode(b"RIFF").decode()}},
+            ],
+            audio=None,
+        )
+        self.choices = [SimpleNamespace(message=message)]
+
+
+class FakeService:
+    async def achat_multimodal(self, messages, max_tokens):
+        self.last_messages = messages
+        return _Resp("Great answer!")
+
+    def chat_completion(self, messages, temperature, max_tokens):
+        return "summary of " + messages[-1]["content"].split("User: ")[1].split("\n")[0]
+
+
+def _collect(responses):
+    """Run an async handler to completion and return everything it yielded."""
+
+    async def run():
+        return [out async for out in responses]
+
+    return asyncio.run(run())
+
+
+def test_sessions_do_not_share_progress_or_summary(monkeypatch):
+    from src.core.tutor import EnglishTutor
+
+    monkeypatch.setenv("AUDIO_PLAYBACK_WAIT", "0")
+    monkeypatch.setenv("SUMMARY_EVERY_N_TURNS", "1")
+    monkeypatch.setattr("src.core.speaking_tutor.time.sleep", lambda s: None)
+    parent = EnglishTutor.__new__(EnglishTutor)
+    parent.sessions = SessionStore()
+    parent.telemetry = None
+    parent.openai_service = FakeService()
+    parent.get_system_message = lambda mode, level=None: "system"
+    tutor = SpeakingTutor(parent.openai_service, parent)
+
+    alice = SimpleNamespace(username=None, session_hash="alice")
+    bob = SimpleNamespace(username=None, session_hash="bob")
+    _collect(tutor.handle_bot_response(history=[{"role": "user", "content": "I like tea"}], request=alice))
+
+    assert parent.session(alice).progress.xp == 20
+    assert "I like tea" in parent.session(alice).running_summary
+    assert parent.session(bob).progress.xp == 0 and parent.session(bob).running_summary == ""
+
+    _collect(tutor.handle_bot_response(history=[{"role": "user", "content": "Hi"}], request=bob))
+    assert not any("I like tea" in str(m["content"]) for m in parent.openai_service.last_messages)
+
+
+def test_progress_endpoint_reads_the_callers_session():
+    from src.core.tutor import EnglishTutor
+    from ui.interfaces import GradioInterface
+
+    parent = EnglishTutor.__new__(EnglishTutor)
+    parent.sessions = SessionStore()
+    alice = SimpleNamespace(username=None, session_hash="alice")
+    parent.session(alice).progress.xp = 40
+
+    ui = GradioInterface(parent)
+    assert ui.get_progress_data(alice)["xp"] == 40
+    assert ui.get_progress_data(SimpleNamespace(username=None, session_hash="bob"))["xp"] == 0
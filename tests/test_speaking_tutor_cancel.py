@@ -1,3 +1,4 @@
+import asyncio
 import base64
 import threading
 from typing import Any
@@ -5,6 +6,7 @@ from typing import Any
 import pytest
 
 from src.core.speaking_tutor import SpeakingTutor
+from src.utils.playback_sync import SYNC_KEY
 
 
 class _Msg:
@@ -28,7 +30,7 @@ class FakeOpenAIService:
         self._text = text
         self._audio_b64 = base64.b64encode(audio_bytes).decode("utf-8")
 
-    def chat_multimodal(self, messages, max_tokens):
+    async def achat_multimodal(self, messages, max_tokens):
         # Return a response that has both text and audio content parts
         message = _Msg(
             [
@@ -39,10 +41,11 @@ class FakeOpenAIService:
         return _Resp(message)
 
     # Not used in this test but present in real service
-    def stream_chat_completion(self, *args, **kwargs):
+    async def astream_chat_completion(self, *args, **kwargs):
         raise NotImplementedError
+        yield
 
-    def text_to_speech(self, *args, **kwargs):
+    async def atext_to_speech(self, *args, **kwargs):
         return b"FAKE_TTS_AUDIO"
 
 
@@ -55,59 +58,65 @@ class FakeParent:
         return "You are Sophia, a helpful tutor."
 
 
+def _collect(responses):
+    """Run an async handler to completion and return everything it yielded."""
+
+    async def run():
+        return [out async for out in responses]
+
+    return asyncio.run(run())
+
+
 @pytest.mark.parametrize("speaking_mode", [None, "Hybrid"])  # validate default and explicit
-def test_speaking_tutor_simulated_stream_can_be_cancelled(monkeypatch, speaking_mode):
-    # Arrange: fake service with both audio and text so we go through audio-first + simulated text streaming path
-    text = "This is a long response that will be streamed word by word for cancellation testing."
+def test_hybrid_reply_is_sent_at_once_without_waiting_for_playback(monkeypatch, speaking_mode):
+    # Audio and the full text arrive in one update; the browser reveals the text during playback
+    text = "This is a long response that used to be streamed word by word after the audio finished."
     svc = FakeOpenAIService(text=text, audio_bytes=b"WAVDATA")
     parent = FakeParent(svc)
-
-    # SpeakingTutor expects BaseTutor init signature: (openai_service, tutor_parent)
     tutor = SpeakingTutor(openai_service=svc, tutor_parent=parent)
 
-    history = [{"role": "user", "content": "Hello"}]
+    def _no_sleep(*_args, **_kwargs):
+        raise AssertionError("the worker must not wait for playback")
 
-    # Speed up: avoid real sleep and audio duration
-    monkeypatch.setattr("src.core.speaking_tutor.time.sleep", lambda *_args, **_kwargs: None)
-    monkeypatch.setattr("src.core.speaking_tutor.get_audio_duration", lambda _path: 0.0)
+    monkeypatch.setattr("src.core.speaking_tutor.time.sleep", _no_sleep)
+    monkeypatch.setattr("src.core.speaking_tutor.get_audio_duration", lambda _path: 6.0)
 
     stop_event = threading.Event()
+    outputs = _collect(
+        tutor.handle_bot_response(
+            history=[{"role": "user", "content": "Hello"}],
+            level="B1",
+            speaking_mode=speaking_mode,
+            stop_event=stop_event,
+        )
+    )
 
-    # Act: drive the generator
-    gen = tutor.handle_bot_response(history=history, level="B1", speaking_mode=speaking_mode, stop_event=stop_event)
-
-    # First yield should be audio playback (audio_path not None)
-    chat_a, hist_a, audio_path = next(gen)
+    assert len(outputs) == 1
+    _, history, audio_path = outputs[0]
     assert audio_path is not None
+    reply = history[-1]
+    assert reply["role"] == "assistant" and reply["text_for_llm"] == text
+    # The chat keeps the plain Markdown reply; the reveal timing rides along for the client
+    assert reply["content"] == text and reply[SYNC_KEY]["duration"] == 6.0
+
+
+def test_text_sync_can_be_disabled(monkeypatch):
+    monkeypatch.setenv("SPEAKING_TEXT_SYNC", "0")
+    monkeypatch.setattr("src.core.speaking_tutor.get_audio_duration", lambda _path: 1.0)
+    svc = FakeOpenAIService(text="Plain reply.", audio_bytes=b"WAVDATA")
+    tutor = SpeakingTutor(openai_service=svc, tutor_parent=FakeParent(svc))
+
+    _, history, _ = _collect(tutor.handle_bot_response(history=[{"role": "user", "content": "Hello"}]))[-1]
+    assert history[-1]["content"] == "Plain reply." and SYNC_KEY not in history[-1]
+
+
+def test_reveal_timing_goes_to_the_sync_output_once(monkeypatch):
+    monkeypatch.setattr("src.core.speaking_tutor.get_audio_duration", lambda _path: 2.0)
+    svc = FakeOpenAIService(text="**Great** job!", audio_bytes=b"WAVDATA")
+    tutor = SpeakingTutor(openai_service=svc, tutor_parent=FakeParent(svc))
 
-    # Next, simulated text streaming starts; consume a couple of chunks then cancel
-    partial_seen = False
-    for _ in range(3):
-        chat_b, hist_b, audio_b = next(gen)
-        assert audio_b is None
-        assert len(hist_b) >= 1
-        last = hist_b[-1]
-        if last.get("role") == "assistant" and isinstance(last.get("content"), str):
-            if len(last["content"].strip()) > 0:
-                partial_seen = True
-                break
-
-    assert partial_seen, "Expected some partial assistant text before cancelling."
-
-    # Trigger cancellation
-    stop_event.set()
-
-    # Exhaust generator gracefully after cancellation (should stop soon)
-    out_history = None
-    for _ in range(50):
-        try:
-            chat_c, hist_c, audio_c = next(gen)
-            out_history = hist_c
-        except StopIteration:
-            break
-
-    assert out_history is not None, "Generator should have yielded state updates before stopping."
-    last_msg = out_history[-1]
-    assert last_msg["role"] == "assistant"
-    # Ensure it didn't stream full text
-    assert len(last_msg["content"].strip()) < len(text)
+    outputs = _collect(tutor.handle_bot_response_with_sync(history=[{"role": "user", "content": "Hello"}]))
+    chat, history, _, timing_html = outputs[-1]
+    assert chat[-1]["content"] == "**Great** job!"  # rendered as Markdown and copied as such
+    assert f'data-sync-id="{history[-1][SYNC_KEY]["id"]}"' in timing_html and 'data-duration="2.00"' in timing_html
+    assert sum(isinstance(out[3], str) for out in outputs) == 1
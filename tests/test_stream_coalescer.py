@@ -0,0 +1,79 @@
+import asyncio
+
+from src.core.writing_tutor import WritingTutor
+from src.infra.stream_coalescer import YieldCoalescer, history_bytes
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_flushes_on_interval_or_char_threshold():
+    clock = FakeClock()
+    coalescer = YieldCoalescer("test", interval_ms=50, max_chars=10, clock=clock)
+    assert not coalescer.add("abc")
+    clock.now = 0.06
+    assert coalescer.add("d")
+    coalescer.flushed([{"role": "assistant", "content": "abcd"}])
+    assert not coalescer.pending and not coalescer.add("efg")
+    assert coalescer.add("hijklmnop")  # 12 chars waiting
+    assert coalescer.events == 1 and coalescer.chunks == 4
+
+
+def test_zero_interval_flushes_every_chunk():
+    coalescer = YieldCoalescer("test", interval_ms=0, max_chars=1000)
+    assert coalescer.add("a") and coalescer.add("b")
+
+
+def test_history_bytes_grows_with_content():
+    short = [{"role": "user", "content": "hi"}]
+    assert history_bytes(short + [{"role": "assistant", "content": "x" * 100}]) > history_bytes(short) + 100
+
+
+class _Telemetry:
+    def __init__(self) -> None:
+        self.hists = {}
+
+    def inc_counter(self, name, labels=None):
+        pass
+
+    def observe_hist(self, name, value, labels=None):
+        self.hists[name] = value
+
+
+class _TokenService:
+    model = "gpt-4o-mini"
+
+    async def astream_chat_completion(self, messages, temperature, max_tokens):
+        for i in range(200):
+            yield f"t{i} "
+
+
+def test_writing_stream_sends_far_fewer_updates_than_tokens(monkeypatch):
+    monkeypatch.setenv("STREAM_FLUSH_MS", "1000")
+    monkeypatch.setenv("STREAM_FLUSH_CHARS", "400")
+    telemetry = _Telemetry()
+
+    class Parent:
+        openai_service = _TokenService()
+
+        def get_system_message(self, mode, level):
+            return "system"
+
+    parent = Parent()
+    parent.telemetry = telemetry
+    tutor = WritingTutor(openai_service=parent.openai_service, tutor_parent=parent)
+
+    async def run():
+        return [history[-1]["content"] async for history, _ in tutor.generate_random_topic(level="B1")]
+
+    updates = asyncio.run(run())
+    assert updates[-1] == "".join(f"t{i} " for i in range(200))
+    assert len(updates) < 10
+    assert telemetry.hists["stream_ui_chunks"] == 200
+    assert telemetry.hists["stream_ui_events"] == len(updates) - 1  # the user message update is not part of the stream
+    assert telemetry.hists["stream_ui_bytes"] > 0
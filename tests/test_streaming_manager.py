@@ -155,7 +155,13 @@ def test_stream_timeout_then_retry_success():
 
     tel = StubTelemetry()
     sm = StreamingManager(
-        service=ServiceTimeoutThenOK(), telemetry=tel, retry_limit=2, backoff_ms=0, heartbeat_ms=5, timeout_ms=10
+        service=ServiceTimeoutThenOK(),
+        telemetry=tel,
+        retry_limit=2,
+        backoff_ms=0,
+        heartbeat_ms=5,
+        timeout_ms=10,
+        retry_mode="restart",
     )
     out = sm.stream_text(messages=[{"role": "user", "content": "hi"}], temperature=0.6, max_tokens=32)
     assert out == "ok"
@@ -280,3 +286,101 @@ def test_stream_timeout_exhausts_and_raises():
         _ = sm.stream_text(messages=[{"role": "user", "content": "hi"}], temperature=0.6, max_tokens=32)
     timeout_events = [e for e in tel.events if e["name"] == "stream_manager_timeout"]
     assert len(timeout_events) >= 1
+
+
+class ServiceDropsMidStream:
+    """First attempt streams part of the reply then drops; the continuation repeats a bit of it."""
+
+    model = "gpt-4o-mini"
+
+    def __init__(self) -> None:
+        self.requests: List[List[Dict[str, Any]]] = []
+
+    def stream_chat_completion(self, messages, temperature, max_tokens):
+        self.requests.append(messages)
+        attempt = len(self.requests)
+
+        def gen():
+            if attempt == 1:
+                yield "The weather was lovely, "
+                yield "so we walked to the beach"
+                raise ConnectionError("connection reset")
+            yield "to the beach"
+            yield " and swam until sunset."
+
+        return gen()
+
+
+def test_resume_continues_from_partial_text_without_duplicates():
+    svc = ServiceDropsMidStream()
+    tel = StubTelemetry()
+    chunks: List[str] = []
+    sm = StreamingManager(service=svc, telemetry=tel, retry_limit=2, backoff_ms=0)
+    out = sm.stream_text(messages=[{"role": "user", "content": "hi"}], on_chunk=chunks.append)
+
+    expected = "The weather was lovely, so we walked to the beach and swam until sunset."
+    assert out == expected
+    assert "".join(chunks) == expected  # the UI never receives repeated text
+    resumed = svc.requests[1]
+    assert resumed[-2] == {"role": "assistant", "content": "The weather was lovely, so we walked to the beach"}
+    assert resumed[-1]["role"] == "user"
+
+    hists = {h["name"]: h["value"] for h in tel.hists}
+    assert hists["stream_resume_prefix_tokens"] > 0
+    assert hists["stream_resume_overlap_chars"] == len("to the beach")
+    assert "stream_resume_saved_ms" in hists
+
+
+def test_restart_mode_records_replayed_tokens():
+    svc = ServiceDropsMidStream()
+    tel = StubTelemetry()
+    sm = StreamingManager(service=svc, telemetry=tel, retry_limit=2, backoff_ms=0, retry_mode="restart")
+    assert sm.stream_text(messages=[{"role": "user", "content": "hi"}]) == "to the beach and swam until sunset."
+    assert svc.requests[1] == [{"role": "user", "content": "hi"}]
+    assert any(h["name"] == "stream_retry_replayed_tokens" for h in tel.hists)
+
+
+def test_overlap_trimmer_keeps_short_or_absent_overlaps():
+    from src.infra.streaming_manager import OverlapTrimmer
+
+    trimmer = OverlapTrimmer("I went to the")
+    assert trimmer.feed(" to") == ""  # could still be a repeat of "... to the"
+    assert trimmer.feed(" the park") == " to the park"  # 7-char overlap is below the minimum: kept
+    assert trimmer.feed("!") == "!"
+
+    trimmer = OverlapTrimmer("Hello there")
+    assert trimmer.feed("General") == "General"
+
+
+def test_stream_stats_record_latency_profile():
+    from src.infra.streaming_manager import StreamStats
+
+    ticks = iter([0.0, 0.4, 0.5, 0.7, 1.0])
+    stats = StreamStats("gpt-4o-mini", "writing", 1, clock=lambda: next(ticks))
+    for chunk in ("Hello", "", " wor", "ld!"):  # empty chunks are not counted
+        stats.chunk(chunk)
+    tel = StubTelemetry()
+    summary = stats.finish(tel, "completed")
+
+    assert summary["ttft_ms"] == 400.0
+    assert summary["chunks"] == 3 and summary["chars"] == 12
+    assert summary["chars_per_s"] == 40.0  # 12 chars over 0.3 s from first to last chunk
+    assert summary["gap_p50_ms"] == 100.0 and summary["gap_max_ms"] == 200.0
+    assert summary["duration_ms"] == 1000.0
+    hists = {h["name"]: h for h in tel.hists}
+    assert hists["stream_ttft_ms"]["labels"] == {"model": "gpt-4o-mini", "mode": "writing", "attempt": 1}
+    assert {"stream_chunk_gap_p95_ms", "stream_chars_per_s", "stream_chunks"} <= set(hists)
+    assert [e["labels"]["outcome"] for e in tel.events if e["name"] == "stream_summary"] == ["completed"]
+
+
+def test_stream_summary_emitted_per_attempt_with_mode():
+    tel = StubTelemetry()
+    sm = StreamingManager(service=ServiceDropsMidStream(), telemetry=tel, retry_limit=2, backoff_ms=0, mode="summary")
+    sm.stream_text(messages=[{"role": "user", "content": "hi"}])
+
+    summaries = [e["labels"] for e in tel.events if e["name"] == "stream_summary"]
+    assert [(s["attempt"], s["outcome"], s["mode"]) for s in summaries] == [
+        (1, "error", "summary"),
+        (2, "completed", "summary"),
+    ]
+    assert summaries[0]["chunks"] == 2 and summaries[0]["ttft_ms"] is not None
@@ -0,0 +1,92 @@
+import json
+import random
+from pathlib import Path
+
+import pytest
+
+import src.infra.telemetry_rollup as rollup_mod
+from src.infra.telemetry import TelemetryEvent
+from src.infra.telemetry_rollup import query, ratios, rollup
+
+
+def write_day(directory: Path, day: str, events) -> Path:
+    path = directory / f"metrics-{day}.jsonl"
+    with path.open("a", encoding="utf-8") as f:
+        for evt in events:
+            line = evt if isinstance(evt, str) else json.dumps(evt.to_dict(), ensure_ascii=False)
+            f.write(line + "\n")
+    return path
+
+
+def ts(day: str, hour: int, minute: int = 0) -> str:
+    return f"{day[:4]}-{day[4:6]}-{day[6:]}T{hour:02d}:{minute:02d}:00.000000+00:00"
+
+
+def test_hourly_quantiles_counters_and_events(tmp_path):
+    rng = random.Random(1)
+    latencies = [rng.lognormvariate(6, 0.6) for _ in range(2000)]
+    events = []
+    for i, value in enumerate(latencies):
+        model = "whisper-1" if i % 2 else "gpt-4o-mini-transcribe"
+        events.append(
+            TelemetryEvent(ts("20250101", i % 2), "histogram", "transcribe_latency_ms", value, {"model": model})
+        )
+    events += [TelemetryEvent(ts("20250101", 0), "counter", "audio_attempts_total", labels={"voice": "alloy"})] * 5
+    events.append(TelemetryEvent(ts("20250101", 0), "counter", "telemetry_dropped_total", value=7))
+    events += [
+        TelemetryEvent(ts("20250101", 1), "event", "stream_summary", labels={"mode": "writing", "ttft_ms": t})
+        for t in (120.5, 340.0, 80)
+    ]
+    # A line from another writer (different key order) and a truncated tail
+    events.append('{"name": "audio_attempts_total", "type": "counter", "ts": "2025-01-01T00:30:00+00:00"}')
+    events.append('{"ts": "2025-01-01T01:00:00+00:00", "type": "hist')
+    write_day(tmp_path, "20250101", events)
+
+    rows = query(rollup(str(tmp_path), workers=1), bucket="day", by=[])
+    latency = rows[("2025-01-01", "histogram", "transcribe_latency_ms", "{}")]
+    assert latency.n == 2000
+    exact = sorted(latencies)
+    for q in (0.5, 0.95, 0.99):
+        assert latency.quantile(q) == pytest.approx(exact[int(q * (len(exact) - 1))], rel=0.011)
+    assert rows[("2025-01-01", "counter", "audio_attempts_total", "{}")].total == 6
+    assert rows[("2025-01-01", "counter", "telemetry_dropped_total", "{}")].total == 7
+    assert rows[("2025-01-01", "event", "stream_summary", "{}")].n == 3
+
+    hourly = query(rollup(str(tmp_path), workers=1), bucket="hour", names=["stream_*"])
+    assert list(hourly) == [("2025-01-01T01", "event", "stream_summary", '{"mode": "writing"}')]
+
+
+def test_rollups_are_cached_until_the_source_changes(tmp_path, monkeypatch):
+    write_day(tmp_path, "20250102", [TelemetryEvent(ts("20250102", 3), "counter", "tts_attempts_total")] * 3)
+    assert query(rollup(str(tmp_path)), bucket="all")[("all", "counter", "tts_attempts_total", "{}")].total == 3
+    assert (tmp_path / "rollups" / "rollup-20250102.jsonl").exists()
+
+    real = rollup_mod.rollup_file
+    monkeypatch.setattr(rollup_mod, "rollup_file", lambda path: pytest.fail("fresh rollup was re-read"))
+    assert query(rollup(str(tmp_path)), bucket="all")[("all", "counter", "tts_attempts_total", "{}")].total == 3
+
+    monkeypatch.setattr(rollup_mod, "rollup_file", real)
+    write_day(tmp_path, "20250102", [TelemetryEvent(ts("20250102", 4), "counter", "tts_attempts_total")])
+    assert query(rollup(str(tmp_path)), bucket="all")[("all", "counter", "tts_attempts_total", "{}")].total == 4
+
+
+def test_query_filters_and_ratio_across_days_on_a_process_pool(tmp_path):
+    for day in ("20250103", "20250104", "20250105"):
+        events = [TelemetryEvent(ts(day, 9), "counter", "audio_attempts_total", labels={"voice": "alloy"})] * 10
+        events += [TelemetryEvent(ts(day, 9), "counter", "text_only_fallback_total", labels={"voice": "alloy"})] * 2
+        events += [
+            TelemetryEvent(ts(day, 9), "gauge", "upstream_streams_open", v, {"worker": w})
+            for w in ("a", "b")
+            for v in (1, 4, 2)
+        ]
+        write_day(tmp_path, day, events)
+
+    pooled = rollup(str(tmp_path), since="20250104", workers=2, use_cache=False)
+    assert {key[0][:10] for key in pooled} == {"2025-01-04", "2025-01-05"}
+
+    rows = query(pooled, bucket="day", names=["audio_attempts_total", "text_only_fallback_total"], by=[])
+    assert [r[3] for r in ratios(rows, "text_only_fallback_total", "audio_attempts_total")] == [0.2, 0.2]
+
+    gauges = query(pooled, bucket="all", names=["upstream_*"], where={"worker": "b"})
+    (gauge,) = gauges.values()
+    assert (gauge.last, gauge.min, gauge.max, gauge.n) == (2, 1, 4, 6)
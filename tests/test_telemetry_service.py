@@ -28,6 +28,7 @@ def test_telemetry_writes_jsonl():
         t.observe_hist("multimodal_latency_ms", 123.4, {"model": "demo"})
         with t.timeit("block_latency_ms", {"unit": "test"}):
             pass
+        t.flush()
 
         # Locate today's file
         files = list(Path(tmpdir).glob("metrics-*.jsonl"))
@@ -44,3 +45,98 @@ def test_telemetry_writes_jsonl():
 
     finally:
         shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+def test_buffered_events_written_in_batches_on_flush(tmp_path):
+    t = TelemetryService(base_dir=str(tmp_path), flush_ms=60_000)
+    try:
+        for i in range(50):
+            t.observe_hist("latency_ms", float(i), {"i": i})
+        assert t.pending == 50
+        assert not list(tmp_path.glob("metrics-*.jsonl"))  # nothing on the request path
+
+        t.flush()
+        records = read_jsonl(next(tmp_path.glob("metrics-*.jsonl")))
+        assert [r["value"] for r in records] == [float(i) for i in range(50)]
+        assert t.pending == 0
+    finally:
+        t.close()
+
+
+def test_overflow_drops_and_counts(tmp_path):
+    t = TelemetryService(base_dir=str(tmp_path), flush_ms=60_000, max_pending=10)
+    try:
+        with t._write_lock:  # writer stalled (e.g. slow disk): the buffer fills up
+            for _ in range(15):
+                t.inc_counter("turns_total")
+        assert t.dropped == 5
+        t.close()
+        records = read_jsonl(next(tmp_path.glob("metrics-*.jsonl")))
+        written = [r for r in records if r["name"] == "turns_total"]
+        dropped = sum(r["value"] for r in records if r["name"] == "telemetry_dropped_total")
+        assert (len(written), dropped) == (10, 5)
+    finally:
+        t.close()
+
+
+def test_concurrent_writers_produce_whole_lines(tmp_path):
+    import threading
+
+    writers = [TelemetryService(base_dir=str(tmp_path), flush_ms=5) for _ in range(3)]
+
+    def emit(t: TelemetryService, worker: int) -> None:
+        for i in range(300):
+            t.log_event("tick", {"worker": worker, "i": i, "pad": "x" * 200})
+
+    threads = [threading.Thread(target=emit, args=(t, n)) for n, t in enumerate(writers) for _ in range(2)]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    for t in writers:
+        t.close()
+
+    records = read_jsonl(next(tmp_path.glob("metrics-*.jsonl")))  # every line parses
+    assert len(records) == 3 * 2 * 300
+
+
+def test_flush_interval_zero_writes_synchronously(tmp_path):
+    t = TelemetryService(base_dir=str(tmp_path), flush_ms=0)
+    t.inc_counter("sync_total")
+    assert [r["name"] for r in read_jsonl(next(tmp_path.glob("metrics-*.jsonl")))] == ["sync_total"]
+
+
+def test_metrics_aggregate_without_jsonl(tmp_path):
+    t = TelemetryService(base_dir=str(tmp_path), jsonl=False)
+    for ms in (40, 80, 120, 400, 3000):
+        t.observe_hist("multimodal_latency_ms", ms, {"model": "demo"})
+    t.inc_counter("audio_attempts_total", {"model": "demo"})
+    t.inc_counter("audio_attempts_total", {"model": "demo"})
+    t.set_gauge("upstream_streams_open", 3)
+    t.log_event("stream_summary", {"ttft_ms": 123.4})
+    t.flush()
+
+    assert not list(tmp_path.glob("metrics-*.jsonl"))
+    assert t.metrics.counter_value("audio_attempts_total", {"model": "demo"}) == 2
+    assert 250 <= t.metrics.quantile("multimodal_latency_ms", 0.8) <= 500
+    text = t.metrics.render_prometheus()
+    assert 'audio_attempts_total{model="demo"} 2' in text
+    assert 'multimodal_latency_ms_bucket{model="demo",le="100"} 2' in text
+    assert 'multimodal_latency_ms_bucket{model="demo",le="+Inf"} 5' in text
+    assert 'multimodal_latency_ms_count{model="demo"} 5' in text
+    assert "upstream_streams_open 3" in text
+    assert 'telemetry_events_total{event="stream_summary"} 1' in text
+
+
+def test_label_cardinality_is_capped():
+    from src.infra.telemetry import OVERFLOW_LABEL, MetricsRegistry
+
+    metrics = MetricsRegistry(max_series=3)
+    for chars in range(50):
+        metrics.inc("stream_fallback_completed_total", {"status": "success", "chars": chars})
+    text = metrics.render_prometheus()
+    series = [line for line in text.splitlines() if line.startswith("stream_fallback_completed_total{")]
+    assert len(series) == 4  # three kept + one overflow series
+    assert f'{{chars="{OVERFLOW_LABEL}",status="{OVERFLOW_LABEL}"}} 47' in text
+    assert 'telemetry_series_overflow_total{metric="stream_fallback_completed_total"} 47' in text
+    assert metrics.counter_value("stream_fallback_completed_total") == 50
@@ -121,3 +121,97 @@ def test_maintain_tmp_audio_dir_reads_env_and_applies(monkeypatch, tmp_path: Pat
     assert len(remaining_audio) <= 2
     total = sum(p.stat().st_size for p in remaining_audio)
     assert total <= 1024
+
+
+def test_index_scans_once_and_tracks_saves(monkeypatch, tmp_path: Path):
+    from src.infra import temp_audio_manager as tam
+
+    _mk_audio_file(tmp_path, "existing", size_bytes=100)
+    index = tam.TempAudioIndex(str(tmp_path))
+    assert index.file_count == 1 and index.total_bytes == 100
+
+    # After startup the index must not rescan the directory
+    monkeypatch.setattr(tam, "_list_audio_files", lambda _d: pytest.fail("unexpected directory scan"))
+    new_f = _mk_audio_file(tmp_path, "new", size_bytes=50)
+    index.record_save(str(new_f), 50)
+    index.record_save(str(tmp_path / "note.txt"), 10)  # non-audio is ignored
+    assert index.file_count == 2 and index.total_bytes == 150
+
+    index.remove(str(new_f))
+    assert not new_f.exists()
+    assert index.file_count == 1 and index.total_bytes == 100
+
+
+def test_index_enforce_evicts_oldest_by_age_count_and_size(tmp_path: Path):
+    from src.infra.temp_audio_manager import TempAudioIndex
+
+    index = TempAudioIndex(str(tmp_path))
+    now = time.time()
+    files = []
+    for i, age_h in enumerate([5, 3, 2, 1, 0]):
+        f = _mk_audio_file(tmp_path, f"f{i}", size_bytes=1024)
+        index.record_save(str(f), 1024, mtime=now - age_h * 3600)
+        files.append(f)
+
+    assert index.enforce(max_age_hours=4) == (1, 1024)
+    assert not files[0].exists()
+
+    assert index.enforce(max_files=3) == (1, 1024)
+    assert not files[1].exists()
+
+    deleted, _ = index.enforce(max_total_mb=2048 / (1024 * 1024))
+    assert deleted == 1 and not files[2].exists()
+    assert files[3].exists() and files[4].exists()
+    assert index.total_bytes == 2048
+
+
+def test_save_does_not_scan_and_janitor_enforces(monkeypatch, tmp_path: Path):
+    from src.infra import temp_audio_manager as tam
+    from src.utils.audio import save_audio_to_temp_file
+
+    monkeypatch.setenv("AUDIO_TMP_DIR", str(tmp_path))
+    monkeypatch.setenv("AUDIO_TMP_MAX_FILES", "2")
+    monkeypatch.setenv("AUDIO_TMP_MAX_AGE_HOURS", "0")
+    monkeypatch.setenv("AUDIO_TMP_MAX_TOTAL_MB", "0")
+    monkeypatch.setattr(tam, "_indexes", {})
+    monkeypatch.setattr(tam, "maintain_tmp_audio_dir", lambda *a, **k: pytest.fail("per-save maintenance"))
+
+    index = tam.get_tmp_audio_index(str(tmp_path), start_janitor=False)
+    for _ in range(4):
+        save_audio_to_temp_file(b"RIFFdata")
+    assert index.file_count == 4
+
+    index.start_janitor(interval_s=0.01)
+    try:
+        deadline = time.time() + 2
+        while index.file_count > 2 and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        index.stop_janitor()
+    assert index.file_count == 2
+    assert len([p for p in tmp_path.iterdir() if p.suffix == ".wav"]) == 2
+
+
+def test_janitor_enforces_limits_over_files_of_other_workers(monkeypatch, tmp_path: Path):
+    from src.infra.temp_audio_manager import TempAudioIndex
+
+    monkeypatch.setenv("AUDIO_TMP_MAX_FILES", "2")
+    monkeypatch.setenv("AUDIO_TMP_MAX_AGE_HOURS", "0")
+    monkeypatch.setenv("AUDIO_TMP_MAX_TOTAL_MB", "0")
+    mine = TempAudioIndex(str(tmp_path))
+    other_worker = TempAudioIndex(str(tmp_path))
+    now = time.time()
+    files = []
+    for i in range(3):
+        f = _mk_audio_file(tmp_path, f"w{i}")
+        os.utime(f, (now - 60 + i, now - 60 + i))
+        other_worker.record_save(str(f), f.stat().st_size, mtime=f.stat().st_mtime)
+        files.append(f)
+
+    # Single process: the index only knows its own saves
+    monkeypatch.delenv("WORKER_ID", raising=False)
+    assert mine._sweep() == (0, 0)
+
+    monkeypatch.setenv("WORKER_ID", "0.1")
+    assert mine._sweep()[0] == 1
+    assert not files[0].exists() and files[1].exists() and files[2].exists()
@@ -0,0 +1,129 @@
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from unittest.mock import MagicMock
+
+from src.infra.tts_cache import TTSCache
+from src.services.openai_service import OpenAIService
+
+
+class StubTelemetry:
+    def __init__(self) -> None:
+        self.counters: List[Dict[str, Any]] = []
+
+    def inc_counter(self, name: str, labels: Optional[Dict[str, Any]] = None) -> None:
+        self.counters.append({"name": name, "labels": labels or {}})
+
+    def names(self) -> List[str]:
+        return [c["name"] for c in self.counters]
+
+
+def test_miss_then_hit_from_disk(tmp_path: Path):
+    tel = StubTelemetry()
+    cache = TTSCache(base_dir=str(tmp_path), telemetry=tel)
+    calls = []
+
+    def synth() -> bytes:
+        calls.append(1)
+        return b"ID3audio"
+
+    assert cache.get_or_create("Hello", "tts-1", "alloy", "mp3", synth) == b"ID3audio"
+    # A new instance over the same directory still hits (disk-backed)
+    cache2 = TTSCache(base_dir=str(tmp_path), telemetry=tel)
+    assert cache2.get_or_create("Hello", "tts-1", "alloy", "mp3", synth) == b"ID3audio"
+    assert len(calls) == 1
+    assert tel.names() == ["tts_cache_miss_total", "tts_cache_hit_total"]
+
+    # Any key component change is a different entry
+    cache.get_or_create("Hello", "tts-1", "nova", "mp3", synth)
+    assert len(calls) == 2
+
+
+def test_concurrent_identical_requests_coalesce(tmp_path: Path):
+    tel = StubTelemetry()
+    cache = TTSCache(base_dir=str(tmp_path), telemetry=tel)
+    calls = []
+
+    def synth() -> bytes:
+        calls.append(1)
+        time.sleep(0.1)
+        return b"ID3slow"
+
+    results: List[bytes] = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_create("Same", "tts-1", "alloy", "mp3", synth)))
+        for _ in range(5)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert results == [b"ID3slow"] * 5
+    assert tel.names().count("tts_cache_coalesced_total") + tel.names().count("tts_cache_hit_total") == 4
+
+
+def test_late_caller_rereads_before_synthesizing(tmp_path: Path):
+    tel = StubTelemetry()
+    cache = TTSCache(base_dir=str(tmp_path), telemetry=tel)
+    cache.get_or_create("Late", "tts-1", "alloy", "mp3", lambda: b"ID3first")
+
+    # First read misses as if it ran just before the previous leader stored the entry and released its claim
+    read = cache._read
+    reads = []
+
+    def racy_read(path: Path):
+        reads.append(path)
+        return None if len(reads) == 1 else read(path)
+
+    cache._read = racy_read
+
+    def synth() -> bytes:
+        raise AssertionError("entry already cached")
+
+    assert cache.get_or_create("Late", "tts-1", "alloy", "mp3", synth) == b"ID3first"
+    assert len(reads) == 2
+    assert not cache._inflight
+    assert tel.names().count("tts_cache_miss_total") == 1
+
+
+def test_eviction_keeps_recently_used_entries(tmp_path: Path):
+    tel = StubTelemetry()
+    cache = TTSCache(base_dir=str(tmp_path), max_files=2, telemetry=tel)
+    cache.get_or_create("one", "tts-1", "alloy", "mp3", lambda: b"1")
+    cache.get_or_create("two", "tts-1", "alloy", "mp3", lambda: b"2")
+    old = time.time() - 60
+    for p in tmp_path.iterdir():
+        os.utime(p, (old, old))
+    cache.get_or_create("one", "tts-1", "alloy", "mp3", lambda: b"x")  # hit refreshes recency
+    cache.get_or_create("three", "tts-1", "alloy", "mp3", lambda: b"3")
+
+    assert len([p for p in tmp_path.iterdir() if p.suffix == ".mp3"]) == 2
+    assert "tts_cache_eviction_total" in tel.names()
+    assert cache.get_or_create("one", "tts-1", "alloy", "mp3", lambda: b"miss") == b"1"
+
+
+def test_replacing_a_stored_entry_keeps_counts(tmp_path: Path):
+    cache = TTSCache(base_dir=str(tmp_path))
+    cache.get_or_create("Hello", "tts-1", "alloy", "mp3", lambda: b"x" * 10)
+    assert (cache._files, cache._bytes) == (1, 10)
+
+    # A second leader for the same key (its miss raced the first store) writes the entry again
+    path = cache._path(TTSCache.key("Hello", "tts-1", "alloy", "mp3"), "mp3")
+    cache._store(path, b"y" * 4)
+    assert (cache._files, cache._bytes) == (1, 4)
+    assert [p.name for p in tmp_path.iterdir()] == [path.name]
+    cache.get_or_create("Bye", "tts-1", "alloy", "mp3", lambda: b"z" * 6)
+    assert (cache._files, cache._bytes) == (2, 10)
+
+
+def test_openai_text_to_speech_uses_cache(tmp_path: Path):
+    service = OpenAIService(api_key="test", tts_cache=TTSCache(base_dir=str(tmp_path)))
+    service.client.audio.speech.create = MagicMock(return_value=MagicMock(content=b"ID3speech"))
+
+    assert service.text_to_speech("Well done!") == b"ID3speech"
+    assert service.text_to_speech("Well done!") == b"ID3speech"
+    assert service.client.audio.speech.create.call_count == 1
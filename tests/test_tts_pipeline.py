@@ -0,0 +1,92 @@
+import threading
+import time
+from typing import List, Optional
+
+import pytest
+
+from src.core.writing_tutor import WritingTutor
+from src.infra.tts_pipeline import TTSPipeline, split_for_tts
+
+FEEDBACK = (
+    "Great job on your essay! Your introduction is clear. "
+    "However, watch your verb tenses in the second paragraph.\n\n"
+    "Vocabulary: try to vary your adjectives. Use words like 'remarkable' or 'vivid'. "
+    "Grammar: 'He go' should be 'He goes'. Overall score: B1."
+)
+
+
+class FakeTTSService:
+    def __init__(self, delay: float = 0.0, gate: Optional[threading.Event] = None) -> None:
+        self.delay = delay
+        self.gate = gate
+        self.calls: List[str] = []
+        self._lock = threading.Lock()
+
+    def text_to_speech(self, text: str, model: str = "tts-1", voice: str = "alloy") -> bytes:
+        with self._lock:
+            self.calls.append(text)
+            first = len(self.calls) == 1
+        if self.gate is not None and not first:
+            self.gate.wait(timeout=5)
+        time.sleep(self.delay)
+        return b"ID3" + text.encode("utf-8")
+
+
+class FakeParent:
+    telemetry = None
+
+
+def test_split_for_tts_respects_limits_and_paragraphs():
+    chunks = split_for_tts(FEEDBACK, max_chars=90, first_chunk_chars=40)
+    assert len(chunks[0]) <= 40
+    assert all(len(c) <= 90 for c in chunks)
+    assert " ".join(chunks).split() == FEEDBACK.split()
+    # Paragraph boundary is never merged into one chunk
+    assert not any("paragraph. Vocabulary" in c for c in chunks)
+
+
+def test_pipeline_synthesizes_chunks_concurrently_in_order():
+    svc = FakeTTSService(delay=0.1)
+    pipeline = TTSPipeline(svc, max_workers=4, max_chars=60, first_chunk_chars=40)
+    start = time.perf_counter()
+    job = pipeline.submit(FEEDBACK)
+    audio = job.result(timeout=5)
+    elapsed = time.perf_counter() - start
+
+    assert len(job.chunks) >= 4
+    assert elapsed < 0.1 * len(job.chunks) * 0.75
+    assert audio == b"".join(b"ID3" + c.encode("utf-8") for c in job.chunks)
+    assert pipeline.submit(FEEDBACK) is job  # reused, not re-synthesized
+    pipeline.shutdown()
+
+
+def test_play_audio_stream_yields_first_chunk_before_rest(monkeypatch, tmp_path):
+    monkeypatch.setenv("AUDIO_TMP_DIR", str(tmp_path))
+    gate = threading.Event()
+    svc = FakeTTSService(gate=gate)
+    tutor = WritingTutor(openai_service=svc, tutor_parent=FakeParent())
+    history = [{"role": "assistant", "content": FEEDBACK}]
+
+    gen = tutor.play_audio_stream(history)
+    first = next(gen)
+    assert first is not None and first.endswith(".mp3")
+    assert not tutor._tts_pipeline().submit(FEEDBACK).done()  # remaining chunks still pending
+
+    gate.set()
+    rest = list(gen)
+    assert len(rest) == len(split_for_tts(FEEDBACK)) - 1
+
+
+def test_prefetch_makes_playback_reuse_synthesis(monkeypatch, tmp_path):
+    monkeypatch.setenv("AUDIO_TMP_DIR", str(tmp_path))
+    monkeypatch.setenv("WRITING_TTS_PREFETCH", "1")
+    svc = FakeTTSService()
+    tutor = WritingTutor(openai_service=svc, tutor_parent=FakeParent())
+
+    tutor._maybe_prefetch_audio(FEEDBACK)
+    tutor._tts_pipeline().submit(FEEDBACK).result(timeout=5)
+    calls_after_prefetch = len(svc.calls)
+
+    path = tutor.play_audio([{"role": "assistant", "content": FEEDBACK}])
+    assert path is not None
+    assert len(svc.calls) == calls_after_prefetch
@@ -0,0 +1,158 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from openai import OpenAI
+
+from src.infra.streaming_manager import StreamingManager
+from src.infra.upstream_streams import UpstreamStreams, get_stream_tracker
+from src.services.openai_service import ChatStream
+
+CHUNK = {
+    "id": "chatcmpl-test",
+    "object": "chat.completion.chunk",
+    "created": 0,
+    "model": "test",
+    "choices": [{"index": 0, "delta": {"content": "Hello"}, "finish_reason": None}],
+}
+
+
+@pytest.fixture
+def stalling_server():
+    """Chat completions endpoint that sends one chunk and then goes silent (no further bytes)."""
+    release = threading.Event()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.end_headers()
+            self.wfile.write(f"data: {json.dumps(CHUNK)}\n\n".encode())
+            self.wfile.flush()
+            release.wait(10)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1"
+    release.set()
+    server.shutdown()
+    server.server_close()
+
+
+class _Service:
+    model = "test"
+
+    def __init__(self, base_url: str) -> None:
+        self.client = OpenAI(api_key="test", base_url=base_url, max_retries=0)
+
+    def open_chat_stream(self, messages, temperature, max_tokens):
+        response = self.client.chat.completions.create(
+            model=self.model, messages=messages, temperature=temperature, max_tokens=max_tokens, stream=True
+        )
+        return ChatStream(response, model=self.model)
+
+
+def _consumer_threads_settle() -> dict:
+    stats = get_stream_tracker().snapshot()
+    for _ in range(20):
+        if stats["open"] == 0 and stats["consumer_threads"] == 0:
+            break
+        time.sleep(0.05)
+        stats = get_stream_tracker().snapshot()
+    return stats
+
+
+def test_close_from_another_thread_unblocks_the_reader(stalling_server):
+    stream = _Service(stalling_server).open_chat_stream(
+        messages=[{"role": "user", "content": "hi"}], temperature=0, max_tokens=5
+    )
+    received = []
+    reader = threading.Thread(target=lambda: received.extend(stream), daemon=True)
+    reader.start()
+    time.sleep(0.3)
+    assert reader.is_alive() and received == ["Hello"]
+
+    start = time.perf_counter()
+    stream.close()
+    reader.join(2)
+    assert not reader.is_alive()
+    assert time.perf_counter() - start < 1.0
+
+
+def test_inactivity_timeout_releases_stream_and_thread(stalling_server):
+    mgr = StreamingManager(service=_Service(stalling_server), retry_limit=2, backoff_ms=1, timeout_ms=300)
+    start = time.perf_counter()
+    with pytest.raises(TimeoutError):
+        mgr.stream_text(messages=[{"role": "user", "content": "hi"}])
+    assert time.perf_counter() - start < 3.0
+    stats = _consumer_threads_settle()
+    assert stats == {"open": 0, "consumer_threads": 0, "leaked": 0}
+
+
+def test_stop_event_releases_stream_and_returns_partial_text(stalling_server):
+    mgr = StreamingManager(service=_Service(stalling_server), retry_limit=1, timeout_ms=5000)
+    stop = threading.Event()
+    threading.Timer(0.3, stop.set).start()
+    assert mgr.stream_text(messages=[{"role": "user", "content": "hi"}], stop_event=stop) == "Hello"
+    assert _consumer_threads_settle()["open"] == 0
+
+
+def test_stop_event_releases_stalled_stream_without_inactivity_timeout(stalling_server, monkeypatch):
+    monkeypatch.delenv("STREAM_TIMEOUT_MS", raising=False)
+    mgr = StreamingManager(service=_Service(stalling_server), retry_limit=1, timeout_ms=0)
+    stop = threading.Event()
+    threading.Timer(0.2, stop.set).start()
+    start = time.perf_counter()
+    assert mgr.stream_text(messages=[{"role": "user", "content": "hi"}], stop_event=stop) == "Hello"
+    assert time.perf_counter() - start < 1.5
+    assert _consumer_threads_settle() == {"open": 0, "consumer_threads": 0, "leaked": 0}
+
+
+def test_async_stop_event_interrupts_a_stalled_read_without_timeout(monkeypatch):
+    monkeypatch.delenv("STREAM_TIMEOUT_MS", raising=False)
+    closed = []
+
+    class _StallingAsync:
+        model = "test"
+
+        async def astream_chat_completion(self, messages, temperature, max_tokens):
+            try:
+                yield "Hello"
+                await asyncio.sleep(5)
+                yield " never"
+            finally:
+                closed.append(True)
+
+    async def run():
+        mgr = StreamingManager(service=_StallingAsync(), retry_limit=1, timeout_ms=0)
+        stop = threading.Event()
+        asyncio.get_running_loop().call_later(0.2, stop.set)
+        return [ch async for ch in mgr.astream_text(messages=[{"role": "user", "content": "hi"}], stop_event=stop)]
+
+    start = time.perf_counter()
+    assert asyncio.run(run()) == ["Hello"]
+    assert time.perf_counter() - start < 1.5
+    assert closed == [True]
+
+
+def test_thread_that_never_exits_is_reported_as_leaked():
+    tracker = UpstreamStreams(release_timeout_ms=50)
+    blocker = threading.Event()
+    thread = threading.Thread(target=blocker.wait, daemon=True)
+    thread.start()
+    lease = tracker.open("chat")
+    lease.attach(None, thread)
+    assert tracker.snapshot() == {"open": 1, "consumer_threads": 1, "leaked": 0}
+
+    assert lease.close("timeout") is False
+    assert tracker.snapshot() == {"open": 0, "consumer_threads": 1, "leaked": 1}
+    blocker.set()
+    thread.join(1)
+    assert tracker.snapshot()["leaked"] == 0
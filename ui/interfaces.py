@@ -1,15 +1,21 @@
+import asyncio
+import time
 import gradio as gr
 from pathlib import Path
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import FileResponse, PlainTextResponse
 import os
 import base64
+import hmac
 from urllib.parse import unquote
 from gradio.routes import mount_gradio_app
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 from typing import TYPE_CHECKING, Optional, Dict, Any
 from src.core.escalation_manager import EscalationManager
-from src.utils.audio import analyze_pronunciation_metrics, save_audio_to_temp_file
+from src.core.session_store import SESSION_ID_PREFIX
+from src.utils.audio import analyze_pronunciation_metrics, remove_temp_audio, save_audio_to_temp_file
+from src.utils.playback_sync import SPEAKING_AUDIO_ID, SPEAKING_CHATBOT_ID
 
 if TYPE_CHECKING:
     # Type-only import to avoid circular import at runtime
@@ -22,17 +28,36 @@ class GradioInterface:
     def __init__(self, tutor: "EnglishTutor"):
         self.tutor = tutor
 
-    def get_progress_html(self):
-        """Return the current user progress dashboard HTML."""
-        return self.tutor.progress_tracker.html_dashboard()
+    def get_progress_html(self, request: Optional[gr.Request] = None):
+        """Return the progress dashboard HTML of the learner behind ``request``."""
+        return self.tutor.session(request).progress.html_dashboard()
+
+    def get_progress_data(self, request: Optional[gr.Request] = None) -> Dict[str, Any]:
+        """Return the progress (JSON) of the learner behind ``request``."""
+        return self.tutor.session(request).progress.to_json()
+
+    async def watch_key_status(self):
+        """Yield the API key status until background validation settles (bounded by KEY_STATUS_POLL_S)."""
+        deadline = time.monotonic() + float(os.getenv("KEY_STATUS_POLL_S", "30"))
+        status = self.tutor.key_status()
+        yield status["message"]
+        while status["state"] == "validating" and time.monotonic() < deadline:
+            await asyncio.sleep(0.5)
+            status = self.tutor.key_status()
+            if status["state"] != "validating":
+                yield status["message"]
 
     def create_interface(self):
         """Create and configure the Gradio interface."""
 
         css_path = Path("assets/styles.css")
         css = css_path.read_text()
+        # Reveals speaking replies in step with the bot audio on the client (no server-side waiting)
+        playback_js = Path("assets/playback_sync.js").read_text()
 
-        with gr.Blocks(css=css, theme=gr.themes.Soft(), elem_id="main-container") as demo:
+        with gr.Blocks(
+            css=css, head=f"<script>{playback_js}</script>", theme=gr.themes.Soft(), elem_id="main-container"
+        ) as demo:
             # State
             history_speaking = gr.State([])
             history_writing = gr.State([])
@@ -98,7 +123,7 @@ class GradioInterface:
                     autoscroll=True,
                     avatar_images=["./assets/user.png", "./assets/sophia-ia.png"],
                     elem_classes="chatbot-container",
-                    elem_id="chatbot-speaking",
+                    elem_id=SPEAKING_CHATBOT_ID,
                 )
                 audio_input_mic = gr.Audio(
                     sources=["microphone"],
@@ -107,18 +132,25 @@ class GradioInterface:
                     elem_classes="container",
                     elem_id="mic-input",
                 )
+                # With SPEAKING_AUDIO_STREAMING the bot reply arrives as consecutive WAV segments
                 audio_output_speaking = gr.Audio(
-                    visible=False, autoplay=True, label="Bot Speech Output", elem_id="audio-output-speaking"
+                    visible=False,
+                    autoplay=True,
+                    streaming=self.tutor.speaking_tutor.audio_streaming_enabled(),
+                    label="Bot Speech Output",
+                    elem_id=SPEAKING_AUDIO_ID,
                 )
+                # Reveal timing of the latest Hybrid reply, read by assets/playback_sync.js
+                playback_sync_speaking = gr.HTML(visible=False, elem_id="playback-sync-speaking")
                 audio_input_mic.stop_recording(
-                    fn=self.tutor.speaking_tutor.handle_transcription,
+                    fn=self.tutor.speaking_tutor.ahandle_transcription,
                     inputs=[history_speaking, audio_input_mic, english_level, speaking_mode],
                     outputs=[chatbot_speaking, history_speaking],
                     api_name="speaking_transcribe",
                 ).then(
-                    fn=self.tutor.speaking_tutor.handle_bot_response,
+                    fn=self.tutor.speaking_tutor.handle_bot_response_with_sync,
                     inputs=[history_speaking, english_level, speaking_mode],
-                    outputs=[chatbot_speaking, history_speaking, audio_output_speaking],
+                    outputs=[chatbot_speaking, history_speaking, audio_output_speaking, playback_sync_speaking],
                     api_name="speaking_bot_response",
                 ).then(
                     fn=lambda: None,
@@ -180,9 +212,13 @@ class GradioInterface:
                     play_audio_btn = gr.Button("playback", elem_classes="gradio-button", elem_id="play-audio-btn")
                     clear_writing_btn = gr.Button("Clear", elem_classes="gradio-button", elem_id="clear-essay-btn")
 
+                # Feedback audio arrives chunk by chunk (first sentence plays while the rest synthesizes)
                 audio_output_writing = gr.Audio(
-                    visible=False, autoplay=True, label="Feedback Audio", elem_id="audio-output-writing"
+                    visible=False, autoplay=True, streaming=True, label="Feedback Audio", elem_id="audio-output-writing"
                 )
+                # Single-file endpoint kept for the React client (front_end/services/api.ts -> /play_audio)
+                play_audio_api_btn = gr.Button(visible=False)
+                audio_file_writing = gr.Audio(visible=False, type="filepath")
 
                 generate_topic_btn.click(
                     fn=self.tutor.writing_tutor.generate_random_topic,
@@ -208,9 +244,15 @@ class GradioInterface:
                     api_name="evaluate_essay",
                 )
                 play_audio_btn.click(
-                    fn=self.tutor.writing_tutor.play_audio,
+                    fn=self.tutor.writing_tutor.play_audio_stream,
                     inputs=[history_writing],
                     outputs=[audio_output_writing],
+                    api_name="play_audio_stream",
+                )
+                play_audio_api_btn.click(
+                    fn=self.tutor.writing_tutor.play_audio,
+                    inputs=[history_writing],
+                    outputs=[audio_file_writing],
                     api_name="play_audio",
                 )
 
@@ -218,7 +260,7 @@ class GradioInterface:
 
             # ------------------- Progress Dashboard Tab -------------------
             with gr.Tab("Progress"):
-                progress_html = gr.HTML(value=self.get_progress_html(), elem_id="progress-dashboard")
+                progress_html = gr.HTML(elem_id="progress-dashboard")
                 refresh_progress_btn = gr.Button("Refresh", elem_classes="gradio-button", elem_id="refresh-progress")
 
                 refresh_progress_btn.click(
@@ -226,6 +268,13 @@ class GradioInterface:
                     inputs=None,
                     outputs=[progress_html],
                 )
+                # JSON progress for the React client, resolved from the caller's own Gradio session
+                gr.api(self.get_progress_data, api_name="get_progress")
+
+            # The API key is validated in the background at startup; push the result once it lands
+            demo.load(fn=self.watch_key_status, inputs=None, outputs=[status_text], show_progress="hidden")
+            # Progress is per session, so it is rendered once the browser session is known
+            demo.load(fn=self.get_progress_html, inputs=None, outputs=[progress_html], show_progress="hidden")
 
         return demo
 
@@ -260,7 +309,7 @@ def run_gradio_interface(tutor: "EnglishTutor"):
     )
 
     # ------------------- Escalation API (FastAPI) -------------------
-    escalation_manager = EscalationManager()
+    escalation_manager = EscalationManager(backend=getattr(tutor, "state_backend", None))
 
     @app.post("/api/escalations")
     async def create_escalation(payload: Dict[str, Any]):
@@ -381,26 +430,61 @@ def run_gradio_interface(tutor: "EnglishTutor"):
             else:
                 raise HTTPException(status_code=400, detail="Provide userAudioBase64 or userAudioUrl")
 
-            metrics = analyze_pronunciation_metrics(audio_path, transcript=transcript, level=level)
+            # Decode + frame analysis is CPU work; keep it off the event loop
+            metrics = await run_in_threadpool(
+                analyze_pronunciation_metrics, audio_path, transcript=transcript, level=level
+            )
             return metrics
         finally:
-            if tmp_path and os.path.exists(tmp_path):
-                try:
-                    os.remove(tmp_path)
-                except Exception:
-                    pass
+            if tmp_path:
+                remove_temp_audio(tmp_path)
 
     # ------------------- Progress API (FastAPI) -------------------
     @app.get("/api/progress")
-    async def get_progress():
+    async def get_progress(session_id: Optional[str] = None):
+        # Without session_id this is the default session (single-user deployments). Per-learner progress is served
+        # by the Gradio /get_progress endpoint, which resolves the caller's own session. Only unguessable browser
+        # session ids are accepted here: "user:<name>" ids would expose any learner's progress to whoever knows
+        # the username. A given id is only looked up, never created, so unknown ids cannot fill the store.
+        if session_id and not session_id.startswith(SESSION_ID_PREFIX):
+            raise HTTPException(status_code=404, detail="Session not found")
         try:
-            return tutor.progress_tracker.to_json()
+            session = tutor.sessions.peek(session_id) if session_id else tutor.sessions.get()
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
+        if session is None:
+            raise HTTPException(status_code=404, detail="Session not found")
+        return session.progress.to_json()
+
+    @app.get("/api/sessions/stats")
+    async def session_stats():
+        return tutor.sessions.memory_report()
+
+    # Runs after uvicorn has drained in-flight requests (graceful shutdown)
+    app.add_event_handler("shutdown", tutor.shutdown)
+
+    # Aggregated telemetry in Prometheus text format (this worker's process). Off by default: it is served
+    # on the public port. Under the multi-worker launcher, workers get a METRICS_TOKEN and only answer the
+    # supervisor, which merges every worker on its internal METRICS_PORT listener.
+    metrics_token = os.getenv("METRICS_TOKEN", "")
+    if metrics_token or os.getenv("METRICS_ENABLED", "0").strip().lower() not in ("0", "false", "no", "off"):
+
+        @app.get("/metrics")
+        async def metrics(request: Request):
+            expected = f"Bearer {metrics_token}"
+            if metrics_token and not hmac.compare_digest(request.headers.get("authorization", ""), expected):
+                raise HTTPException(status_code=404, detail="Not Found")
+            telemetry = getattr(tutor, "telemetry", None)
+            if telemetry is None:
+                raise HTTPException(status_code=404, detail="Telemetry disabled")
+            return PlainTextResponse(
+                telemetry.metrics.render_prometheus(), media_type="text/plain; version=0.0.4; charset=utf-8"
+            )
 
     # Simple health check for platform probes
     @app.get("/healthz")
     async def healthz():
-        return {"status": "ok"}
+        # Liveness stays "ok" while the API key is still being validated in the background
+        return {"status": "ok", "api_key": tutor.key_status()["state"]}
 
     return app